@@ -44,13 +44,24 @@ services/__init__.py:
     from .document_service_pb2_grpc import *
     from .search_service_pb2_grpc import *
 
+LAZY MODE (--lazy):
+===================
+Instead of star imports, schemas/__init__.py and services/__init__.py define a
+module-level __getattr__/__dir__ (PEP 562) backed by a name -> module index that
+is built here from the generated .pyi stubs (or the .py sources when no stub
+exists). Nothing is imported until a name is first accessed, so importing
+DocumentServiceStub no longer loads the search or ML services. A matching
+__init__.pyi with explicit re-exports is written next to each __init__.py so
+type checkers still resolve every name.
+
 """
 
+import ast
 import os
 import sys
 import logging
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -60,26 +71,176 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+LAZY_INIT_TEMPLATE = '''
+# Exports are resolved lazily on first access (PEP 562), so importing this
+# package does not load any generated module until one of its names is used.
+import importlib as _importlib
 
-def generate_schemas_init(schemas_output_dir: str, output_file: str) -> List[str]:
-    """Generate __init__.py for schemas package"""
+_SUBMODULES = {submodules}
 
-    schemas_path = Path(schemas_output_dir)
-    if not schemas_path.exists():
-        logger.error(f"Schemas directory not found: {schemas_path}")
+_EXPORTS = {{
+{exports}}}
+
+__all__ = {all_names}
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        if name in _SUBMODULES:
+            return _importlib.import_module(f".{{name}}", __name__)
+        raise AttributeError(f"module {{__name__!r}} has no attribute {{name!r}}")
+    value = getattr(_importlib.import_module(f".{{module_name}}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+'''
+
+
+def _collect_public_names(module_file: Path) -> List[str]:
+    """Return the names a star import of module_file would bind.
+
+    The .pyi stub is preferred because the generated _pb2.py modules build their
+    classes at runtime and declare nothing statically.
+    """
+    stub_file = module_file.with_suffix(".pyi")
+    source_file = stub_file if stub_file.exists() else module_file
+
+    try:
+        tree = ast.parse(source_file.read_text(encoding='utf-8'))
+    except (OSError, SyntaxError, ValueError) as e:
+        logger.warning(f"Could not parse {source_file} for exports: {e}")
         return []
 
-    # Find all _pb2.py files to determine what to import
-    pb2_files = list(schemas_path.glob("*_pb2.py"))
+    names = []
+    for node in tree.body:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            names.append(node.name)
+        elif isinstance(node, ast.Assign):
+            names.extend(target.id for target in node.targets if isinstance(target, ast.Name))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            names.append(node.target.id)
+
+    return [name for name in dict.fromkeys(names) if not name.startswith("_")]
+
+
+def _build_export_index(module_files: List[Path]) -> Dict[str, str]:
+    """Map every exported name to the module that provides it.
+
+    Modules are processed in import order and later modules win, matching what
+    the equivalent sequence of star imports would produce.
+    """
+    index = {}
+    for module_file in module_files:
+        for name in _collect_public_names(module_file):
+            index[name] = module_file.stem
+    return index
+
+
+def _render_lazy_init(header: str, module_files: List[Path]) -> Tuple[str, str, List[str]]:
+    """Render the lazy __init__.py and its __init__.pyi for the given modules."""
+    index = _build_export_index(module_files)
+    all_names = sorted(index)
+    submodules = tuple(module_file.stem for module_file in module_files)
+
+    exports = "".join(f"    {name!r}: {index[name]!r},\n" for name in all_names)
+    init_content = header + LAZY_INIT_TEMPLATE.format(
+        submodules=repr(submodules),
+        exports=exports,
+        all_names=repr(all_names),
+    )
+
+    stub_content = header + "\n"
+    for module_name in submodules:
+        stub_content += f"from . import {module_name} as {module_name}\n"
+    for module_name in submodules:
+        names = sorted(name for name in all_names if index[name] == module_name)
+        if names:
+            imports = "".join(f"    {name} as {name},\n" for name in names)
+            stub_content += f"from .{module_name} import (\n{imports})\n"
+    stub_content += f"\n__all__ = {all_names!r}\n"
+
+    return init_content, stub_content, all_names
+
+
+def _write_file_atomically(output_file: str, content: str) -> bool:
+    """Write content to output_file through a temporary file and a rename."""
+    output_path = Path(output_file)
+    temp_file = output_path.with_suffix(f"{output_path.suffix}.tmp")
 
-    # Generate the __init__.py content
-    content = '''# OpenSearch Protobuf Schemas
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        temp_file.replace(output_path)
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to write {output_file}: {e}")
+        if temp_file.exists():
+            temp_file.unlink()
+        return False
+
+
+def _generate_lazy_init(header: str, module_files: List[Path], output_file: str) -> Optional[List[str]]:
+    """Write a lazy __init__.py and the matching __init__.pyi next to it.
+
+    Returns the exported names, or None if either file could not be written.
+    """
+    init_content, stub_content, all_names = _render_lazy_init(header, module_files)
+    stub_file = str(Path(output_file).with_suffix(".pyi"))
+
+    if not _write_file_atomically(output_file, init_content):
+        return None
+    if not _write_file_atomically(stub_file, stub_content):
+        return None
+
+    logger.info(f"Generated lazy {output_file} and {stub_file} with {len(all_names)} exports")
+    return all_names
+
+
+SCHEMAS_HEADER = '''# OpenSearch Protobuf Schemas
 # This module provides convenient access to all protobuf message types
 # without requiring knowledge of the specific _pb2 module names.
 #
 # This file is automatically generated by tools/generate_init_files.py
 # DO NOT EDIT MANUALLY
+'''
 
+SERVICES_HEADER = '''# OpenSearch Protobuf Services
+# This module provides convenient access to all gRPC service stubs
+# without requiring knowledge of the specific _pb2 module names.
+#
+# This file is automatically generated by tools/generate_init_files.py
+# DO NOT EDIT MANUALLY
+'''
+
+
+def generate_schemas_init(schemas_output_dir: str, output_file: str, lazy: bool = False) -> List[str]:
+    """Generate __init__.py for schemas package.
+
+    With lazy=True the package resolves names on first access instead of
+    star-importing every _pb2 module, and an __init__.pyi is written alongside.
+    """
+
+    schemas_path = Path(schemas_output_dir)
+    if not schemas_path.exists():
+        logger.error(f"Schemas directory not found: {schemas_path}")
+        return []
+
+    # Find all _pb2.py files to determine what to import
+    pb2_files = list(schemas_path.glob("*_pb2.py"))
+
+    if lazy:
+        exports = _generate_lazy_init(SCHEMAS_HEADER, sorted(pb2_files), output_file)
+        if exports is None:
+            return []
+        return exports or ["*"]
+
+    # Generate the __init__.py content
+    content = SCHEMAS_HEADER + '''
 # Import all classes from the generated modules
 '''
 
@@ -107,8 +268,12 @@ def generate_schemas_init(schemas_output_dir: str, output_file: str) -> List[str
         return []
 
 
-def generate_services_init(services_dir: str, output_file: str) -> bool:
-    """Generate __init__.py for services package with dynamic service discovery."""
+def generate_services_init(services_dir: str, output_file: str, lazy: bool = False) -> bool:
+    """Generate __init__.py for services package with dynamic service discovery.
+
+    With lazy=True each service module (and grpc itself) is only imported when
+    one of its names is first accessed.
+    """
 
     services_path = Path(services_dir)
     if not services_path.exists():
@@ -128,13 +293,11 @@ def generate_services_init(services_dir: str, output_file: str) -> bool:
 
     all_services = sorted(all_services)
 
-    content = '''# OpenSearch Protobuf Services
-# This module provides convenient access to all gRPC service stubs
-# without requiring knowledge of the specific _pb2 module names.
-#
-# This file is automatically generated by tools/generate_init_files.py
-# DO NOT EDIT MANUALLY
+    if lazy:
+        module_files = sorted(pb2_files) + sorted(grpc_files)
+        return _generate_lazy_init(SERVICES_HEADER, module_files, output_file) is not None
 
+    content = SERVICES_HEADER + '''
 # Import all classes from the generated service modules
 '''
 
@@ -169,20 +332,23 @@ def generate_services_init(services_dir: str, output_file: str) -> bool:
 
 def main():
     """Main function - reads .proto files directly for service discovery."""
-    if len(sys.argv) != 3:
-        logger.error("Usage: generate_init_files.py <schemas_output_dir> <services_output_dir>")
+    args = [arg for arg in sys.argv[1:] if arg != "--lazy"]
+    lazy = len(args) != len(sys.argv) - 1
+
+    if len(args) != 2:
+        logger.error("Usage: generate_init_files.py [--lazy] <schemas_output_dir> <services_output_dir>")
         logger.info("Note: This version reads from protos/schemas/ and protos/services/ directories")
         sys.exit(1)
 
-    schemas_output_dir = sys.argv[1]  # Where to write schemas __init__.py
-    services_output_dir = sys.argv[2]  # Where to write services __init__.py
+    schemas_output_dir = args[0]  # Where to write schemas __init__.py
+    services_output_dir = args[1]  # Where to write services __init__.py
 
     success = True
 
     # Generate schemas __init__.py by reading .proto files
     try:
         schemas_init = os.path.join(schemas_output_dir, "__init__.py")
-        result = generate_schemas_init(schemas_output_dir, schemas_init)
+        result = generate_schemas_init(schemas_output_dir, schemas_init, lazy=lazy)
         if not result:
             logger.error("Failed to generate schemas init file")
             success = False
@@ -193,7 +359,7 @@ def main():
     # Generate services __init__.py
     try:
         services_init = os.path.join(services_output_dir, "__init__.py")
-        if not generate_services_init(services_output_dir, services_init):
+        if not generate_services_init(services_output_dir, services_init, lazy=lazy):
             logger.error("Failed to generate services init file")
             success = False
     except Exception as e:
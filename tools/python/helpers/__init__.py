@@ -0,0 +1,8 @@
+# OpenSearch Protobuf Helpers
+# Hand-written client utilities built on top of the generated schemas and
+# services packages. Import the submodule you need, e.g.:
+#
+#     from opensearch.protobufs.helpers.bulk import chunk_bulk_requests
+#
+# Submodules are not imported here so that using one helper does not pull in
+# the dependencies (grpc, numpy, ...) of the others.
@@ -0,0 +1,22 @@
+"""
+Lookups shared by the helpers that talk to the generated gRPC services.
+"""
+
+from types import ModuleType
+
+
+def method_path(service_module: ModuleType, service_name: str, method_name: str) -> str:
+    """Return the gRPC method path, e.g. /org.opensearch.protobufs.services.SearchService/Search.
+
+    service_module is the generated *_pb2 module declaring the service.
+    """
+    service = service_module.DESCRIPTOR.services_by_name[service_name]
+    method = service.methods_by_name[method_name]
+    return f"/{service.full_name}/{method.name}"
+
+
+def sized_deserializer(deserializer):
+    """Wrap a response deserializer so it returns (message, serialized size)."""
+    def deserialize(data: bytes):
+        return deserializer(data), len(data)
+    return deserialize
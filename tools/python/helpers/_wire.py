@@ -0,0 +1,43 @@
+"""
+Protobuf wire-format size arithmetic shared by the helpers.
+
+Only the pieces needed to account for length-delimited fields are provided;
+everything else is left to the protobuf runtime.
+"""
+
+WIRETYPE_VARINT = 0
+WIRETYPE_LENGTH_DELIMITED = 2
+
+
+def varint_size(value: int) -> int:
+    """Return the number of bytes needed to encode a non-negative varint."""
+    size = 1
+    while value >= 0x80:
+        value >>= 7
+        size += 1
+    return size
+
+
+def tag_size(field_number: int) -> int:
+    """Return the encoded size of the tag for field_number."""
+    return varint_size(field_number << 3)
+
+
+def length_delimited_size(field_number: int, payload_size: int) -> int:
+    """Return the encoded size of a length-delimited field with payload_size bytes."""
+    return tag_size(field_number) + varint_size(payload_size) + payload_size
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode a non-negative integer as a varint."""
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_tag(field_number: int, wire_type: int) -> bytes:
+    """Encode the tag for field_number with the given wire type."""
+    return encode_varint((field_number << 3) | wire_type)
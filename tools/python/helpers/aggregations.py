@@ -0,0 +1,274 @@
+"""
+Flatten SearchResponse aggregation trees into columnar tables.
+
+Every aggregation path gets one table, whatever the number of parent buckets:
+"by_host" at the top level, "by_host>by_status" for a terms aggregation
+nested under it, "by_host>max_cpu" for a metric inside each host bucket.
+
+- Bucket aggregations (sterms, lterms, dterms, ulterms) have the columns
+  key, doc_count and parent.
+- Metric aggregations (min, max) have the columns value (NaN for null) and
+  parent.
+
+With strings=True, key_as_string / value_as_string columns are added
+whenever the server sent them. Checking for them costs about a quarter of
+the extraction time, so they are opt-in.
+
+parent is the row index of the enclosing bucket in the parent path's table,
+or -1 at the top level. Trees are walked breadth first, so each table's
+parent column is non-decreasing and all rows under one parent bucket are
+contiguous (ready for numpy.searchsorted or reduceat). umterms (an unmapped
+field) contributes no rows.
+
+Values are gathered into typed array.array buffers and handed to NumPy or
+Arrow without copying. The resulting columns never create per-bucket Python
+objects, apart from string keys. numpy (or pyarrow for output="arrow") is an
+optional dependency, imported on first use.
+"""
+
+import math
+from array import array
+from collections import deque
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from opensearch.protobufs.schemas import Aggregate, SearchResponse
+
+OUTPUT_NUMPY = "numpy"
+OUTPUT_ARROW = "arrow"
+
+PATH_SEPARATOR = ">"
+
+BUCKET_KINDS = ("sterms", "lterms", "dterms", "ulterms")
+METRIC_KINDS = ("min", "max")
+
+# array.array typecode and NumPy/Arrow type of the key column per bucket kind;
+# sterms keys are kept in a list.
+_KEY_TYPES = {
+    "dterms": ("d", "float64"),
+    "lterms": ("q", "int64"),
+    "ulterms": ("Q", "uint64"),
+    "sterms": (None, "string"),
+}
+
+
+class AggregationTable(NamedTuple):
+    """The rows of one aggregation path."""
+
+    kind: str
+    columns: Any  # Dict[str, numpy.ndarray] or pyarrow.RecordBatch
+
+
+def extract_aggregations(
+    source: Union[SearchResponse, Mapping[str, Aggregate]],
+    output: str = OUTPUT_NUMPY,
+    separator: str = PATH_SEPARATOR,
+    strings: bool = False,
+) -> Dict[str, AggregationTable]:
+    """Return one AggregationTable per aggregation path in source.
+
+    source is a SearchResponse or its aggregations map. Raises ValueError if
+    the same path holds different aggregation kinds.
+    """
+    if output not in (OUTPUT_NUMPY, OUTPUT_ARROW):
+        raise ValueError(f"Unknown output {output!r}; expected {OUTPUT_NUMPY!r} or {OUTPUT_ARROW!r}")
+    aggregations = source.aggregations if isinstance(source, SearchResponse) else source
+
+    # Each pending entry is one path with all its (aggregate, parent row)
+    # instances, so per-path work (kind lookup, accumulator, path string) is
+    # done once per path rather than once per bucket.
+    tables: Dict[str, _Accumulator] = {}
+    pending = deque((name, [(aggregate, -1)]) for name, aggregate in aggregations.items())
+    while pending:
+        path, nodes = pending.popleft()
+        kind = None
+        for aggregate, _ in nodes:
+            kind = _kind(aggregate)
+            if kind is not None:
+                break
+        if kind is None:
+            continue
+
+        table = tables.get(path)
+        if table is None:
+            table = tables[path] = _Accumulator(kind, strings)
+        if kind in METRIC_KINDS:
+            table.add_metrics(path, nodes)
+            continue
+
+        children: Dict[str, List[Tuple[Aggregate, int]]] = {}
+        for aggregate, parent in nodes:
+            if not aggregate.HasField(kind):
+                _check_kind(path, kind, aggregate)
+                continue
+            buckets = getattr(aggregate, kind).buckets
+            base = table.add_buckets(buckets, parent)
+            _collect_children([bucket.aggregate for bucket in buckets], base, children)
+        for name, nested in children.items():
+            pending.append((f"{path}{separator}{name}", nested))
+
+    converter = _numpy_columns if output == OUTPUT_NUMPY else _arrow_columns
+    return {path: AggregationTable(tables[path].kind, converter(tables[path])) for path in sorted(tables)}
+
+
+def _collect_children(sub_aggregations: List[Any], base: int,
+                      children: Dict[str, List[Tuple[Aggregate, int]]]) -> None:
+    """Append (child aggregate, parent row) pairs grouped by child name.
+
+    Buckets of one aggregation nearly always carry the same sub-aggregations,
+    which are then gathered one name at a time with list comprehensions.
+    Iterating the maps directly (never through items()) avoids the slow
+    generic Mapping views.
+    """
+    non_empty = next((mapping for mapping in sub_aggregations if len(mapping)), None)
+    if non_empty is None:
+        return
+    names = list(non_empty)
+    rows = range(base, base + len(sub_aggregations))
+    if all([len(mapping) == len(names) for mapping in sub_aggregations]) and all(
+            [name in mapping for name in names for mapping in sub_aggregations]):
+        for name in names:
+            children.setdefault(name, []).extend(zip([mapping[name] for mapping in sub_aggregations], rows))
+        return
+    for mapping, row in zip(sub_aggregations, rows):
+        for name in mapping:
+            children.setdefault(name, []).append((mapping[name], row))
+
+
+def _kind(aggregate: Aggregate) -> Optional[str]:
+    """Return the populated field of aggregate if it is a supported kind."""
+    fields = aggregate.ListFields()
+    if not fields:
+        return None
+    name = fields[0][0].name
+    return name if name in _KEY_TYPES or name in METRIC_KINDS else None
+
+
+def _check_kind(path: str, expected: str, aggregate: Aggregate) -> None:
+    """Raise if aggregate holds a supported kind other than expected."""
+    kind = _kind(aggregate)
+    if kind is not None and kind != expected:
+        raise ValueError(f"Aggregation {path!r} is {expected} in one bucket and {kind} in another")
+
+
+class _Accumulator:
+    """Typed column buffers for one aggregation path."""
+
+    def __init__(self, kind: str, strings: bool):
+        self.kind = kind
+        self.with_strings = strings
+        self.rows = 0
+        self.parent = array("q")
+        self.strings: Optional[List[Optional[str]]] = None  # key_as_string / value_as_string
+        if kind in METRIC_KINDS:
+            self.values = array("d")
+        else:
+            typecode = _KEY_TYPES[kind][0]
+            self.keys: Union[array, List[Any]] = array(typecode) if typecode else []
+            self.doc_count = array("q")
+
+    def add_buckets(self, buckets, parent: int) -> int:
+        """Append one bucket aggregation's buckets; returns the first new row."""
+        base = self.rows
+        count = len(buckets)
+        if not count:
+            return base
+        self.rows += count
+        self.parent.extend(array("q", [parent]) * count)
+        self.doc_count.extend([bucket.doc_count for bucket in buckets])
+        if self.kind == "lterms":
+            keys = [bucket.key for bucket in buckets]
+            if any([key.HasField("unsigned") for key in keys]):
+                keys = [int(key.unsigned) if key.HasField("unsigned") else key.signed for key in keys]
+            else:
+                keys = [key.signed for key in keys]
+        else:
+            keys = [bucket.key for bucket in buckets]
+        try:
+            self.keys.extend(keys)
+        except OverflowError:
+            # lterms keys beyond int64 arrive as unsigned strings; keep Python ints.
+            # extend() stops part way, so rebuild from the rows before this call.
+            self.keys = list(self.keys[:base]) + keys
+        if self.with_strings and self.kind != "sterms":
+            self._add_strings(base, [bucket.key_as_string if bucket.HasField("key_as_string") else None
+                                     for bucket in buckets])
+        return base
+
+    def add_metrics(self, path: str, nodes: List[Tuple[Aggregate, int]]) -> None:
+        """Append the single-value metric of every node."""
+        kind = self.kind
+        if not all([aggregate.HasField(kind) for aggregate, _ in nodes]):
+            for aggregate, _ in nodes:
+                if not aggregate.HasField(kind):
+                    _check_kind(path, kind, aggregate)
+            nodes = [node for node in nodes if node[0].HasField(kind)]
+        metrics = [getattr(aggregate, kind) for aggregate, _ in nodes]
+        values = [metric.value for metric in metrics]
+        doubles = [value.double for value in values]
+        if not all([value.HasField("double") for value in values]):
+            doubles = [number if value.HasField("double") else math.nan for number, value in zip(doubles, values)]
+        base = self.rows
+        self.rows += len(metrics)
+        self.values.extend(doubles)
+        self.parent.extend([parent for _, parent in nodes])
+        if self.with_strings:
+            self._add_strings(base, [metric.value_as_string if metric.HasField("value_as_string") else None
+                                     for metric in metrics])
+
+    def _add_strings(self, base: int, strings: List[Optional[str]]) -> None:
+        if self.strings is None:
+            if all(string is None for string in strings):
+                return
+            self.strings = [None] * base
+        self.strings.extend(strings)
+
+    def column_specs(self) -> List[tuple]:
+        """Return (name, buffer or list, type name) for every column."""
+        if self.kind in METRIC_KINDS:
+            specs = [("value", self.values, "float64"), ("parent", self.parent, "int64")]
+            string_name = "value_as_string"
+        else:
+            key_type = _KEY_TYPES[self.kind][1] if isinstance(self.keys, array) or self.kind == "sterms" else "object"
+            specs = [("key", self.keys, key_type), ("doc_count", self.doc_count, "int64"),
+                     ("parent", self.parent, "int64")]
+            string_name = "key_as_string"
+        if self.strings is not None:
+            self.strings.extend([None] * (self.rows - len(self.strings)))
+            specs.append((string_name, self.strings, "string"))
+        return specs
+
+
+def _import(name: str):
+    """Import an optional dependency with an actionable error message."""
+    try:
+        return __import__(name)
+    except ImportError as e:
+        raise ImportError(f"Aggregation extraction requires {name}; install it with 'pip install {name}'") from e
+
+
+def _numpy_columns(table: _Accumulator) -> Dict[str, Any]:
+    numpy = _import("numpy")
+    columns = {}
+    for name, values, type_name in table.column_specs():
+        if isinstance(values, array):
+            columns[name] = numpy.frombuffer(values, dtype=type_name) if len(values) else numpy.empty(0, type_name)
+        else:
+            column = numpy.empty(len(values), dtype=object)
+            column[:] = values
+            columns[name] = column
+    return columns
+
+
+def _arrow_columns(table: _Accumulator) -> Any:
+    pyarrow = _import("pyarrow")
+    arrays, names = [], []
+    for name, values, type_name in table.column_specs():
+        if isinstance(values, array):
+            arrow_type = getattr(pyarrow, type_name)()
+            arrays.append(pyarrow.Array.from_buffers(arrow_type, len(values), [None, pyarrow.py_buffer(values)]))
+        elif type_name == "string":
+            arrays.append(pyarrow.array(values, type=pyarrow.string()))
+        else:
+            arrays.append(pyarrow.array(values))
+        names.append(name)
+    return pyarrow.RecordBatch.from_arrays(arrays, names=names)
@@ -0,0 +1,127 @@
+"""
+Size-aware chunking of bulk operations into BulkRequest messages.
+
+The size of every BulkRequestBody is computed once, when it is accepted, and
+added to a running total together with its field-12 tag and length prefix.
+A chunk is therefore never re-measured as it grows, and each yielded
+BulkRequest is guaranteed to serialize to at most max_bytes.
+"""
+
+import json
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Union
+
+from opensearch.protobufs.schemas import BulkRequest, BulkRequestBody
+
+from ._wire import length_delimited_size
+
+# Default gRPC max receive message size.
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_ACTIONS = 500
+
+BULK_REQUEST_BODY_FIELD_NUMBER = BulkRequest.BULK_REQUEST_BODY_FIELD_NUMBER
+
+# Document keys that are moved onto the IndexOperation instead of the source.
+METADATA_KEYS = {"_id": "x_id", "_index": "x_index", "_routing": "routing", "_pipeline": "pipeline"}
+
+BulkAction = Union[BulkRequestBody, bytes, Mapping[str, Any]]
+
+
+def to_bulk_request_body(action: BulkAction) -> BulkRequestBody:
+    """Convert a document or BulkRequestBody into a BulkRequestBody.
+
+    BulkRequestBody instances are returned unchanged. Bytes are used as the
+    JSON source of an index operation. Mappings are serialized to JSON after
+    moving the _id, _index, _routing and _pipeline keys onto the operation.
+    """
+    if isinstance(action, BulkRequestBody):
+        return action
+    body = BulkRequestBody()
+    fill_bulk_request_body(body, action)
+    return body
+
+
+def fill_bulk_request_body(body: BulkRequestBody, action: BulkAction) -> None:
+    """Write action into an empty body in place, as to_bulk_request_body() would build it.
+
+    BulkRequestBody actions are copied.
+    """
+    if isinstance(action, BulkRequestBody):
+        body.CopyFrom(action)
+        return
+
+    index_operation = body.operation_container.index
+    index_operation.SetInParent()
+
+    if isinstance(action, (bytes, bytearray, memoryview)):
+        body.object = bytes(action)
+    elif isinstance(action, Mapping):
+        source = dict(action)
+        for key, field in METADATA_KEYS.items():
+            if key in source:
+                setattr(index_operation, field, str(source.pop(key)))
+        body.object = json.dumps(source, separators=(",", ":")).encode("utf-8")
+    else:
+        raise TypeError(f"Unsupported bulk action type: {type(action).__name__}")
+
+
+def chunk_bulk_requests(
+    actions: Iterable[BulkAction],
+    template: Optional[BulkRequest] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_actions: int = DEFAULT_MAX_ACTIONS,
+    **fields: Any,
+) -> Iterator[BulkRequest]:
+    """Yield BulkRequest messages built from actions.
+
+    Every chunk carries the top-level fields of template (or of
+    BulkRequest(**fields), e.g. index="logs", refresh=REFRESH_WAIT_FOR), holds
+    at most max_actions bodies and serializes to at most max_bytes. A single
+    action that cannot fit in an otherwise empty chunk raises ValueError.
+    """
+    if template is not None and fields:
+        raise ValueError("Pass either a template BulkRequest or field keyword arguments, not both")
+    if max_actions < 1:
+        raise ValueError(f"max_actions must be positive, got {max_actions}")
+
+    if template is None:
+        template = BulkRequest(**fields)
+    elif len(template.bulk_request_body):
+        shared = BulkRequest()
+        shared.CopyFrom(template)
+        del shared.bulk_request_body[:]
+        template = shared
+
+    base_size = template.ByteSize()
+    if base_size >= max_bytes:
+        raise ValueError(f"Top-level BulkRequest fields alone use {base_size} of {max_bytes} bytes")
+
+    pending: List[BulkRequestBody] = []
+    pending_size = base_size
+
+    for position, action in enumerate(actions):
+        body = to_bulk_request_body(action)
+        body_size = length_delimited_size(BULK_REQUEST_BODY_FIELD_NUMBER, body.ByteSize())
+
+        if base_size + body_size > max_bytes:
+            raise ValueError(
+                f"Bulk action {position} needs {base_size + body_size} bytes, over the {max_bytes} byte limit"
+            )
+
+        if pending and (pending_size + body_size > max_bytes or len(pending) >= max_actions):
+            yield _build_request(template, pending)
+            pending = []
+            pending_size = base_size
+
+        pending.append(body)
+        pending_size += body_size
+
+    if pending:
+        yield _build_request(template, pending)
+
+
+def _build_request(template: BulkRequest, bodies: List[BulkRequestBody]) -> BulkRequest:
+    """Return a copy of template holding bodies."""
+    request = BulkRequest()
+    request.CopyFrom(template)
+    request.bulk_request_body.extend(bodies)
+    return request
@@ -0,0 +1,250 @@
+"""
+Pooled channels with client-side load balancing for the generated stubs.
+
+A ChannelPool opens channels_per_target channels to every target. Each
+channel gets its own subchannel pool, so it gets its own HTTP/2 connection
+and a busy connection's concurrent-stream limit or head-of-line blocking
+does not hold back calls on the others. pool.stub(DocumentServiceStub)
+returns an object with the same methods as the generated stub; each call
+picks a channel by round robin or by fewest outstanding calls.
+
+Health is tracked from each channel's local connectivity state (subscribe()
+for sync channels, get_state() for grpc.aio channels), so it costs no
+network round trips. Channels in TRANSIENT_FAILURE or SHUTDOWN are skipped
+while a healthy one exists. A channel that stays unhealthy longer than
+evict_after seconds is closed and replaced with a fresh one.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import grpc
+
+POLICY_ROUND_ROBIN = "round_robin"
+POLICY_LEAST_OUTSTANDING = "least_outstanding"
+
+UNHEALTHY_STATES = frozenset((grpc.ChannelConnectivity.TRANSIENT_FAILURE, grpc.ChannelConnectivity.SHUTDOWN))
+
+# Forces a separate connection per channel even for identical targets.
+SEPARATE_CONNECTION_OPTION = ("grpc.use_local_subchannel_pool", 1)
+
+ChannelFactory = Callable[[str, Sequence[Tuple[str, Any]]], Any]
+
+
+class _Slot:
+    """One channel plus its bookkeeping."""
+
+    def __init__(self, pool: "ChannelPool", target: str):
+        self.pool = pool
+        self.target = target
+        self.outstanding = 0
+        self.calls = 0
+        self.unhealthy_since: Optional[float] = None
+        self._open()
+
+    def _open(self) -> None:
+        self.channel = self.pool.channel_factory(self.target, self.pool.options)
+        self.stubs: Dict[type, Any] = {}
+        self.cached_state: Optional[grpc.ChannelConnectivity] = None
+        if not hasattr(self.channel, "get_state") and hasattr(self.channel, "subscribe"):
+            self.channel.subscribe(self._on_state)
+
+    def _on_state(self, state: grpc.ChannelConnectivity) -> None:
+        self.cached_state = state
+
+    def state(self) -> Optional[grpc.ChannelConnectivity]:
+        """Return the local connectivity state without trying to connect."""
+        if hasattr(self.channel, "get_state"):
+            return self.channel.get_state(try_to_connect=False)
+        return self.cached_state
+
+    def healthy(self, now: float) -> bool:
+        """Update the unhealthy timer and report whether the channel is usable."""
+        if self.state() in UNHEALTHY_STATES:
+            if self.unhealthy_since is None:
+                self.unhealthy_since = now
+            return False
+        self.unhealthy_since = None
+        return True
+
+    def replace(self) -> None:
+        """Close the channel and open a new one to the same target."""
+        old = self.channel
+        if hasattr(old, "unsubscribe") and not hasattr(old, "get_state"):
+            old.unsubscribe(self._on_state)
+        _close_channel(old)
+        self.unhealthy_since = None
+        self._open()
+
+    def stub(self, stub_class: type) -> Any:
+        stub = self.stubs.get(stub_class)
+        if stub is None:
+            stub = self.stubs[stub_class] = stub_class(self.channel)
+        return stub
+
+
+class ChannelPool:
+    """Multiple channels across one or more targets with per-call selection."""
+
+    def __init__(
+        self,
+        targets: Sequence[str],
+        channels_per_target: int = 2,
+        policy: str = POLICY_ROUND_ROBIN,
+        channel_factory: Optional[ChannelFactory] = None,
+        options: Sequence[Tuple[str, Any]] = (),
+        evict_after: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Open channels_per_target channels to each target.
+
+        channel_factory(target, options) creates a channel; it defaults to
+        grpc.insecure_channel. Pass e.g. grpc.aio.insecure_channel for asyncio
+        or a function calling grpc.secure_channel for TLS.
+        """
+        if not targets:
+            raise ValueError("At least one target is required")
+        if channels_per_target < 1:
+            raise ValueError(f"channels_per_target must be positive, got {channels_per_target}")
+        if policy not in (POLICY_ROUND_ROBIN, POLICY_LEAST_OUTSTANDING):
+            raise ValueError(f"Unknown policy {policy!r}")
+
+        self.policy = policy
+        self.channel_factory = channel_factory or (lambda target, opts: grpc.insecure_channel(target, options=opts))
+        self.options = list(options) + [SEPARATE_CONNECTION_OPTION]
+        self.evict_after = evict_after
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        # Interleave targets so round robin alternates nodes before channels.
+        self._slots: List[_Slot] = [
+            _Slot(self, target) for _ in range(channels_per_target) for target in targets
+        ]
+
+    @property
+    def channels(self) -> List[Any]:
+        """The current channels, in slot order."""
+        return [slot.channel for slot in self._slots]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return per-channel target, state, outstanding and total call counts."""
+        with self._lock:
+            return [
+                {"target": slot.target, "state": slot.state(), "outstanding": slot.outstanding, "calls": slot.calls}
+                for slot in self._slots
+            ]
+
+    def stub(self, stub_class: type) -> "PooledStub":
+        """Return a pooled stand-in for stub_class, e.g. SearchServiceStub."""
+        return PooledStub(self, stub_class)
+
+    def close(self) -> None:
+        """Close every sync channel."""
+        for slot in self._slots:
+            slot.channel.close()
+
+    async def aclose(self) -> None:
+        """Close every grpc.aio channel."""
+        await asyncio.gather(*(slot.channel.close() for slot in self._slots))
+
+    def _acquire(self) -> _Slot:
+        """Pick a slot for one call and count it as outstanding."""
+        with self._lock:
+            now = self.clock()
+            healthy = []
+            for slot in self._slots:
+                if slot.healthy(now):
+                    healthy.append(slot)
+                elif now - slot.unhealthy_since >= self.evict_after:
+                    slot.replace()
+            candidates = healthy or self._slots
+
+            start = next(self._counter)
+            if self.policy == POLICY_ROUND_ROBIN:
+                slot = candidates[start % len(candidates)]
+            else:
+                count = len(candidates)
+                slot = min((candidates[(start + i) % count] for i in range(count)), key=lambda s: s.outstanding)
+
+            slot.outstanding += 1
+            slot.calls += 1
+            return slot
+
+    def _release(self, slot: _Slot) -> None:
+        with self._lock:
+            slot.outstanding -= 1
+
+
+class PooledStub:
+    """Exposes the methods of a generated stub, dispatching each call through the pool."""
+
+    def __init__(self, pool: ChannelPool, stub_class: type):
+        self._pool = pool
+        self._stub_class = stub_class
+        prototype = pool._slots[0].stub(stub_class)
+        for name in vars(prototype):
+            if not name.startswith("_"):
+                setattr(self, name, _PooledMethod(pool, stub_class, name))
+
+
+class _PooledMethod:
+    """Multicallable facade that selects a channel per invocation."""
+
+    def __init__(self, pool: ChannelPool, stub_class: type, name: str):
+        self._pool = pool
+        self._stub_class = stub_class
+        self._name = name
+
+    def _multicallable(self, slot: _Slot):
+        return getattr(slot.stub(self._stub_class), self._name)
+
+    def __call__(self, request, *args, **kwargs):
+        """Invoke the method; blocking calls hold the slot until they return."""
+        slot = self._pool._acquire()
+        try:
+            result = self._multicallable(slot)(request, *args, **kwargs)
+        except BaseException:
+            self._pool._release(slot)
+            raise
+        return self._track(slot, result)
+
+    def with_call(self, request, *args, **kwargs):
+        """Sync unary with_call(), returning (response, call)."""
+        slot = self._pool._acquire()
+        try:
+            return self._multicallable(slot).with_call(request, *args, **kwargs)
+        finally:
+            self._pool._release(slot)
+
+    def future(self, request, *args, **kwargs):
+        """Sync unary future(); the slot is released when the future completes."""
+        slot = self._pool._acquire()
+        try:
+            result = self._multicallable(slot).future(request, *args, **kwargs)
+        except BaseException:
+            self._pool._release(slot)
+            raise
+        return self._track(slot, result)
+
+    def _track(self, slot: _Slot, result: Any) -> Any:
+        """Release the slot now, or when result (a call or future) finishes."""
+        add_done_callback = getattr(result, "add_done_callback", None)
+        if add_done_callback is None:
+            # A blocking unary call has already returned its response.
+            self._pool._release(slot)
+            return result
+        add_done_callback(lambda _: self._pool._release(slot))
+        return result
+
+
+def _close_channel(channel: Any) -> None:
+    """Close a sync or grpc.aio channel without waiting for it."""
+    result = channel.close()
+    if asyncio.iscoroutine(result):
+        try:
+            asyncio.get_running_loop().create_task(result)
+        except RuntimeError:
+            result.close()
@@ -0,0 +1,281 @@
+"""
+Columnar export of search hits to NumPy arrays or Arrow record batches.
+
+Hits from one SearchResponse or from a stream of them (e.g. the iterator
+returned by SearchServiceStub.ServerStreamSearch) are gathered into batches
+of batch_size rows. Each batch holds one contiguous column per field instead
+of one Python object per hit. Metadata columns are _id, _index, _score,
+_seq_no, _primary_term and _version. Sort values become sort_0, sort_1, ...
+and every requested _source path gets its own column, decoded through
+HitView.project so the rest of each document is never built.
+
+Column types come from schema when given (fixed-schema mode). Otherwise they
+are inferred (schema-inference mode) from the first batch a column appears
+in and then kept for every later batch, so that the batches of one stream
+share a schema: numbers become float64, booleans bool, strings string, and
+columns that are mixed, nested or all missing in that batch become object.
+A later value that does not fit a float64 or bool column raises ValueError;
+declare such columns in schema. Supported type names are bool, int32,
+int64, float32, float64, string and object.
+
+NumPy has no null: missing floats become NaN and missing metadata integers
+become -1. Inferred bool columns are object arrays so that missing values
+can be kept as None; declare int or bool columns in schema to get int or
+bool arrays, in which case a missing value raises ValueError. Arrow output
+keeps missing values as nulls and holds string and object columns as
+strings, with non-string values JSON-encoded.
+
+numpy (and pyarrow for output="arrow") are optional dependencies, imported
+on first use.
+"""
+
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+
+from opensearch.protobufs.schemas import SearchResponse
+
+from .hits import HitView
+
+OUTPUT_NUMPY = "numpy"
+OUTPUT_ARROW = "arrow"
+
+METADATA_COLUMNS = ("_id", "_index", "_score", "_seq_no", "_primary_term", "_version")
+
+DEFAULT_BATCH_SIZE = 10000
+
+_METADATA_TYPES = {
+    "_id": "string",
+    "_index": "string",
+    "_score": "float64",
+    "_seq_no": "int64",
+    "_primary_term": "int64",
+    "_version": "int64",
+}
+
+_METADATA_GETTERS = {
+    "_id": lambda view: view.id,
+    "_index": lambda view: view.index,
+    "_score": lambda view: view.score,
+    "_seq_no": lambda view: view.seq_no,
+    "_primary_term": lambda view: view.primary_term,
+    "_version": lambda view: view.version,
+}
+
+# Widening order for numeric types within one batch; booleans mixed with numbers are object.
+_NUMERIC_RANK = {"int64": 1, "float64": 2}
+
+# Type kept for an inferred column, from the type of its first batch; anything else is object.
+_INFERRED_TYPES = {"bool": "bool", "int64": "float64", "float64": "float64", "string": "string"}
+
+_TYPES = ("bool", "int32", "int64", "float32", "float64", "string", "object")
+
+
+def iter_hit_batches(
+    responses: Union[SearchResponse, Iterable[SearchResponse]],
+    source_fields: Sequence[str] = (),
+    schema: Optional[Mapping[str, str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    output: str = OUTPUT_NUMPY,
+    metadata: Sequence[str] = METADATA_COLUMNS,
+    include_sort: bool = True,
+) -> Iterator[Any]:
+    """Yield columnar batches of at most batch_size hits.
+
+    With output="numpy" each batch is a dict of column name to ndarray; with
+    output="arrow" it is a pyarrow.RecordBatch.
+    """
+    if output not in (OUTPUT_NUMPY, OUTPUT_ARROW):
+        raise ValueError(f"Unknown output {output!r}; expected {OUTPUT_NUMPY!r} or {OUTPUT_ARROW!r}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    unknown_metadata = set(metadata) - set(METADATA_COLUMNS)
+    if unknown_metadata:
+        raise ValueError(f"Unknown metadata columns: {sorted(unknown_metadata)}")
+    schema = dict(schema or {})
+    for column, type_name in schema.items():
+        if type_name not in _TYPES:
+            raise ValueError(f"Unsupported type {type_name!r} for column {column!r}; expected one of {_TYPES}")
+
+    if isinstance(responses, SearchResponse):
+        responses = [responses]
+
+    converter = _NumpyConverter() if output == OUTPUT_NUMPY else _ArrowConverter()
+    inferred: Dict[str, str] = {}
+    source_fields = list(source_fields)
+    pending: List[HitView] = []
+
+    for response in responses:
+        for hit in response.hits.hits:
+            pending.append(HitView(hit))
+            if len(pending) == batch_size:
+                yield _build_batch(pending, source_fields, metadata, include_sort, schema, inferred, converter)
+                pending = []
+
+    if pending:
+        yield _build_batch(pending, source_fields, metadata, include_sort, schema, inferred, converter)
+
+
+def hits_to_columns(
+    responses: Union[SearchResponse, Iterable[SearchResponse]],
+    source_fields: Sequence[str] = (),
+    schema: Optional[Mapping[str, str]] = None,
+    output: str = OUTPUT_NUMPY,
+    metadata: Sequence[str] = METADATA_COLUMNS,
+    include_sort: bool = True,
+) -> Any:
+    """Return all hits as a single columnar batch (see iter_hit_batches)."""
+    for batch in iter_hit_batches(responses, source_fields, schema, sys.maxsize, output, metadata, include_sort):
+        return batch
+    if output == OUTPUT_ARROW:
+        return _import("pyarrow").record_batch({})
+    return {}
+
+
+def _build_batch(views: List[HitView], source_fields: List[str], metadata: Sequence[str],
+                 include_sort: bool, schema: Dict[str, str], inferred: Dict[str, str], converter) -> Any:
+    """Convert a list of hit views into one columnar batch."""
+    columns: Dict[str, List[Any]] = {}
+    for name in metadata:
+        getter = _METADATA_GETTERS[name]
+        columns[name] = [getter(view) for view in views]
+
+    if include_sort:
+        sorts = [view.sort for view in views]
+        for position in range(max((len(values) for values in sorts), default=0)):
+            columns[f"sort_{position}"] = [values[position] if position < len(values) else None for values in sorts]
+
+    if source_fields:
+        projected = [view.project(source_fields) for view in views]
+        for path in source_fields:
+            columns[path] = [values.get(path) for values in projected]
+
+    types = {}
+    for name, values in columns.items():
+        if name in schema:
+            types[name] = schema[name]
+        elif name in _METADATA_TYPES:
+            types[name] = _METADATA_TYPES[name]
+        else:
+            if name not in inferred:
+                inferred[name] = _INFERRED_TYPES.get(_infer_type(values), "object")
+            types[name] = inferred[name]
+            _check_inferred(name, types[name], values)
+
+    return converter.convert(columns, types, fixed=set(schema))
+
+
+def _infer_type(values: List[Any]) -> Optional[str]:
+    """Return the narrowest type that holds every non-None value, or None if all are None."""
+    result = None
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            kind = "bool"
+        elif isinstance(value, int):
+            kind = "int64"
+        elif isinstance(value, float):
+            kind = "float64"
+        elif isinstance(value, str):
+            kind = "string"
+        else:
+            return "object"
+        result = _widen(result, kind)
+        if result == "object":
+            return result
+    return result
+
+
+def _check_inferred(name: str, type_name: str, values: List[Any]) -> None:
+    """Raise ValueError if a value does not fit the type inferred for its column from an earlier batch."""
+    if type_name == "float64":
+        fits = lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif type_name == "bool":
+        fits = lambda value: isinstance(value, bool)
+    else:
+        return
+    for value in values:
+        if value is not None and not fits(value):
+            raise ValueError(f"Column {name!r} was inferred as {type_name} from its first batch but has value "
+                             f"{value!r}; declare its type in schema")
+
+
+def _widen(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Return the type that holds values of both current and new."""
+    if current is None or current == new:
+        return new
+    if new is None:
+        return current
+    if current in _NUMERIC_RANK and new in _NUMERIC_RANK:
+        return max(current, new, key=_NUMERIC_RANK.get)
+    return "object"
+
+
+def _import(name: str):
+    """Import an optional dependency with an actionable error message."""
+    try:
+        return __import__(name)
+    except ImportError as e:
+        raise ImportError(f"Columnar hit export requires {name}; install it with 'pip install {name}'") from e
+
+
+class _NumpyConverter:
+    """Build dicts of NumPy arrays."""
+
+    def __init__(self):
+        self.numpy = _import("numpy")
+
+    def convert(self, columns: Dict[str, List[Any]], types: Dict[str, Optional[str]], fixed: set) -> Dict[str, Any]:
+        numpy = self.numpy
+        batch = {}
+        for name, values in columns.items():
+            type_name = types[name] or "object"
+            has_missing = None in values
+            if type_name in ("float32", "float64"):
+                values = [numpy.nan if value is None else value for value in values] if has_missing else values
+                batch[name] = numpy.fromiter(values, dtype=type_name, count=len(values))
+            elif type_name in ("int32", "int64"):
+                if has_missing and name in fixed:
+                    raise ValueError(f"Column {name!r} has missing values and cannot be {type_name} in NumPy")
+                if has_missing:
+                    values = [-1 if value is None else value for value in values]
+                batch[name] = numpy.fromiter(values, dtype=type_name, count=len(values))
+            elif type_name == "bool" and name in fixed:
+                if has_missing:
+                    raise ValueError(f"Column {name!r} has missing values and cannot be bool in NumPy")
+                batch[name] = numpy.fromiter(values, dtype=bool, count=len(values))
+            else:
+                column = numpy.empty(len(values), dtype=object)
+                column[:] = values
+                batch[name] = column
+        return batch
+
+
+class _ArrowConverter:
+    """Build pyarrow.RecordBatch objects."""
+
+    def __init__(self):
+        self.pyarrow = _import("pyarrow")
+        pyarrow = self.pyarrow
+        self.arrow_types = {
+            "bool": pyarrow.bool_(),
+            "int32": pyarrow.int32(),
+            "int64": pyarrow.int64(),
+            "float32": pyarrow.float32(),
+            "float64": pyarrow.float64(),
+            "string": pyarrow.string(),
+        }
+
+    def convert(self, columns: Dict[str, List[Any]], types: Dict[str, Optional[str]], fixed: set) -> Any:
+        # Arrow keeps missing values as nulls, so fixed columns need no special casing.
+        pyarrow = self.pyarrow
+        arrays = []
+        for name, values in columns.items():
+            arrow_type = self.arrow_types.get(types[name] or "object", pyarrow.string())
+            if arrow_type == pyarrow.string():
+                # Mixed or nested values have no single Arrow type; keep them as (JSON) strings.
+                values = [value if value is None or isinstance(value, str) else json.dumps(value)
+                          for value in values]
+            arrays.append(pyarrow.array(values, type=arrow_type))
+        return pyarrow.RecordBatch.from_arrays(arrays, names=list(columns))
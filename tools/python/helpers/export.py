@@ -0,0 +1,360 @@
+"""
+Parallel export of an index through a point in time (PIT) split into slices.
+
+A single Python process spends most of a large export decoding
+SearchResponse messages on one core. The exporters here create one PIT,
+split it into slices and run each slice in its own worker process. Each
+worker opens its own channel, pages through its slice with search_after over
+the sort values of the previous page's last hit, and decodes its hits
+locally:
+
+- iter_pit_export() sends each page's transformed hits back to the parent
+  through a bounded queue and yields them as they arrive, so a slow consumer
+  pauses the workers instead of buffering the index in memory.
+- export_pit_to_files() has every worker append _source lines to its own
+  NDJSON file, so nothing but counters crosses process boundaries. Line
+  breaks in a stored _source (e.g. pretty-printed JSON) can only be
+  whitespace between tokens, so they are written as spaces to keep one
+  document per line.
+
+The PIT is deleted in a finally block: after success, after a worker fails,
+and when the consumer stops iterating early. It is deleted before waiting
+for the workers, and the parent keeps draining the page queue while they
+shut down: a worker cannot exit until its queue's feeder thread has flushed
+the pages already put, which blocks on a full pipe once nobody reads it.
+
+Workers are started with the "spawn" method, so transform must be a
+module-level function. Messages cross to the workers serialized, since the
+generated classes do not pickle under their package name.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import grpc
+
+from opensearch.protobufs.schemas import (
+    CreatePitRequest,
+    DeletePitRequest,
+    HitsMetadataHitsInner,
+    SearchRequest,
+    SearchRequestBody,
+    SortCombinations,
+)
+from opensearch.protobufs.services import SearchServiceStub
+
+logger = logging.getLogger(__name__)
+
+# Cheapest total order inside a PIT.
+DEFAULT_SORT = ("_shard_doc",)
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_KEEP_ALIVE = "5m"
+
+_PAGE = "page"
+_DONE = "done"
+
+_LINE_BREAKS_TO_SPACES = bytes.maketrans(b"\r\n", b"  ")
+
+SortSpec = Sequence[Union[str, SortCombinations]]
+
+
+class ExportPage(NamedTuple):
+    """The transformed hits of one page from one slice."""
+
+    slice_id: int
+    items: List[Any]
+
+
+class ExportSummary(NamedTuple):
+    """Totals for a finished export."""
+
+    pit_id: str
+    hits: int
+    hits_per_slice: List[int]
+    files: List[str]
+
+
+class _SliceSpec(NamedTuple):
+    """Everything a worker needs to export one slice; must be picklable."""
+
+    target: str
+    channel_options: Tuple[Tuple[str, Any], ...]
+    tls: Union[bool, bytes]
+    pit_id: str
+    keep_alive: str
+    slice_id: int
+    slices: int
+    body: bytes
+    page_size: int
+    timeout: Optional[float]
+    metadata: Optional[Tuple[Tuple[str, str], ...]]
+    transform: Callable[[HitsMetadataHitsInner], Any]
+    path: Optional[str]
+
+
+def source_bytes(hit: HitsMetadataHitsInner) -> bytes:
+    """Default transform: the hit's raw _source bytes."""
+    return hit.x_source
+
+
+def iter_pit_export(
+    target: str,
+    index: Union[str, Sequence[str]],
+    slices: int = 0,
+    body: Optional[SearchRequestBody] = None,
+    sort: SortSpec = DEFAULT_SORT,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    keep_alive: str = DEFAULT_KEEP_ALIVE,
+    transform: Callable[[HitsMetadataHitsInner], Any] = source_bytes,
+    processes: Optional[int] = None,
+    channel_options: Sequence[Tuple[str, Any]] = (),
+    tls: Union[bool, bytes] = False,
+    timeout: Optional[float] = None,
+    metadata: Optional[Sequence[Tuple[str, str]]] = None,
+    max_buffered_pages: Optional[int] = None,
+) -> Iterator[ExportPage]:
+    """Yield ExportPage items for every hit of index, in arrival order.
+
+    slices defaults to the number of CPUs. body supplies the query and any
+    other SearchRequestBody options; pit, slice, size, sort and search_after
+    are set by the exporter. transform(hit) runs in the workers and its result
+    must be picklable. Pages from different slices interleave. Every process
+    opens its own channel to target: plaintext unless tls is True (system
+    root certificates) or PEM root certificate bytes.
+    """
+    run = _Export(target, index, slices, body, sort, page_size, keep_alive, transform, processes,
+                  channel_options, tls, timeout, metadata, None)
+    with run:
+        yield from run.pages(max_buffered_pages)
+
+
+def export_pit_to_files(
+    target: str,
+    index: Union[str, Sequence[str]],
+    directory: str,
+    slices: int = 0,
+    body: Optional[SearchRequestBody] = None,
+    sort: SortSpec = DEFAULT_SORT,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    keep_alive: str = DEFAULT_KEEP_ALIVE,
+    processes: Optional[int] = None,
+    channel_options: Sequence[Tuple[str, Any]] = (),
+    tls: Union[bool, bytes] = False,
+    timeout: Optional[float] = None,
+    metadata: Optional[Sequence[Tuple[str, str]]] = None,
+) -> ExportSummary:
+    """Write every hit's _source as one line of directory/slice-NNNN.ndjson.
+
+    Arguments are as for iter_pit_export(). Returns the per-slice counts and
+    the files written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    run = _Export(target, index, slices, body, sort, page_size, keep_alive, source_bytes, processes,
+                  channel_options, tls, timeout, metadata, directory)
+    with run:
+        return run.files()
+
+
+class _Export:
+    """Creates the PIT, runs the slice workers and always deletes the PIT."""
+
+    def __init__(self, target, index, slices, body, sort, page_size, keep_alive, transform, processes,
+                 channel_options, tls, timeout, metadata, directory):
+        if page_size < 1:
+            raise ValueError(f"page_size must be positive, got {page_size}")
+        self.target = target
+        self.indices = [index] if isinstance(index, str) else list(index)
+        self.slices = slices or os.cpu_count() or 1
+        self.processes = max(1, min(processes or self.slices, self.slices))
+        self.keep_alive = keep_alive
+        self.channel_options = tuple(channel_options)
+        self.tls = tls
+        self.timeout = timeout
+        self.metadata = tuple(metadata) if metadata else None
+        self.template = _search_body(body, sort, page_size).SerializeToString()
+        self.page_size = page_size
+        self.transform = transform
+        self.directory = directory
+        self.pit_id: Optional[str] = None
+        self._channel = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stop = None
+        self._queue = None
+
+    def __enter__(self) -> "_Export":
+        self._channel = _open_channel(self.target, self.channel_options, self.tls)
+        try:
+            response = SearchServiceStub(self._channel).CreatePit(
+                CreatePitRequest(index=self.indices, keep_alive=self.keep_alive),
+                timeout=self.timeout, metadata=self.metadata)
+        except BaseException:
+            self._channel.close()
+            raise
+        self.pit_id = response.pit_id
+        logger.info(f"Created PIT over {self.indices} for {self.slices} slices")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._stop is not None:
+            self._stop.set()
+        try:
+            SearchServiceStub(self._channel).DeletePit(DeletePitRequest(pit_id=[self.pit_id]),
+                                                       timeout=self.timeout, metadata=self.metadata)
+        except grpc.RpcError as e:
+            logger.warning(f"Failed to delete PIT {self.pit_id}: {e}")
+        finally:
+            self._channel.close()
+            if self._pool is not None:
+                self._shutdown()
+
+    def _shutdown(self) -> None:
+        """Wait for the workers, draining pages they queued so their feeder threads can finish."""
+        shutdown = threading.Thread(target=self._pool.shutdown, kwargs={"wait": True, "cancel_futures": True})
+        shutdown.start()
+        while shutdown.is_alive():
+            if self._queue is not None:
+                _drain(self._queue)
+            shutdown.join(0.1)
+
+    def _start(self, page_queue) -> List[Future]:
+        context = multiprocessing.get_context("spawn")
+        self._stop = context.Event()
+        self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=context,
+                                         initializer=_init_worker, initargs=(page_queue, self._stop))
+        return [self._pool.submit(_export_slice, self._spec(slice_id)) for slice_id in range(self.slices)]
+
+    def _spec(self, slice_id: int) -> _SliceSpec:
+        path = None
+        if self.directory is not None:
+            path = os.path.join(self.directory, f"slice-{slice_id:04d}.ndjson")
+        return _SliceSpec(self.target, self.channel_options, self.tls, self.pit_id, self.keep_alive,
+                          slice_id, self.slices, self.template, self.page_size, self.timeout, self.metadata,
+                          self.transform, path)
+
+    def pages(self, max_buffered_pages: Optional[int]) -> Iterator[ExportPage]:
+        context = multiprocessing.get_context("spawn")
+        page_queue = self._queue = context.Queue(max_buffered_pages or self.processes * 4)
+        futures = self._start(page_queue)
+        remaining = self.slices
+        while remaining:
+            try:
+                kind, slice_id, payload = page_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            finally:
+                _raise_failures(futures)
+            if kind == _DONE:
+                remaining -= 1
+            else:
+                yield ExportPage(slice_id, payload)
+        _raise_failures(futures)
+
+    def files(self) -> ExportSummary:
+        futures = self._start(None)
+        counts = [future.result() for future in futures]
+        paths = [self._spec(slice_id).path for slice_id in range(self.slices)]
+        return ExportSummary(self.pit_id, sum(counts), counts, paths)
+
+
+def _search_body(body: Optional[SearchRequestBody], sort: SortSpec, page_size: int) -> SearchRequestBody:
+    template = SearchRequestBody()
+    if body is not None:
+        template.CopyFrom(body)
+    template.size = page_size
+    del template.sort[:]
+    for entry in sort:
+        template.sort.append(SortCombinations(field=entry) if isinstance(entry, str) else entry)
+    return template
+
+
+def _open_channel(target: str, options: Tuple[Tuple[str, Any], ...], tls: Union[bool, bytes]) -> grpc.Channel:
+    if tls is False:
+        return grpc.insecure_channel(target, options=list(options))
+    root_certificates = None if tls is True else tls
+    return grpc.secure_channel(target, grpc.ssl_channel_credentials(root_certificates), options=list(options))
+
+
+def _raise_failures(futures: List[Future]) -> None:
+    for future in futures:
+        if future.done() and future.exception() is not None:
+            raise future.exception()
+
+
+def _drain(page_queue) -> None:
+    while True:
+        try:
+            page_queue.get_nowait()
+        except queue.Empty:
+            return
+
+
+# Worker process state, set by _init_worker.
+_worker_queue = None
+_worker_stop = None
+
+
+def _init_worker(page_queue, stop) -> None:
+    global _worker_queue, _worker_stop
+    _worker_queue, _worker_stop = page_queue, stop
+
+
+def _put(item: Tuple[str, int, Any]) -> bool:
+    """Queue item for the parent unless the export is being stopped."""
+    while not _worker_stop.is_set():
+        try:
+            _worker_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _ndjson_line(source: bytes) -> bytes:
+    if b"\n" in source or b"\r" in source:
+        source = source.translate(_LINE_BREAKS_TO_SPACES)
+    return source + b"\n"
+
+
+def _export_slice(spec: _SliceSpec) -> int:
+    """Page through one slice; returns the number of hits exported."""
+    request = SearchRequest()
+    body = request.search_request_body
+    body.MergeFromString(spec.body)
+    body.pit.id = spec.pit_id
+    body.pit.keep_alive = spec.keep_alive
+    if spec.slices > 1:
+        body.slice.id = spec.slice_id
+        body.slice.max = spec.slices
+
+    exported = 0
+    output = open(spec.path, "wb") if spec.path else None
+    try:
+        with _open_channel(spec.target, spec.channel_options, spec.tls) as channel:
+            stub = SearchServiceStub(channel)
+            while not _worker_stop.is_set():
+                response = stub.Search(request, timeout=spec.timeout, metadata=spec.metadata)
+                hits = response.hits.hits
+                if not hits:
+                    break
+                if output is not None:
+                    output.write(b"".join([_ndjson_line(hit.x_source) for hit in hits]))
+                elif not _put((_PAGE, spec.slice_id, [spec.transform(hit) for hit in hits])):
+                    break
+                exported += len(hits)
+                if len(hits) < spec.page_size:
+                    break
+                del body.search_after[:]
+                body.search_after.extend(hits[-1].sort)
+                if response.pit_id:
+                    body.pit.id = response.pit_id
+    finally:
+        if output is not None:
+            output.close()
+    if output is None:
+        _put((_DONE, spec.slice_id, exported))
+    return exported
@@ -0,0 +1,272 @@
+"""
+In-process stand-in for an OpenSearch gRPC endpoint.
+
+FakeOpenSearch serves DocumentService, SearchService and MLService from the
+generated servicer base classes on a local port. It is meant for testing and
+benchmarking clients without a cluster, so responses are synthetic but have
+realistic shapes and sizes:
+
+- Bulk answers every action with a 2xx item, or with bulk_failure_status for
+  a bulk_failure_rate fraction of them (a partial failure with errors=true).
+- Search returns a canned page of hits_per_page hits (or
+  search_request_body.size when set), each with a source_size byte _source.
+- ServerStreamSearch streams stream_pages such pages, frame_interval apart.
+- PredictModelStream and ExecuteAgentStream stream stream_chunks
+  PredictResponse frames of chunk_size characters each.
+- CreatePit and DeletePit return well-formed PIT responses; open_pits holds
+  the ids created and not yet deleted.
+- With documents=N, Search requests carrying a PIT page through a corpus of
+  N documents sorted by number, honouring search_request_body.slice and
+  search_after, as a PIT export would see them.
+
+Every unary call sleeps latency (+ up to jitter) seconds first and fails with
+rpc_error_code for an rpc_error_rate fraction of calls, mimicking 429
+rejections that the REST layer surfaces as RESOURCE_EXHAUSTED.
+
+Pages are built once per size and reused, so the server spends its time on
+serialization rather than on building messages.
+"""
+
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent import futures
+from typing import Dict, Optional, Set
+
+import grpc
+
+from opensearch.protobufs.schemas import (
+    BulkResponse,
+    CreatePITResponse,
+    DeletePITResponse,
+    PredictResponse,
+    SearchResponse,
+    Status,
+)
+from opensearch.protobufs.services import (
+    DocumentServiceServicer,
+    MLServiceServicer,
+    SearchServiceServicer,
+    add_DocumentServiceServicer_to_server,
+    add_MLServiceServicer_to_server,
+    add_SearchServiceServicer_to_server,
+)
+
+REJECTED_ERROR_TYPE = "es_rejected_execution_exception"
+
+
+class FakeOpenSearch:
+    """Local gRPC server implementing the OpenSearch services with synthetic data."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rpc_error_rate: float = 0.0,
+        rpc_error_code: grpc.StatusCode = grpc.StatusCode.RESOURCE_EXHAUSTED,
+        bulk_failure_rate: float = 0.0,
+        bulk_failure_status: int = 429,
+        hits_per_page: int = 10,
+        source_size: int = 256,
+        stream_pages: int = 10,
+        stream_chunks: int = 20,
+        chunk_size: int = 64,
+        frame_interval: float = 0.0,
+        documents: Optional[int] = None,
+        index: str = "fake-index",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_workers: int = 16,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rpc_error_rate = rpc_error_rate
+        self.rpc_error_code = rpc_error_code
+        self.bulk_failure_rate = bulk_failure_rate
+        self.bulk_failure_status = bulk_failure_status
+        self.hits_per_page = hits_per_page
+        self.source_size = source_size
+        self.stream_pages = stream_pages
+        self.stream_chunks = stream_chunks
+        self.chunk_size = chunk_size
+        self.frame_interval = frame_interval
+        self.documents = documents
+        self.index = index
+        self.host = host
+        self.port = port
+        self.max_workers = max_workers
+        self.target: Optional[str] = None
+        self.calls: Counter = Counter()
+        self.open_pits: Set[str] = set()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages: Dict[int, SearchResponse] = {}
+        self._server: Optional[grpc.Server] = None
+
+    def start(self) -> str:
+        """Start serving and return the host:port target."""
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=self.max_workers))
+        add_DocumentServiceServicer_to_server(_DocumentServicer(self), server)
+        add_SearchServiceServicer_to_server(_SearchServicer(self), server)
+        add_MLServiceServicer_to_server(_MLServicer(self), server)
+        port = server.add_insecure_port(f"{self.host}:{self.port}")
+        server.start()
+        self._server = server
+        self.target = f"{self.host}:{port}"
+        return self.target
+
+    def stop(self, grace: Optional[float] = None) -> None:
+        """Stop serving; in-flight calls are cancelled after grace seconds."""
+        if self._server is not None:
+            self._server.stop(grace).wait()
+            self._server = None
+
+    def __enter__(self) -> "FakeOpenSearch":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def page(self, size: int) -> SearchResponse:
+        """Return the canned SearchResponse holding size hits."""
+        page = self._pages.get(size)
+        if page is None:
+            page = SearchResponse(took=1)
+            page.hits.total.total_hits.value = size
+            for number in range(size):
+                self._add_hit(page, number)
+            self._pages[size] = page
+        return page
+
+    def pit_page(self, body) -> SearchResponse:
+        """Return the next page of the documents corpus for a PIT search body."""
+        size = body.size if body.HasField("size") else self.hits_per_page
+        start = body.search_after[0].general_number.int64_value + 1 if len(body.search_after) else 0
+        step = body.slice.max if body.HasField("slice") and body.slice.max > 1 else 1
+        offset = body.slice.id if step > 1 else 0
+        start += (offset - start) % step
+
+        page = SearchResponse(took=1, pit_id=body.pit.id)
+        page.hits.total.total_hits.value = self.documents
+        for number in range(start, self.documents, step)[:size]:
+            self._add_hit(page, number).sort.add().general_number.int64_value = number
+        return page
+
+    def _add_hit(self, page: SearchResponse, number: int):
+        hit = page.hits.hits.add(x_index=self.index, x_id=str(number))
+        hit.x_score.double = 1.0
+        prefix = f'{{"id":{number},"body":"'
+        padding = "x" * max(0, self.source_size - len(prefix) - 2)
+        hit.x_source = f'{prefix}{padding}"}}'.encode()
+        return hit
+
+    def _chance(self, rate: float) -> bool:
+        if rate <= 0.0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _enter(self, method: str, context: grpc.ServicerContext) -> None:
+        """Count the call, apply latency and inject RPC errors."""
+        with self._lock:
+            self.calls[method] += 1
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+        if delay > 0.0:
+            time.sleep(delay)
+        if self._chance(self.rpc_error_rate):
+            context.abort(self.rpc_error_code, "429 Too Many Requests: rejected by fake server")
+
+    def _pause(self) -> None:
+        if self.frame_interval > 0.0:
+            time.sleep(self.frame_interval)
+
+    def _predict_frames(self, method: str, context: grpc.ServicerContext):
+        self._enter(method, context)
+        text = "y" * self.chunk_size
+        for number in range(self.stream_chunks):
+            frame = PredictResponse()
+            frame.inference_results.add().output.add(name="response", result=text)
+            if number == self.stream_chunks - 1:
+                frame.status = Status.STATUS_COMPLETED
+            yield frame
+            self._pause()
+
+
+class _DocumentServicer(DocumentServiceServicer):
+    def __init__(self, fake: FakeOpenSearch):
+        self.fake = fake
+
+    def Bulk(self, request, context):
+        fake = self.fake
+        fake._enter("Bulk", context)
+        response = BulkResponse(took=1)
+        for body in request.bulk_request_body:
+            operation = body.operation_container.WhichOneof("operation_container") or "index"
+            action = getattr(body.operation_container, operation)
+            item = getattr(response.items.add(), operation)
+            item.x_index = action.x_index or request.index or fake.index
+            item.x_id = action.x_id if action.HasField("x_id") else uuid.uuid4().hex
+            if fake._chance(fake.bulk_failure_rate):
+                response.errors = True
+                item.status = fake.bulk_failure_status
+                item.error.type = REJECTED_ERROR_TYPE
+                item.error.reason = "rejected execution by fake server"
+            else:
+                item.status = 201 if operation in ("index", "create") else 200
+        return response
+
+
+class _SearchServicer(SearchServiceServicer):
+    def __init__(self, fake: FakeOpenSearch):
+        self.fake = fake
+
+    def _size(self, request) -> int:
+        body = request.search_request_body
+        return body.size if body.HasField("size") else self.fake.hits_per_page
+
+    def Search(self, request, context):
+        self.fake._enter("Search", context)
+        body = request.search_request_body
+        if self.fake.documents is not None and body.HasField("pit"):
+            return self.fake.pit_page(body)
+        return self.fake.page(self._size(request))
+
+    def CreatePit(self, request, context):
+        self.fake._enter("CreatePit", context)
+        response = CreatePITResponse(pit_id=uuid.uuid4().hex, creation_time=int(time.time() * 1000))
+        response.x_shards.total = response.x_shards.successful = 1
+        with self.fake._lock:
+            self.fake.open_pits.add(response.pit_id)
+        return response
+
+    def DeletePit(self, request, context):
+        self.fake._enter("DeletePit", context)
+        response = DeletePITResponse()
+        with self.fake._lock:
+            for pit_id in request.pit_id:
+                response.pits.add(pit_id=pit_id, successful=pit_id in self.fake.open_pits)
+                self.fake.open_pits.discard(pit_id)
+        return response
+
+    def ServerStreamSearch(self, request, context):
+        fake = self.fake
+        fake._enter("ServerStreamSearch", context)
+        page = fake.page(self._size(request))
+        for _ in range(fake.stream_pages):
+            yield page
+            fake._pause()
+
+
+class _MLServicer(MLServiceServicer):
+    def __init__(self, fake: FakeOpenSearch):
+        self.fake = fake
+
+    def PredictModelStream(self, request, context):
+        yield from self.fake._predict_frames("PredictModelStream", context)
+
+    def ExecuteAgentStream(self, request, context):
+        yield from self.fake._predict_frames("ExecuteAgentStream", context)
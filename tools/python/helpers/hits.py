@@ -0,0 +1,239 @@
+"""
+Read-only, lazily decoded views over SearchResponse hits.
+
+Wrapping a page of hits costs nothing up front: a HitView is created only
+when its position is accessed, metadata properties read the underlying
+message directly, and the JSON x_source is decoded only on first access and
+then cached on the view. project()/get() decode just the requested top-level
+_source keys, skipping over the rest of the document without building it.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from opensearch.protobufs.schemas import FieldValue, HitsMetadata, HitsMetadataHitsInner, SearchResponse
+
+_MISSING = object()
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_STRING_OR_BRACKET = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.DOTALL)
+_SCALAR = re.compile(r"[^,}\]\s]+")
+
+
+def field_value_to_python(value: FieldValue) -> Any:
+    """Convert a FieldValue (e.g. a sort value) into a plain Python value."""
+    if value.HasField("string"):
+        return value.string
+    if value.HasField("general_number"):
+        kind = value.general_number.WhichOneof("value")
+        return getattr(value.general_number, kind) if kind else None
+    if value.HasField("bool"):
+        return value.bool
+    return None
+
+
+class HitView:
+    """Read-only view of one HitsMetadataHitsInner with a lazily decoded _source."""
+
+    __slots__ = ("_hit", "_source", "_fields")
+
+    def __init__(self, hit: HitsMetadataHitsInner):
+        self._hit = hit
+        self._source: Any = _MISSING
+        self._fields: Dict[str, Any] = {}
+
+    @property
+    def message(self) -> HitsMetadataHitsInner:
+        """The wrapped hit message."""
+        return self._hit
+
+    @property
+    def id(self) -> Optional[str]:
+        """The document _id, or None if absent."""
+        return self._hit.x_id if self._hit.HasField("x_id") else None
+
+    @property
+    def index(self) -> Optional[str]:
+        """The document _index, or None if absent."""
+        return self._hit.x_index if self._hit.HasField("x_index") else None
+
+    @property
+    def routing(self) -> Optional[str]:
+        """The document _routing, or None if absent."""
+        return self._hit.x_routing if self._hit.HasField("x_routing") else None
+
+    @property
+    def score(self) -> Optional[float]:
+        """The hit _score, or None when absent or null."""
+        if not self._hit.HasField("x_score") or self._hit.x_score.WhichOneof("hit_x_score") != "double":
+            return None
+        return self._hit.x_score.double
+
+    @property
+    def sort(self) -> Tuple[Any, ...]:
+        """The hit sort values as plain Python values."""
+        return tuple(field_value_to_python(value) for value in self._hit.sort)
+
+    @property
+    def seq_no(self) -> Optional[int]:
+        """The document _seq_no, or None if absent."""
+        return self._hit.x_seq_no if self._hit.HasField("x_seq_no") else None
+
+    @property
+    def primary_term(self) -> Optional[int]:
+        """The document _primary_term, or None if absent."""
+        return self._hit.x_primary_term if self._hit.HasField("x_primary_term") else None
+
+    @property
+    def version(self) -> Optional[int]:
+        """The document _version, or None if absent."""
+        return self._hit.x_version if self._hit.HasField("x_version") else None
+
+    @property
+    def raw_source(self) -> Optional[bytes]:
+        """The undecoded JSON _source bytes, or None if absent."""
+        return self._hit.x_source if self._hit.HasField("x_source") else None
+
+    @property
+    def source(self) -> Any:
+        """The decoded _source, parsed on first access and cached."""
+        if self._source is _MISSING:
+            raw = self.raw_source
+            self._source = None if raw is None else json.loads(raw)
+        return self._source
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """Return the _source value at a dotted path, decoding as little as possible."""
+        value = self.project([path]).get(path, _MISSING)
+        return default if value is _MISSING else value
+
+    def project(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """Return {path: value} for the dotted paths present in _source.
+
+        Only the top-level keys named by paths are decoded, unless the whole
+        _source has already been decoded, in which case it is reused.
+        """
+        paths = list(paths)
+        if self._source is _MISSING:
+            wanted = {path.split(".", 1)[0] for path in paths} - self._fields.keys()
+            if wanted:
+                raw = self.raw_source
+                if raw is None:
+                    return {}
+                found = _decode_top_level_keys(raw.decode("utf-8"), wanted)
+                # Absent keys are cached as _MISSING too, so they are not searched for again.
+                self._fields.update(dict.fromkeys(wanted, _MISSING), **found)
+            roots = self._fields
+        elif isinstance(self._source, dict):
+            roots = self._source
+        else:
+            return {}
+
+        result = {}
+        for path in paths:
+            value = _lookup(roots, path.split("."))
+            if value is not _MISSING:
+                result[path] = value
+        return result
+
+    def __repr__(self) -> str:
+        return f"HitView(index={self.index!r}, id={self.id!r}, score={self.score!r})"
+
+
+class HitViews(Sequence[HitView]):
+    """Sequence of HitView over the hits of a SearchResponse or HitsMetadata.
+
+    Views are created on first access and reused afterwards.
+    """
+
+    __slots__ = ("_hits", "_views")
+
+    def __init__(self, response: Union[SearchResponse, HitsMetadata]):
+        hits_metadata = response.hits if isinstance(response, SearchResponse) else response
+        self._hits = hits_metadata.hits
+        self._views: List[Optional[HitView]] = [None] * len(self._hits)
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        view = self._views[position]
+        if view is None:
+            view = self._views[position] = HitView(self._hits[position])
+        return view
+
+    def __iter__(self) -> Iterator[HitView]:
+        for position in range(len(self._views)):
+            yield self[position]
+
+
+def _lookup(roots: Dict[str, Any], keys: List[str]) -> Any:
+    """Follow keys through nested dicts, returning _MISSING if any is absent."""
+    value: Any = roots
+    for key in keys:
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _decode_top_level_keys(text: str, wanted: set) -> Dict[str, Any]:
+    """Decode only the wanted top-level members of the JSON object in text."""
+    found: Dict[str, Any] = {}
+    pos = _WHITESPACE.match(text, 0).end()
+    if not text.startswith("{", pos):
+        raise ValueError("_source is not a JSON object")
+    pos += 1
+
+    while len(found) < len(wanted):
+        pos = _WHITESPACE.match(text, pos).end()
+        if text.startswith("}", pos):
+            break
+        key_match = _STRING.match(text, pos)
+        if key_match is None:
+            raise ValueError(f"Malformed _source at offset {pos}")
+        key = json.loads(key_match.group())
+        pos = _WHITESPACE.match(text, key_match.end()).end()
+        if not text.startswith(":", pos):
+            raise ValueError(f"Malformed _source at offset {pos}")
+        pos = _WHITESPACE.match(text, pos + 1).end()
+
+        if key in wanted:
+            found[key], pos = _decoder.raw_decode(text, pos)
+        else:
+            pos = _skip_value(text, pos)
+
+        pos = _WHITESPACE.match(text, pos).end()
+        if text.startswith(",", pos):
+            pos += 1
+    return found
+
+
+def _skip_value(text: str, pos: int) -> int:
+    """Return the offset just past the JSON value starting at pos."""
+    first = text[pos:pos + 1]
+    if first == '"':
+        match = _STRING.match(text, pos)
+        if match is None:
+            raise ValueError(f"Unterminated string in _source at offset {pos}")
+        return match.end()
+    if first in ("{", "["):
+        depth = 0
+        for match in _STRING_OR_BRACKET.finditer(text, pos):
+            token = match.group()
+            if token in ("{", "["):
+                depth += 1
+            elif token in ("}", "]"):
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        raise ValueError(f"Unterminated container in _source at offset {pos}")
+    match = _SCALAR.match(text, pos)
+    if match is None:
+        raise ValueError(f"Malformed _source at offset {pos}")
+    return match.end()
@@ -0,0 +1,200 @@
+"""
+Asyncio bulk ingestion with per-item retries.
+
+AsyncBulkIngester chunks actions with chunk_bulk_requests and keeps up to
+concurrency Bulk calls in flight on a grpc.aio DocumentServiceStub. A
+response with errors unset is counted as fully successful without looking at
+its items. Otherwise each Item is matched to the BulkRequestBody at the same
+position. Items whose status is retryable (429/503 by default) are re-sent in
+new, smaller requests after a jittered exponential backoff. Any other failure
+goes to the dead-letter sink. Only the failed documents are sent again,
+never the whole batch.
+
+A Bulk call that fails as a whole with UNAVAILABLE or RESOURCE_EXHAUSTED is
+retried the same way. Any other RPC error dead-letters every body it carried.
+"""
+
+import asyncio
+import inspect
+import random
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import grpc
+
+from opensearch.protobufs.schemas import BulkRequest, BulkRequestBody, BulkResponse, ErrorCause
+
+from .bulk import DEFAULT_MAX_ACTIONS, DEFAULT_MAX_BYTES, BulkAction, chunk_bulk_requests
+
+DEFAULT_RETRY_STATUSES = frozenset((429, 503))
+RETRYABLE_RPC_CODES = frozenset((grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.RESOURCE_EXHAUSTED))
+
+
+@dataclass
+class FailedItem:
+    """A bulk action that could not be ingested."""
+
+    body: BulkRequestBody
+    # HTTP-style item status, or None when the whole RPC failed.
+    status: Optional[int]
+    error: Optional[ErrorCause]
+    attempts: int
+    # Set when the whole RPC failed.
+    rpc_error: Optional[BaseException] = None
+
+
+@dataclass
+class IngestSummary:
+    """Counters for one ingest() run."""
+
+    requests: int = 0
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+    dead_letters: List[FailedItem] = field(default_factory=list)
+
+
+DeadLetterSink = Callable[[FailedItem], Union[Awaitable[None], None]]
+
+
+class AsyncBulkIngester:
+    """Drive DocumentService.Bulk with bounded concurrency and per-item retries."""
+
+    def __init__(
+        self,
+        stub: Any,
+        template: Optional[BulkRequest] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_actions: int = DEFAULT_MAX_ACTIONS,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+        dead_letter: Optional[DeadLetterSink] = None,
+        timeout: Optional[float] = None,
+        metadata: Optional[Sequence[Tuple[str, str]]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """Create an ingester around a DocumentServiceStub built on a grpc.aio channel.
+
+        Failed items are passed to dead_letter when given, and are otherwise
+        collected in IngestSummary.dead_letters.
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be positive, got {concurrency}")
+        self.stub = stub
+        self.template = template if template is not None else BulkRequest()
+        self.max_bytes = max_bytes
+        self.max_actions = max_actions
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.dead_letter = dead_letter
+        self.timeout = timeout
+        self.metadata = metadata
+        self.rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        """Return the full-jitter delay before retry number attempt (1-based)."""
+        ceiling = min(self.max_backoff, self.initial_backoff * (2 ** (attempt - 1)))
+        return self.rng.uniform(0, ceiling)
+
+    async def ingest(self, actions: Iterable[BulkAction]) -> IngestSummary:
+        """Send every action, retrying retryable failures, and return the totals."""
+        summary = IngestSummary()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: Set[asyncio.Future] = set()
+
+        def spawn(coroutine) -> None:
+            task = asyncio.ensure_future(coroutine)
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        try:
+            for request in self._chunk(actions):
+                await semaphore.acquire()
+                spawn(self._send(request, 0, semaphore, summary, spawn))
+
+            while tasks:
+                await asyncio.gather(*list(tasks))
+        except BaseException:
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(*list(tasks), return_exceptions=True)
+            raise
+
+        return summary
+
+    def _chunk(self, actions: Iterable[BulkAction]):
+        """Chunk actions into requests sharing the template's top-level fields."""
+        return chunk_bulk_requests(actions, template=self.template,
+                                   max_bytes=self.max_bytes, max_actions=self.max_actions)
+
+    async def _send(self, request: BulkRequest, attempt: int, semaphore: asyncio.Semaphore,
+                    summary: IngestSummary, spawn: Callable) -> None:
+        """Send one request (holding a semaphore slot) and settle its items."""
+        try:
+            summary.requests += 1
+            response: BulkResponse = await self.stub.Bulk(request, timeout=self.timeout, metadata=self.metadata)
+        except grpc.RpcError as e:
+            semaphore.release()
+            bodies = list(request.bulk_request_body)
+            if e.code() in RETRYABLE_RPC_CODES and attempt < self.max_retries:
+                await self._retry(bodies, attempt, semaphore, summary, spawn)
+            else:
+                for body in bodies:
+                    await self._fail(FailedItem(body, None, None, attempt + 1, e), summary)
+            return
+        except BaseException:
+            semaphore.release()
+            raise
+        semaphore.release()
+
+        bodies = request.bulk_request_body
+        if not response.errors:
+            summary.succeeded += len(bodies)
+            return
+
+        if len(response.items) != len(bodies):
+            error = RuntimeError(f"BulkResponse has {len(response.items)} items for {len(bodies)} bodies")
+            for body in bodies:
+                await self._fail(FailedItem(body, None, None, attempt + 1, error), summary)
+            return
+
+        retry: List[BulkRequestBody] = []
+        for body, item in zip(bodies, response.items):
+            kind = item.WhichOneof("item")
+            result = getattr(item, kind) if kind else None
+            status = result.status if result is not None else 0
+            if 200 <= status < 300:
+                summary.succeeded += 1
+            elif status in self.retry_statuses and attempt < self.max_retries:
+                retry.append(body)
+            else:
+                error = result.error if result is not None and result.HasField("error") else None
+                await self._fail(FailedItem(body, status, error, attempt + 1), summary)
+
+        if retry:
+            await self._retry(retry, attempt, semaphore, summary, spawn)
+
+    async def _retry(self, bodies: List[BulkRequestBody], attempt: int, semaphore: asyncio.Semaphore,
+                     summary: IngestSummary, spawn: Callable) -> None:
+        """Wait out the backoff, then resend bodies in fresh requests."""
+        summary.retried += len(bodies)
+        await asyncio.sleep(self.backoff(attempt + 1))
+        for request in self._chunk(bodies):
+            await semaphore.acquire()
+            spawn(self._send(request, attempt + 1, semaphore, summary, spawn))
+
+    async def _fail(self, failed: FailedItem, summary: IngestSummary) -> None:
+        """Record a permanent failure and hand it to the dead-letter sink."""
+        summary.failed += 1
+        if self.dead_letter is None:
+            summary.dead_letters.append(failed)
+            return
+        result = self.dead_letter(failed)
+        if inspect.isawaitable(result):
+            await result
@@ -0,0 +1,558 @@
+"""
+Client-side metrics for the generated stubs: serialization cost, wire size and latency.
+
+Two pieces cooperate, both reporting to a MetricsSink per method
+("SearchService/Search", "MLService/PredictModelStream", ...):
+
+- Interceptors (MetricsInterceptor for sync channels,
+  aio_metrics_interceptors() for grpc.aio) record end-to-end latency, calls,
+  errors (any status but OK, cancellations included) and in-flight counts.
+  For response streams they also record the time to the first message, the
+  gaps between messages as the consumer sees them, and the number of
+  messages per stream (when it ends, fails or is cancelled).
+- instrument_serializers() wraps a channel so that the request serializer
+  and response deserializer the stubs pass in are timed, and the serialized
+  sizes recorded. Interceptors only see messages, never bytes, so this is
+  the only way to observe protobuf encoding separately from the wire. For
+  streams the deserializer runs once per message, so response size and
+  deserialize time are per message.
+
+Latency includes serialization; subtracting serialize_seconds and
+deserialize_seconds leaves the network and the server.
+
+instrument_channel() wires both up for a sync channel. grpc.aio takes
+interceptors only when the channel is created:
+
+    metrics = ClientMetrics()
+    channel = instrument_serializers(
+        grpc.aio.insecure_channel(target, interceptors=aio_metrics_interceptors(metrics)), metrics)
+
+ClientMetrics keeps every metric in a log-linear, HDR-style Histogram. When
+a sink's enabled attribute is False, every wrapper checks it once and calls
+straight through; instrument_channel(channel, None) returns channel as is.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import grpc
+from grpc import aio
+
+# Histogram metrics
+SERIALIZE_SECONDS = "serialize_seconds"
+DESERIALIZE_SECONDS = "deserialize_seconds"
+REQUEST_BYTES = "request_bytes"
+RESPONSE_BYTES = "response_bytes"
+LATENCY_SECONDS = "latency_seconds"
+FIRST_MESSAGE_SECONDS = "first_message_seconds"
+MESSAGE_GAP_SECONDS = "message_gap_seconds"
+STREAM_MESSAGES = "stream_messages"
+
+# Counters
+CALLS = "calls"
+ERRORS = "errors"
+
+DEFAULT_SIGNIFICANT_BITS = 5  # 32 sub-buckets per power of two, under 3.2% error
+
+
+class HistogramSnapshot(NamedTuple):
+    """Summary of a Histogram at one point in time."""
+
+    count: int
+    total: float
+    min: float
+    max: float
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    p999: float
+
+
+class Histogram:
+    """Log-linear histogram of non-negative values, in the style of HdrHistogram.
+
+    Each power of two is split into 2**significant_bits equal buckets, so a
+    reported percentile is within 2**-significant_bits of the true value
+    whatever the magnitude, from nanoseconds to megabytes. Recording is a dict
+    increment; memory grows with the spread of values, not their count.
+    Not thread-safe on its own; ClientMetrics serializes access.
+    """
+
+    def __init__(self, significant_bits: int = DEFAULT_SIGNIFICANT_BITS):
+        if not 1 <= significant_bits <= 16:
+            raise ValueError(f"significant_bits must be in [1, 16], got {significant_bits}")
+        self.significant_bits = significant_bits
+        self._sub_buckets = 1 << significant_bits
+        self._counts: Dict[int, int] = {}
+        self._zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Add value count times."""
+        if value < 0:
+            raise ValueError(f"Histogram values must be non-negative, got {value}")
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value == 0:
+            self._zeros += count
+            return
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + count
+
+    def merge(self, other: "Histogram") -> None:
+        """Add every value recorded in other, which must use the same precision."""
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("Cannot merge histograms with different significant_bits")
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._zeros += other._zeros
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+
+    def percentile(self, fraction: float) -> float:
+        """Return the value at fraction (in [0, 1]) of the recorded values.
+
+        The result is the upper bound of the bucket holding that rank,
+        clamped to the exact min and max.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = self._zeros
+        if seen >= rank:
+            return 0.0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                return min(max(self._upper_bound(index), self.min), self.max)
+        return self.max
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Return (bucket upper bound, count) pairs in increasing order."""
+        pairs = [(0.0, self._zeros)] if self._zeros else []
+        return pairs + [(self._upper_bound(index), self._counts[index]) for index in sorted(self._counts)]
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Return count, total, min, max, mean and the usual percentiles."""
+        return HistogramSnapshot(
+            self.count,
+            self.total,
+            self.min if self.count else 0.0,
+            self.max,
+            self.total / self.count if self.count else 0.0,
+            self.percentile(0.50),
+            self.percentile(0.90),
+            self.percentile(0.99),
+            self.percentile(0.999),
+        )
+
+    def _index(self, value: float) -> int:
+        mantissa, exponent = math.frexp(value)  # value = mantissa * 2**exponent, mantissa in [0.5, 1)
+        return exponent * self._sub_buckets + int((mantissa - 0.5) * 2 * self._sub_buckets)
+
+    def _upper_bound(self, index: int) -> float:
+        exponent, sub_bucket = divmod(index, self._sub_buckets)
+        return math.ldexp(0.5 + (sub_bucket + 1) / (2 * self._sub_buckets), exponent)
+
+
+class MetricsSink:
+    """Receives client metrics. Subclass and override what you need.
+
+    The default methods discard everything. Set enabled to False to make the
+    instrumentation skip its timing entirely.
+    """
+
+    enabled = True
+
+    def observe(self, method: str, metric: str, value: float) -> None:
+        """Record one sample of a histogram metric."""
+
+    def increment(self, method: str, metric: str, amount: int = 1) -> None:
+        """Add amount to a counter."""
+
+    def in_flight(self, method: str, delta: int) -> None:
+        """Called with +1 when a call starts and -1 when it finishes."""
+
+
+class ClientMetrics(MetricsSink):
+    """Thread-safe MetricsSink keeping a Histogram per method and metric."""
+
+    def __init__(self, significant_bits: int = DEFAULT_SIGNIFICANT_BITS, enabled: bool = True):
+        self.enabled = enabled
+        self.significant_bits = significant_bits
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._peak_in_flight: Dict[str, int] = {}
+
+    def observe(self, method: str, metric: str, value: float) -> None:
+        key = (method, metric)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.significant_bits)
+            histogram.record(value)
+
+    def increment(self, method: str, metric: str, amount: int = 1) -> None:
+        key = (method, metric)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def in_flight(self, method: str, delta: int) -> None:
+        with self._lock:
+            current = self._in_flight[method] = self._in_flight.get(method, 0) + delta
+            if current > self._peak_in_flight.get(method, 0):
+                self._peak_in_flight[method] = current
+
+    def histogram(self, method: str, metric: str) -> Optional[Histogram]:
+        """Return the live histogram for method and metric, or None if never observed."""
+        return self._histograms.get((method, metric))
+
+    def current_in_flight(self, method: str) -> int:
+        """Return the number of calls to method currently in progress."""
+        return self._in_flight.get(method, 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return {method: {metric: HistogramSnapshot or int}}.
+
+        Counters and the "in_flight" / "in_flight_peak" gauges are ints.
+        """
+        with self._lock:
+            methods: Dict[str, Dict[str, Any]] = {}
+            for (method, metric), histogram in self._histograms.items():
+                methods.setdefault(method, {})[metric] = histogram.snapshot()
+            for (method, metric), count in self._counters.items():
+                methods.setdefault(method, {})[metric] = count
+            for method, count in self._in_flight.items():
+                methods.setdefault(method, {})["in_flight"] = count
+                methods[method]["in_flight_peak"] = self._peak_in_flight.get(method, 0)
+            return methods
+
+    def reset(self) -> None:
+        """Drop every histogram and counter; in-flight gauges keep their current value."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._peak_in_flight = dict(self._in_flight)
+
+
+@lru_cache(maxsize=256)
+def method_name(path: Any) -> str:
+    """Return "Service/Method" for a full method path such as
+    /org.opensearch.protobufs.services.SearchService/Search (str or bytes)."""
+    if isinstance(path, bytes):
+        path = path.decode("ascii")
+    service, _, method = path.lstrip("/").rpartition("/")
+    return f"{service.rpartition('.')[2]}/{method}"
+
+
+def _call_started(sink: MetricsSink, method: str) -> float:
+    sink.increment(method, CALLS)
+    sink.in_flight(method, 1)
+    return time.perf_counter()
+
+
+def _call_done(sink: MetricsSink, method: str, start: float, call: Any) -> None:
+    sink.observe(method, LATENCY_SECONDS, time.perf_counter() - start)
+    sink.in_flight(method, -1)
+    try:
+        code = call.code()
+    except Exception:  # a failed future may raise instead of reporting a code
+        code = None
+    if code != grpc.StatusCode.OK:
+        sink.increment(method, ERRORS)
+
+
+# Keeps the status checks of finished grpc.aio calls alive until they run.
+_pending_status_checks = set()
+
+
+def _aio_call_done(sink: MetricsSink, method: str, start: float, call: Any) -> None:
+    sink.observe(method, LATENCY_SECONDS, time.perf_counter() - start)
+    sink.in_flight(method, -1)
+    # aio calls only report their code through a coroutine; the call is done, so it returns at once.
+    task = asyncio.ensure_future(call.code())
+    _pending_status_checks.add(task)
+    task.add_done_callback(partial(_aio_status_checked, sink, method))
+
+
+def _aio_status_checked(sink: MetricsSink, method: str, task: "asyncio.Future") -> None:
+    _pending_status_checks.discard(task)
+    if task.cancelled() or task.exception() is not None or task.result() != grpc.StatusCode.OK:
+        sink.increment(method, ERRORS)
+
+
+class _MessageClock:
+    """Times the messages of one response stream as the consumer receives them."""
+
+    __slots__ = ("sink", "method", "start", "last", "messages", "finished")
+
+    def __init__(self, sink: MetricsSink, method: str, start: float):
+        self.sink = sink
+        self.method = method
+        self.start = start
+        self.last = start
+        self.messages = 0
+        self.finished = False
+
+    def message(self) -> None:
+        now = time.perf_counter()
+        metric = MESSAGE_GAP_SECONDS if self.messages else FIRST_MESSAGE_SECONDS
+        self.sink.observe(self.method, metric, now - self.last)
+        self.last = now
+        self.messages += 1
+
+    def finish(self) -> None:
+        if not self.finished:
+            self.finished = True
+            self.sink.observe(self.method, STREAM_MESSAGES, self.messages)
+
+    def call_done(self, call: Any) -> None:
+        # A cancelled stream may never be iterated to its end.
+        if call.cancelled():
+            self.finish()
+
+
+class _ObservedStream:
+    """A sync response-stream call that times each message it yields.
+
+    Everything else (cancel, code, details, add_done_callback, ...) is
+    delegated to the wrapped call.
+    """
+
+    def __init__(self, call: Any, clock: _MessageClock):
+        self._call = call
+        self._clock = clock
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            response = next(self._call)
+        except BaseException:
+            self._clock.finish()
+            raise
+        self._clock.message()
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._call, name)
+
+
+class MetricsInterceptor(
+    grpc.UnaryUnaryClientInterceptor,
+    grpc.UnaryStreamClientInterceptor,
+    grpc.StreamUnaryClientInterceptor,
+    grpc.StreamStreamClientInterceptor,
+):
+    """Sync client interceptor recording latency, errors, in-flight calls and stream messages."""
+
+    def __init__(self, sink: MetricsSink):
+        self.sink = sink
+
+    def _unary_response(self, continuation: Callable, details: Any, request: Any) -> Any:
+        sink = self.sink
+        if not sink.enabled:
+            return continuation(details, request)
+        method = method_name(details.method)
+        start = _call_started(sink, method)
+        call = continuation(details, request)
+        call.add_done_callback(partial(_call_done, sink, method, start))
+        return call
+
+    def _stream_response(self, continuation: Callable, details: Any, request: Any) -> Any:
+        sink = self.sink
+        if not sink.enabled:
+            return continuation(details, request)
+        method = method_name(details.method)
+        start = _call_started(sink, method)
+        call = continuation(details, request)
+        call.add_done_callback(partial(_call_done, sink, method, start))
+        clock = _MessageClock(sink, method, start)
+        call.add_done_callback(clock.call_done)
+        return _ObservedStream(call, clock)
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return self._unary_response(continuation, client_call_details, request)
+
+    def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        return self._unary_response(continuation, client_call_details, request_iterator)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return self._stream_response(continuation, client_call_details, request)
+
+    def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        return self._stream_response(continuation, client_call_details, request_iterator)
+
+
+class _AioInterceptor:
+    def __init__(self, sink: MetricsSink):
+        self.sink = sink
+
+    async def _unary_response(self, continuation: Callable, details: Any, request: Any) -> Any:
+        sink = self.sink
+        if not sink.enabled:
+            return await continuation(details, request)
+        method = method_name(details.method)
+        start = _call_started(sink, method)
+        call = await continuation(details, request)
+        call.add_done_callback(partial(_aio_call_done, sink, method, start))
+        return call
+
+    async def _stream_response(self, continuation: Callable, details: Any, request: Any) -> Any:
+        sink = self.sink
+        if not sink.enabled:
+            return await continuation(details, request)
+        method = method_name(details.method)
+        start = _call_started(sink, method)
+        call = await continuation(details, request)
+        call.add_done_callback(partial(_aio_call_done, sink, method, start))
+        clock = _MessageClock(sink, method, start)
+        call.add_done_callback(clock.call_done)
+        return self._observe(call, clock)
+
+    @staticmethod
+    async def _observe(call: Any, clock: _MessageClock):
+        try:
+            async for response in call:
+                clock.message()
+                yield response
+        finally:
+            clock.finish()
+
+
+class _AioUnaryUnary(_AioInterceptor, aio.UnaryUnaryClientInterceptor):
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        return await self._unary_response(continuation, client_call_details, request)
+
+
+class _AioUnaryStream(_AioInterceptor, aio.UnaryStreamClientInterceptor):
+    async def intercept_unary_stream(self, continuation, client_call_details, request):
+        return await self._stream_response(continuation, client_call_details, request)
+
+
+class _AioStreamUnary(_AioInterceptor, aio.StreamUnaryClientInterceptor):
+    async def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        return await self._unary_response(continuation, client_call_details, request_iterator)
+
+
+class _AioStreamStream(_AioInterceptor, aio.StreamStreamClientInterceptor):
+    async def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        return await self._stream_response(continuation, client_call_details, request_iterator)
+
+
+def aio_metrics_interceptors(sink: MetricsSink) -> List[aio.ClientInterceptor]:
+    """Return the grpc.aio interceptors, one per call type, to pass as interceptors=."""
+    return [_AioUnaryUnary(sink), _AioUnaryStream(sink), _AioStreamUnary(sink), _AioStreamStream(sink)]
+
+
+def _timed_serializer(sink: MetricsSink, method: str, serialize: Optional[Callable]) -> Callable:
+    if serialize is None:
+        # Pre-serialized requests (e.g. helpers.raw_bulk): only their size is known.
+        def measure(data: bytes) -> bytes:
+            if sink.enabled:
+                sink.observe(method, REQUEST_BYTES, len(data))
+            return data
+        return measure
+
+    def timed(message: Any) -> bytes:
+        if not sink.enabled:
+            return serialize(message)
+        start = time.perf_counter()
+        data = serialize(message)
+        sink.observe(method, SERIALIZE_SECONDS, time.perf_counter() - start)
+        sink.observe(method, REQUEST_BYTES, len(data))
+        return data
+    return timed
+
+
+def _timed_deserializer(sink: MetricsSink, method: str, deserialize: Optional[Callable]) -> Optional[Callable]:
+    if deserialize is None:
+        return None
+
+    def timed(data: bytes) -> Any:
+        if not sink.enabled:
+            return deserialize(data)
+        start = time.perf_counter()
+        message = deserialize(data)
+        sink.observe(method, DESERIALIZE_SECONDS, time.perf_counter() - start)
+        sink.observe(method, RESPONSE_BYTES, len(data))
+        return message
+    return timed
+
+
+class _SerializationTimingChannel:
+    """Channel proxy that wraps the serializers of every multicallable it creates."""
+
+    def __init__(self, channel: Any, sink: MetricsSink):
+        self._channel = channel
+        self._sink = sink
+
+    def _wrap(self, factory: Callable, method: str, request_serializer: Optional[Callable],
+              response_deserializer: Optional[Callable], *args: Any, **kwargs: Any) -> Any:
+        name = method_name(method)
+        return factory(method, _timed_serializer(self._sink, name, request_serializer),
+                       _timed_deserializer(self._sink, name, response_deserializer), *args, **kwargs)
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, *args, **kwargs):
+        return self._wrap(self._channel.unary_unary, method, request_serializer, response_deserializer,
+                          *args, **kwargs)
+
+    def unary_stream(self, method, request_serializer=None, response_deserializer=None, *args, **kwargs):
+        return self._wrap(self._channel.unary_stream, method, request_serializer, response_deserializer,
+                          *args, **kwargs)
+
+    def stream_unary(self, method, request_serializer=None, response_deserializer=None, *args, **kwargs):
+        return self._wrap(self._channel.stream_unary, method, request_serializer, response_deserializer,
+                          *args, **kwargs)
+
+    def stream_stream(self, method, request_serializer=None, response_deserializer=None, *args, **kwargs):
+        return self._wrap(self._channel.stream_stream, method, request_serializer, response_deserializer,
+                          *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._channel, name)
+
+    def __enter__(self):
+        self._channel.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._channel.__exit__(*exc_info)
+
+    async def __aenter__(self):
+        await self._channel.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._channel.__aexit__(*exc_info)
+
+
+def instrument_serializers(channel: Any, sink: MetricsSink) -> Any:
+    """Wrap a sync or grpc.aio channel so stubs built on it time (de)serialization."""
+    return _SerializationTimingChannel(channel, sink)
+
+
+def instrument_channel(channel: grpc.Channel, sink: Optional[MetricsSink]) -> grpc.Channel:
+    """Return a sync channel reporting latency, sizes and serialization cost to sink.
+
+    Build the generated stubs on the returned channel. With sink None the
+    channel is returned unchanged.
+    """
+    if sink is None:
+        return channel
+    return grpc.intercept_channel(instrument_serializers(channel, sink), MetricsInterceptor(sink))
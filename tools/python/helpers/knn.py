@@ -0,0 +1,200 @@
+"""
+Batched kNN search from a matrix of query vectors.
+
+knn_search_batch() runs one KnnQuery search per row of a 2-D array over
+SearchService.Search and returns the neighbours as (n_queries, k) arrays of
+ids and scores, for offline evaluation and re-ranking jobs that issue
+thousands of queries at once.
+
+Requests are built without touching a message per query. All queries share
+everything but their vector, so encode_knn_searches() serializes that shared
+part once, with the KnnQuery's field, k, filter and method_parameters. Each
+request is then that prefix followed by a fixed header and the row's float32
+bytes: a second serialized search_request_body.query.knn holding only the
+packed vector field. Protobuf parsing merges repeated occurrences of a
+message field, so the server reads exactly the SearchRequest that setting
+knn.vector would have produced, and the client never appends a float.
+
+The requests go out as pre-serialized bytes with at most concurrency calls
+in flight. Responses are decoded one hit at a time only for _id and _score.
+The document sources are not fetched unless fetch_source is True or the
+template sets _source, which keeps the responses small.
+
+numpy is an optional dependency, imported on first use.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from opensearch.protobufs.schemas import ObjectMap, QueryContainer, SearchRequest, SearchResponse
+from opensearch.protobufs.services import search_service_pb2
+
+from ._grpc import method_path
+from ._wire import WIRETYPE_LENGTH_DELIMITED, encode_tag, encode_varint
+from .object_map import dict_to_object_map
+
+SEARCH = method_path(search_service_pb2, "SearchService", "Search")
+
+DEFAULT_CONCURRENCY = 16
+
+# Field numbers from SearchRequest down to KnnQuery.vector.
+_VECTOR_PATH = (
+    SearchRequest.SEARCH_REQUEST_BODY_FIELD_NUMBER,
+    SearchRequest.DESCRIPTOR.fields_by_name["search_request_body"].message_type.fields_by_name["query"].number,
+    QueryContainer.KNN_FIELD_NUMBER,
+    QueryContainer.DESCRIPTOR.fields_by_name["knn"].message_type.fields_by_name["vector"].number,
+)
+
+
+class KnnBatchResult(NamedTuple):
+    """Neighbours of every query; row i belongs to query vector i.
+
+    ids is an object array holding None, and scores a float32 array holding
+    NaN, where a query returned fewer than k hits or failed. errors maps the
+    rows of failed queries to their exception.
+    """
+
+    ids: Any
+    scores: Any
+    errors: Dict[int, BaseException]
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Batched kNN search requires numpy; install it with 'pip install numpy'") from e
+    return numpy
+
+
+def _vector_header(row_bytes: int) -> bytes:
+    """Return the tags and lengths that wrap row_bytes of packed floats in a SearchRequest."""
+    header = b""
+    length = row_bytes
+    for number in reversed(_VECTOR_PATH):
+        wrapper = encode_tag(number, WIRETYPE_LENGTH_DELIMITED) + encode_varint(length)
+        header = wrapper + header
+        length += len(wrapper)
+    return header
+
+
+def _shared_request(
+    field: str,
+    k: int,
+    filter: Optional[QueryContainer],
+    method_parameters: Optional[Union[ObjectMap, Mapping[str, Any]]],
+    template: Optional[SearchRequest],
+    fetch_source: bool,
+) -> SearchRequest:
+    request = SearchRequest()
+    if template is not None:
+        request.CopyFrom(template)
+    body = request.search_request_body
+    body.ClearField("query")
+    knn = body.query.knn
+    knn.field = field
+    knn.k = k
+    if filter is not None:
+        knn.filter.CopyFrom(filter)
+    if isinstance(method_parameters, ObjectMap):
+        knn.method_parameters.CopyFrom(method_parameters)
+    elif method_parameters is not None:
+        dict_to_object_map(method_parameters, knn.method_parameters)
+    if not body.HasField("size"):
+        body.size = k
+    if not fetch_source and not body.HasField("x_source"):
+        body.x_source.fetch = False
+    return request
+
+
+def encode_knn_searches(
+    vectors: Any,
+    field: str,
+    k: int,
+    filter: Optional[QueryContainer] = None,
+    method_parameters: Optional[Union[ObjectMap, Mapping[str, Any]]] = None,
+    template: Optional[SearchRequest] = None,
+    fetch_source: bool = False,
+) -> List[bytes]:
+    """Return one serialized SearchRequest per row of vectors.
+
+    Each holds a KnnQuery on field for the row (converted to float32) with k
+    neighbours and the optional filter and method_parameters (an ObjectMap or
+    a plain mapping such as {"ef_search": 100}). Other fields come from
+    template, whose query is replaced; its size defaults to k.
+    """
+    if k < 1:
+        raise ValueError(f"k must be positive, got {k}")
+    numpy = _numpy()
+    matrix = numpy.ascontiguousarray(vectors, dtype="<f4")
+    if matrix.ndim != 2 or matrix.shape[1] == 0:
+        raise ValueError(f"Expected a 2-D array of query vectors, got shape {matrix.shape}")
+
+    prefix = _shared_request(field, k, filter, method_parameters, template, fetch_source).SerializeToString()
+    if matrix.shape[0] == 0:
+        # memoryview cannot cast an array with a zero-length dimension.
+        return []
+    row_bytes = matrix.shape[1] * 4
+    prefix += _vector_header(row_bytes)
+    data = memoryview(matrix).cast("B")
+    return [b"".join((prefix, data[start:start + row_bytes])) for start in range(0, len(data), row_bytes)]
+
+
+def knn_search_batch(
+    channel: Any,
+    vectors: Any,
+    field: str,
+    k: int,
+    filter: Optional[QueryContainer] = None,
+    method_parameters: Optional[Union[ObjectMap, Mapping[str, Any]]] = None,
+    template: Optional[SearchRequest] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: Optional[float] = None,
+    metadata: Optional[Sequence[Tuple[str, str]]] = None,
+    fetch_source: bool = False,
+    return_exceptions: bool = False,
+) -> KnnBatchResult:
+    """Search every row of vectors on a sync channel and return the neighbours.
+
+    Requests are built as by encode_knn_searches(). The first failed search
+    is raised after the others have been cancelled, unless return_exceptions
+    is True, in which case failures are reported in KnnBatchResult.errors.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be positive, got {concurrency}")
+    numpy = _numpy()
+    requests = encode_knn_searches(vectors, field, k, filter, method_parameters, template, fetch_source)
+    ids = numpy.full((len(requests), k), None, dtype=object)
+    scores = numpy.full((len(requests), k), numpy.nan, dtype=numpy.float32)
+    errors: Dict[int, BaseException] = {}
+
+    search = channel.unary_unary(SEARCH, request_serializer=None, response_deserializer=SearchResponse.FromString)
+    in_flight: Deque[Tuple[int, Any]] = deque()
+
+    def settle() -> None:
+        row, call = in_flight.popleft()
+        try:
+            response = call.result()
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            errors[row] = e
+            return
+        row_ids = ids[row]
+        row_scores = scores[row]
+        for column, hit in enumerate(response.hits.hits[:k]):
+            row_ids[column] = hit.x_id
+            if hit.x_score.WhichOneof("hit_x_score") == "double":
+                row_scores[column] = hit.x_score.double
+
+    try:
+        for row, request in enumerate(requests):
+            if len(in_flight) >= concurrency:
+                settle()
+            in_flight.append((row, search.future(request, timeout=timeout, metadata=metadata)))
+        while in_flight:
+            settle()
+    finally:
+        for _, call in in_flight:
+            call.cancel()
+    return KnnBatchResult(ids, scores, errors)
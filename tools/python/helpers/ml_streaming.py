@@ -0,0 +1,291 @@
+"""
+Asyncio consumption of MLService.PredictModelStream and ExecuteAgentStream.
+
+open_ml_stream() starts either call on a grpc.aio channel and returns an
+MLStream. Iterating it yields one StreamChunk per PredictResponse frame as
+soon as the frame is decoded, carrying the frame's incremental text
+(data_as_map.content, or result when a model sends plain outputs) and its
+timing. The stream keeps the text parts in a list and joins them once, so
+assembling a long answer from thousands of tokens stays linear; collect()
+drains the stream and returns the assembled StreamResult.
+
+Every stream records time to first chunk and the gaps between chunks in its
+StreamMetrics, and optionally reports them to a helpers.instrumentation
+MetricsSink under the usual first_message_seconds / message_gap_seconds
+names.
+
+fan_out() runs many streams with at most concurrency open at once and
+interleaves their chunks through one queue of max_buffered chunks. When the
+consumer falls behind, the queue fills and every reader stops pulling, so
+HTTP/2 flow control pushes back on the server instead of chunks piling up
+in memory.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from opensearch.protobufs.schemas import (
+    MlExecuteAgentStreamRequest,
+    MlPredictModelStreamRequest,
+    PredictResponse,
+    Status,
+)
+from opensearch.protobufs.services import ml_service_pb2
+
+from ._grpc import method_path, sized_deserializer
+from .instrumentation import FIRST_MESSAGE_SECONDS, MESSAGE_GAP_SECONDS, STREAM_MESSAGES, MetricsSink, method_name
+from .streaming import effective_timeout
+
+PREDICT_MODEL_STREAM = method_path(ml_service_pb2, "MLService", "PredictModelStream")
+EXECUTE_AGENT_STREAM = method_path(ml_service_pb2, "MLService", "ExecuteAgentStream")
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_BUFFERED = 64
+
+# Statuses after which no further frames are expected.
+FINAL_STATUSES = frozenset((
+    Status.STATUS_COMPLETED,
+    Status.STATUS_COMPLETED_WITH_ERROR,
+    Status.STATUS_FAILED,
+    Status.STATUS_CANCELLED,
+))
+
+_DONE = object()
+_FAILED = object()
+
+MLStreamRequest = Union[MlPredictModelStreamRequest, MlExecuteAgentStreamRequest]
+
+
+class StreamChunk(NamedTuple):
+    """One decoded PredictResponse frame."""
+
+    index: int
+    text: str
+    is_last: bool
+    status: Optional[int]  # a Status value, None if the frame carries none
+    size: int
+    # Seconds since the call started, and since the previous chunk.
+    elapsed: float
+    gap: float
+    response: PredictResponse
+
+
+@dataclass
+class StreamMetrics:
+    """Timing totals for one stream."""
+
+    chunks: int = 0
+    bytes: int = 0
+    time_to_first_chunk: Optional[float] = None
+    max_gap: float = 0.0
+    total_gap: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def mean_gap(self) -> float:
+        """Mean seconds between consecutive chunks."""
+        return self.total_gap / (self.chunks - 1) if self.chunks > 1 else 0.0
+
+
+@dataclass
+class StreamResult:
+    """A fully consumed stream."""
+
+    text: str
+    status: Optional[int]
+    metrics: StreamMetrics
+    chunks: List[StreamChunk] = field(default_factory=list)
+
+
+def chunk_text(response: PredictResponse) -> str:
+    """Return the incremental text carried by one PredictResponse frame."""
+    parts = []
+    for inference in response.inference_results:
+        for output in inference.output:
+            if output.HasField("data_as_map") and output.data_as_map.HasField("content"):
+                parts.append(output.data_as_map.content)
+            elif output.HasField("result"):
+                parts.append(output.result)
+    return parts[0] if len(parts) == 1 else "".join(parts)
+
+
+def _is_last(response: PredictResponse) -> bool:
+    if response.HasField("status") and response.status in FINAL_STATUSES:
+        return True
+    return any(output.data_as_map.is_last
+               for inference in response.inference_results for output in inference.output
+               if output.HasField("data_as_map"))
+
+
+class MLStream:
+    """An in-progress PredictModelStream or ExecuteAgentStream call.
+
+    Iterate it once, with async for, or call collect(). The text of the
+    chunks read so far is available from text() at any time. Timings count
+    from started, a time.monotonic() value taken when the call was made
+    (by default, when the MLStream is created), not from the start of
+    iteration.
+    """
+
+    def __init__(self, call: Any, method: str, sink: Optional[MetricsSink] = None,
+                 started: Optional[float] = None):
+        self._call = call
+        self._started = time.monotonic() if started is None else started
+        self._method = method
+        self._sink = sink
+        self._parts: List[str] = []
+        self._text: Optional[str] = None
+        self.status: Optional[int] = None
+        self.metrics = StreamMetrics()
+
+    def __aiter__(self) -> AsyncIterator[StreamChunk]:
+        return self._chunks()
+
+    async def _chunks(self) -> AsyncIterator[StreamChunk]:
+        metrics = self.metrics
+        sink = self._sink if self._sink is not None and self._sink.enabled else None
+        started = previous = self._started
+        try:
+            async for response, size in self._call:
+                now = time.monotonic()
+                gap = now - previous
+                if metrics.time_to_first_chunk is None:
+                    metrics.time_to_first_chunk = gap
+                    if sink is not None:
+                        sink.observe(self._method, FIRST_MESSAGE_SECONDS, gap)
+                else:
+                    metrics.total_gap += gap
+                    metrics.max_gap = max(metrics.max_gap, gap)
+                    if sink is not None:
+                        sink.observe(self._method, MESSAGE_GAP_SECONDS, gap)
+                previous = now
+                text = chunk_text(response)
+                if text:
+                    self._parts.append(text)
+                    self._text = None
+                if response.HasField("status"):
+                    self.status = response.status
+                chunk = StreamChunk(metrics.chunks, text, _is_last(response),
+                                    response.status if response.HasField("status") else None,
+                                    size, now - started, gap, response)
+                metrics.chunks += 1
+                metrics.bytes += size
+                yield chunk
+        except BaseException:
+            self.cancel()
+            raise
+        finally:
+            metrics.elapsed = time.monotonic() - started
+            if sink is not None:
+                sink.observe(self._method, STREAM_MESSAGES, metrics.chunks)
+
+    def text(self) -> str:
+        """Return the text assembled from the chunks read so far."""
+        if self._text is None:
+            self._text = "".join(self._parts)
+        return self._text
+
+    async def collect(self, keep_chunks: bool = False) -> StreamResult:
+        """Read the rest of the stream and return the assembled result.
+
+        Chunks are only retained when keep_chunks is True.
+        """
+        chunks = []
+        async for chunk in self:
+            if keep_chunks:
+                chunks.append(chunk)
+        return StreamResult(self.text(), self.status, self.metrics, chunks)
+
+    def cancel(self) -> None:
+        """Cancel the underlying call."""
+        cancel = getattr(self._call, "cancel", None)
+        if cancel is not None:
+            cancel()
+
+
+def open_ml_stream(
+    channel: Any,
+    request: MLStreamRequest,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    metadata: Optional[Sequence[Tuple[str, str]]] = None,
+    sink: Optional[MetricsSink] = None,
+) -> MLStream:
+    """Start PredictModelStream or ExecuteAgentStream, chosen by the request type.
+
+    channel is a grpc.aio.Channel; timeout and deadline are as for
+    helpers.streaming.consume_search_stream().
+    """
+    if isinstance(request, MlPredictModelStreamRequest):
+        path = PREDICT_MODEL_STREAM
+    elif isinstance(request, MlExecuteAgentStreamRequest):
+        path = EXECUTE_AGENT_STREAM
+    else:
+        raise TypeError(f"Expected an MlPredictModelStreamRequest or MlExecuteAgentStreamRequest, "
+                        f"got {type(request).__name__}")
+    multicallable = channel.unary_stream(
+        path,
+        request_serializer=type(request).SerializeToString,
+        response_deserializer=sized_deserializer(PredictResponse.FromString),
+    )
+    started = time.monotonic()
+    call = multicallable(request, timeout=effective_timeout(timeout, deadline), metadata=metadata)
+    return MLStream(call, method_name(path), sink, started)
+
+
+async def fan_out(
+    channel: Any,
+    requests: Sequence[MLStreamRequest],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_buffered: int = DEFAULT_MAX_BUFFERED,
+    timeout: Optional[float] = None,
+    metadata: Optional[Sequence[Tuple[str, str]]] = None,
+    sink: Optional[MetricsSink] = None,
+    return_exceptions: bool = False,
+) -> AsyncIterator[Tuple[int, Union[StreamChunk, BaseException]]]:
+    """Yield (request position, chunk) pairs from many streams as chunks arrive.
+
+    At most concurrency streams are open at a time and at most max_buffered
+    chunks wait for the consumer. A failing stream cancels all others and its
+    error is raised, unless return_exceptions is True, in which case it is
+    yielded as (position, exception) and the rest carry on. Closing the
+    generator early (e.g. with contextlib.aclosing) cancels every open stream.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be positive, got {concurrency}")
+    if max_buffered < 1:
+        raise ValueError(f"max_buffered must be positive, got {max_buffered}")
+
+    queue: asyncio.Queue = asyncio.Queue(max_buffered)
+    pending = iter(enumerate(requests))
+
+    async def run() -> None:
+        for position, request in pending:
+            # A stream's timeout starts when it opens, not while it waits for a slot.
+            stream = open_ml_stream(channel, request, timeout, metadata=metadata, sink=sink)
+            try:
+                async for chunk in stream:
+                    await queue.put((position, chunk))
+            except Exception as e:
+                await queue.put((position if return_exceptions else _FAILED, e))
+                if not return_exceptions:
+                    return
+        await queue.put((_DONE, None))
+
+    workers = [asyncio.ensure_future(run()) for _ in range(min(concurrency, len(requests)))]
+    running = len(workers)
+    try:
+        while running:
+            position, item = await queue.get()
+            if position is _DONE:
+                running -= 1
+            elif position is _FAILED:
+                raise item
+            else:
+                yield position, item
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,469 @@
+"""
+Streaming transcoder from REST _bulk NDJSON to BulkRequest.
+
+The input is the body of a REST _bulk call: an action line such as
+{"index": {"_index": "logs", "_id": "1"}} followed, except for delete, by
+the document line. Every line is read from the source once, in order:
+
+* a path is memory-mapped, and lines are memoryview slices of the mapping;
+* a binary file object (a pipe, a gzip.open() stream) is read line by line
+  through its own buffer;
+* bytes are sliced in place.
+
+Memory use therefore does not depend on the size of the input, only on the
+size of one BulkRequest.
+
+Action lines are small and are parsed with json. Their metadata is encoded
+straight into the OperationContainer wire format: IndexOperation for index,
+WriteOperation for create, UpdateOperation for update, DeleteOperation for
+delete. The field numbers and enum values come from the generated
+descriptors. The document line of an index or create action is never
+parsed. Its bytes become BulkRequestBody.object unchanged, so the
+transcoder costs about the same whatever the documents contain. The line
+after an update action is parsed to find its keys, but the "doc" and
+"upsert" values are copied into UpdateAction as the bytes found in the
+input, not re-serialized.
+
+transcode_ndjson_bulk() yields serialized BulkRequest bytes for
+raw_bulk.bulk_raw_method(), assembled like raw_bulk.chunk_raw_bulk_requests().
+ndjson_bulk_requests() yields BulkRequest messages. Both keep every request
+within max_bytes and max_actions. A line that cannot be transcoded raises
+NdjsonBulkError, which carries the byte offset and line number of the
+line. When on_error is given, it receives the error instead, the action is
+dropped and reading resumes at the next line.
+"""
+
+import json
+import json.scanner
+import mmap
+import os
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Tuple, Union
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from opensearch.protobufs.schemas import (
+    BulkRequest,
+    BulkRequestBody,
+    DeleteOperation,
+    IndexOperation,
+    OperationContainer,
+    Script,
+    ScriptLanguage,
+    SourceConfig,
+    UpdateAction,
+    UpdateOperation,
+    WriteOperation,
+)
+
+from ._wire import WIRETYPE_LENGTH_DELIMITED, WIRETYPE_VARINT, encode_tag
+from .bulk import BULK_REQUEST_BODY_FIELD_NUMBER, DEFAULT_MAX_ACTIONS, DEFAULT_MAX_BYTES, chunk_bulk_requests
+from .object_map import dict_to_object_map
+from .raw_bulk import _chunk_prepared, _Encoder, _Prepared, _varint
+
+NdjsonSource = Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, Any]
+ErrorHandler = Callable[["NdjsonBulkError"], None]
+
+_BODY_TAG = encode_tag(BULK_REQUEST_BODY_FIELD_NUMBER, WIRETYPE_LENGTH_DELIMITED)
+_UPDATE_ACTION_TAG = encode_tag(BulkRequestBody.UPDATE_ACTION_FIELD_NUMBER, WIRETYPE_LENGTH_DELIMITED)
+_OBJECT_TAG = encode_tag(BulkRequestBody.OBJECT_FIELD_NUMBER, WIRETYPE_LENGTH_DELIMITED)
+_CONTAINER_TAG = encode_tag(BulkRequestBody.OPERATION_CONTAINER_FIELD_NUMBER, WIRETYPE_LENGTH_DELIMITED)
+
+# REST metadata keys whose proto field name differs.
+_RENAMED = {"_id": "x_id", "_index": "x_index", "_source": "x_source"}
+
+_VARINT_TYPES = (
+    FieldDescriptor.TYPE_INT32,
+    FieldDescriptor.TYPE_INT64,
+    FieldDescriptor.TYPE_BOOL,
+    FieldDescriptor.TYPE_ENUM,
+)
+
+_WHITESPACE = b" \t\r"
+
+
+class NdjsonBulkError(ValueError):
+    """A line of _bulk NDJSON that cannot be transcoded."""
+
+    def __init__(self, reason: str, offset: int, line: int):
+        super().__init__(f"{reason} (line {line}, byte offset {offset})")
+        self.reason = reason
+        self.offset = offset
+        self.line = line
+
+
+class _Field(NamedTuple):
+    number: int
+    tag: bytes
+    type: int
+    # Enum descriptor and the prefix of its value names, e.g. "VERSION_TYPE_".
+    enum: Any
+    enum_prefix: str
+
+
+def _fields(message_class: Any) -> Dict[str, _Field]:
+    """Map REST keys to the scalar fields of message_class."""
+    fields = {}
+    for field in message_class.DESCRIPTOR.fields:
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            continue
+        wire_type = WIRETYPE_VARINT if field.type in _VARINT_TYPES else WIRETYPE_LENGTH_DELIMITED
+        enum, prefix = field.enum_type, ""
+        if enum is not None:
+            prefix = enum.values_by_number[0].name[:-len("UNSPECIFIED")]
+        key = next((rest for rest, name in _RENAMED.items() if name == field.name), field.name)
+        fields[key] = _Field(field.number, encode_tag(field.number, wire_type), field.type, enum, prefix)
+    return fields
+
+
+# op_type -> (OperationContainer field tag, metadata fields, whether a document line follows)
+_ACTIONS = {
+    name: (encode_tag(OperationContainer.DESCRIPTOR.fields_by_name[name].number, WIRETYPE_LENGTH_DELIMITED),
+           _fields(message_class), name != "delete")
+    for name, message_class in (
+        ("index", IndexOperation),
+        ("create", WriteOperation),
+        ("update", UpdateOperation),
+        ("delete", DeleteOperation),
+    )
+}
+_UPDATE_FIELDS = _fields(UpdateAction)
+_UPDATE_RAW_KEYS = frozenset(("doc", "upsert"))
+_UPDATE_MESSAGE_FIELDS = {
+    "script": UpdateAction.DESCRIPTOR.fields_by_name["script"].number,
+    "_source": UpdateAction.DESCRIPTOR.fields_by_name["x_source"].number,
+}
+
+_BUILTIN_LANGUAGES = ScriptLanguage.DESCRIPTOR.fields_by_name["builtin"].enum_type
+
+_decoder = json.JSONDecoder()
+_scan_once = json.scanner.make_scanner(_decoder)
+
+
+def transcode_ndjson_bulk(
+    source: NdjsonSource,
+    template: Optional[BulkRequest] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_actions: int = DEFAULT_MAX_ACTIONS,
+    on_error: Optional[ErrorHandler] = None,
+    **fields: Any,
+) -> Iterator[bytes]:
+    """Yield serialized BulkRequest bytes for the actions of an NDJSON _bulk body.
+
+    source is a path, a binary file object or bytes. The top-level fields
+    come from template or BulkRequest(**fields), as in
+    raw_bulk.chunk_raw_bulk_requests(). A single action over max_bytes
+    raises ValueError.
+    """
+    # op_type only selects the layout of _Encoder.prepare(), which is not used here.
+    encoder = _Encoder(template, "index", fields)
+    yield from _chunk_prepared(encoder, _prepared(source, on_error), max_bytes, max_actions)
+
+
+def ndjson_bulk_requests(
+    source: NdjsonSource,
+    template: Optional[BulkRequest] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_actions: int = DEFAULT_MAX_ACTIONS,
+    on_error: Optional[ErrorHandler] = None,
+    **fields: Any,
+) -> Iterator[BulkRequest]:
+    """Yield BulkRequest messages for the actions of an NDJSON _bulk body.
+
+    Same input and limits as transcode_ndjson_bulk(), chunked by
+    bulk.chunk_bulk_requests().
+    """
+    return chunk_bulk_requests(ndjson_bulk_bodies(source, on_error), template, max_bytes, max_actions, **fields)
+
+
+def ndjson_bulk_bodies(source: NdjsonSource, on_error: Optional[ErrorHandler] = None) -> Iterator[BulkRequestBody]:
+    """Yield one BulkRequestBody per action of an NDJSON _bulk body."""
+    for metadata, document in _actions(source, on_error):
+        body = BulkRequestBody.FromString(metadata)
+        if document is not None:
+            body.object = bytes(document)
+        yield body
+
+
+def _prepared(source: NdjsonSource, on_error: Optional[ErrorHandler]) -> Iterator[_Prepared]:
+    """Yield raw_bulk entries: (size, header, document bytes)."""
+    for metadata, document in _actions(source, on_error):
+        if document is None:
+            header = _BODY_TAG + _varint(len(metadata)) + metadata
+            yield len(header), header, b""
+            continue
+        size = len(document)
+        body = metadata + _OBJECT_TAG + _varint(size)
+        header = _BODY_TAG + _varint(len(body) + size) + body
+        yield len(header) + size, header, document
+
+
+def _actions(source: NdjsonSource, on_error: Optional[ErrorHandler]) -> Iterator[Tuple[bytes, Any]]:
+    """Yield (encoded BulkRequestBody fields except object, document bytes or None) per action."""
+
+    def report(error: NdjsonBulkError) -> None:
+        if on_error is None:
+            raise error
+        on_error(error)
+
+    lines = _lines(source)
+    number = 0
+    for offset, line in lines:
+        number += 1
+        if not _strip(line):
+            continue
+        try:
+            op_type, metadata = _parse_action(line)
+        except ValueError as e:
+            report(NdjsonBulkError(str(e), offset, number))
+            continue
+        field, fields, has_document = _ACTIONS[op_type]
+        try:
+            operation = _encode_fields(fields, metadata, op_type)
+            error = None
+        except ValueError as e:
+            error = NdjsonBulkError(str(e), offset, number)
+
+        document = None
+        if has_document:
+            next_line = next(lines, None)
+            if next_line is None:
+                report(error or NdjsonBulkError(f"The {op_type} action has no document line", offset, number))
+                return
+            offset, document = next_line
+            number += 1
+        if error is not None:
+            report(error)
+            continue
+
+        container = field + _varint(len(operation)) + operation
+        encoded = _CONTAINER_TAG + _varint(len(container)) + container
+        if op_type == "update":
+            try:
+                update = _parse_update(document)
+            except ValueError as e:
+                report(NdjsonBulkError(str(e), offset, number))
+                continue
+            yield encoded + _UPDATE_ACTION_TAG + _varint(len(update)) + update, None
+        elif document is not None and _strip(document)[:1] != b"{":
+            report(NdjsonBulkError("The document line is not a JSON object", offset, number))
+        else:
+            yield encoded, document
+
+
+def _lines(source: NdjsonSource) -> Iterator[Tuple[int, Any]]:
+    """Yield (byte offset, line without its line ending) for every line of source."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield from _split(mapping)
+        finally:
+            try:
+                mapping.close()
+            except BufferError:
+                # A caller still holds a document view; the mapping closes with it.
+                pass
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield from _split(source if isinstance(source, (bytes, bytearray)) else bytes(source))
+    else:
+        offset = 0
+        for line in source:
+            yield offset, line.rstrip(b"\r\n")
+            offset += len(line)
+
+
+def _split(buffer: Any) -> Iterator[Tuple[int, memoryview]]:
+    """Split a bytes-like object with a find() method into memoryview lines."""
+    view = memoryview(buffer)
+    size = len(buffer)
+    start = 0
+    try:
+        while start < size:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                end = size
+            stop = end - 1 if end > start and view[end - 1] == 0x0D else end
+            yield start, view[start:stop]
+            start = end + 1
+    finally:
+        view.release()
+
+
+def _strip(line: Any) -> bytes:
+    """Return the start of line without leading whitespace, enough to test its first character."""
+    head = bytes(line[:16]).lstrip(_WHITESPACE)
+    return head if head or len(line) <= 16 else bytes(line).lstrip(_WHITESPACE)
+
+
+def _parse_action(line: Any) -> Tuple[str, Dict[str, Any]]:
+    """Return op_type and the metadata of an action line."""
+    try:
+        action = _decoder.decode(bytes(line).decode("utf-8"))
+    except ValueError:
+        raise ValueError("The action line is not valid JSON") from None
+    if not isinstance(action, dict) or len(action) != 1:
+        raise ValueError("The action line must be an object with exactly one key")
+    (op_type, metadata), = action.items()
+    if op_type not in _ACTIONS:
+        raise ValueError(f"Unknown action {op_type!r}; expected one of {sorted(_ACTIONS)}")
+    if not isinstance(metadata, dict):
+        raise ValueError(f"The {op_type} metadata must be an object")
+    return op_type, metadata
+
+
+def _encode_fields(fields: Dict[str, _Field], values: Dict[str, Any], context: str,
+                   extra: Optional[Dict[int, bytes]] = None) -> bytes:
+    """Encode values as the scalar fields in fields, plus pre-encoded extra fields, in field-number order."""
+    encoded = dict(extra) if extra else {}
+    for key, value in values.items():
+        field = fields.get(key)
+        if field is None:
+            raise ValueError(f"Unknown {context} parameter {key!r}")
+        encoded[field.number] = field.tag + _encode_scalar(field, key, value)
+    return b"".join(encoded[number] for number in sorted(encoded))
+
+
+def _encode_scalar(field: _Field, key: str, value: Any) -> bytes:
+    if field.type == FieldDescriptor.TYPE_STRING:
+        if not isinstance(value, (str, int)) or isinstance(value, bool):
+            raise ValueError(f"{key} must be a string, got {value!r}")
+        data = str(value).encode("utf-8")
+        return _varint(len(data)) + data
+    if field.type == FieldDescriptor.TYPE_BOOL:
+        if not isinstance(value, bool):
+            raise ValueError(f"{key} must be true or false, got {value!r}")
+        return b"\x01" if value else b"\x00"
+    if field.type == FieldDescriptor.TYPE_ENUM:
+        enum_value = field.enum.values_by_name.get(field.enum_prefix + str(value).upper())
+        if enum_value is None or enum_value.number == 0:
+            raise ValueError(f"Unsupported {key} {value!r}")
+        return _varint(enum_value.number)
+    if isinstance(value, str) and value.lstrip("-").isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{key} must be an integer, got {value!r}")
+    return _varint(value & 0xFFFFFFFFFFFFFFFF)
+
+
+def _parse_update(line: Any) -> bytes:
+    """Return the encoded UpdateAction of the line following an update action."""
+    data = bytes(line)
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ValueError("The update line is not valid UTF-8") from None
+    # Offsets found in text are offsets into data while the line is ASCII.
+    ascii_only = len(text) == len(data)
+    values = {}
+    extra = {}
+    for key, value, start, end in _object_members(text):
+        if key in _UPDATE_RAW_KEYS:
+            if not isinstance(value, dict):
+                raise ValueError(f"{key} must be an object")
+            raw = data[start:end] if ascii_only else text[start:end].encode("utf-8")
+            number = _UPDATE_FIELDS[key].number
+            extra[number] = encode_tag(number, WIRETYPE_LENGTH_DELIMITED) + _varint(len(raw)) + raw
+        elif key in _UPDATE_MESSAGE_FIELDS:
+            message = _script(value) if key == "script" else _source_config(value)
+            payload = message.SerializeToString()
+            number = _UPDATE_MESSAGE_FIELDS[key]
+            extra[number] = encode_tag(number, WIRETYPE_LENGTH_DELIMITED) + _varint(len(payload)) + payload
+        else:
+            values[key] = value
+    return _encode_fields(_UPDATE_FIELDS, values, "update", extra)
+
+
+def _object_members(text: str) -> Iterator[Tuple[str, Any, int, int]]:
+    """Yield (key, value, value start, value end) for the members of a JSON object."""
+    end = len(text)
+    position = _skip(text, 0)
+    if text[position:position + 1] != "{":
+        raise ValueError("The update line is not a JSON object")
+    position = _skip(text, position + 1)
+    if text[position:position + 1] == "}":
+        if _skip(text, position + 1) != end:
+            raise ValueError("The update line has trailing data")
+        return
+    while True:
+        try:
+            if text[position:position + 1] != '"':
+                raise StopIteration
+            key, position = _scan_once(text, position)
+            position = _skip(text, position)
+            if text[position:position + 1] != ":":
+                raise StopIteration
+            start = _skip(text, position + 1)
+            value, position = _scan_once(text, start)
+        except StopIteration:
+            raise ValueError("The update line is not valid JSON") from None
+        yield key, value, start, position
+        position = _skip(text, position)
+        separator = text[position:position + 1]
+        position = _skip(text, position + 1)
+        if separator == "}":
+            if position != end:
+                raise ValueError("The update line has trailing data")
+            return
+        if separator != ",":
+            raise ValueError("The update line is not valid JSON")
+
+
+def _skip(text: str, position: int) -> int:
+    while position < len(text) and text[position] in " \t\r\n":
+        position += 1
+    return position
+
+
+def _script(value: Any) -> Script:
+    """Build a Script from the REST forms: a source string, {"source": ...} or {"id": ...}."""
+    script = Script()
+    if isinstance(value, str):
+        script.inline.source = value
+        return script
+    if not isinstance(value, dict):
+        raise ValueError(f"script must be a string or an object, got {value!r}")
+    value = dict(value)
+    params = value.pop("params", None)
+    if "id" in value:
+        target = script.stored
+        target.id = str(value.pop("id"))
+    elif "source" in value:
+        target = script.inline
+        target.source = str(value.pop("source"))
+        lang = value.pop("lang", None)
+        if lang is not None:
+            builtin = _BUILTIN_LANGUAGES.values_by_name.get(f"BUILTIN_SCRIPT_LANGUAGE_{str(lang).upper()}")
+            if builtin is not None:
+                target.lang.builtin = builtin.number
+            else:
+                target.lang.custom = str(lang)
+        for option, option_value in value.pop("options", {}).items():
+            target.options[option] = str(option_value)
+    else:
+        raise ValueError("script must have a source or an id")
+    if value:
+        raise ValueError(f"Unknown script parameters {sorted(value)}")
+    if params is not None:
+        if not isinstance(params, dict):
+            raise ValueError("script params must be an object")
+        dict_to_object_map(params, target.params)
+    return script
+
+
+def _source_config(value: Any) -> SourceConfig:
+    """Build a SourceConfig from true/false, a field pattern, a list of them or {"includes", "excludes"}."""
+    config = SourceConfig()
+    if isinstance(value, bool):
+        config.fetch = value
+    elif isinstance(value, (str, list)):
+        config.filter.includes.extend([value] if isinstance(value, str) else value)
+    elif isinstance(value, dict) and set(value) <= {"includes", "excludes"}:
+        config.filter.SetInParent()
+        for key in ("includes", "excludes"):
+            patterns = value.get(key, [])
+            getattr(config.filter, key).extend([patterns] if isinstance(patterns, str) else patterns)
+    else:
+        raise ValueError(f"Unsupported _source {value!r}")
+    return config
@@ -0,0 +1,233 @@
+"""
+Conversion between ObjectMap messages and plain Python values.
+
+ObjectMap.Value is a oneof over null, int32, int64, float, double, string,
+bool, nested ObjectMap and ListValue. Both directions walk the tree with an
+explicit work stack instead of recursion, so deeply nested documents neither
+hit the recursion limit nor pay for a Python call per container.
+
+Encoding rules for Python values:
+
+* None -> null_value
+* bool -> bool (checked before int, since bool is an int subclass)
+* int -> int32 if it fits in 32 bits, else int64; larger values raise ValueError
+* float -> double, or float when compact_floats=True and the value is exactly
+  representable as a float32
+* str -> string
+* Mapping -> object_map, list/tuple -> list_value; mapping keys must be str
+
+Decoding is the inverse. float (float32) values are returned as the shortest
+decimal that round-trips through float32, as google.protobuf.json_format does.
+"""
+
+import json
+import struct
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from opensearch.protobufs.schemas import NULL_VALUE_NULL, ObjectMap
+
+INT32_MIN, INT32_MAX = -(2 ** 31), 2 ** 31 - 1
+INT64_MIN, INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+_float32 = struct.Struct("<f")
+
+# Oneof members returned as-is when decoding.
+_SCALAR_KINDS = frozenset(("string", "int64", "int32", "double", "bool"))
+
+
+def object_map_to_dict(message: ObjectMap) -> Dict[str, Any]:
+    """Convert an ObjectMap into a dict of plain Python values."""
+    root: Dict[str, Any] = {}
+    _decode_into(message, root, [])
+    return root
+
+
+def object_maps_to_dicts(messages: Iterable[ObjectMap]) -> List[Dict[str, Any]]:
+    """Convert every ObjectMap in messages (e.g. a repeated field) to a dict."""
+    stack: List = []
+    results = []
+    for message in messages:
+        root: Dict[str, Any] = {}
+        _decode_into(message, root, stack)
+        results.append(root)
+    return results
+
+
+def hits_object_maps_to_dicts(hits: Iterable[Any], field: str = "fields") -> List[Optional[Dict[str, Any]]]:
+    """Decode the ObjectMap field of every hit, e.g. fields or meta_fields.
+
+    Hits that do not have the field set yield None.
+    """
+    stack: List = []
+    results: List[Optional[Dict[str, Any]]] = []
+    for hit in hits:
+        if not hit.HasField(field):
+            results.append(None)
+            continue
+        root: Dict[str, Any] = {}
+        _decode_into(getattr(hit, field), root, stack)
+        results.append(root)
+    return results
+
+
+def value_to_python(value: ObjectMap.Value) -> Any:
+    """Convert a single ObjectMap.Value into a plain Python value."""
+    stack: List = []
+    result = _decode_value(value, stack)
+    _drain_decode(stack)
+    return result
+
+
+def dict_to_object_map(data: Mapping[str, Any], message: Optional[ObjectMap] = None,
+                       compact_floats: bool = False) -> ObjectMap:
+    """Convert a mapping of plain Python values into an ObjectMap.
+
+    When message is given it is cleared and filled in place, which allows
+    populating a sub-message such as KnnQuery.method_parameters directly.
+    """
+    if message is None:
+        message = ObjectMap()
+    else:
+        message.Clear()
+    stack = [(data, message.fields, True)]
+    _drain_encode(stack, compact_floats)
+    return message
+
+
+def dicts_to_object_maps(items: Iterable[Mapping[str, Any]], repeated: Any,
+                         compact_floats: bool = False) -> None:
+    """Append one ObjectMap per mapping in items to a repeated ObjectMap field."""
+    stack: List = []
+    for data in items:
+        stack.append((data, repeated.add().fields, True))
+        _drain_encode(stack, compact_floats)
+
+
+def python_to_value(obj: Any, value: Optional[ObjectMap.Value] = None,
+                    compact_floats: bool = False) -> ObjectMap.Value:
+    """Convert a plain Python value into an ObjectMap.Value."""
+    if value is None:
+        value = ObjectMap.Value()
+    else:
+        value.Clear()
+    stack: List = []
+    _encode_value(obj, value, stack, compact_floats)
+    _drain_encode(stack, compact_floats)
+    return value
+
+
+def object_map_to_json(message: ObjectMap) -> bytes:
+    """Serialize an ObjectMap as compact UTF-8 JSON."""
+    return json.dumps(object_map_to_dict(message), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_to_object_map(data: bytes, message: Optional[ObjectMap] = None,
+                       compact_floats: bool = False) -> ObjectMap:
+    """Parse a JSON object into an ObjectMap."""
+    parsed = json.loads(data)
+    if not isinstance(parsed, dict):
+        raise ValueError(f"Expected a JSON object, got {type(parsed).__name__}")
+    return dict_to_object_map(parsed, message, compact_floats)
+
+
+def _decode_into(message: ObjectMap, root: Dict[str, Any], stack: List) -> None:
+    """Decode message into root using stack as scratch space."""
+    stack.append((message.fields.items(), root, True))
+    _drain_decode(stack)
+
+
+def _drain_decode(stack: List) -> None:
+    """Process pending (source items, target container, is_map) decode tasks."""
+    while stack:
+        items, target, is_map = stack.pop()
+        if is_map:
+            for key, value in items:
+                target[key] = _decode_value(value, stack)
+        else:
+            append = target.append
+            for value in items:
+                append(_decode_value(value, stack))
+
+
+def _decode_value(value: ObjectMap.Value, stack: List) -> Any:
+    """Decode one value; containers are returned empty and queued on stack."""
+    kind = value.WhichOneof("value")
+    if kind in _SCALAR_KINDS:
+        return getattr(value, kind)
+    if kind == "object_map":
+        nested: Dict[str, Any] = {}
+        stack.append((value.object_map.fields.items(), nested, True))
+        return nested
+    if kind == "list_value":
+        items: List[Any] = []
+        stack.append((value.list_value.value, items, False))
+        return items
+    if kind == "float":
+        return _shortest_float32(value.float)
+    # null_value or an unset oneof
+    return None
+
+
+def _drain_encode(stack: List, compact_floats: bool) -> None:
+    """Process pending (source, target container, is_map) encode tasks."""
+    while stack:
+        source, target, is_map = stack.pop()
+        if is_map:
+            for key, item in source.items():
+                if not isinstance(key, str):
+                    raise TypeError(f"ObjectMap keys must be str, got {type(key).__name__}")
+                _encode_value(item, target[key], stack, compact_floats)
+        else:
+            add = target.add
+            for item in source:
+                _encode_value(item, add(), stack, compact_floats)
+
+
+def _encode_value(obj: Any, value: ObjectMap.Value, stack: List, compact_floats: bool) -> None:
+    """Encode one value; containers are marked set and queued on stack."""
+    if isinstance(obj, str):
+        value.string = obj
+    elif isinstance(obj, bool):
+        value.bool = obj
+    elif isinstance(obj, int):
+        if INT32_MIN <= obj <= INT32_MAX:
+            value.int32 = obj
+        elif INT64_MIN <= obj <= INT64_MAX:
+            value.int64 = obj
+        else:
+            raise ValueError(f"Integer {obj} does not fit in int64")
+    elif isinstance(obj, float):
+        if compact_floats and _is_float32(obj):
+            value.float = obj
+        else:
+            value.double = obj
+    elif obj is None:
+        value.null_value = NULL_VALUE_NULL
+    elif isinstance(obj, Mapping):
+        value.object_map.SetInParent()
+        stack.append((obj, value.object_map.fields, True))
+    elif isinstance(obj, (list, tuple)):
+        value.list_value.SetInParent()
+        stack.append((obj, value.list_value.value, False))
+    else:
+        raise TypeError(f"Cannot store {type(obj).__name__} in an ObjectMap")
+
+
+def _is_float32(number: float) -> bool:
+    """Return True if number survives a float32 round trip unchanged."""
+    try:
+        return _float32.unpack(_float32.pack(number))[0] == number
+    except OverflowError:
+        return False
+
+
+def _shortest_float32(number: float) -> float:
+    """Return the shortest decimal that round-trips to the same float32."""
+    if number != number or number in (float("inf"), float("-inf")):
+        return number
+    target = _float32.pack(number)
+    for precision in range(6, 10):
+        candidate = float(f"{number:.{precision}g}")
+        if _float32.pack(candidate) == target:
+            return candidate
+    return number
@@ -0,0 +1,248 @@
+"""
+Multi-process BulkRequest serialization with a single gRPC sender.
+
+Encoding documents into BulkRequest bytes holds the GIL, so one process
+building and serializing requests cannot keep more than one core busy while
+its send path waits. ParallelBulkEncoder moves that work to a pool of worker
+processes. Each worker receives one batch of raw documents, encodes it with
+the helpers.raw_bulk encoder, and writes the serialized BulkRequest into a
+slot of a shared memory block. Only the slot number and length travel back
+through the result pipe, never a pickled message. The parent copies the slot
+into the bytes object gRPC sends (gRPC accepts nothing else) and frees the
+slot for the next batch.
+
+encode() yields the batches in submission order, whatever order the workers
+finish in, and at most one batch per slot is in progress at a time, so a
+slow sender holds the workers back instead of letting encoded requests pile
+up. parallel_bulk() sends the encoded requests from the calling thread
+through a raw DocumentService.Bulk multicallable, so nothing is decoded
+again, and yields one BatchResult per batch, in order, carrying the batch's
+position and its BulkResponse or RpcError.
+
+Documents are mappings (serialized to JSON in the worker, with _id, _index,
+_routing and _pipeline moved onto the operation as helpers.bulk does), JSON
+source bytes, or raw_bulk.RawAction tuples. The requests are byte-identical
+to what helpers.bulk.chunk_bulk_requests() would build from the same batch.
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Deque, Iterable, Iterator, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from opensearch.protobufs.schemas import BulkRequest, BulkResponse
+
+from .bulk import DEFAULT_MAX_BYTES
+from .raw_bulk import RawAction, _Encoder, bulk_raw_method
+
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# RawAction attribute for each of helpers.bulk.METADATA_KEYS.
+_RAW_METADATA = {"_id": "id", "_index": "index", "_routing": "routing", "_pipeline": "pipeline"}
+
+Document = Any  # a Mapping, JSON source bytes or a RawAction
+
+
+class EncodedBatch(NamedTuple):
+    """One batch serialized as a BulkRequest."""
+
+    position: int
+    documents: int
+    data: bytes
+
+
+class BatchResult(NamedTuple):
+    """The outcome of sending one batch; exactly one of response and error is set."""
+
+    position: int
+    documents: int
+    request_bytes: int
+    response: Optional[BulkResponse]
+    error: Optional[BaseException]
+
+
+# Worker process state, set up once by _initialize_worker.
+_worker_encoder: Optional[_Encoder] = None
+_worker_memory: Optional[SharedMemory] = None
+_worker_slot_bytes = 0
+
+
+def _initialize_worker(template: bytes, op_type: str, memory_name: str, slot_bytes: int) -> None:
+    global _worker_encoder, _worker_memory, _worker_slot_bytes
+    _worker_encoder = _Encoder(BulkRequest.FromString(template), op_type, {})
+    # Workers share the parent's resource tracker, so attaching registers
+    # nothing new and the parent's unlink() stays the only cleanup.
+    _worker_memory = SharedMemory(memory_name)
+    _worker_slot_bytes = slot_bytes
+
+
+def _raw_action(document: Document) -> Any:
+    if isinstance(document, Mapping):
+        source = dict(document)
+        metadata = {attribute: str(source.pop(key)) for key, attribute in _RAW_METADATA.items() if key in source}
+        return RawAction(json.dumps(source, separators=(",", ":")).encode("utf-8"), **metadata)
+    if isinstance(document, (bytes, bytearray, memoryview, RawAction)):
+        return document
+    raise TypeError(f"Unsupported document type: {type(document).__name__}")
+
+
+def _encode_batch(documents: Sequence[Document], slot: int) -> Tuple[int, Optional[bytes]]:
+    """Encode one batch into slot; return (length, None), or (length, data) if it does not fit."""
+    encoder = _worker_encoder
+    prepared = [encoder.prepare(_raw_action(document)) for document in documents]
+    data = encoder.write(prepared, encoder.base_size + sum(entry[0] for entry in prepared))
+    if len(data) > _worker_slot_bytes:
+        return len(data), data
+    offset = slot * _worker_slot_bytes
+    _worker_memory.buf[offset:offset + len(data)] = data
+    return len(data), None
+
+
+class ParallelBulkEncoder:
+    """Pool of worker processes that serialize document batches into BulkRequest bytes.
+
+    Every request carries the top-level fields of template (its bodies are
+    ignored) or of BulkRequest(**fields). slot_bytes should be at least the
+    largest request expected; a larger request still works but comes back
+    through the pipe. slots bounds the batches in progress and defaults to
+    twice the number of processes. Use it as a context manager, or call
+    close(), to stop the workers and free the shared memory.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        template: Optional[BulkRequest] = None,
+        op_type: str = "index",
+        slot_bytes: int = DEFAULT_MAX_BYTES,
+        slots: Optional[int] = None,
+        start_method: str = "spawn",
+        **fields: Any,
+    ):
+        if processes is None:
+            # Leave a core for the sender.
+            processes = max(1, (os.cpu_count() or 2) - 1)
+        if processes < 1:
+            raise ValueError(f"processes must be positive, got {processes}")
+        if slot_bytes < 1:
+            raise ValueError(f"slot_bytes must be positive, got {slot_bytes}")
+        slots = 2 * processes if slots is None else slots
+        if slots < 1:
+            raise ValueError(f"slots must be positive, got {slots}")
+        # Validates the template and op_type before any process starts.
+        _Encoder(template, op_type, fields)
+        template_bytes = (template if template is not None else BulkRequest(**fields)).SerializeToString()
+
+        self.processes = processes
+        self.slot_bytes = slot_bytes
+        self.slots = slots
+        self._memory = SharedMemory(create=True, size=slot_bytes * slots)
+        try:
+            # spawn by default: forking a process that already runs gRPC threads is unsafe.
+            self._executor = ProcessPoolExecutor(
+                processes, mp_context=get_context(start_method), initializer=_initialize_worker,
+                initargs=(template_bytes, op_type, self._memory.name, slot_bytes))
+        except BaseException:
+            self._memory.close()
+            self._memory.unlink()
+            raise
+        self._closed = False
+
+    def encode(self, batches: Iterable[Sequence[Document]]) -> Iterator[EncodedBatch]:
+        """Yield each batch as an EncodedBatch, in the order given.
+
+        Batches are read ahead only while a slot is free. Closing the
+        generator early waits for the batches already submitted.
+        """
+        if self._closed:
+            raise ValueError("ParallelBulkEncoder is closed")
+        free = list(range(self.slots - 1, -1, -1))
+        pending: Deque[Tuple[int, int, int, Future]] = deque()
+        source = enumerate(batches)
+        exhausted = False
+        try:
+            while True:
+                while free and not exhausted:
+                    item = next(source, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    position, documents = item
+                    if not isinstance(documents, (list, tuple)):
+                        documents = list(documents)
+                    slot = free.pop()
+                    pending.append((position, len(documents), slot,
+                                    self._executor.submit(_encode_batch, documents, slot)))
+                if not pending:
+                    return
+                position, count, slot, future = pending.popleft()
+                try:
+                    length, data = future.result()
+                    if data is None:
+                        offset = slot * self.slot_bytes
+                        data = bytes(self._memory.buf[offset:offset + length])
+                finally:
+                    free.append(slot)
+                yield EncodedBatch(position, count, data)
+        finally:
+            for _, _, _, future in pending:
+                future.cancel()
+            for _, _, _, future in pending:
+                if not future.cancelled():
+                    future.exception()
+
+    def close(self) -> None:
+        """Stop the workers and release the shared memory."""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self) -> "ParallelBulkEncoder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def parallel_bulk(
+    channel: Any,
+    batches: Iterable[Sequence[Document]],
+    encoder: ParallelBulkEncoder,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    timeout: Optional[float] = None,
+    metadata: Optional[Sequence[Tuple[str, str]]] = None,
+) -> Iterator[BatchResult]:
+    """Encode batches on encoder's workers and send them on a sync channel.
+
+    At most max_in_flight Bulk calls are outstanding. Results are yielded in
+    batch order; a failed call is reported in BatchResult.error rather than
+    raised, so every batch can be correlated with its outcome.
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be positive, got {max_in_flight}")
+    bulk = bulk_raw_method(channel)
+    in_flight: Deque[Tuple[EncodedBatch, Any]] = deque()
+
+    def settle() -> BatchResult:
+        batch, call = in_flight.popleft()
+        try:
+            return BatchResult(batch.position, batch.documents, len(batch.data), call.result(), None)
+        except Exception as e:
+            return BatchResult(batch.position, batch.documents, len(batch.data), None, e)
+
+    try:
+        for batch in encoder.encode(batches):
+            if len(in_flight) >= max_in_flight:
+                yield settle()
+            in_flight.append((batch, bulk.future(batch.data, timeout=timeout, metadata=metadata)))
+        while in_flight:
+            yield settle()
+    finally:
+        for _, call in in_flight:
+            call.cancel()
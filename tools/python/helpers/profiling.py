@@ -0,0 +1,277 @@
+"""
+Hotspot analysis of search profiles collected from many responses and shards.
+
+With profile=true every shard returns a tree of QueryProfile, Collector,
+AggregationProfile and FetchProfile messages. ProfileAnalyzer folds any
+number of them into totals per node, keyed by category and name:
+
+- "query": the Lucene query type (TermQuery, BooleanQuery, ...),
+- "collector": the collector name,
+- "aggregation": the aggregator type,
+- "fetch": the fetch phase or sub-phase type,
+- "rewrite": the query rewrite of each search.
+
+Every node has a total time (its own time_in_nanos, children included) and a
+self time (total minus its children), so nesting is not counted twice when
+hotspots are ranked by self time. Breakdown timings are summed per name, and
+the numeric and string fields of AggregationProfileDebug are summed and
+counted, so e.g. the collection strategies chosen by a terms aggregator show
+up next to its cost.
+
+Shard time is the sum of the top-level query trees, rewrite times,
+top-level aggregations and fetch of that shard. Shards are identified by
+"[index][shard]" from the "[node-ID][index-name][shard-ID]" profile id, so a
+replica on another node counts as the same shard. shard_skew() compares the
+shards of each index.
+
+folded_stacks() writes the trees in the folded format read by flamegraph.pl,
+speedscope and inferno: one "frame;frame;frame self_nanos" line per stack.
+"""
+
+import re
+import statistics
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from opensearch.protobufs.schemas import (
+    AggregationProfile,
+    Collector,
+    FetchProfile,
+    Profile,
+    QueryProfile,
+    SearchResponse,
+    ShardProfile,
+)
+
+CATEGORY_QUERY = "query"
+CATEGORY_COLLECTOR = "collector"
+CATEGORY_AGGREGATION = "aggregation"
+CATEGORY_FETCH = "fetch"
+CATEGORY_REWRITE = "rewrite"
+
+CATEGORIES = (CATEGORY_QUERY, CATEGORY_COLLECTOR, CATEGORY_AGGREGATION, CATEGORY_FETCH, CATEGORY_REWRITE)
+
+_SHARD_ID = re.compile(r"^\[([^\]]*)\]\[([^\]]*)\]\[([^\]]*)\]$")
+_SHARD_KEY = re.compile(r"^\[([^\]]*)\]\[[^\]]*\]$")
+
+
+class Hotspot(NamedTuple):
+    """Totals for one (category, name) across everything analyzed."""
+
+    category: str
+    name: str
+    count: int
+    total_ns: int
+    self_ns: int
+    max_ns: int
+    breakdown: Dict[str, int]
+    debug: Dict[str, Any]
+
+
+class ShardSkew(NamedTuple):
+    """How unevenly the time of one index is spread over its shards."""
+
+    index: str
+    shards: int
+    mean_ns: float
+    median_ns: float
+    max_ns: int
+    slowest_shard: str
+    skew: float  # max_ns / mean_ns; 1.0 is perfectly balanced
+
+
+class _Totals:
+    """Mutable accumulator behind one Hotspot."""
+
+    __slots__ = ("count", "total_ns", "self_ns", "max_ns", "breakdown", "debug")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.self_ns = 0
+        self.max_ns = 0
+        self.breakdown: Counter = Counter()
+        self.debug: Dict[str, Any] = {}
+
+    def add(self, total_ns: int, self_ns: int) -> None:
+        self.count += 1
+        self.total_ns += total_ns
+        self.self_ns += self_ns
+        self.max_ns = max(self.max_ns, total_ns)
+
+
+class ProfileAnalyzer:
+    """Accumulates profile trees and reports hotspots, shard skew and stacks."""
+
+    def __init__(self):
+        self._totals: Dict[tuple, _Totals] = {}
+        self._shards: Counter = Counter()
+        self._stacks: Counter = Counter()
+        self.responses = 0
+
+    def add(self, source: Union[SearchResponse, Profile, ShardProfile, Iterable[Any]]) -> "ProfileAnalyzer":
+        """Add a SearchResponse, Profile, ShardProfile or an iterable of them.
+
+        Responses without a profile are counted but contribute nothing.
+        Returns self, so analyzers can be built in one expression.
+        """
+        if isinstance(source, SearchResponse):
+            self.responses += 1
+            if source.HasField("profile"):
+                self.add(source.profile)
+        elif isinstance(source, Profile):
+            for shard in source.shards:
+                self._add_shard(shard)
+        elif isinstance(source, ShardProfile):
+            self._add_shard(source)
+        else:
+            for item in source:
+                self.add(item)
+        return self
+
+    def hotspots(self, category: Optional[str] = None, top: Optional[int] = None,
+                 by: str = "self_ns") -> List[Hotspot]:
+        """Return hotspots, largest first by the given Hotspot field.
+
+        category restricts the result to one of CATEGORIES; top limits its
+        length.
+        """
+        if category is not None and category not in CATEGORIES:
+            raise ValueError(f"Unknown category {category!r}; expected one of {CATEGORIES}")
+        if by not in ("count", "total_ns", "self_ns", "max_ns"):
+            raise ValueError(f"Cannot rank hotspots by {by!r}")
+        spots = [
+            Hotspot(key[0], key[1], totals.count, totals.total_ns, totals.self_ns, totals.max_ns,
+                    dict(totals.breakdown), _debug_dict(totals.debug))
+            for key, totals in self._totals.items()
+            if category is None or key[0] == category
+        ]
+        spots.sort(key=lambda spot: (-getattr(spot, by), spot.category, spot.name))
+        return spots if top is None else spots[:top]
+
+    def shard_times(self) -> Dict[str, int]:
+        """Return the total nanoseconds spent per "[index][shard]"."""
+        return dict(self._shards)
+
+    def shard_skew(self) -> List[ShardSkew]:
+        """Return one ShardSkew per index, most skewed first."""
+        by_index: Dict[str, Dict[str, int]] = {}
+        for shard, nanos in self._shards.items():
+            by_index.setdefault(_index_of(shard), {})[shard] = nanos
+        skews = []
+        for index, shards in by_index.items():
+            times = list(shards.values())
+            mean = statistics.fmean(times)
+            slowest = max(shards, key=lambda shard: (shards[shard], shard))
+            skew = shards[slowest] / mean if mean else 1.0
+            skews.append(ShardSkew(index, len(shards), mean, statistics.median(times), shards[slowest], slowest,
+                                   skew))
+        skews.sort(key=lambda entry: (-entry.skew, entry.index))
+        return skews
+
+    def folded_stacks(self) -> List[str]:
+        """Return "frame;frame self_nanos" lines, sorted, with self time > 0.
+
+        Stacks start with the category, then the query/collector/aggregation
+        path; aggregations are labelled "name (type)". Write the lines to a
+        file and pass it to flamegraph.pl or speedscope.
+        """
+        return [f"{stack} {nanos}" for stack, nanos in sorted(self._stacks.items()) if nanos > 0]
+
+    def _add_shard(self, shard: ShardProfile) -> None:
+        key = _shard_key(shard.id)
+        nanos = 0
+        for search in shard.searches:
+            for query in search.query:
+                nanos += self._add_query(query, (CATEGORY_QUERY,))
+            for collector in search.collector:
+                self._add_collector(collector, (CATEGORY_COLLECTOR,))
+            self._record((CATEGORY_REWRITE, "rewrite"), search.rewrite_time, search.rewrite_time,
+                         (CATEGORY_REWRITE,))
+            nanos += search.rewrite_time
+        for aggregation in shard.aggregations:
+            nanos += self._add_aggregation(aggregation, (CATEGORY_AGGREGATION,))
+        if shard.HasField("fetch"):
+            nanos += self._add_fetch(shard.fetch, (CATEGORY_FETCH,))
+        self._shards[key] += nanos
+
+    def _add_query(self, query: QueryProfile, stack: tuple) -> int:
+        stack = stack + (query.type,)
+        children = sum([self._add_query(child, stack) for child in query.children])
+        totals = self._record((CATEGORY_QUERY, query.type), query.time_in_nanos,
+                              query.time_in_nanos - children, stack)
+        _add_breakdown(totals.breakdown, query.breakdown)
+        return query.time_in_nanos
+
+    def _add_collector(self, collector: Collector, stack: tuple) -> int:
+        stack = stack + (collector.name,)
+        children = sum([self._add_collector(child, stack) for child in collector.children])
+        self._record((CATEGORY_COLLECTOR, collector.name), collector.time_in_nanos,
+                     collector.time_in_nanos - children, stack)
+        return collector.time_in_nanos
+
+    def _add_aggregation(self, aggregation: AggregationProfile, stack: tuple) -> int:
+        stack = stack + (f"{aggregation.description} ({aggregation.type})",)
+        children = sum([self._add_aggregation(child, stack) for child in aggregation.children])
+        totals = self._record((CATEGORY_AGGREGATION, aggregation.type), aggregation.time_in_nanos,
+                              aggregation.time_in_nanos - children, stack)
+        _add_breakdown(totals.breakdown, aggregation.breakdown)
+        if aggregation.HasField("debug"):
+            _add_debug(totals.debug, aggregation.debug, "")
+        return aggregation.time_in_nanos
+
+    def _add_fetch(self, fetch: FetchProfile, stack: tuple) -> int:
+        stack = stack + (fetch.type,)
+        children = sum([self._add_fetch(child, stack) for child in fetch.children])
+        totals = self._record((CATEGORY_FETCH, fetch.type), fetch.time_in_nanos,
+                              fetch.time_in_nanos - children, stack)
+        _add_breakdown(totals.breakdown, fetch.breakdown)
+        return fetch.time_in_nanos
+
+    def _record(self, key: tuple, total_ns: int, self_ns: int, stack: tuple) -> _Totals:
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = self._totals[key] = _Totals()
+        # Children can be timed slightly over their parent; never report negative self time.
+        self_ns = max(0, self_ns)
+        totals.add(total_ns, self_ns)
+        self._stacks[";".join([frame.replace(";", ",") for frame in stack])] += self_ns
+        return totals
+
+
+def _add_breakdown(breakdown: Counter, message: Any) -> None:
+    """Sum every field of a breakdown message, timings and *_count invocation counts alike."""
+    for field, value in message.ListFields():
+        breakdown[field.name] += value
+
+
+def _add_debug(debug: Dict[str, Any], message: Any, prefix: str) -> None:
+    """Sum numeric debug fields and count string values, recursing into sub-messages."""
+    for field, value in message.ListFields():
+        name = prefix + field.name
+        if isinstance(value, bool) or isinstance(value, str):
+            debug.setdefault(name, Counter())[str(value)] += 1
+        elif isinstance(value, int):
+            debug[name] = debug.get(name, 0) + value
+        elif hasattr(value, "ListFields"):
+            _add_debug(debug, value, name + ".")
+        else:
+            for item in value:
+                if isinstance(item, str):
+                    debug.setdefault(name, Counter())[item] += 1
+                else:
+                    _add_debug(debug, item, name + ".")
+
+
+def _debug_dict(debug: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: dict(value) if isinstance(value, Counter) else value for name, value in debug.items()}
+
+
+def _shard_key(shard_id: str) -> str:
+    match = _SHARD_ID.match(shard_id)
+    return f"[{match.group(2)}][{match.group(3)}]" if match else shard_id
+
+
+def _index_of(shard_key: str) -> str:
+    match = _SHARD_KEY.match(shard_key)
+    return match.group(1) if match else ""
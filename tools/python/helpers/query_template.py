@@ -0,0 +1,427 @@
+"""
+Compiled, parameterized SearchRequestBody templates.
+
+A template is a query DSL dict in the protobuf JSON mapping of
+SearchRequestBody (what google.protobuf.json_format.ParseDict accepts,
+e.g. {"query": {"term": {"field": "color", "value": {"string": "{{color}}"}}}})
+in which some values are placeholders: a "{{name}}" string or a Param.
+compile_template() parses the dict once into a prototype message, without
+the placeholder values, and records the field path of every placeholder.
+
+Binding then never walks the dict again:
+
+- bind(**values) copies the prototype (one C-level CopyFrom on the upb and
+  cpp backends) and sets only the placeholder leaves;
+- bind_bytes(**values) returns the serialized body. The serialized bytes of
+  every field that holds no placeholder are computed at compile time, and
+  only the messages on the path down to a placeholder are re-encoded, so the
+  cost grows with the number of parameters instead of the size of the query.
+  The bytes parse to the message bind() returns; use them with a raw
+  multicallable or as search_request_body of a serialized SearchRequest.
+
+A placeholder may stand for a scalar (enum names are accepted), a whole
+message (given as a message or a JSON-mapping dict), one message of a list,
+a map entry value, or a whole repeated field. Repeated float and double fields, such as a kNN query
+vector, are filled in one packed merge instead of per-element appends on
+the upb and cpp backends; float32/float64 buffers such as NumPy rows are
+used as they are. A placeholder cannot be one element of
+a scalar list, since binding would change the list's order.
+
+TemplateCache keeps compiled templates in a thread-safe LRU keyed on the
+canonical JSON of the template dict, so services can pass the same dict on
+every call and compile it only once.
+"""
+
+import array
+import json
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Tuple, Type
+
+from google.protobuf import json_format
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.internal import api_implementation
+from google.protobuf.message import Message
+
+from opensearch.protobufs.schemas import SearchRequestBody
+
+from ._wire import WIRETYPE_LENGTH_DELIMITED, encode_tag, encode_varint
+
+DEFAULT_MAX_TEMPLATES = 256
+
+PLACEHOLDER_PATTERN = re.compile(r"^\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}$")
+
+# Buffer formats packed straight into repeated float/double fields.
+_PACKED_FORMATS = {FieldDescriptor.TYPE_FLOAT: ("f", 4), FieldDescriptor.TYPE_DOUBLE: ("d", 8)}
+# The pure-Python backend parses packed records element by element, so extend() is faster there.
+_PACKED_MERGE = api_implementation.Type() != "python"
+
+
+class Param(NamedTuple):
+    """A placeholder, for templates built in code rather than loaded from JSON."""
+
+    name: str
+
+
+# One step of a placeholder path: the field, and the map key or list index
+# within it (None for singular fields).
+_Step = Tuple[FieldDescriptor, Any]
+_Leaf = Tuple[Tuple[_Step, ...], str]
+
+
+def _placeholder_name(value: Any) -> Optional[str]:
+    if isinstance(value, Param):
+        return value.name
+    if isinstance(value, str):
+        match = PLACEHOLDER_PATTERN.match(value)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _is_map(field: FieldDescriptor) -> bool:
+    return field.message_type is not None and field.message_type.GetOptions().map_entry
+
+
+def _is_repeated(field: FieldDescriptor) -> bool:
+    # Newer protobuf releases replace FieldDescriptor.label with is_repeated.
+    is_repeated = getattr(field, "is_repeated", None)
+    return field.label == FieldDescriptor.LABEL_REPEATED if is_repeated is None else is_repeated
+
+
+def _field(descriptor: Descriptor, key: str) -> FieldDescriptor:
+    field = descriptor.fields_by_name.get(key)
+    if field is None:
+        field = next((candidate for candidate in descriptor.fields if candidate.json_name == key), None)
+    if field is None:
+        raise ValueError(f"{descriptor.full_name} has no field {key!r}")
+    return field
+
+
+def _strip(value: Mapping[str, Any], descriptor: Descriptor, path: Tuple[_Step, ...],
+           leaves: List[_Leaf]) -> Dict[str, Any]:
+    """Return value without its placeholders, appending each placeholder's path to leaves."""
+    result = {}
+    for key, item in value.items():
+        field = _field(descriptor, key)
+        name = _placeholder_name(item)
+        if name is not None:
+            leaves.append((path + ((field, None),), name))
+        elif _is_map(field):
+            value_field = field.message_type.fields_by_name["value"]
+            entries = {}
+            for map_key, entry in item.items():
+                entry_name = _placeholder_name(entry)
+                if entry_name is not None:
+                    leaves.append((path + ((field, map_key),), entry_name))
+                elif value_field.message_type is not None and isinstance(entry, Mapping):
+                    entries[map_key] = _strip(entry, value_field.message_type, path + ((field, map_key),), leaves)
+                else:
+                    entries[map_key] = entry
+            result[key] = entries
+        elif _is_repeated(field) and isinstance(item, list):
+            if field.message_type is None:
+                if any(_placeholder_name(element) is not None for element in item):
+                    raise ValueError(f"Placeholder inside the scalar list {field.full_name}; "
+                                     f"a placeholder must replace the whole list")
+                result[key] = item
+                continue
+            elements = []
+            for index, element in enumerate(item):
+                element_name = _placeholder_name(element)
+                if element_name is not None:
+                    # Keep an empty element so binding fills it in place.
+                    leaves.append((path + ((field, index),), element_name))
+                    elements.append({})
+                elif isinstance(element, Mapping):
+                    elements.append(_strip(element, field.message_type, path + ((field, index),), leaves))
+                else:
+                    elements.append(element)
+            result[key] = elements
+        elif field.message_type is not None and isinstance(item, Mapping):
+            result[key] = _strip(item, field.message_type, path + ((field, None),), leaves)
+        else:
+            result[key] = item
+    return result
+
+
+def _child(message: Message, step: _Step) -> Message:
+    field, key = step
+    container = getattr(message, field.name)
+    return container if key is None else container[key]
+
+
+def _set_message(target: Message, value: Any) -> None:
+    if isinstance(value, Message):
+        target.CopyFrom(value)
+    else:
+        target.Clear()
+        json_format.ParseDict(value, target)
+
+
+def _scalar(field: FieldDescriptor, value: Any) -> Any:
+    if field.enum_type is not None and isinstance(value, str):
+        return field.enum_type.values_by_name[value].number
+    return value
+
+
+def _assign(parent: Message, step: _Step, value: Any) -> None:
+    """Set the field (or map entry) named by step on parent to a bound value."""
+    field, key = step
+    if key is not None and not _is_map(field):
+        _set_message(getattr(parent, field.name)[key], value)
+    elif key is not None:
+        container = getattr(parent, field.name)
+        value_field = field.message_type.fields_by_name["value"]
+        if value_field.message_type is not None:
+            _set_message(container[key], value)
+        else:
+            container[key] = _scalar(value_field, value)
+    elif _is_map(field):
+        parent.ClearField(field.name)
+        for map_key, entry in value.items():
+            _assign(parent, (field, map_key), entry)
+    elif _is_repeated(field):
+        container = getattr(parent, field.name)
+        del container[:]
+        if field.message_type is not None:
+            for element in value:
+                _set_message(container.add(), element)
+        elif field.type in _PACKED_FORMATS and _PACKED_MERGE:
+            _merge_packed(parent, field, value)
+        elif field.enum_type is not None:
+            container.extend(_scalar(field, element) for element in value)
+        else:
+            container.extend(value)
+    elif field.message_type is not None:
+        _set_message(getattr(parent, field.name), value)
+    else:
+        setattr(parent, field.name, _scalar(field, value))
+
+
+def _merge_packed(parent: Message, field: FieldDescriptor, values: Any) -> None:
+    """Append float or double values to a repeated field as one packed record."""
+    format_char, itemsize = _PACKED_FORMATS[field.type]
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is None or view.format.lstrip("@=<") != format_char or view.itemsize != itemsize or (
+            not view.c_contiguous or sys.byteorder != "little" and view.format[0] != "<"):
+        # array() narrows to float32 exactly as assigning to the field would.
+        packed = array.array(format_char, values if view is None else view.tolist())
+        if sys.byteorder != "little":
+            packed.byteswap()
+        view = memoryview(packed)
+    data = view.cast("B")
+    parent.MergeFromString(encode_tag(field.number, WIRETYPE_LENGTH_DELIMITED) + encode_varint(len(data)) + data)
+
+
+def _apply(message: Message, leaves: List[_Leaf], values: Mapping[str, Any]) -> None:
+    for steps, name in leaves:
+        target = message
+        for step in steps[:-1]:
+            target = _child(target, step)
+        _assign(target, steps[-1], values[name])
+
+
+def _only_field(message: Message, field: FieldDescriptor) -> Message:
+    """Return a copy of message holding nothing but field."""
+    holder = type(message)()
+    holder.CopyFrom(message)
+    for other, _ in holder.ListFields():
+        if other.number != field.number:
+            holder.ClearField(other.name)
+    return holder
+
+
+class _Nested:
+    """A length-delimited field whose content holds placeholders."""
+
+    __slots__ = ("tag", "parts")
+
+    def __init__(self, tag: bytes, parts: List[Any]):
+        self.tag = tag
+        self.parts = parts
+
+    def render(self, values: Mapping[str, Any]) -> bytes:
+        content = _render(self.parts, values)
+        return b"".join((self.tag, encode_varint(len(content)), content))
+
+
+class _Rebuilt:
+    """A field re-encoded on every bind from a copy of its prototype value."""
+
+    __slots__ = ("holder", "leaves")
+
+    def __init__(self, holder: Message, leaves: List[_Leaf]):
+        self.holder = holder
+        self.leaves = leaves
+
+    def render(self, values: Mapping[str, Any]) -> bytes:
+        message = type(self.holder)()
+        message.CopyFrom(self.holder)
+        _apply(message, self.leaves, values)
+        return message.SerializeToString()
+
+
+def _render(parts: List[Any], values: Mapping[str, Any]) -> bytes:
+    return b"".join([part if isinstance(part, bytes) else part.render(values) for part in parts])
+
+
+def _compile_parts(message: Message, leaves: List[_Leaf]) -> List[Any]:
+    """Split message into pre-serialized fields and the parts that depend on leaves."""
+    by_field: Dict[int, List[_Leaf]] = {}
+    fields = {field.number: field for field, _ in message.ListFields()}
+    for leaf in leaves:
+        field = leaf[0][0][0]
+        fields[field.number] = field
+        by_field.setdefault(field.number, []).append(leaf)
+
+    parts: List[Any] = []
+    for number in sorted(fields):
+        field = fields[number]
+        group = by_field.get(number)
+        if not group:
+            parts.append(_only_field(message, field).SerializeToString())
+        elif field.message_type is None or _is_map(field) or any(len(steps) == 1 for steps, _ in group):
+            parts.append(_Rebuilt(_only_field(message, field), group))
+        else:
+            tag = encode_tag(number, WIRETYPE_LENGTH_DELIMITED)
+            if _is_repeated(field):
+                for index, element in enumerate(getattr(message, field.name)):
+                    inner = [(steps[1:], name) for steps, name in group if steps[0][1] == index]
+                    if inner:
+                        parts.append(_Nested(tag, _compile_parts(element, inner)))
+                    else:
+                        serialized = element.SerializeToString()
+                        parts.append(tag + encode_varint(len(serialized)) + serialized)
+            else:
+                inner = [(steps[1:], name) for steps, name in group]
+                parts.append(_Nested(tag, _compile_parts(getattr(message, field.name), inner)))
+
+    merged: List[Any] = []
+    for part in parts:
+        if isinstance(part, bytes) and merged and isinstance(merged[-1], bytes):
+            merged[-1] += part
+        else:
+            merged.append(part)
+    return merged
+
+
+class QueryTemplate:
+    """A compiled template; see compile_template()."""
+
+    def __init__(self, source: Mapping[str, Any], message_class: Type[Message] = SearchRequestBody):
+        leaves: List[_Leaf] = []
+        stripped = _strip(source, message_class.DESCRIPTOR, (), leaves)
+        self.message_class = message_class
+        self.prototype = message_class()
+        json_format.ParseDict(stripped, self.prototype)
+        self.params: FrozenSet[str] = frozenset(name for _, name in leaves)
+        self._leaves = leaves
+        self._parts = _compile_parts(self.prototype, leaves)
+
+    def _check(self, values: Mapping[str, Any]) -> None:
+        if values.keys() != self.params:
+            missing = sorted(self.params - values.keys())
+            unknown = sorted(values.keys() - self.params)
+            raise ValueError(f"Template parameters do not match: missing {missing}, unknown {unknown}")
+
+    def bind(self, **values: Any) -> Message:
+        """Return a new message with every placeholder set from values."""
+        self._check(values)
+        message = self.message_class()
+        message.CopyFrom(self.prototype)
+        _apply(message, self._leaves, values)
+        return message
+
+    def bind_bytes(self, **values: Any) -> bytes:
+        """Return the serialized message bind() would build."""
+        self._check(values)
+        return _render(self._parts, values)
+
+
+def compile_template(source: Mapping[str, Any], message_class: Type[Message] = SearchRequestBody) -> QueryTemplate:
+    """Compile a template dict with "{{name}}" or Param placeholders."""
+    return QueryTemplate(source, message_class)
+
+
+class TemplateCacheStats(NamedTuple):
+    """Counters since the cache was created."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+
+
+def _canonical(value: Any) -> Any:
+    # Param is a tuple, which json.dumps would otherwise write as a list.
+    if isinstance(value, Param):
+        return "{{" + value.name + "}}"
+    if isinstance(value, Mapping):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def _canonical_key(source: Mapping[str, Any], message_class: Type[Message]) -> str:
+    return message_class.DESCRIPTOR.full_name + json.dumps(_canonical(source), sort_keys=True, separators=(",", ":"))
+
+
+class TemplateCache:
+    """Thread-safe LRU of compiled templates."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_TEMPLATES,
+                 compile: Callable[..., QueryTemplate] = compile_template):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self._compile = compile
+        self._entries: "OrderedDict[str, QueryTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> TemplateCacheStats:
+        """Return the current counters."""
+        with self._lock:
+            return TemplateCacheStats(self._hits, self._misses, self._evictions, len(self._entries))
+
+    def get(self, source: Mapping[str, Any], message_class: Type[Message] = SearchRequestBody) -> QueryTemplate:
+        """Return the compiled template for source, compiling it on first use."""
+        key = _canonical_key(source, message_class)
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return template
+            self._misses += 1
+        template = self._compile(source, message_class)
+        with self._lock:
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return template
+
+    def bind(self, source: Mapping[str, Any], **values: Any) -> SearchRequestBody:
+        """Return get(source).bind(**values)."""
+        return self.get(source).bind(**values)
+
+    def bind_bytes(self, source: Mapping[str, Any], **values: Any) -> bytes:
+        """Return get(source).bind_bytes(**values)."""
+        return self.get(source).bind_bytes(**values)
+
+    def clear(self) -> None:
+        """Drop every compiled template."""
+        with self._lock:
+            self._entries.clear()
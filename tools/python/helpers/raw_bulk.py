@@ -0,0 +1,204 @@
+"""
+BulkRequest wire bytes assembled directly from pre-encoded document sources.
+
+When the caller already holds each document's _source as JSON bytes,
+building BulkRequestBody messages only to serialize them again costs more
+than the network call. encode_bulk_request() writes the serialized
+BulkRequest itself. Each body's tags, length prefixes and operation metadata
+are encoded into one small header, whose size (plus the source length) is
+known before anything is copied. The headers and the untouched source bytes
+are then joined into a single allocation of exactly that total size. Fields
+are written in field-number order, exactly as the protobuf runtime writes
+them, so the result is byte-identical to BulkRequest.SerializeToString() for
+the same content.
+
+grpc only accepts bytes as a pre-serialized message, so the buffer is built
+with bytes.join rather than a bytearray that would have to be copied again.
+
+The bytes cannot go through the generated stub, whose serializer expects a
+message. bulk_raw_method(channel) returns a Bulk multicallable whose request
+serializer is the identity instead.
+"""
+
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from opensearch.protobufs.schemas import BulkRequest, BulkResponse
+from opensearch.protobufs.services import document_service_pb2
+
+from ._grpc import method_path
+from ._wire import WIRETYPE_LENGTH_DELIMITED, encode_tag, encode_varint
+from .bulk import BULK_REQUEST_BODY_FIELD_NUMBER, DEFAULT_MAX_ACTIONS, DEFAULT_MAX_BYTES
+
+BULK = method_path(document_service_pb2, "DocumentService", "Bulk")
+
+# BulkRequestBody.operation_container = 1, BulkRequestBody.object = 3
+_BODY_TAG = encode_tag(BULK_REQUEST_BODY_FIELD_NUMBER, WIRETYPE_LENGTH_DELIMITED)
+_CONTAINER_TAG = encode_tag(1, WIRETYPE_LENGTH_DELIMITED)
+_OBJECT_TAG = encode_tag(3, WIRETYPE_LENGTH_DELIMITED)
+
+# Per operation: the OperationContainer field and, in field-number order,
+# (field tag, RawAction attribute) for the IndexOperation/WriteOperation fields.
+_OPERATIONS = {
+    "index": (1, ((1, "id"), (2, "index"), (3, "routing"), (9, "pipeline"))),
+    "create": (2, ((1, "routing"), (2, "id"), (3, "index"), (4, "pipeline"))),
+}
+_OPERATION_LAYOUTS = {
+    op_type: (
+        encode_tag(container_field, WIRETYPE_LENGTH_DELIMITED),
+        tuple((encode_tag(number, WIRETYPE_LENGTH_DELIMITED), attribute) for number, attribute in fields),
+    )
+    for op_type, (container_field, fields) in _OPERATIONS.items()
+}
+
+
+class RawAction(NamedTuple):
+    """One document: its JSON source bytes and optional operation metadata."""
+
+    source: bytes
+    id: Optional[str] = None
+    index: Optional[str] = None
+    routing: Optional[str] = None
+    pipeline: Optional[str] = None
+
+
+RawBulkAction = Union[RawAction, bytes]
+
+# (encoded size of the whole field-12 entry, header bytes, source bytes)
+_Prepared = Tuple[int, bytes, Any]
+
+_SMALL_VARINTS = [bytes((value,)) for value in range(0x80)]
+
+
+class _Encoder:
+    """Measures and writes bodies for one op_type and set of top-level fields."""
+
+    def __init__(self, template: Optional[BulkRequest], op_type: str, fields: dict):
+        if template is not None and fields:
+            raise ValueError("Pass either a template BulkRequest or field keyword arguments, not both")
+        if op_type not in _OPERATION_LAYOUTS:
+            raise ValueError(f"Unsupported op_type {op_type!r}; expected one of {sorted(_OPERATION_LAYOUTS)}")
+        self.operation_tag, self.layout = _OPERATION_LAYOUTS[op_type]
+        self.prefix, self.suffix = _split_template(template if template is not None else BulkRequest(**fields))
+        self.base_size = len(self.prefix) + len(self.suffix)
+
+    def prepare(self, action: RawBulkAction) -> _Prepared:
+        """Encode everything of one body except its source bytes.
+
+        The header runs from the field-12 tag up to and including the length
+        prefix of BulkRequestBody.object, so header + source is the entry.
+        """
+        if isinstance(action, (bytes, bytearray, memoryview)):
+            action = RawAction(action)
+        operation = b"".join([
+            tag + _varint(len(encoded)) + encoded
+            for tag, attribute in self.layout
+            if (value := getattr(action, attribute)) is not None
+            for encoded in (value.encode("utf-8"),)
+        ])
+        container = self.operation_tag + _varint(len(operation)) + operation
+        source = action.source
+        header = _CONTAINER_TAG + _varint(len(container)) + container + _OBJECT_TAG + _varint(len(source))
+        header = _BODY_TAG + _varint(len(header) + len(source)) + header
+        return len(header) + len(source), header, source
+
+    def write(self, prepared: List[_Prepared], total: int) -> bytes:
+        """Join prefix, bodies and suffix into one allocation of total bytes."""
+        parts = [self.prefix]
+        for _, header, source in prepared:
+            parts.append(header)
+            parts.append(source)
+        parts.append(self.suffix)
+        encoded = b"".join(parts)
+        if len(encoded) != total:
+            raise AssertionError(f"Encoded {len(encoded)} bytes, expected {total}")
+        return encoded
+
+
+def encode_bulk_request(
+    actions: Iterable[RawBulkAction],
+    template: Optional[BulkRequest] = None,
+    op_type: str = "index",
+    **fields: Any,
+) -> bytes:
+    """Return serialized BulkRequest bytes holding one op_type body per action.
+
+    Actions are RawAction tuples or bare source bytes. The top-level fields
+    come from template (its bodies are ignored) or from BulkRequest(**fields).
+    op_type is "index" or "create".
+    """
+    encoder = _Encoder(template, op_type, fields)
+    prepared = [encoder.prepare(action) for action in actions]
+    return encoder.write(prepared, encoder.base_size + sum(entry[0] for entry in prepared))
+
+
+def chunk_raw_bulk_requests(
+    actions: Iterable[RawBulkAction],
+    template: Optional[BulkRequest] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_actions: int = DEFAULT_MAX_ACTIONS,
+    op_type: str = "index",
+    **fields: Any,
+) -> Iterator[bytes]:
+    """Yield serialized BulkRequest bytes, each at most max_bytes and max_actions.
+
+    The raw counterpart of bulk.chunk_bulk_requests(), with the same limits
+    and the same ValueError for an action that cannot fit on its own.
+    """
+    encoder = _Encoder(template, op_type, fields)
+    yield from _chunk_prepared(encoder, map(encoder.prepare, actions), max_bytes, max_actions)
+
+
+def _chunk_prepared(encoder: _Encoder, entries: Iterable[_Prepared], max_bytes: int,
+                    max_actions: int) -> Iterator[bytes]:
+    """Group prepared bodies into BulkRequest bytes within the limits."""
+    if max_actions < 1:
+        raise ValueError(f"max_actions must be positive, got {max_actions}")
+    base_size = encoder.base_size
+    if base_size >= max_bytes:
+        raise ValueError(f"Top-level BulkRequest fields alone use {base_size} of {max_bytes} bytes")
+
+    pending: List[_Prepared] = []
+    pending_size = base_size
+    for position, entry in enumerate(entries):
+        if base_size + entry[0] > max_bytes:
+            raise ValueError(
+                f"Bulk action {position} needs {base_size + entry[0]} bytes, over the {max_bytes} byte limit"
+            )
+        if pending and (pending_size + entry[0] > max_bytes or len(pending) >= max_actions):
+            yield encoder.write(pending, pending_size)
+            pending = []
+            pending_size = base_size
+        pending.append(entry)
+        pending_size += entry[0]
+
+    if pending:
+        yield encoder.write(pending, pending_size)
+
+
+def bulk_raw_method(channel: Any):
+    """Return a DocumentService.Bulk multicallable that sends pre-serialized bytes.
+
+    Works with sync and grpc.aio channels; responses are BulkResponse messages.
+    """
+    return channel.unary_unary(BULK, request_serializer=None, response_deserializer=BulkResponse.FromString)
+
+
+def _split_template(template: BulkRequest) -> Tuple[bytes, bytes]:
+    """Serialize the template's fields numbered below and above the bodies."""
+    before, after = BulkRequest(), BulkRequest()
+    before.CopyFrom(template)
+    after.CopyFrom(template)
+    for field, _ in template.ListFields():
+        if field.number >= BULK_REQUEST_BODY_FIELD_NUMBER:
+            before.ClearField(field.name)
+        if field.number <= BULK_REQUEST_BODY_FIELD_NUMBER:
+            after.ClearField(field.name)
+    return before.SerializeToString(), after.SerializeToString()
+
+
+def _varint(value: int) -> bytes:
+    if value < 0x80:
+        return _SMALL_VARINTS[value]
+    if value < 0x4000:
+        return bytes(((value & 0x7F) | 0x80, value >> 7))
+    return encode_varint(value)
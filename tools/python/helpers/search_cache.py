@@ -0,0 +1,198 @@
+"""
+Client-side SearchResponse cache keyed on a canonical request fingerprint.
+
+fingerprint() hashes a normalized copy of a SearchRequest. Repeated fields
+whose order carries no meaning (target indices, routing values, source
+include/exclude lists, stored_fields, ...) are sorted and de-duplicated,
+and the message is serialized deterministically, which orders every map by
+key. Requests that only differ in those respects share one entry.
+
+SearchResponseCache stores serialized responses in an LRU bounded by entry
+count and total bytes, each with a TTL. Every hit parses a fresh message, so
+callers can modify what they get back without corrupting the cache. Requests
+that are stateful or opt out of caching bypass it entirely:
+
+- a point in time (search_request_body.pit),
+- a scroll,
+- request_cache=false.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from opensearch.protobufs.schemas import SearchRequest, SearchResponse
+
+# Repeated fields that behave as sets, per message.
+UNORDERED_REQUEST_FIELDS = (
+    "index",
+    "routing",
+    "x_source_includes",
+    "x_source_excludes",
+    "docvalue_fields",
+    "expand_wildcards",
+)
+UNORDERED_BODY_FIELDS = ("stored_fields", "stats")
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 60.0
+
+
+def fingerprint(request: SearchRequest) -> bytes:
+    """Return a 16-byte digest equal for semantically equal requests."""
+    canonical = SearchRequest()
+    canonical.CopyFrom(request)
+    _normalize(canonical, UNORDERED_REQUEST_FIELDS)
+    if canonical.HasField("search_request_body"):
+        _normalize(canonical.search_request_body, UNORDERED_BODY_FIELDS)
+    return hashlib.blake2b(canonical.SerializeToString(deterministic=True), digest_size=16).digest()
+
+
+def bypass_reason(request: SearchRequest) -> Optional[str]:
+    """Return why request must not be cached, or None if it may be."""
+    if request.HasField("search_request_body") and request.search_request_body.HasField("pit"):
+        return "pit"
+    if request.HasField("scroll"):
+        return "scroll"
+    if request.HasField("request_cache") and not request.request_cache:
+        return "request_cache"
+    return None
+
+
+class CacheStats(NamedTuple):
+    """Counters since the cache was created."""
+
+    hits: int
+    misses: int
+    bypasses: int
+    evictions: int
+    expirations: int
+    entries: int
+    bytes: int
+
+
+class SearchResponseCache:
+    """Thread-safe LRU + TTL cache of SearchResponse messages."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._bypasses = self._evictions = self._expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> CacheStats:
+        """Return the current counters."""
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._bypasses, self._evictions, self._expirations,
+                              len(self._entries), self._bytes)
+
+    def get(self, request: SearchRequest) -> Optional[SearchResponse]:
+        """Return a cached response for request, or None on a miss or bypass."""
+        if bypass_reason(request) is not None:
+            with self._lock:
+                self._bypasses += 1
+            return None
+        serialized = self._lookup(fingerprint(request))
+        return None if serialized is None else SearchResponse.FromString(serialized)
+
+    def put(self, request: SearchRequest, response: SearchResponse, ttl: Optional[float] = None) -> bool:
+        """Cache response for request; returns False if it was not stored."""
+        if bypass_reason(request) is not None:
+            return False
+        return self._store(fingerprint(request), response.SerializeToString(), self.ttl if ttl is None else ttl)
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after writes the dashboards should see."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def search(self, stub: Any, request: SearchRequest, **kwargs: Any) -> SearchResponse:
+        """Return the cached response or call stub.Search and cache its result."""
+        if bypass_reason(request) is not None:
+            with self._lock:
+                self._bypasses += 1
+            return stub.Search(request, **kwargs)
+        key = fingerprint(request)
+        serialized = self._lookup(key)
+        if serialized is not None:
+            return SearchResponse.FromString(serialized)
+        response = stub.Search(request, **kwargs)
+        self._store(key, response.SerializeToString(), self.ttl)
+        return response
+
+    async def search_async(self, stub: Any, request: SearchRequest, **kwargs: Any) -> SearchResponse:
+        """search() for grpc.aio stubs."""
+        if bypass_reason(request) is not None:
+            with self._lock:
+                self._bypasses += 1
+            return await stub.Search(request, **kwargs)
+        key = fingerprint(request)
+        serialized = self._lookup(key)
+        if serialized is not None:
+            return SearchResponse.FromString(serialized)
+        response = await stub.Search(request, **kwargs)
+        self._store(key, response.SerializeToString(), self.ttl)
+        return response
+
+    def _lookup(self, key: bytes) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires, serialized = entry
+            if expires <= self.clock():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return serialized
+
+    def _store(self, key: bytes, serialized: bytes, ttl: float) -> bool:
+        size = len(serialized)
+        if ttl <= 0 or size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self.clock() + ttl, serialized)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+        return True
+
+    def _remove(self, key: bytes) -> None:
+        _, serialized = self._entries.pop(key)
+        self._bytes -= len(serialized)
+
+
+def _normalize(message: Any, field_names: Tuple[str, ...]) -> None:
+    """Sort and de-duplicate the given repeated scalar fields in place."""
+    for name in field_names:
+        values = getattr(message, name)
+        if len(values) > 1:
+            normalized = sorted(set(values))
+            del values[:]
+            values.extend(normalized)
@@ -0,0 +1,159 @@
+"""
+Asyncio consumption of SearchService.ServerStreamSearch with bounded buffering.
+
+A single reader task pulls frames off the grpc.aio call into a queue of at
+most max_buffered responses, and concurrency worker tasks hand them to the
+caller's handler. When the handlers fall behind, the queue fills, the reader
+stops pulling, and HTTP/2 flow control pushes back on the server. A slow
+consumer therefore neither stalls forever nor buffers without limit.
+
+The call is cancelled when a handler raises, when the consuming task is
+cancelled, or when the deadline expires. Each frame is reported to an optional
+on_frame callback with its wire size (taken from the deserializer, not
+re-measured), inter-arrival latency, time spent queued and handler time.
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Sequence, Tuple, Union
+
+from opensearch.protobufs.schemas import SearchRequest, SearchResponse
+from opensearch.protobufs.services import search_service_pb2
+
+from ._grpc import method_path, sized_deserializer
+
+SERVER_STREAM_SEARCH = method_path(search_service_pb2, "SearchService", "ServerStreamSearch")
+
+DEFAULT_MAX_BUFFERED = 4
+
+
+@dataclass(frozen=True)
+class FrameStats:
+    """Measurements for one streamed response."""
+
+    index: int
+    size: int
+    # Seconds since the previous frame arrived (or since the call started).
+    latency: float
+    # Seconds the frame waited in the buffer before a handler picked it up.
+    queue_wait: float
+    # Seconds the handler took.
+    processing: float
+
+
+@dataclass
+class StreamSummary:
+    """Totals for one consumed stream."""
+
+    frames: int = 0
+    bytes: int = 0
+    time_to_first_frame: Optional[float] = None
+    max_buffered: int = 0
+    elapsed: float = 0.0
+
+
+Handler = Callable[[Any], Union[Awaitable[None], None]]
+
+
+async def consume_search_stream(
+    channel: Any,
+    request: SearchRequest,
+    handler: Handler,
+    max_buffered: int = DEFAULT_MAX_BUFFERED,
+    concurrency: int = 1,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    metadata: Optional[Sequence[Tuple[str, str]]] = None,
+    on_frame: Optional[Callable[[FrameStats], None]] = None,
+) -> StreamSummary:
+    """Stream SearchResponse pages from ServerStreamSearch into handler.
+
+    channel is a grpc.aio.Channel. handler may be a coroutine function or a
+    plain callable; with concurrency > 1 pages may be handled out of order.
+    deadline is an absolute time.monotonic() value and is combined with
+    timeout, the earlier of the two winning, so a caller's remaining budget
+    can be passed straight through.
+    """
+    multicallable = channel.unary_stream(
+        SERVER_STREAM_SEARCH,
+        request_serializer=SearchRequest.SerializeToString,
+        response_deserializer=sized_deserializer(SearchResponse.FromString),
+    )
+    call = multicallable(request, timeout=effective_timeout(timeout, deadline), metadata=metadata)
+    return await consume_stream(call, handler, max_buffered, concurrency, on_frame)
+
+
+def effective_timeout(timeout: Optional[float], deadline: Optional[float]) -> Optional[float]:
+    """Combine a relative timeout and an absolute monotonic deadline."""
+    if deadline is None:
+        return timeout
+    remaining = max(0.0, deadline - time.monotonic())
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+async def consume_stream(
+    call: Any,
+    handler: Handler,
+    max_buffered: int = DEFAULT_MAX_BUFFERED,
+    concurrency: int = 1,
+    on_frame: Optional[Callable[[FrameStats], None]] = None,
+) -> StreamSummary:
+    """Consume an async iterable of (message, size) pairs with bounded buffering.
+
+    call is usually a grpc.aio call created with sized_deserializer; its
+    cancel() method is invoked on failure or cancellation when present.
+    """
+    if max_buffered < 1:
+        raise ValueError(f"max_buffered must be positive, got {max_buffered}")
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be positive, got {concurrency}")
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(max_buffered)
+    summary = StreamSummary()
+    started = loop.time()
+
+    async def read() -> None:
+        previous = started
+        async for message, size in call:
+            now = loop.time()
+            if summary.time_to_first_frame is None:
+                summary.time_to_first_frame = now - started
+            await queue.put((summary.frames, message, size, now - previous, now))
+            summary.frames += 1
+            summary.bytes += size
+            summary.max_buffered = max(summary.max_buffered, queue.qsize())
+            previous = now
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, message, size, latency, received = item
+            start = loop.time()
+            result = handler(message)
+            if inspect.isawaitable(result):
+                await result
+            if on_frame is not None:
+                on_frame(FrameStats(index, size, latency, start - received, loop.time() - start))
+
+    tasks = [asyncio.ensure_future(read())]
+    tasks.extend(asyncio.ensure_future(work()) for _ in range(concurrency))
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        cancel = getattr(call, "cancel", None)
+        if cancel is not None:
+            cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    summary.elapsed = loop.time() - started
+    return summary
@@ -0,0 +1,464 @@
+"""
+Capture of gRPC traffic to a compact binary log, and rate-controlled replay.
+
+TrafficRecorder is a sync client interceptor. record_channel(channel,
+recorder) returns a channel on which the generated stubs work as usual while
+every request message, every response message (each message of a response
+stream separately) and the final status of each call are appended to the
+log.
+
+The log is append-only. It starts with the 8-byte LOG_MAGIC, followed by
+records of a 20-byte little-endian header and a payload:
+
+    kind      uint8   KIND_METHOD, KIND_REQUEST, KIND_RESPONSE or KIND_STATUS
+    (pad)     uint8
+    method    uint16  method id, defined by an earlier KIND_METHOD record
+    call      uint32  call id shared by the records of one call
+    timestamp int64   nanoseconds since the recorder was created
+    size      uint32  payload length
+
+KIND_METHOD payloads are the method path, KIND_STATUS payloads the status
+code name, and the others serialized messages. Beside the log, the sidecar
+<log>.idx holds INDEX_MAGIC and one 28-byte entry per record (offset,
+timestamp, size, call, method, kind), so a reader can find records without
+scanning. The index is only an accelerator. Records past its end, e.g. after
+a crash between the two writes, are found by scanning the log, and a torn
+record at the very end is ignored.
+
+TrafficLog reads a log through mmap. Record payloads are memoryview slices of
+the mapping, so nothing is copied. A message is parsed only when
+Record.message() is called, with the request or response class looked up
+from the method.
+
+replay() sends the recorded unary-request calls to a channel as
+pre-serialized bytes, without parsing them. It follows the recorded
+timestamps divided by rate, or goes as fast as concurrency allows with
+rate=None, and returns a ReplayReport with latency percentiles per method.
+Server-streaming responses are drained but not decoded. Client-streaming
+calls and calls to methods the generated services do not define are
+counted, once per call, and not replayed.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import grpc
+from google.protobuf import message_factory
+
+from opensearch.protobufs.services import document_service_pb2, ml_service_pb2, search_service_pb2
+
+from .instrumentation import Histogram, method_name
+
+LOG_MAGIC = b"OSPBTRC1"
+INDEX_MAGIC = b"OSPBIDX1"
+
+KIND_METHOD = 0
+KIND_REQUEST = 1
+KIND_RESPONSE = 2
+KIND_STATUS = 3
+
+DEFAULT_REPLAY_CONCURRENCY = 8
+
+_HEADER = struct.Struct("<BxHIqI")
+_INDEX_ENTRY = struct.Struct("<QqIIHBx")
+
+# Method path -> MethodDescriptor for every generated service.
+_METHODS = {
+    f"/{service.full_name}/{method.name}": method
+    for module in (document_service_pb2, ml_service_pb2, search_service_pb2)
+    for service in module.DESCRIPTOR.services_by_name.values()
+    for method in service.methods
+}
+
+
+def index_path(path: str) -> str:
+    """Return the sidecar index path of the log at path."""
+    return path + ".idx"
+
+
+class TrafficRecorder(
+    grpc.UnaryUnaryClientInterceptor,
+    grpc.UnaryStreamClientInterceptor,
+    grpc.StreamUnaryClientInterceptor,
+    grpc.StreamStreamClientInterceptor,
+):
+    """Sync client interceptor appending the calls it sees to a traffic log.
+
+    Messages are serialized once more for the log, so recording costs about
+    one extra SerializeToString per message. With record_responses False
+    only requests and statuses are written. Safe to share between threads;
+    close() (or leaving the with block) flushes both files.
+    """
+
+    def __init__(self, path: str, record_responses: bool = True, clock: Callable[[], int] = time.monotonic_ns):
+        self.path = path
+        self.record_responses = record_responses
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.Lock()
+        self._methods: Dict[str, int] = {}
+        self._next_call = 0
+        self._log = open(path, "wb")
+        self._index = open(index_path(path), "wb")
+        self._log.write(LOG_MAGIC)
+        self._index.write(INDEX_MAGIC)
+        self._offset = len(LOG_MAGIC)
+
+    def record(self, kind: int, method: str, call: int, payload: bytes) -> None:
+        """Append one record for method, defining the method first if needed."""
+        timestamp = self._clock() - self._start
+        with self._lock:
+            if self._log.closed:
+                # A call that completed after close(); its records are dropped.
+                return
+            method_id = self._methods.get(method)
+            if method_id is None:
+                method_id = self._methods[method] = len(self._methods)
+                self._append(KIND_METHOD, method_id, 0, timestamp, method.encode("utf-8"))
+            self._append(kind, method_id, call, timestamp, payload)
+
+    def _append(self, kind: int, method_id: int, call: int, timestamp: int, payload: bytes) -> None:
+        self._log.write(_HEADER.pack(kind, method_id, call, timestamp, len(payload)))
+        self._log.write(payload)
+        self._index.write(_INDEX_ENTRY.pack(self._offset, timestamp, len(payload), call, method_id, kind))
+        self._offset += _HEADER.size + len(payload)
+
+    def new_call(self) -> int:
+        """Return a fresh call id."""
+        with self._lock:
+            self._next_call += 1
+            return self._next_call
+
+    def flush(self) -> None:
+        """Write buffered records to both files."""
+        with self._lock:
+            self._log.flush()
+            self._index.flush()
+
+    def close(self) -> None:
+        """Flush and close the log and its index."""
+        with self._lock:
+            if not self._log.closed:
+                self._log.close()
+                self._index.close()
+
+    def __enter__(self) -> "TrafficRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _requests(self, method: str, call: int, request_iterator: Iterable[Any]) -> Iterator[Any]:
+        for request in request_iterator:
+            self.record(KIND_REQUEST, method, call, request.SerializeToString())
+            yield request
+
+    def _status(self, method: str, call: int, future: Any) -> None:
+        code = future.code()
+        self.record(KIND_STATUS, method, call, (code.name if code is not None else "UNKNOWN").encode("ascii"))
+
+    def _unary_done(self, method: str, call: int, future: Any) -> None:
+        # exception() raises on a cancelled future; its status is still recorded.
+        if self.record_responses and not future.cancelled() and future.exception() is None:
+            self.record(KIND_RESPONSE, method, call, future.result().SerializeToString())
+        self._status(method, call, future)
+
+    def _start_call(self, details: Any, request: Any, streaming_request: bool) -> Tuple[str, int, Any]:
+        method = details.method.decode("ascii") if isinstance(details.method, bytes) else details.method
+        call = self.new_call()
+        if streaming_request:
+            return method, call, self._requests(method, call, request)
+        self.record(KIND_REQUEST, method, call, request.SerializeToString())
+        return method, call, request
+
+    def _unary_response(self, continuation: Callable, details: Any, request: Any, streaming_request: bool) -> Any:
+        method, call, request = self._start_call(details, request, streaming_request)
+        future = continuation(details, request)
+        future.add_done_callback(lambda done: self._unary_done(method, call, done))
+        return future
+
+    def _stream_response(self, continuation: Callable, details: Any, request: Any, streaming_request: bool) -> Any:
+        method, call, request = self._start_call(details, request, streaming_request)
+        stream = continuation(details, request)
+        if self.record_responses:
+            return _RecordedStream(stream, self, method, call)
+        stream.add_done_callback(lambda done: self._status(method, call, done))
+        return stream
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        return self._unary_response(continuation, client_call_details, request, False)
+
+    def intercept_stream_unary(self, continuation, client_call_details, request_iterator):
+        return self._unary_response(continuation, client_call_details, request_iterator, True)
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        return self._stream_response(continuation, client_call_details, request, False)
+
+    def intercept_stream_stream(self, continuation, client_call_details, request_iterator):
+        return self._stream_response(continuation, client_call_details, request_iterator, True)
+
+
+class _RecordedStream:
+    """A sync response-stream call that records each message it yields, then
+    the status once the stream ends, so the status follows the last response."""
+
+    def __init__(self, stream: Any, recorder: TrafficRecorder, method: str, call: int):
+        self._stream = stream
+        self._recorder = recorder
+        self._method = method
+        self._call = call
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            response = next(self._stream)
+        except (StopIteration, grpc.RpcError):
+            self._recorder._status(self._method, self._call, self._stream)
+            raise
+        self._recorder.record(KIND_RESPONSE, self._method, self._call, response.SerializeToString())
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+def record_channel(channel: grpc.Channel, recorder: TrafficRecorder) -> grpc.Channel:
+    """Return a sync channel whose calls are recorded; build the generated stubs on it."""
+    return grpc.intercept_channel(channel, recorder)
+
+
+class Record(NamedTuple):
+    """One log record; payload is a view into the mapped log, valid until it is closed."""
+
+    kind: int
+    method: str
+    call: int
+    timestamp: int
+    payload: memoryview
+
+    def message(self) -> Any:
+        """Parse the payload of a request or response record into its message class."""
+        descriptor = _METHODS.get(self.method)
+        if descriptor is None:
+            raise KeyError(f"Unknown method {self.method!r}")
+        if self.kind == KIND_REQUEST:
+            message_class = message_factory.GetMessageClass(descriptor.input_type)
+        elif self.kind == KIND_RESPONSE:
+            message_class = message_factory.GetMessageClass(descriptor.output_type)
+        else:
+            raise ValueError(f"Record kind {self.kind} carries no message")
+        return message_class.FromString(self.payload)
+
+
+class TrafficLog:
+    """Read-only, memory-mapped view of a traffic log."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        if self._view[:len(LOG_MAGIC)] != LOG_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a traffic log")
+        # (offset, timestamp, size, call, method id, kind) per complete record.
+        self._entries: List[Tuple[int, int, int, int, int, int]] = []
+        self._read_index()
+        self._scan()
+        self.methods: Dict[int, str] = {
+            method_id: bytes(self._view[offset + _HEADER.size:offset + _HEADER.size + size]).decode("utf-8")
+            for offset, _, size, _, method_id, kind in self._entries if kind == KIND_METHOD
+        }
+
+    def _read_index(self) -> None:
+        try:
+            with open(index_path(self.path), "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return
+        if not data.startswith(INDEX_MAGIC):
+            return
+        end = len(self._view)
+        body = memoryview(data)[len(INDEX_MAGIC):]
+        usable = len(body) - len(body) % _INDEX_ENTRY.size
+        for entry in _INDEX_ENTRY.iter_unpack(body[:usable]):
+            if entry[0] + _HEADER.size + entry[2] > end:
+                break
+            self._entries.append(entry)
+
+    def _scan(self) -> None:
+        """Append the records found after the last indexed one."""
+        view = self._view
+        if self._entries:
+            offset, _, size, _, _, _ = self._entries[-1]
+            offset += _HEADER.size + size
+        else:
+            offset = len(LOG_MAGIC)
+        end = len(view)
+        while offset + _HEADER.size <= end:
+            kind, method_id, call, timestamp, size = _HEADER.unpack_from(view, offset)
+            if offset + _HEADER.size + size > end:
+                break
+            self._entries.append((offset, timestamp, size, call, method_id, kind))
+            offset += _HEADER.size + size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def records(self, kinds: Optional[Sequence[int]] = None) -> Iterator[Record]:
+        """Yield records in log order, optionally only those of the given kinds."""
+        view = self._view
+        methods = self.methods
+        for offset, timestamp, size, call, method_id, kind in self._entries:
+            if kinds is not None and kind not in kinds:
+                continue
+            start = offset + _HEADER.size
+            yield Record(kind, methods.get(method_id, ""), call, timestamp, view[start:start + size])
+
+    def requests(self) -> Iterator[Record]:
+        """Yield the request records."""
+        return self.records((KIND_REQUEST,))
+
+    def close(self) -> None:
+        """Unmap the log. Payload views still referenced elsewhere keep it mapped."""
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "TrafficLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class MethodReplayStats(NamedTuple):
+    """Replay results of one method; latencies in seconds."""
+
+    calls: int
+    errors: int
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+class ReplayReport(NamedTuple):
+    """Totals of one replay() run."""
+
+    calls: int
+    errors: Dict[str, int]  # status code name -> count
+    skipped: int  # client-streaming calls, which are not replayed
+    unknown: int  # calls to methods missing from the generated services, not replayed either
+    elapsed: float
+    # Longest delay between a call's scheduled and actual start.
+    max_lag: float
+    methods: Dict[str, MethodReplayStats]
+
+
+def replay(
+    log: TrafficLog,
+    channel: grpc.Channel,
+    rate: Optional[float] = 1.0,
+    concurrency: int = DEFAULT_REPLAY_CONCURRENCY,
+    methods: Optional[Iterable[str]] = None,
+    timeout: Optional[float] = None,
+    metadata: Optional[Sequence[Tuple[str, str]]] = None,
+) -> ReplayReport:
+    """Replay the recorded unary-request calls of log on a sync channel.
+
+    rate scales the recorded pacing (2.0 replays twice as fast, None as fast
+    as possible); at most concurrency calls are in flight, so a rate the
+    target cannot sustain shows up as max_lag. methods restricts the replay
+    to the given "Service/Method" names.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be positive, got {concurrency}")
+    if rate is not None and rate <= 0:
+        raise ValueError(f"rate must be positive or None, got {rate}")
+    wanted = None if methods is None else frozenset(methods)
+
+    callables: Dict[str, Any] = {}
+    histograms: Dict[str, Histogram] = {}
+    counts: Dict[str, List[int]] = {}
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    slots = threading.Semaphore(concurrency)
+    skipped_calls = set()
+    unknown_calls = set()
+    max_lag = 0.0
+
+    def send(path: str, payload: memoryview, streaming: bool) -> None:
+        multicallable = callables[path]
+        start = time.perf_counter()
+        code = grpc.StatusCode.OK
+        try:
+            if streaming:
+                for _ in multicallable(bytes(payload), timeout=timeout, metadata=metadata):
+                    pass
+            else:
+                multicallable(bytes(payload), timeout=timeout, metadata=metadata)
+        except grpc.RpcError as e:
+            code = e.code()
+        finally:
+            slots.release()
+        elapsed = time.perf_counter() - start
+        name = method_name(path)
+        with lock:
+            histograms[name].record(elapsed)
+            counts[name][0] += 1
+            if code is not grpc.StatusCode.OK:
+                counts[name][1] += 1
+                errors[code.name] = errors.get(code.name, 0) + 1
+
+    started = time.perf_counter()
+    first_timestamp = None
+    with ThreadPoolExecutor(concurrency) as executor:
+        for record in log.requests():
+            name = method_name(record.method)
+            if wanted is not None and name not in wanted:
+                continue
+            descriptor = _METHODS.get(record.method)
+            if descriptor is None:
+                unknown_calls.add(record.call)
+                continue
+            if descriptor.client_streaming:
+                skipped_calls.add(record.call)
+                continue
+            if record.method not in callables:
+                factory = channel.unary_stream if descriptor.server_streaming else channel.unary_unary
+                callables[record.method] = factory(record.method, request_serializer=None,
+                                                   response_deserializer=None)
+                histograms[name] = Histogram()
+                counts[name] = [0, 0]
+            if first_timestamp is None:
+                first_timestamp = record.timestamp
+            if rate is not None:
+                due = started + (record.timestamp - first_timestamp) / 1e9 / rate
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                slots.acquire()
+                max_lag = max(max_lag, time.perf_counter() - due)
+            else:
+                slots.acquire()
+            executor.submit(send, record.method, record.payload, descriptor.server_streaming)
+    elapsed = time.perf_counter() - started
+
+    report = {}
+    for name, histogram in histograms.items():
+        calls, failed = counts[name]
+        snapshot = histogram.snapshot()
+        report[name] = MethodReplayStats(calls, failed, histogram.percentile(0.5), histogram.percentile(0.9),
+                                         histogram.percentile(0.99), snapshot.max)
+    return ReplayReport(sum(stats.calls for stats in report.values()), errors, len(skipped_calls), len(unknown_calls),
+                        elapsed, max_lag, report)
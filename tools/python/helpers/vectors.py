@@ -0,0 +1,135 @@
+"""
+Batch population of BulkRequestBody.extra_field_values from dense vectors.
+
+Vectors are read through the buffer protocol, so a 2-D NumPy array, a 2-D
+memoryview or anything else exposing a C buffer works without NumPy being
+installed. Rows are sliced out of a single byte view and handed to protobuf
+whole: the binary_le encoding stores each row as its little-endian bytes, and
+the values encoding parses float/double rows from their packed wire form
+(which is the same byte layout), so there is no per-element Python loop and no
+intermediate list.
+"""
+
+import array
+import sys
+from typing import Any, Sequence, Tuple
+
+from opensearch.protobufs.schemas import BulkRequestBody
+
+from ._wire import WIRETYPE_LENGTH_DELIMITED, encode_tag, encode_varint
+
+ENCODING_VALUES = "values"
+ENCODING_BINARY_LE = "binary_le"
+
+# (buffer format character, item size) -> BinaryFieldValue oneof field
+_FIELD_BY_FORMAT = {
+    ("f", 4): "float_array_value",
+    ("d", 8): "double_array_value",
+    ("i", 4): "int_array_value",
+    ("l", 4): "int_array_value",
+    ("l", 8): "long_array_value",
+    ("q", 8): "long_array_value",
+    ("B", 1): "bytes_value",
+    ("b", 1): "bytes_value",
+    ("c", 1): "bytes_value",
+}
+
+# Types whose packed repeated encoding is the raw little-endian bytes.
+_FIXED_WIDTH_FIELDS = {"float_array_value", "double_array_value"}
+
+# array typecode used to byte-swap big-endian input.
+_TYPECODE_BY_FIELD = {
+    "float_array_value": "f",
+    "double_array_value": "d",
+    "int_array_value": "i",
+    "long_array_value": "q",
+}
+
+
+def set_vector_field(
+    bodies: Sequence[BulkRequestBody],
+    field: str,
+    vectors: Any,
+    encoding: str = ENCODING_VALUES,
+) -> None:
+    """Store row i of vectors in bodies[i].extra_field_values[field].
+
+    The element type of vectors selects the BinaryFieldValue variant: float32
+    -> float_array_value, float64 -> double_array_value, int32 ->
+    int_array_value, int64 -> long_array_value and 8-bit data -> bytes_value.
+    With encoding="binary_le" array rows are written straight through as
+    little-endian bytes; with encoding="values" they populate the repeated
+    values list. Any existing value for field is replaced.
+    """
+    if encoding not in (ENCODING_VALUES, ENCODING_BINARY_LE):
+        raise ValueError(f"Unknown encoding {encoding!r}; expected {ENCODING_VALUES!r} or {ENCODING_BINARY_LE!r}")
+
+    data, rows, dimension, itemsize, value_field = _as_little_endian_rows(vectors)
+    if rows != len(bodies):
+        raise ValueError(f"Got {rows} vectors for {len(bodies)} bulk bodies")
+
+    row_size = dimension * itemsize
+    packed_prefix = encode_tag(1, WIRETYPE_LENGTH_DELIMITED) + encode_varint(row_size)
+    typecode = _TYPECODE_BY_FIELD.get(value_field)
+
+    for index, body in enumerate(bodies):
+        row = data[index * row_size:(index + 1) * row_size]
+        value = body.extra_field_values[field]
+        value.Clear()
+
+        if value_field == "bytes_value":
+            value.bytes_value.bytes = bytes(row)
+            continue
+
+        array_value = getattr(value, value_field)
+        if encoding == ENCODING_BINARY_LE:
+            array_value.binary_le.bytes_le = bytes(row)
+            array_value.binary_le.dimension = dimension
+        elif value_field in _FIXED_WIDTH_FIELDS:
+            array_value.values.MergeFromString(packed_prefix + row)
+        elif sys.byteorder == "little":
+            array_value.values.values.extend(row.cast(typecode))
+        else:
+            array_value.values.values.extend(_byteswapped(row, typecode).cast(typecode))
+
+
+def _as_little_endian_rows(vectors: Any) -> Tuple[memoryview, int, int, int, str]:
+    """Return a flat little-endian byte view of vectors and its layout.
+
+    The result is (data, rows, dimension, itemsize, BinaryFieldValue field).
+    """
+    try:
+        view = memoryview(vectors)
+    except TypeError:
+        # Objects such as framework tensors that only implement __array__.
+        try:
+            import numpy
+        except ImportError:
+            raise TypeError(f"{type(vectors).__name__} does not support the buffer protocol") from None
+        view = memoryview(numpy.asarray(vectors))
+
+    if view.ndim != 2:
+        raise ValueError(f"Expected a 2-D array of vectors, got {view.ndim} dimension(s)")
+
+    byte_order = view.format[0] if view.format[0] in "@=<>!" else "@"
+    format_char = view.format.lstrip("@=<>!")
+    value_field = _FIELD_BY_FORMAT.get((format_char, view.itemsize))
+    if value_field is None:
+        raise TypeError(f"Unsupported vector element format {view.format!r} (itemsize {view.itemsize})")
+
+    rows, dimension = view.shape
+    data = view.cast("B") if view.c_contiguous else memoryview(view.tobytes())
+
+    little_endian = byte_order == "<" or (byte_order in "@=" and sys.byteorder == "little")
+    if not little_endian and view.itemsize > 1:
+        data = _byteswapped(data, _TYPECODE_BY_FIELD[value_field])
+
+    return data, rows, dimension, view.itemsize, value_field
+
+
+def _byteswapped(data: memoryview, typecode: str) -> memoryview:
+    """Return a byte view of data with every typecode-sized item reversed."""
+    swapped = array.array(typecode)
+    swapped.frombytes(data)
+    swapped.byteswap()
+    return memoryview(swapped).cast("B")
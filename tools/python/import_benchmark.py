@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Cold-import benchmark for the opensearch-protobufs Python package.
+
+Every measurement runs in a fresh interpreter so nothing is shared between
+samples: the wall time covers the protobuf runtime, the descriptor pool load
+for the target module and (for *_pb2_grpc modules) grpc itself. Each target is
+measured under every requested protobuf backend by setting
+PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION in the child environment.
+
+Usage:
+    export PYTHONPATH=bazel-bin
+    python3 tools/python/import_benchmark.py --output results.json
+    python3 tools/python/import_benchmark.py --write-baseline baseline.json
+    python3 tools/python/import_benchmark.py --baseline baseline.json --threshold 0.25
+
+Results are JSON: one record per (target, backend) with the median and minimum
+wall time in milliseconds and the peak RSS in KiB. When --baseline is given the
+script exits with status 1 if any record regresses by more than --threshold
+(relative) and more than the absolute noise floors, and with status 1 before
+measuring anything if the baseline file does not exist. CI writes the
+baseline from the base branch on the same runner (see DEVELOPER_GUIDE.md),
+since timings do not carry over between machines.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import pkgutil
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+PACKAGES = ["opensearch.protobufs.schemas", "opensearch.protobufs.services"]
+
+DEFAULT_BACKENDS = ["upb", "python"]
+
+# Executed in the child interpreter. Prints one JSON object on stdout.
+CHILD_SCRIPT = '''
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+from google.protobuf.internal import api_implementation
+print(json.dumps({"wall_ms": elapsed * 1000.0, "rss_kb": rss, "backend": api_implementation.Type()}))
+'''
+
+
+def discover_targets() -> List[str]:
+    """Return the packages plus every generated module inside them.
+
+    Submodules are found on disk so discovery itself does not import them.
+    """
+    targets = []
+    for package in PACKAGES:
+        spec = importlib.util.find_spec(package)
+        if spec is None or not spec.submodule_search_locations:
+            logger.warning(f"Package not found: {package}")
+            continue
+        targets.append(package)
+        modules = sorted(info.name for info in pkgutil.iter_modules(spec.submodule_search_locations))
+        targets.extend(f"{package}.{name}" for name in modules if name.endswith(("_pb2", "_pb2_grpc")))
+    return targets
+
+
+def measure_once(target: str, backend: str) -> Dict:
+    """Import target in a fresh interpreter using the given protobuf backend."""
+    env = dict(os.environ, PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION=backend)
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, target],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} with backend {backend} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(target: str, backend: str, repeat: int) -> Dict:
+    """Return the summary record for repeat cold imports of target."""
+    samples = [measure_once(target, backend) for _ in range(repeat)]
+    wall = [sample["wall_ms"] for sample in samples]
+    return {
+        "target": target,
+        "requested_backend": backend,
+        "backend": samples[0]["backend"],
+        "repeat": repeat,
+        "wall_ms_median": statistics.median(wall),
+        "wall_ms_min": min(wall),
+        "rss_kb_median": statistics.median(sample["rss_kb"] for sample in samples),
+    }
+
+
+def result_key(record: Dict) -> str:
+    """Key used to match a record against the baseline."""
+    return f"{record['target']}@{record['requested_backend']}"
+
+
+def find_regressions(results: List[Dict], baseline: List[Dict], threshold: float,
+                     min_delta_ms: float, min_delta_kb: float) -> List[str]:
+    """Compare results against baseline and describe every regression.
+
+    A metric regresses when it exceeds the baseline by more than threshold
+    (a fraction, e.g. 0.25 for 25%) and by more than the absolute floor, so
+    that sub-millisecond noise on tiny imports does not fail the gate.
+    """
+    baseline_by_key = {result_key(record): record for record in baseline}
+    regressions = []
+    checks = [("wall_ms_median", min_delta_ms, "ms"), ("rss_kb_median", min_delta_kb, "KiB")]
+
+    for record in results:
+        previous = baseline_by_key.get(result_key(record))
+        if previous is None:
+            continue
+        for metric, floor, unit in checks:
+            old, new = previous[metric], record[metric]
+            if new - old > floor and new > old * (1.0 + threshold):
+                regressions.append(
+                    f"{result_key(record)} {metric}: {old:.1f}{unit} -> {new:.1f}{unit} "
+                    f"(+{(new / old - 1.0) * 100.0 if old else float('inf'):.0f}%)"
+                )
+    return regressions
+
+
+def write_json(path: str, payload: Dict) -> None:
+    """Write payload as indented JSON to path."""
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and return the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--targets", nargs="+", help="Modules to import (default: discovered)")
+    parser.add_argument("--backends", nargs="+", default=DEFAULT_BACKENDS,
+                        help="PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION values to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--write-baseline", help="Write results as a new baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative regression (default: 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="Ignore wall time regressions smaller than this")
+    parser.add_argument("--min-delta-kb", type=float, default=2048.0,
+                        help="Ignore RSS regressions smaller than this")
+    args = parser.parse_args(argv)
+
+    if args.baseline and not Path(args.baseline).exists():
+        logger.error(f"Baseline not found: {args.baseline}")
+        return 1
+
+    targets = args.targets or discover_targets()
+    if not targets:
+        logger.error("No targets found; is the built package on PYTHONPATH?")
+        return 1
+
+    results = []
+    for target in targets:
+        for backend in args.backends:
+            record = measure(target, backend, args.repeat)
+            logger.info(f"{result_key(record)}: {record['wall_ms_median']:.1f}ms, "
+                        f"{record['rss_kb_median']:.0f}KiB ({record['backend']})")
+            results.append(record)
+
+    payload = {"python": sys.version.split()[0], "results": results}
+    if args.output:
+        write_json(args.output, payload)
+    else:
+        print(json.dumps(payload, indent=2, sort_keys=True))
+
+    if args.write_baseline:
+        write_json(args.write_baseline, payload)
+        logger.info(f"Wrote baseline {args.write_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))["results"]
+        regressions = find_regressions(results, baseline, args.threshold,
+                                       args.min_delta_ms, args.min_delta_kb)
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        if regressions:
+            return 1
+        logger.info("✅ No import-time regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
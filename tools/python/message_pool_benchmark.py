@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark building BulkRequests with and without helpers.message_pool.
+
+Builds and serializes --docs documents in batches of --batch, once creating a
+new BulkRequest per batch as chunk-and-send code usually does, and once
+refilling requests from a BulkRequestPool. For each it reports documents per
+second, Python heap bytes allocated per document (tracemalloc, measured in a
+separate pass since tracing slows everything down), cyclic GC collections
+per thousand documents, GC pause times (gc.callbacks) and the growth of the
+process's peak RSS. --live-objects keeps that many extra objects alive, as a
+long-running indexer would, which makes every full collection slower.
+
+Usage:
+    export PYTHONPATH=bazel-bin
+    python3 tools/python/message_pool_benchmark.py --docs 200000 --batch 500
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+from google.protobuf.internal import api_implementation
+
+from opensearch.protobufs.schemas import BulkRequest
+from helpers.bulk import to_bulk_request_body
+from helpers.message_pool import BulkRequestPool
+
+SCENARIOS = ["fresh", "pooled"]
+
+
+def sample_actions(count: int, as_bytes: bool) -> List[Any]:
+    """Return count bulk actions, as JSON bytes or as mappings with an _id."""
+    actions = []
+    for number in range(count):
+        document = {"_id": str(number), "message": f"event {number}", "status": 200 + number % 5,
+                    "host": f"web-{number % 7}"}
+        if as_bytes:
+            del document["_id"]
+            actions.append(json.dumps(document).encode("utf-8"))
+        else:
+            actions.append(document)
+    return actions
+
+
+def fresh_batches(actions: List[Any]) -> Callable[[], int]:
+    """Return a function that builds and serializes one new BulkRequest."""
+    def build_once() -> int:
+        request = BulkRequest(index="logs")
+        request.bulk_request_body.extend(to_bulk_request_body(action) for action in actions)
+        return len(request.SerializeToString())
+    return build_once
+
+
+def pooled_batches(actions: List[Any], max_reuses: Any) -> Callable[[], int]:
+    """Return a function that builds, serializes and releases one pooled BulkRequest."""
+    kwargs = {} if max_reuses is None else {"max_reuses": max_reuses or None}
+    pool = BulkRequestPool(index="logs", **kwargs)
+
+    def build_once() -> int:
+        request = pool.build(actions)
+        size = len(request.SerializeToString())
+        pool.release(request)
+        return size
+    return build_once
+
+
+class GCPauses:
+    """Records the duration of every cyclic collection while installed."""
+
+    def __init__(self):
+        self.pauses: List[float] = []
+        self._started = 0.0
+
+    def __call__(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+        else:
+            self.pauses.append(time.perf_counter() - self._started)
+
+    def __enter__(self) -> "GCPauses":
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        gc.callbacks.remove(self)
+
+
+def peak_rss_bytes() -> int:
+    """Return the peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_scenario(build_once: Callable[[], int], batches: int, docs_per_batch: int) -> Dict[str, Any]:
+    """Time batches calls of build_once and return the measurements."""
+    documents = batches * docs_per_batch
+    build_once()
+    gc.collect()
+    rss_before = peak_rss_bytes()
+    with GCPauses() as pauses:
+        start = time.perf_counter()
+        sent = sum(build_once() for _ in range(batches))
+        elapsed = time.perf_counter() - start
+    rss_growth = peak_rss_bytes() - rss_before
+
+    tracemalloc.start()
+    traced_batches = max(1, batches // 10)
+    allocated_before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for _ in range(traced_batches):
+        build_once()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "docs_per_s": documents / elapsed,
+        "mb_per_s": sent / elapsed / 1e6,
+        "heap_peak_bytes_per_doc": (peak - allocated_before) / docs_per_batch,
+        "heap_retained_bytes": current - allocated_before,
+        "gc_collections_per_1k_docs": len(pauses.pauses) * 1000.0 / documents,
+        "gc_pause_ms_total": sum(pauses.pauses) * 1000.0,
+        "gc_pause_ms_max": max(pauses.pauses, default=0.0) * 1000.0,
+        "peak_rss_growth_bytes": rss_growth,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the selected scenarios and return the payload."""
+    # Kept alive for the whole run so full collections have a realistic heap to traverse.
+    live = [{"n": number} for number in range(args.live_objects)]
+    actions = sample_actions(args.batch, args.source == "bytes")
+    batches = max(1, args.docs // args.batch)
+    factories = {
+        "fresh": lambda: fresh_batches(actions),
+        "pooled": lambda: pooled_batches(actions, args.max_reuses),
+    }
+    results = {scenario: run_scenario(factories[scenario](), batches, args.batch) for scenario in args.scenarios}
+    del live
+    return {
+        "python": sys.version.split()[0],
+        "protobuf_backend": api_implementation.Type(),
+        "config": vars(args),
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and print a JSON summary."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--docs", type=int, default=100000, help="Documents per scenario")
+    parser.add_argument("--batch", type=int, default=500, help="Documents per BulkRequest")
+    parser.add_argument("--source", choices=["bytes", "json"], default="bytes",
+                        help="Pre-encoded JSON sources, or mappings serialized per batch")
+    parser.add_argument("--max-reuses", type=int,
+                        help="Uses before a pooled request is retired, 0 for never (default: per backend)")
+    parser.add_argument("--live-objects", type=int, default=0, help="Extra objects kept alive during the run")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
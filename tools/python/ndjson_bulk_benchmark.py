@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark helpers.ndjson_bulk against re-encoding _bulk NDJSON documents.
+
+Writes a synthetic _bulk NDJSON file of index actions and turns it into
+serialized BulkRequests three ways:
+
+- reparse: json.loads every action and document line and feed the dicts to
+  bulk.chunk_bulk_requests(), which dumps the documents again;
+- messages: ndjson_bulk_requests() followed by SerializeToString();
+- raw: transcode_ndjson_bulk().
+
+Reports input MB/s and the tracemalloc peak of each run. The file is read
+through mmap, so the peak should stay near one BulkRequest whatever --docs is.
+
+Usage:
+    export PYTHONPATH=bazel-bin
+    python3 tools/python/ndjson_bulk_benchmark.py --docs 100000 --doc-bytes 1024
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+from google.protobuf.internal import api_implementation
+
+from helpers.bulk import chunk_bulk_requests
+from helpers.ndjson_bulk import ndjson_bulk_requests, transcode_ndjson_bulk
+
+SCENARIOS = ["reparse", "messages", "raw"]
+
+
+def write_ndjson(path: str, docs: int, doc_bytes: int, seed: int = 0) -> int:
+    """Write docs index actions to path and return the file size."""
+    generator = random.Random(seed)
+    with open(path, "wb") as file:
+        for number in range(docs):
+            action = {"index": {"_index": "logs", "_id": str(number)}}
+            document = {
+                "timestamp": 1700000000 + number,
+                "level": generator.choice(["INFO", "WARN", "ERROR"]),
+                "message": "x" * max(0, doc_bytes - 64),
+            }
+            file.write(json.dumps(action, separators=(",", ":")).encode("utf-8") + b"\n")
+            file.write(json.dumps(document, separators=(",", ":")).encode("utf-8") + b"\n")
+    return os.path.getsize(path)
+
+
+def _reparsed_actions(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "rb") as file:
+        for action_line in file:
+            metadata = json.loads(action_line)["index"]
+            document = json.loads(next(file))
+            document["_id"] = metadata["_id"]
+            document["_index"] = metadata["_index"]
+            yield document
+
+
+def scenario_functions(path: str, max_actions: int) -> Dict[str, Callable[[], Iterator[bytes]]]:
+    """Return one callable per scenario yielding the serialized requests."""
+
+    def reparse():
+        requests = chunk_bulk_requests(_reparsed_actions(path), max_actions=max_actions)
+        return (request.SerializeToString() for request in requests)
+
+    def messages():
+        return (request.SerializeToString() for request in ndjson_bulk_requests(path, max_actions=max_actions))
+
+    def raw():
+        return transcode_ndjson_bulk(path, max_actions=max_actions)
+
+    return {"reparse": reparse, "messages": messages, "raw": raw}
+
+
+def measure(function: Callable[[], Iterator[bytes]], size: int) -> Dict[str, float]:
+    """Run function once, keeping only one request alive at a time."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    requests = sum(1 for _ in function())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"mb_per_s": size / elapsed / 1e6, "seconds": elapsed, "peak_kib": peak / 1024, "requests": requests}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and print a JSON summary."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--docs", type=int, default=100000, help="Index actions in the generated file")
+    parser.add_argument("--doc-bytes", type=int, default=1024, help="Approximate bytes per document line")
+    parser.add_argument("--max-actions", type=int, default=500, help="Actions per BulkRequest")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bulk.ndjson")
+        size = write_ndjson(path, args.docs, args.doc_bytes)
+        functions = scenario_functions(path, args.max_actions)
+        results = {scenario: measure(functions[scenario], size) for scenario in args.scenarios}
+    print(json.dumps({"backend": api_implementation.Type(), "config": vars(args), "input_bytes": size,
+                      "results": results}, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark helpers.object_map against google.protobuf.json_format.
+
+Builds a page of hits whose fields ObjectMap holds a mixed document and times
+decoding and encoding it with the helpers, with a straightforward recursive
+decoder, and with json_format (which produces/consumes the message-shaped
+JSON rather than plain values, but is what callers otherwise reach for).
+
+Usage:
+    export PYTHONPATH=bazel-bin
+    python3 tools/python/object_map_benchmark.py --hits 1000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict, List
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+from google.protobuf import json_format
+from google.protobuf.internal import api_implementation
+
+from opensearch.protobufs.schemas import HitsMetadataHitsInner, ObjectMap
+from helpers.object_map import (
+    dict_to_object_map,
+    hits_object_maps_to_dicts,
+    object_map_to_dict,
+    object_map_to_json,
+)
+
+
+def sample_document(seed: int) -> Dict[str, Any]:
+    """Return a representative document with nested objects and lists."""
+    return {
+        "title": f"document {seed}",
+        "views": seed * 31,
+        "timestamp": 1700000000000 + seed,
+        "score": seed / 7.0,
+        "published": seed % 2 == 0,
+        "tags": ["alpha", "beta", "gamma", seed],
+        "author": {"name": "someone", "id": seed, "roles": ["editor", None]},
+        "metrics": [{"k": "p50", "v": 1.5}, {"k": "p99", "v": 9.25}],
+    }
+
+
+def recursive_to_python(value: ObjectMap.Value) -> Any:
+    """Naive recursive decoder, as typically hand-written."""
+    kind = value.WhichOneof("value")
+    if kind == "object_map":
+        return {key: recursive_to_python(item) for key, item in value.object_map.fields.items()}
+    if kind == "list_value":
+        return [recursive_to_python(item) for item in value.list_value.value]
+    if kind in (None, "null_value"):
+        return None
+    return getattr(value, kind)
+
+
+def time_call(function: Callable[[], Any], repeat: int) -> float:
+    """Return the best wall time in milliseconds over repeat runs."""
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1000.0
+
+
+def main(argv: List[str] = None) -> int:
+    """Run the benchmark and print a JSON summary."""
+    parser = argparse.ArgumentParser(description="ObjectMap codec benchmark")
+    parser.add_argument("--hits", type=int, default=1000, help="Hits per page")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args(argv)
+
+    documents = [sample_document(i) for i in range(args.hits)]
+    hits = [HitsMetadataHitsInner(x_id=str(i)) for i in range(args.hits)]
+    for hit, document in zip(hits, documents):
+        dict_to_object_map(document, hit.fields)
+    maps = [hit.fields for hit in hits]
+    message_dicts = [json_format.MessageToDict(message) for message in maps]
+
+    results = {
+        "decode_helpers_batch_ms": time_call(lambda: hits_object_maps_to_dicts(hits), args.repeat),
+        "decode_helpers_ms": time_call(lambda: [object_map_to_dict(m) for m in maps], args.repeat),
+        "decode_recursive_ms": time_call(
+            lambda: [{k: recursive_to_python(v) for k, v in m.fields.items()} for m in maps], args.repeat),
+        "decode_json_format_ms": time_call(lambda: [json_format.MessageToDict(m) for m in maps], args.repeat),
+        "encode_helpers_ms": time_call(lambda: [dict_to_object_map(d) for d in documents], args.repeat),
+        "encode_json_format_ms": time_call(
+            lambda: [json_format.ParseDict(d, ObjectMap()) for d in message_dicts], args.repeat),
+        "to_json_helpers_ms": time_call(lambda: [object_map_to_json(m) for m in maps], args.repeat),
+        "to_json_json_format_ms": time_call(lambda: [json_format.MessageToJson(m) for m in maps], args.repeat),
+    }
+
+    print(json.dumps({"backend": api_implementation.Type(), "hits": args.hits, "results": results},
+                     indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
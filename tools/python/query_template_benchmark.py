@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark helpers.query_template against building SearchRequestBody from scratch.
+
+Serializes a filtered kNN query with a few changing values (a term, a price
+range, a list of brands and a query vector) three ways:
+
+- scratch: substitute the values into the query dict and ParseDict it, as
+  services typically do on every call;
+- bind: QueryTemplate.bind() followed by SerializeToString();
+- bind_bytes: QueryTemplate.bind_bytes().
+
+Usage:
+    export PYTHONPATH=bazel-bin
+    python3 tools/python/query_template_benchmark.py --queries 2000 --dimension 768
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+from google.protobuf import json_format
+from google.protobuf.internal import api_implementation
+
+from opensearch.protobufs.schemas import SearchRequestBody
+from helpers.query_template import Param, compile_template
+
+SCENARIOS = ["scratch", "bind", "bind_bytes"]
+
+
+def query(color: Any, min_price: Any, brands: Any, vector: Any, filters: int) -> Dict[str, Any]:
+    """Return the benchmark query with the given values, which may be placeholders."""
+    static_filters = [{"exists": {"field": f"attribute_{number}"}} for number in range(filters)]
+    return {
+        "size": 10,
+        "x_source": {"fetch": False},
+        "query": {"bool": {
+            "filter": [
+                {"term": {"field": "color", "value": {"string": color}}},
+                {"range": {"number_range_query": {"field": "price", "gte": min_price, "lte": 1000}}},
+                {"terms": {"terms": {"brand": brands}}},
+            ] + static_filters,
+            "must": [{"knn": {"field": "embedding", "k": 10, "vector": vector}}],
+        }},
+    }
+
+
+def sample_values(count: int, dimension: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Return count sets of parameter values."""
+    generator = random.Random(seed)
+    return [{
+        "color": generator.choice(["red", "green", "blue"]),
+        "min_price": generator.randint(0, 500),
+        "brands": {"value": {"field_value_array": [{"string": f"brand-{generator.randint(0, 99)}"}]}},
+        "vector": [generator.random() for _ in range(dimension)],
+    } for _ in range(count)]
+
+
+def scenario_functions(values: List[Dict[str, Any]], filters: int) -> Dict[str, Callable[[], Any]]:
+    """Return one callable per scenario serializing a query per value set."""
+    template = compile_template(query(Param("color"), Param("min_price"), Param("brands"), Param("vector"), filters))
+
+    def scratch():
+        return [json_format.ParseDict(query(filters=filters, **value), SearchRequestBody()).SerializeToString()
+                for value in values]
+
+    def bind():
+        return [template.bind(**value).SerializeToString() for value in values]
+
+    def bind_bytes():
+        return [template.bind_bytes(**value) for value in values]
+
+    return {"scratch": scratch, "bind": bind, "bind_bytes": bind_bytes}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and print a JSON summary."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--queries", type=int, default=2000, help="Queries serialized per repetition")
+    parser.add_argument("--dimension", type=int, default=768, help="kNN query vector dimension")
+    parser.add_argument("--filters", type=int, default=10, help="Extra static filter clauses")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args(argv)
+
+    values = sample_values(args.queries, args.dimension)
+    functions = scenario_functions(values, args.filters)
+    results = {
+        f"{scenario}_us_per_query": min(timeit.repeat(functions[scenario], number=1, repeat=args.repeat))
+        * 1e6 / args.queries
+        for scenario in SCENARIOS
+    }
+    print(json.dumps({"backend": api_implementation.Type(), "config": vars(args), "results": results},
+                     indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/aggregations.py
+
+Requires the generated opensearch.protobufs package and numpy on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise. Arrow cases also need pyarrow.
+"""
+
+import math
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import numpy
+    from opensearch.protobufs.schemas import Aggregate, NULL_VALUE_NULL, SearchResponse
+    from helpers.aggregations import extract_aggregations
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or numpy is not importable: {e}")
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def make_response():
+    """Build hosts (sterms) > status (lterms) > max latency, plus a top-level min."""
+    response = SearchResponse()
+    hosts = response.aggregations["hosts"].sterms
+    for host, statuses in (("a", [(200, 5.0), (500, None)]), ("b", []), ("c", [(404, 1.5)])):
+        bucket = hosts.buckets.add(key=host, doc_count=10 * len(statuses) + 1)
+        if not statuses:
+            continue
+        status_terms = bucket.aggregate["status"].lterms
+        for code, latency in statuses:
+            status = status_terms.buckets.add(doc_count=code // 100, key_as_string=str(code))
+            status.key.signed = code
+            maximum = status.aggregate["latency"].max
+            if latency is None:
+                maximum.value.null_value = NULL_VALUE_NULL
+            else:
+                maximum.value.double = latency
+    response.aggregations["fastest"].min.value.double = 0.25
+    return response
+
+
+class TestExtractAggregations(unittest.TestCase):
+    """Test cases for NumPy output."""
+
+    def test_paths_and_kinds(self):
+        """Test that every path is found with its kind."""
+        tables = extract_aggregations(make_response())
+
+        self.assertEqual({path: table.kind for path, table in tables.items()},
+                         {"hosts": "sterms", "hosts>status": "lterms", "hosts>status>latency": "max",
+                          "fastest": "min"})
+
+    def test_bucket_columns(self):
+        """Test keys, doc counts and parent indices of nested buckets."""
+        tables = extract_aggregations(make_response())
+        hosts = tables["hosts"].columns
+        status = tables["hosts>status"].columns
+
+        self.assertEqual(list(hosts["key"]), ["a", "b", "c"])
+        self.assertEqual(hosts["doc_count"].dtype, numpy.int64)
+        self.assertEqual(list(hosts["doc_count"]), [21, 1, 11])
+        self.assertEqual(list(hosts["parent"]), [-1, -1, -1])
+        self.assertNotIn("key_as_string", hosts)
+
+        self.assertEqual(status["key"].dtype, numpy.int64)
+        self.assertEqual(list(status["key"]), [200, 500, 404])
+        self.assertEqual(list(status["parent"]), [0, 0, 2])
+        self.assertNotIn("key_as_string", status)
+
+    def test_string_columns(self):
+        """Test that strings=True adds key_as_string where the server sent it."""
+        tables = extract_aggregations(make_response(), strings=True)
+
+        self.assertNotIn("key_as_string", tables["hosts"].columns)
+        self.assertEqual(list(tables["hosts>status"].columns["key_as_string"]), ["200", "500", "404"])
+
+    def test_metric_columns(self):
+        """Test metric values, nulls as NaN, and their parents."""
+        tables = extract_aggregations(make_response())
+        latency = tables["hosts>status>latency"].columns
+        fastest = tables["fastest"].columns
+
+        self.assertEqual(latency["value"][0], 5.0)
+        self.assertTrue(math.isnan(latency["value"][1]))
+        self.assertEqual(latency["value"][2], 1.5)
+        self.assertEqual(list(latency["parent"]), [0, 1, 2])
+        self.assertEqual(list(fastest["value"]), [0.25])
+        self.assertEqual(list(fastest["parent"]), [-1])
+
+    def test_other_key_types(self):
+        """Test dterms, ulterms and unsigned lterms keys."""
+        response = SearchResponse()
+        response.aggregations["d"].dterms.buckets.add(key=1.5, doc_count=1)
+        response.aggregations["u"].ulterms.buckets.add(key=2 ** 64 - 1, doc_count=2)
+        long_terms = response.aggregations["l"].lterms
+        long_terms.buckets.add(doc_count=1).key.signed = -1
+        long_terms.buckets.add(doc_count=1).key.unsigned = str(2 ** 63)
+
+        tables = extract_aggregations(response)
+
+        self.assertEqual(tables["d"].columns["key"].dtype, numpy.float64)
+        self.assertEqual(tables["u"].columns["key"].dtype, numpy.uint64)
+        self.assertEqual(int(tables["u"].columns["key"][0]), 2 ** 64 - 1)
+        self.assertEqual(list(tables["l"].columns["key"]), [-1, 2 ** 63])
+
+    def test_unmapped_and_empty(self):
+        """Test that umterms and empty bucket lists produce no rows."""
+        response = SearchResponse()
+        response.aggregations["missing"].umterms.SetInParent()
+        response.aggregations["none"].sterms.SetInParent()
+
+        tables = extract_aggregations(response)
+
+        self.assertNotIn("missing", tables)
+        self.assertEqual(len(tables["none"].columns["key"]), 0)
+        self.assertEqual(len(tables["none"].columns["parent"]), 0)
+
+    def test_kind_conflict(self):
+        """Test that one path holding two kinds raises ValueError."""
+        response = SearchResponse()
+        outer = response.aggregations["outer"].sterms
+        outer.buckets.add(key="x").aggregate["inner"].min.value.double = 1.0
+        outer.buckets.add(key="y").aggregate["inner"].max.value.double = 1.0
+
+        with self.assertRaises(ValueError):
+            extract_aggregations(response)
+
+    def test_accepts_aggregations_map(self):
+        """Test that the aggregations map can be passed directly."""
+        response = make_response()
+
+        self.assertEqual(set(extract_aggregations(response.aggregations)), set(extract_aggregations(response)))
+
+    def test_many_buckets(self):
+        """Test parent ordering over many buckets."""
+        response = SearchResponse()
+        outer = response.aggregations["t"].lterms
+        for number in range(1000):
+            bucket = outer.buckets.add(doc_count=number)
+            bucket.key.signed = number
+            bucket.aggregate["m"].max.value.double = number / 2
+
+        tables = extract_aggregations(response)
+
+        numpy.testing.assert_array_equal(tables["t"].columns["key"], numpy.arange(1000))
+        numpy.testing.assert_array_equal(tables["t>m"].columns["parent"], numpy.arange(1000))
+        numpy.testing.assert_array_equal(tables["t>m"].columns["value"], numpy.arange(1000) / 2)
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestExtractAggregationsArrow(unittest.TestCase):
+    """Test cases for Arrow output."""
+
+    def test_record_batches(self):
+        """Test that each path becomes a RecordBatch with typed columns."""
+        tables = extract_aggregations(make_response(), output="arrow", strings=True)
+        status = tables["hosts>status"].columns
+        latency = tables["hosts>status>latency"].columns
+
+        self.assertEqual(status.schema.names, ["key", "doc_count", "parent", "key_as_string"])
+        self.assertEqual(status.column("key").type, pyarrow.int64())
+        self.assertEqual(status.column("key").to_pylist(), [200, 500, 404])
+        self.assertEqual(tables["hosts"].columns.column("key").to_pylist(), ["a", "b", "c"])
+        self.assertEqual(latency.column("parent").to_pylist(), [0, 1, 2])
+
+    def test_invalid_output(self):
+        """Test that unknown output formats are rejected."""
+        with self.assertRaises(ValueError):
+            extract_aggregations(make_response(), output="pandas")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/bulk.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import json
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from opensearch.protobufs.schemas import BulkRequest, BulkRequestBody, REFRESH_WAIT_FOR
+    from helpers.bulk import chunk_bulk_requests, to_bulk_request_body
+    from helpers._wire import length_delimited_size, varint_size
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+
+def make_body(doc_id: str, size: int) -> BulkRequestBody:
+    """Build an index BulkRequestBody with a source of size bytes."""
+    body = BulkRequestBody(object=b"x" * size)
+    body.operation_container.index.x_id = doc_id
+    return body
+
+
+class TestWireSizes(unittest.TestCase):
+    """Test cases for the wire size arithmetic."""
+
+    def test_varint_size_boundaries(self):
+        """Test varint sizes on either side of each 7-bit boundary."""
+        self.assertEqual(varint_size(0), 1)
+        self.assertEqual(varint_size(127), 1)
+        self.assertEqual(varint_size(128), 2)
+        self.assertEqual(varint_size(16383), 2)
+        self.assertEqual(varint_size(16384), 3)
+
+    def test_length_delimited_size_matches_protobuf(self):
+        """Test that the per-body accounting matches ByteSize()."""
+        for size in (0, 1, 120, 200, 20000):
+            body = make_body("1", size)
+            request = BulkRequest(bulk_request_body=[body])
+            self.assertEqual(length_delimited_size(12, body.ByteSize()), request.ByteSize())
+
+
+class TestToBulkRequestBody(unittest.TestCase):
+    """Test cases for converting documents to BulkRequestBody."""
+
+    def test_body_is_passed_through(self):
+        """Test that BulkRequestBody instances are not copied."""
+        body = make_body("1", 3)
+        self.assertIs(to_bulk_request_body(body), body)
+
+    def test_bytes_become_index_source(self):
+        """Test that bytes are used as the source of an index operation."""
+        body = to_bulk_request_body(b'{"a":1}')
+        self.assertEqual(body.object, b'{"a":1}')
+        self.assertEqual(body.operation_container.WhichOneof("operation_container"), "index")
+
+    def test_mapping_metadata_keys(self):
+        """Test that metadata keys move onto the IndexOperation."""
+        body = to_bulk_request_body({"_id": 7, "_index": "logs", "_routing": "r", "message": "hi"})
+        operation = body.operation_container.index
+        self.assertEqual((operation.x_id, operation.x_index, operation.routing), ("7", "logs", "r"))
+        self.assertEqual(json.loads(body.object), {"message": "hi"})
+
+    def test_unsupported_type(self):
+        """Test that unsupported actions raise TypeError."""
+        with self.assertRaises(TypeError):
+            to_bulk_request_body(42)
+
+
+class TestChunkBulkRequests(unittest.TestCase):
+    """Test cases for chunk_bulk_requests."""
+
+    def test_chunks_respect_byte_budget(self):
+        """Test that every chunk fits the budget and nothing is lost."""
+        bodies = [make_body(str(i), 100 + (i * 37) % 400) for i in range(200)]
+
+        chunks = list(chunk_bulk_requests(bodies, max_bytes=4096, max_actions=1000, index="logs"))
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(chunk.ByteSize(), 4096)
+            self.assertEqual(chunk.index, "logs")
+        ids = [body.operation_container.index.x_id for chunk in chunks for body in chunk.bulk_request_body]
+        self.assertEqual(ids, [str(i) for i in range(200)])
+
+    def test_chunks_are_filled(self):
+        """Test that a chunk is only closed when the next body would not fit."""
+        bodies = [make_body(str(i), 100 + (i * 37) % 400) for i in range(200)]
+
+        chunks = list(chunk_bulk_requests(bodies, max_bytes=4096, max_actions=1000))
+
+        sizes = [length_delimited_size(12, body.ByteSize()) for body in bodies]
+        consumed = 0
+        for chunk in chunks[:-1]:
+            consumed += len(chunk.bulk_request_body)
+            self.assertGreater(chunk.ByteSize() + sizes[consumed], 4096)
+
+    def test_max_actions(self):
+        """Test that chunks hold at most max_actions bodies."""
+        chunks = list(chunk_bulk_requests((b"{}" for _ in range(25)), max_actions=10))
+        self.assertEqual([len(chunk.bulk_request_body) for chunk in chunks], [10, 10, 5])
+
+    def test_template_fields_are_shared(self):
+        """Test that template fields are copied to every chunk but bodies are not."""
+        template = BulkRequest(index="logs", pipeline="p", routing="r", timeout="1m", refresh=REFRESH_WAIT_FOR)
+        template.bulk_request_body.add(object=b"ignored")
+
+        chunks = list(chunk_bulk_requests([b"{}"] * 3, template=template, max_actions=2))
+
+        self.assertEqual(len(chunks), 2)
+        for chunk in chunks:
+            self.assertEqual((chunk.index, chunk.pipeline, chunk.routing, chunk.timeout),
+                             ("logs", "p", "r", "1m"))
+            self.assertEqual(chunk.refresh, REFRESH_WAIT_FOR)
+            self.assertNotIn(b"ignored", [body.object for body in chunk.bulk_request_body])
+        self.assertEqual(len(template.bulk_request_body), 1)
+
+    def test_oversized_action(self):
+        """Test that an action larger than the budget raises ValueError."""
+        with self.assertRaises(ValueError):
+            list(chunk_bulk_requests([make_body("1", 5000)], max_bytes=4096))
+
+    def test_template_and_fields_conflict(self):
+        """Test that template and keyword fields cannot be combined."""
+        with self.assertRaises(ValueError):
+            list(chunk_bulk_requests([], template=BulkRequest(), index="logs"))
+
+    def test_empty_input(self):
+        """Test that no chunks are produced for no actions."""
+        self.assertEqual(list(chunk_bulk_requests([])), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/channel_pool.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import os
+import sys
+import unittest
+from concurrent import futures
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import SearchRequest, SearchResponse
+    from opensearch.protobufs.services import (
+        SearchServiceServicer,
+        SearchServiceStub,
+        add_SearchServiceServicer_to_server,
+    )
+    from helpers.channel_pool import POLICY_LEAST_OUTSTANDING, ChannelPool
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+class FakeFuture:
+    """Completes when finish() is called, running done callbacks."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def add_done_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def finish(self):
+        for callback in self.callbacks:
+            callback(self)
+
+
+class FakeMulticallable:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def __call__(self, request, **kwargs):
+        self.channel.calls += 1
+        return SearchResponse(took=self.channel.number)
+
+    def future(self, request, **kwargs):
+        self.channel.calls += 1
+        future = FakeFuture()
+        self.channel.futures.append(future)
+        return future
+
+
+class FakeChannel:
+    """Stands in for grpc.aio.Channel: exposes get_state() and unary_unary()."""
+
+    created = 0
+
+    def __init__(self, target, options):
+        self.target = target
+        self.options = options
+        self.number = FakeChannel.created
+        FakeChannel.created += 1
+        self.state = grpc.ChannelConnectivity.READY
+        self.calls = 0
+        self.futures = []
+        self.closed = False
+
+    def get_state(self, try_to_connect=False):
+        return self.state
+
+    def unary_unary(self, *args, **kwargs):
+        return FakeMulticallable(self)
+
+    unary_stream = unary_unary
+    stream_unary = unary_unary
+    stream_stream = unary_unary
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChannelPool(unittest.TestCase):
+    """Test cases for channel selection and eviction."""
+
+    def make_pool(self, **kwargs):
+        kwargs.setdefault("channel_factory", FakeChannel)
+        return ChannelPool(["a:9400", "b:9400"], **kwargs)
+
+    def test_channels_per_target_with_separate_connections(self):
+        """Test that every target gets its own channels, each with a local subchannel pool."""
+        pool = self.make_pool(channels_per_target=3)
+
+        self.assertEqual([channel.target for channel in pool.channels], ["a:9400", "b:9400"] * 3)
+        for channel in pool.channels:
+            self.assertIn(("grpc.use_local_subchannel_pool", 1), channel.options)
+
+    def test_round_robin(self):
+        """Test that round robin spreads calls evenly across channels."""
+        pool = self.make_pool()
+        search = pool.stub(SearchServiceStub)
+
+        for _ in range(8):
+            search.Search(SearchRequest())
+
+        self.assertEqual([channel.calls for channel in pool.channels], [2, 2, 2, 2])
+        self.assertEqual([entry["outstanding"] for entry in pool.stats()], [0, 0, 0, 0])
+
+    def test_same_method_surface_as_stub(self):
+        """Test that the pooled stub exposes every method of the generated stub."""
+        pool = self.make_pool()
+        expected = set(vars(SearchServiceStub(FakeChannel("x", ()))))
+
+        self.assertTrue(expected)
+        self.assertEqual({name for name in vars(pool.stub(SearchServiceStub)) if not name.startswith("_")},
+                         expected)
+
+    def test_least_outstanding(self):
+        """Test that the channel with fewest in-flight calls is chosen and released on completion."""
+        pool = self.make_pool(policy=POLICY_LEAST_OUTSTANDING)
+        search = pool.stub(SearchServiceStub)
+
+        pending = [search.Search.future(SearchRequest()) for _ in range(4)]
+        self.assertEqual([entry["outstanding"] for entry in pool.stats()], [1, 1, 1, 1])
+
+        pending[2].finish()
+        search.Search.future(SearchRequest())
+        self.assertEqual(pool.channels[2].calls, 2)
+
+        for index in (0, 1, 3):
+            pending[index].finish()
+        self.assertEqual(pool.stats()[2]["outstanding"], 1)
+
+    def test_unhealthy_channels_skipped(self):
+        """Test that channels in TRANSIENT_FAILURE receive no calls while others are healthy."""
+        pool = self.make_pool()
+        pool.channels[0].state = grpc.ChannelConnectivity.TRANSIENT_FAILURE
+        search = pool.stub(SearchServiceStub)
+
+        for _ in range(6):
+            search.Search(SearchRequest())
+
+        self.assertEqual([channel.calls for channel in pool.channels], [0, 2, 2, 2])
+
+    def test_all_unhealthy_still_dispatches(self):
+        """Test that calls still go out when no channel is healthy."""
+        pool = self.make_pool()
+        for channel in pool.channels:
+            channel.state = grpc.ChannelConnectivity.TRANSIENT_FAILURE
+
+        pool.stub(SearchServiceStub).Search(SearchRequest())
+
+        self.assertEqual(sum(channel.calls for channel in pool.channels), 1)
+
+    def test_eviction_replaces_channel(self):
+        """Test that a channel unhealthy for evict_after seconds is closed and reopened."""
+        clock = FakeClock()
+        pool = self.make_pool(evict_after=10.0, clock=clock)
+        search = pool.stub(SearchServiceStub)
+        broken = pool.channels[1]
+        broken.state = grpc.ChannelConnectivity.TRANSIENT_FAILURE
+
+        search.Search(SearchRequest())
+        clock.now = 5.0
+        search.Search(SearchRequest())
+        self.assertIs(pool.channels[1], broken)
+
+        clock.now = 10.0
+        response = search.Search(SearchRequest())
+        replacement = pool.channels[1]
+        self.assertIsNot(replacement, broken)
+        self.assertTrue(broken.closed)
+        self.assertEqual(replacement.target, "b:9400")
+
+        for _ in range(4):
+            search.Search(SearchRequest())
+        self.assertGreater(replacement.calls, 0)
+        self.assertIsInstance(response, SearchResponse)
+
+    def test_invalid_arguments(self):
+        """Test that bad configuration is rejected."""
+        with self.assertRaises(ValueError):
+            ChannelPool([])
+        with self.assertRaises(ValueError):
+            self.make_pool(channels_per_target=0)
+        with self.assertRaises(ValueError):
+            self.make_pool(policy="random")
+
+
+class NodeServicer(SearchServiceServicer):
+    """Answers Search with took set to the node number."""
+
+    def __init__(self, number):
+        self.number = number
+
+    def Search(self, request, context):
+        return SearchResponse(took=self.number)
+
+
+class TestChannelPoolServers(unittest.TestCase):
+    """Test cases against real in-process servers."""
+
+    def setUp(self):
+        self.servers, self.targets = [], []
+        for number in range(2):
+            server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+            add_SearchServiceServicer_to_server(NodeServicer(number), server)
+            port = server.add_insecure_port("127.0.0.1:0")
+            server.start()
+            self.servers.append(server)
+            self.targets.append(f"127.0.0.1:{port}")
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop(None)
+
+    def test_calls_spread_across_nodes(self):
+        """Test that sync unary calls, with_call and future reach both nodes."""
+        pool = ChannelPool(self.targets, channels_per_target=2)
+        try:
+            search = pool.stub(SearchServiceStub)
+            nodes = [search.Search(SearchRequest(), timeout=5).took for _ in range(4)]
+            response, call = search.Search.with_call(SearchRequest(), timeout=5)
+            self.assertEqual(sum(entry["outstanding"] for entry in pool.stats()), 0)
+            future = search.Search.future(SearchRequest(), timeout=5)
+
+            self.assertEqual(sorted(nodes), [0, 0, 1, 1])
+            self.assertIn(response.took, (0, 1))
+            self.assertEqual(call.code(), grpc.StatusCode.OK)
+            self.assertIn(future.result().took, (0, 1))
+        finally:
+            pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
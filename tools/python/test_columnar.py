@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/columnar.py
+
+Requires the generated opensearch.protobufs package and NumPy on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise. Arrow cases are skipped when
+pyarrow is not installed.
+"""
+
+import json
+import math
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import numpy
+    from opensearch.protobufs.schemas import SearchResponse
+    from helpers.columnar import OUTPUT_ARROW, hits_to_columns, iter_hit_batches
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or numpy is not importable: {e}")
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def make_response(start, count, price=lambda i: i * 1.5):
+    """Build a SearchResponse with count hits numbered from start."""
+    response = SearchResponse()
+    for i in range(start, start + count):
+        hit = response.hits.hits.add(x_id=str(i), x_index="idx", x_seq_no=i, x_primary_term=1, x_version=2)
+        hit.x_score.double = float(i)
+        hit.x_source = json.dumps({"price": price(i), "name": f"n{i}", "stock": i, "nested": {"a": i}}).encode()
+        hit.sort.add().general_number.int64_value = i
+    return response
+
+
+class TestNumpyColumns(unittest.TestCase):
+    """Test cases for NumPy output."""
+
+    def test_metadata_and_source_columns(self):
+        """Test the column set and dtypes for a single response."""
+        columns = hits_to_columns(make_response(0, 4), source_fields=["price", "name", "nested.a"])
+
+        self.assertEqual(list(columns), ["_id", "_index", "_score", "_seq_no", "_primary_term", "_version",
+                                         "sort_0", "price", "name", "nested.a"])
+        self.assertEqual(list(columns["_id"]), ["0", "1", "2", "3"])
+        self.assertEqual(columns["_score"].dtype, numpy.float64)
+        self.assertEqual(columns["_seq_no"].dtype, numpy.int64)
+        self.assertEqual(list(columns["sort_0"]), [0, 1, 2, 3])
+        self.assertEqual(columns["price"].dtype, numpy.float64)
+        self.assertEqual(columns["name"].dtype, object)
+        self.assertEqual(list(columns["nested.a"]), [0, 1, 2, 3])
+
+    def test_batches_span_responses(self):
+        """Test that batch_size is honoured across a stream of responses."""
+        stream = (make_response(start, 3) for start in (0, 3, 6))
+
+        batches = list(iter_hit_batches(stream, batch_size=4, metadata=["_id"], include_sort=False))
+
+        self.assertEqual([len(batch["_id"]) for batch in batches], [4, 4, 1])
+        self.assertEqual(list(batches[1]["_id"]), ["4", "5", "6", "7"])
+
+    def test_missing_values(self):
+        """Test NaN, -1 and float promotion for missing values."""
+        response = make_response(0, 2)
+        response.hits.hits.add(x_id="x", x_source=b'{"name": "only"}')
+
+        columns = hits_to_columns(response, source_fields=["stock", "price"])
+
+        self.assertTrue(math.isnan(columns["_score"][2]))
+        self.assertEqual(columns["_seq_no"][2], -1)
+        self.assertEqual(columns["stock"].dtype, numpy.float64)
+        self.assertTrue(math.isnan(columns["stock"][2]))
+
+    def test_inferred_types_only_widen(self):
+        """Test that a float column accepts a later batch of ints."""
+        stream = [make_response(0, 2, price=lambda i: 1.5), make_response(2, 2, price=lambda i: i)]
+
+        batches = list(iter_hit_batches(stream, source_fields=["price"], batch_size=2))
+
+        self.assertEqual([batch["price"].dtype for batch in batches], [numpy.float64, numpy.float64])
+
+    def test_inferred_dtypes_stable_across_batches(self):
+        """Test that inferred int and bool columns keep one dtype whether or not a batch has missing values."""
+        sparse = make_response(2, 1)
+        sparse.hits.hits.add(x_id="x", x_source=b'{"flag": true}')
+        dense = make_response(0, 2)
+        for hit in dense.hits.hits:
+            hit.x_source = hit.x_source[:-1] + b', "flag": false}'
+
+        batches = list(iter_hit_batches([dense, sparse], source_fields=["stock", "flag"], batch_size=2))
+
+        self.assertEqual([batch["stock"].dtype for batch in batches], [numpy.float64, numpy.float64])
+        self.assertEqual([batch["flag"].dtype for batch in batches], [object, object])
+        self.assertEqual(list(batches[0]["stock"]), [0.0, 1.0])
+        self.assertTrue(math.isnan(batches[1]["stock"][1]))
+
+    def test_inferred_type_kept_from_first_batch(self):
+        """Test that a column all missing in its first batch stays object and others reject misfits."""
+        responses = [SearchResponse(), SearchResponse()]
+        for value in (None, None, 1, 2, 2.5, "x"):
+            responses[0].hits.hits.add(x_source=json.dumps({"mixed": value}).encode())
+            if value is not None:
+                responses[1].hits.hits.add(x_source=json.dumps({"mixed": value}).encode())
+
+        batches = list(iter_hit_batches(responses[0], source_fields=["mixed"], metadata=[], batch_size=2))
+        self.assertEqual([batch["mixed"].dtype for batch in batches], [object, object, object])
+        self.assertEqual([list(batch["mixed"]) for batch in batches], [[None, None], [1, 2], [2.5, "x"]])
+        with self.assertRaises(ValueError):
+            list(iter_hit_batches(responses[1], source_fields=["mixed"], metadata=[], batch_size=2))
+
+    def test_fixed_schema(self):
+        """Test that a fixed schema overrides inference."""
+        columns = hits_to_columns(make_response(0, 3), source_fields=["stock"], schema={"stock": "float32",
+                                                                                        "_score": "float32"})
+        self.assertEqual(columns["stock"].dtype, numpy.float32)
+        self.assertEqual(columns["_score"].dtype, numpy.float32)
+
+    def test_fixed_int_schema_rejects_missing(self):
+        """Test that missing values cannot go into a fixed integer column."""
+        response = make_response(0, 1)
+        response.hits.hits.add(x_source=b"{}")
+        with self.assertRaises(ValueError):
+            hits_to_columns(response, source_fields=["stock"], schema={"stock": "int64"})
+
+    def test_invalid_arguments(self):
+        """Test argument validation."""
+        with self.assertRaises(ValueError):
+            list(iter_hit_batches(make_response(0, 1), output="pandas"))
+        with self.assertRaises(ValueError):
+            list(iter_hit_batches(make_response(0, 1), schema={"a": "decimal"}))
+        with self.assertRaises(ValueError):
+            list(iter_hit_batches(make_response(0, 1), metadata=["_type"]))
+
+    def test_empty(self):
+        """Test that no hits give no columns."""
+        self.assertEqual(hits_to_columns(SearchResponse()), {})
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrowColumns(unittest.TestCase):
+    """Test cases for Arrow output."""
+
+    def test_record_batch(self):
+        """Test Arrow types and nulls."""
+        response = make_response(0, 2)
+        response.hits.hits.add(x_id="x", x_source=b'{"name": "only"}')
+
+        batch = hits_to_columns(response, source_fields=["stock", "name"], output=OUTPUT_ARROW)
+
+        self.assertEqual(batch.num_rows, 3)
+        self.assertEqual(batch.schema.field("_seq_no").type, pyarrow.int64())
+        self.assertEqual(batch.schema.field("stock").type, pyarrow.float64())
+        self.assertEqual(batch.column("stock").to_pylist(), [0, 1, None])
+        self.assertEqual(batch.column("name").to_pylist(), ["n0", "n1", "only"])
+
+    def test_mixed_values_become_strings(self):
+        """Test that mixed-type columns are stored as strings, JSON-encoding non-strings."""
+        response = SearchResponse()
+        for value in (1, "two", {"three": 3}, None):
+            response.hits.hits.add(x_source=json.dumps({"mixed": value}).encode())
+
+        batch = hits_to_columns(response, source_fields=["mixed"], metadata=[], include_sort=False,
+                                output=OUTPUT_ARROW)
+
+        self.assertEqual(batch.schema.field("mixed").type, pyarrow.string())
+        self.assertEqual(batch.column("mixed").to_pylist(), ["1", "two", '{"three": 3}', None])
+
+    def test_batches_share_a_schema(self):
+        """Test that every batch of a stream concatenates into one table and no column is null-typed."""
+        response = SearchResponse()
+        for value in (None, None, 1, 2, 2.5, "x"):
+            response.hits.hits.add(x_source=json.dumps({"mixed": value, "number": 1}).encode())
+        response.hits.hits[2].x_source = b'{"mixed": 1, "number": 2.5}'
+
+        batches = list(iter_hit_batches(response, source_fields=["mixed", "number"], batch_size=2,
+                                        output=OUTPUT_ARROW))
+        table = pyarrow.Table.from_batches(batches)
+
+        self.assertEqual(table.num_rows, 6)
+        self.assertEqual(table.schema.field("mixed").type, pyarrow.string())
+        self.assertEqual(table.schema.field("number").type, pyarrow.float64())
+        self.assertEqual(table.column("mixed").to_pylist(), [None, None, "1", "2", "2.5", "x"])
+        self.assertEqual(table.column("number").to_pylist(), [1, 1, 2.5, 1, 1, 1])
+        self.assertNotIn(pyarrow.null(), table.schema.types)
+
+    def test_fixed_schema(self):
+        """Test fixed Arrow types."""
+        batch = hits_to_columns(make_response(0, 2), source_fields=["stock"], schema={"stock": "int32"},
+                                output=OUTPUT_ARROW)
+        self.assertEqual(batch.schema.field("stock").type, pyarrow.int32())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/compression.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import asyncio
+import os
+import random
+import struct
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import BulkRequest, SearchRequest
+    from opensearch.protobufs.services import DocumentServiceStub, SearchServiceStub
+    from helpers.compression import CompressionPolicy, MethodRule, compressing_channel
+    from helpers.fake_server import FakeOpenSearch
+    from helpers.raw_bulk import bulk_raw_method, encode_bulk_request
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+BULK = "DocumentService/Bulk"
+SEARCH = "SearchService/Search"
+BULK_PATH = "/org.opensearch.protobufs.services.DocumentService/Bulk"
+
+
+def json_bulk(count=200):
+    """Build a compressible BulkRequest of JSON sources."""
+    request = BulkRequest(index="logs")
+    for number in range(count):
+        body = request.bulk_request_body.add()
+        body.operation_container.index.x_id = str(number)
+        body.object = b'{"message": "GET /index.html HTTP/1.1", "status": 200, "host": "web-%d"}' % (number % 7)
+    return request
+
+
+def vector_bulk(count=50, dimensions=256):
+    """Build a BulkRequest of packed random floats, which do not compress."""
+    generator = random.Random(0)
+    request = BulkRequest(index="vectors")
+    for _ in range(count):
+        values = [generator.random() for _ in range(dimensions)]
+        request.bulk_request_body.add().object = struct.pack(f"<{dimensions}f", *values)
+    return request
+
+
+class RecordingCallable:
+    """Multicallable stand-in that records the keyword arguments of each call."""
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.calls = []
+        self.requests = []
+
+    def __call__(self, request, **kwargs):
+        self.requests.append(self.serializer(request) if self.serializer is not None else request)
+        self.calls.append(kwargs)
+        return "response"
+
+    def future(self, request, **kwargs):
+        return self(request, **kwargs)
+
+
+class RecordingChannel:
+    """Channel stand-in returning RecordingCallable objects."""
+
+    def __init__(self):
+        self.callables = {}
+
+    def unary_unary(self, method, request_serializer=None, response_deserializer=None, _registered_method=False):
+        callable_ = RecordingCallable(request_serializer)
+        self.callables[method] = callable_
+        return callable_
+
+
+class TestCompressionPolicy(unittest.TestCase):
+    """Test cases for per-call decisions and statistics."""
+
+    def setUp(self):
+        self.channel = RecordingChannel()
+        self.policy = CompressionPolicy(default=MethodRule(min_bytes=1024), sample_every=4)
+        self.bulk = compressing_channel(self.channel, self.policy).unary_unary(
+            BULK_PATH, request_serializer=BulkRequest.SerializeToString)
+
+    def compressions(self):
+        return [call["compression"] for call in self.channel.callables[BULK_PATH].calls]
+
+    def test_size_threshold(self):
+        """Test that small requests are sent uncompressed and large ones gzipped."""
+        self.bulk(json_bulk(2))
+        self.bulk(json_bulk(200))
+
+        self.assertEqual(self.compressions(), [grpc.Compression.NoCompression, grpc.Compression.Gzip])
+        stats = self.policy.stats()[BULK]
+        self.assertEqual((stats.calls, stats.compressed_calls, stats.samples), (2, 1, 1))
+        self.assertLess(stats.ratio, 0.3)
+
+    def test_incompressible_payloads_turn_compression_off(self):
+        """Test that after a poor sample the method stops compressing, and recovers."""
+        for _ in range(4):
+            self.bulk(vector_bulk())
+        self.assertEqual(self.compressions()[0], grpc.Compression.Gzip)
+        self.assertEqual(self.compressions()[1:], [grpc.Compression.NoCompression] * 3)
+        self.assertGreater(self.policy.stats()[BULK].ratio, 0.8)
+
+        for _ in range(12):
+            self.bulk.future(json_bulk())
+        self.assertEqual(self.compressions()[-1], grpc.Compression.Gzip)
+        stats = self.policy.stats()[BULK]
+        self.assertEqual(stats.samples, 4)
+        self.assertGreater(stats.estimated_saved_bytes, 0)
+        self.assertGreater(stats.estimated_cpu_seconds, 0)
+
+    def test_rules_and_explicit_compression(self):
+        """Test per-method rules, never-compress methods and caller overrides."""
+        policy = CompressionPolicy(rules={BULK: MethodRule(0, grpc.Compression.Deflate), SEARCH: None})
+        channel = compressing_channel(self.channel, policy)
+        bulk = channel.unary_unary(BULK_PATH, request_serializer=BulkRequest.SerializeToString)
+        search = channel.unary_unary("/org.opensearch.protobufs.services.SearchService/Search",
+                                     request_serializer=SearchRequest.SerializeToString)
+        bulk(json_bulk(1))
+        bulk(json_bulk(1), compression=grpc.Compression.Gzip)
+        search(SearchRequest(q="x" * 100000))
+
+        self.assertEqual(self.compressions(), [grpc.Compression.Deflate, grpc.Compression.Gzip])
+        self.assertEqual(policy.choose(SEARCH, 10 ** 6), grpc.Compression.NoCompression)
+
+    def test_explicit_compression_not_counted(self):
+        """Test that calls with a caller-chosen compression leave the policy's statistics alone."""
+        bulk = compressing_channel(self.channel, self.policy).unary_unary(
+            BULK_PATH, request_serializer=BulkRequest.SerializeToString)
+        for _ in range(5):
+            bulk(json_bulk(200), compression=grpc.Compression.NoCompression)
+
+        self.assertEqual(self.compressions(), [grpc.Compression.NoCompression] * 5)
+        self.assertEqual(self.policy.stats(), {})
+        bulk(json_bulk(200))
+        stats = self.policy.stats()[BULK]
+        self.assertEqual((stats.calls, stats.compressed_calls, stats.samples), (1, 1, 1))
+
+    def test_serializes_once(self):
+        """Test that each request is serialized once and gRPC receives the resulting bytes."""
+        serialized = []
+
+        def serializer(request):
+            serialized.append(request)
+            return request.SerializeToString()
+
+        bulk = compressing_channel(self.channel, self.policy).unary_unary(BULK_PATH, request_serializer=serializer)
+        request = json_bulk(200)
+        bulk(request)
+        bulk(request, compression=grpc.Compression.Deflate)
+
+        self.assertEqual(len(serialized), 2)
+        self.assertEqual(self.channel.callables[BULK_PATH].serializer, None)
+        self.assertEqual(self.channel.callables[BULK_PATH].requests, [request.SerializeToString()] * 2)
+        self.assertEqual(self.compressions(), [grpc.Compression.Gzip, grpc.Compression.Deflate])
+
+    def test_pre_serialized_requests(self):
+        """Test that bytes requests are sized with len() and sampled."""
+        raw = compressing_channel(self.channel, self.policy).unary_unary(BULK_PATH)
+        raw(encode_bulk_request([b'{"a": "aaaaaaaaaaaaaaaa"}'] * 200))
+
+        self.assertEqual(self.compressions(), [grpc.Compression.Gzip])
+        self.assertEqual(self.policy.stats()[BULK].samples, 1)
+
+
+class TestCompressionEndToEnd(unittest.TestCase):
+    """Test cases against the fake server."""
+
+    def setUp(self):
+        self.fake = FakeOpenSearch(seed=0)
+        self.target = self.fake.start()
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def test_sync_and_aio_calls(self):
+        """Test that compressed and uncompressed calls succeed on both channel kinds."""
+        policy = CompressionPolicy(default=MethodRule(min_bytes=1024))
+        with compressing_channel(grpc.insecure_channel(self.target), policy) as channel:
+            response = DocumentServiceStub(channel).Bulk(json_bulk(), timeout=5)
+            SearchServiceStub(channel).Search(SearchRequest(index=["a"]), timeout=5)
+            bulk_raw_method(channel)(encode_bulk_request([b'{"a": 1}'] * 100), timeout=5)
+        self.assertEqual(len(response.items), 200)
+
+        async def run():
+            async with compressing_channel(grpc.aio.insecure_channel(self.target), policy) as channel:
+                return await DocumentServiceStub(channel).Bulk(json_bulk(), timeout=5)
+
+        self.assertEqual(len(asyncio.run(run()).items), 200)
+        stats = policy.stats()
+        self.assertEqual(stats[BULK].compressed_calls, 3)
+        self.assertEqual(stats[SEARCH].compressed_calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/export.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import SearchRequestBody
+    from helpers.export import export_pit_to_files, iter_pit_export
+    from helpers.fake_server import FakeOpenSearch
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+def hit_id(hit):
+    """Transform used by the workers; module level so it can be pickled."""
+    return int(hit.x_id)
+
+
+class PrettySourceServer(FakeOpenSearch):
+    """Fake server whose _source bytes are pretty-printed JSON with a trailing newline."""
+
+    def _add_hit(self, page, number):
+        hit = super()._add_hit(page, number)
+        hit.x_source = json.dumps(json.loads(hit.x_source), indent=2).encode() + b"\r\n"
+        return hit
+
+
+def failing_transform(hit):
+    """Transform that breaks on one document."""
+    if hit.x_id == "57":
+        raise RuntimeError("bad document")
+    return hit.x_id
+
+
+class TestPitExport(unittest.TestCase):
+    """Test cases running slice workers against the fake server's PIT corpus."""
+
+    def setUp(self):
+        self.fake = FakeOpenSearch(documents=523, source_size=40)
+        self.target = self.fake.start()
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def test_iter_export_covers_every_document(self):
+        """Test that all slices together yield every document exactly once."""
+        pages = list(iter_pit_export(self.target, "logs", slices=3, page_size=50, transform=hit_id, timeout=10))
+        ids = [item for page in pages for item in page.items]
+
+        self.assertEqual(sorted(ids), list(range(523)))
+        self.assertEqual({page.slice_id for page in pages}, {0, 1, 2})
+        for page in pages:
+            self.assertTrue(all(item % 3 == page.slice_id for item in page.items))
+        self.assertEqual(self.fake.open_pits, set())
+        self.assertEqual(self.fake.calls["CreatePit"], 1)
+        self.assertEqual(self.fake.calls["DeletePit"], 1)
+
+    def test_single_slice_pages_with_search_after(self):
+        """Test that one slice pages through the corpus in sort order."""
+        pages = list(iter_pit_export(self.target, ["logs"], slices=1, page_size=100, transform=hit_id))
+
+        self.assertEqual([item for page in pages for item in page.items], list(range(523)))
+        self.assertEqual(len(pages), 6)
+
+    def test_body_options_preserved(self):
+        """Test that the caller's body is used but size and sort are overridden."""
+        body = SearchRequestBody(size=3, track_scores=True)
+
+        pages = list(iter_pit_export(self.target, "logs", slices=2, body=body, page_size=200, transform=hit_id))
+
+        self.assertEqual(sum(len(page.items) for page in pages), 523)
+        self.assertEqual(body.size, 3)
+
+    def test_export_to_files(self):
+        """Test that every worker writes its slice as NDJSON."""
+        with tempfile.TemporaryDirectory() as directory:
+            summary = export_pit_to_files(self.target, "logs", directory, slices=4, page_size=64)
+            ids = []
+            for path in summary.files:
+                with open(path, "rb") as handle:
+                    ids.extend(json.loads(line)["id"] for line in handle)
+
+        self.assertEqual(summary.hits, 523)
+        self.assertEqual(sum(summary.hits_per_slice), 523)
+        self.assertEqual(len(summary.files), 4)
+        self.assertEqual(sorted(ids), list(range(523)))
+        self.assertEqual(self.fake.open_pits, set())
+
+    def test_export_to_files_pretty_sources(self):
+        """Test that pretty-printed sources are still written one document per line."""
+        self.tearDown()
+        self.fake = PrettySourceServer(documents=50, source_size=40)
+        self.target = self.fake.start()
+        with tempfile.TemporaryDirectory() as directory:
+            summary = export_pit_to_files(self.target, "logs", directory, slices=2, page_size=16)
+            lines = []
+            for path in summary.files:
+                with open(path, "rb") as handle:
+                    lines.extend(handle.read().splitlines())
+
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(sorted(json.loads(line)["id"] for line in lines), list(range(50)))
+
+    def test_worker_failure_deletes_pit(self):
+        """Test that a failing worker surfaces its error and the PIT is still deleted."""
+        with self.assertRaises(RuntimeError):
+            list(iter_pit_export(self.target, "logs", slices=2, page_size=20, transform=failing_transform))
+
+        self.assertEqual(self.fake.open_pits, set())
+
+    def test_early_exit_deletes_pit(self):
+        """Test that abandoning the iterator stops the workers and deletes the PIT."""
+        pages = iter_pit_export(self.target, "logs", slices=2, page_size=10, transform=hit_id,
+                                max_buffered_pages=1)
+        next(pages)
+        pages.close()
+
+        self.assertEqual(self.fake.open_pits, set())
+
+    def test_early_exit_with_large_pages(self):
+        """Test that abandoning the iterator with pages still in the pipe does not hang and deletes the PIT."""
+        self.tearDown()
+        self.fake = FakeOpenSearch(documents=2000, source_size=4096)
+        self.target = self.fake.start()
+        pages = iter_pit_export(self.target, "logs", slices=2, page_size=500, max_buffered_pages=2)
+        next(pages)
+        pages.close()
+
+        self.assertEqual(self.fake.open_pits, set())
+        self.assertEqual(self.fake.calls["DeletePit"], 1)
+
+    def test_create_pit_failure(self):
+        """Test that a failed CreatePit raises before any worker starts."""
+        self.fake.rpc_error_rate = 1.0
+
+        with self.assertRaises(grpc.RpcError):
+            list(iter_pit_export(self.target, "logs", slices=2))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
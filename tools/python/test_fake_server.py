@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/fake_server.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import (
+        BulkRequest,
+        CreatePitRequest,
+        DeletePitRequest,
+        MlPredictModelStreamRequest,
+        SearchRequest,
+        Status,
+    )
+    from opensearch.protobufs.services import DocumentServiceStub, MLServiceStub, SearchServiceStub
+    from helpers.bulk import to_bulk_request_body
+    from helpers.fake_server import REJECTED_ERROR_TYPE, FakeOpenSearch
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+def bulk_request(count):
+    """Build a BulkRequest with count index actions."""
+    request = BulkRequest()
+    request.bulk_request_body.extend(to_bulk_request_body({"_id": str(i), "n": i}) for i in range(count))
+    return request
+
+
+class FakeServerTestCase(unittest.TestCase):
+    """Starts a FakeOpenSearch configured by server_config per test."""
+
+    server_config = {}
+
+    def setUp(self):
+        self.fake = FakeOpenSearch(seed=0, **self.server_config)
+        self.channel = grpc.insecure_channel(self.fake.start())
+
+    def tearDown(self):
+        self.channel.close()
+        self.fake.stop()
+
+
+class TestFakeServer(FakeServerTestCase):
+    """Test cases for the default, error-free configuration."""
+
+    server_config = {"hits_per_page": 7, "source_size": 100, "stream_pages": 3, "stream_chunks": 4}
+
+    def test_bulk(self):
+        """Test that every action gets a successful item with its id."""
+        response = DocumentServiceStub(self.channel).Bulk(bulk_request(5), timeout=5)
+
+        self.assertFalse(response.errors)
+        self.assertEqual([item.index.x_id for item in response.items], ["0", "1", "2", "3", "4"])
+        self.assertEqual({item.index.status for item in response.items}, {201})
+        self.assertEqual(self.fake.calls["Bulk"], 1)
+
+    def test_search_pages(self):
+        """Test that Search returns hits_per_page hits unless size is requested."""
+        stub = SearchServiceStub(self.channel)
+        request = SearchRequest()
+
+        default = stub.Search(request, timeout=5)
+        request.search_request_body.size = 3
+        sized = stub.Search(request, timeout=5)
+
+        self.assertEqual(len(default.hits.hits), 7)
+        self.assertEqual(len(sized.hits.hits), 3)
+        self.assertEqual(len(default.hits.hits[0].x_source), 100)
+
+    def test_server_stream_search(self):
+        """Test that ServerStreamSearch yields stream_pages pages."""
+        pages = list(SearchServiceStub(self.channel).ServerStreamSearch(SearchRequest(), timeout=5))
+
+        self.assertEqual([len(page.hits.hits) for page in pages], [7, 7, 7])
+
+    def test_pit_lifecycle(self):
+        """Test that CreatePit returns an id that DeletePit reports as deleted."""
+        stub = SearchServiceStub(self.channel)
+
+        pit_id = stub.CreatePit(CreatePitRequest(index=["a"], keep_alive="1m"), timeout=5).pit_id
+        deleted = stub.DeletePit(DeletePitRequest(pit_id=[pit_id]), timeout=5)
+
+        self.assertTrue(pit_id)
+        self.assertEqual([(pit.pit_id, pit.successful) for pit in deleted.pits], [(pit_id, True)])
+
+    def test_predict_stream(self):
+        """Test that PredictModelStream yields stream_chunks frames, the last one completed."""
+        frames = list(MLServiceStub(self.channel).PredictModelStream(MlPredictModelStreamRequest(model_id="m"),
+                                                                     timeout=5))
+
+        self.assertEqual(len(frames), 4)
+        self.assertEqual(frames[-1].status, Status.STATUS_COMPLETED)
+        self.assertFalse(frames[0].HasField("status"))
+
+
+class TestFakeServerFailures(FakeServerTestCase):
+    """Test cases for injected failures."""
+
+    server_config = {"bulk_failure_rate": 0.5}
+
+    def test_partial_bulk_failures(self):
+        """Test that some items are rejected with 429 and errors is set."""
+        response = DocumentServiceStub(self.channel).Bulk(bulk_request(50), timeout=5)
+        statuses = [item.index.status for item in response.items]
+
+        self.assertTrue(response.errors)
+        self.assertEqual(set(statuses), {201, 429})
+        rejected = next(item.index for item in response.items if item.index.status == 429)
+        self.assertEqual(rejected.error.type, REJECTED_ERROR_TYPE)
+
+
+class TestFakeServerRpcErrors(FakeServerTestCase):
+    """Test cases for injected RPC errors."""
+
+    server_config = {"rpc_error_rate": 1.0}
+
+    def test_rpc_errors(self):
+        """Test that calls fail with RESOURCE_EXHAUSTED."""
+        with self.assertRaises(grpc.RpcError) as raised:
+            SearchServiceStub(self.channel).Search(SearchRequest(), timeout=5)
+
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertIn("429", raised.exception.details())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/hits.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import json
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from opensearch.protobufs.schemas import FieldValue, NULL_VALUE_NULL, SearchResponse
+    from helpers import hits as hits_module
+    from helpers.hits import HitViews, field_value_to_python
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+
+SOURCE = {
+    "title": "a \"quoted\" title, with {braces} and [brackets]",
+    "vector": [0.1, 0.2, 0.3],
+    "author": {"name": "x", "tags": ["t1", {"deep": "}"}]},
+    "count": 7,
+    "flag": False,
+    "nothing": None,
+}
+
+
+def make_response(count=3):
+    """Build a SearchResponse with count hits."""
+    response = SearchResponse()
+    for i in range(count):
+        hit = response.hits.hits.add(x_id=str(i), x_index="idx", x_routing="r", x_seq_no=i, x_version=1)
+        hit.x_score.double = 1.0 / (i + 1)
+        hit.x_source = json.dumps(dict(SOURCE, count=i)).encode("utf-8")
+        hit.sort.add(string=f"s{i}")
+        hit.sort.add().general_number.int64_value = i
+    return response
+
+
+class TestFieldValue(unittest.TestCase):
+    """Test cases for field_value_to_python."""
+
+    def test_variants(self):
+        """Test each FieldValue variant."""
+        self.assertEqual(field_value_to_python(FieldValue(string="a")), "a")
+        self.assertEqual(field_value_to_python(FieldValue(bool=True)), True)
+        number = FieldValue()
+        number.general_number.double_value = 1.5
+        self.assertEqual(field_value_to_python(number), 1.5)
+        self.assertIsNone(field_value_to_python(FieldValue(null_value=NULL_VALUE_NULL)))
+
+
+class TestHitViews(unittest.TestCase):
+    """Test cases for HitViews and HitView."""
+
+    def test_metadata_properties(self):
+        """Test the cheap metadata properties."""
+        view = HitViews(make_response())[1]
+        self.assertEqual((view.id, view.index, view.routing), ("1", "idx", "r"))
+        self.assertEqual(view.score, 0.5)
+        self.assertEqual(view.sort, ("s1", 1))
+        self.assertEqual((view.seq_no, view.version), (1, 1))
+        self.assertIsNone(view.primary_term)
+
+    def test_null_score(self):
+        """Test that a null score is None."""
+        response = make_response(1)
+        response.hits.hits[0].x_score.null_value = NULL_VALUE_NULL
+        self.assertIsNone(HitViews(response)[0].score)
+
+    def test_sequence_behaviour(self):
+        """Test len, iteration, slicing and view reuse."""
+        views = HitViews(make_response(5).hits)
+        self.assertEqual(len(views), 5)
+        self.assertEqual([view.id for view in views], ["0", "1", "2", "3", "4"])
+        self.assertEqual([view.id for view in views[1:4:2]], ["1", "3"])
+        self.assertIs(views[2], views[2])
+
+    def test_source_decoded_once(self):
+        """Test that _source is decoded lazily and cached."""
+        views = HitViews(make_response())
+        with patch.object(hits_module.json, "loads", wraps=json.loads) as loads:
+            view = views[0]
+            self.assertEqual(loads.call_count, 0)
+            self.assertEqual(view.source["count"], 0)
+            view.source
+            self.assertEqual(loads.call_count, 1)
+
+    def test_project_decodes_only_requested_keys(self):
+        """Test projection without decoding the whole document."""
+        view = HitViews(make_response())[2]
+
+        with patch.object(hits_module.json, "loads", wraps=json.loads) as loads:
+            projected = view.project(["count", "author.name", "author.missing", "absent"])
+
+        self.assertEqual(projected, {"count": 2, "author.name": "x"})
+        # Only key strings are parsed with json.loads; the full document never is.
+        self.assertTrue(all(len(call.args[0]) < 20 for call in loads.call_args_list))
+        self.assertEqual(view._fields.keys(), {"count", "author", "absent"})
+
+    def test_project_caches_absent_keys(self):
+        """Test that a key missing from _source is searched for only once."""
+        view = HitViews(make_response())[1]
+        with patch.object(hits_module, "_decode_top_level_keys",
+                          wraps=hits_module._decode_top_level_keys) as decode:
+            self.assertEqual(view.project(["absent", "count"]), {"count": 1})
+            self.assertEqual(view.project(["absent.child"]), {})
+            self.assertIsNone(view.get("absent"))
+        self.assertEqual(decode.call_count, 1)
+
+    def test_get_with_awkward_values(self):
+        """Test skipping strings with escapes and brackets, and falsy values."""
+        view = HitViews(make_response())[0]
+        self.assertEqual(view.get("flag"), False)
+        self.assertIsNone(view.get("nothing", "default"))
+        self.assertEqual(view.get("absent", "default"), "default")
+        self.assertEqual(view.get("author.tags"), ["t1", {"deep": "}"}])
+        self.assertEqual(view.get("title"), SOURCE["title"])
+
+    def test_project_reuses_decoded_source(self):
+        """Test that projection reads the cached full document when present."""
+        view = HitViews(make_response())[0]
+        view.source
+        self.assertEqual(view.project(["vector"]), {"vector": [0.1, 0.2, 0.3]})
+
+    def test_missing_source(self):
+        """Test hits without _source."""
+        response = SearchResponse()
+        response.hits.hits.add(x_id="1")
+        view = HitViews(response)[0]
+        self.assertIsNone(view.raw_source)
+        self.assertIsNone(view.source)
+        self.assertEqual(view.project(["a"]), {})
+
+    def test_malformed_source(self):
+        """Test that a non-object _source raises ValueError on projection."""
+        response = SearchResponse()
+        response.hits.hits.add(x_source=b"[1, 2]")
+        with self.assertRaises(ValueError):
+            HitViews(response)[0].get("a")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit tests for import_benchmark.py
+
+Tests the regression gate and the fresh-interpreter measurement helpers.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add the tools/python directory to the path so we can import the module
+sys.path.insert(0, os.path.dirname(__file__))
+from import_benchmark import (
+    find_regressions,
+    main,
+    measure,
+    result_key,
+)
+
+
+def make_record(target="opensearch.protobufs.schemas", backend="upb", wall_ms=100.0, rss_kb=20000.0):
+    """Build a result record the way measure() does."""
+    return {
+        "target": target,
+        "requested_backend": backend,
+        "backend": backend,
+        "repeat": 1,
+        "wall_ms_median": wall_ms,
+        "wall_ms_min": wall_ms,
+        "rss_kb_median": rss_kb,
+    }
+
+
+class TestFindRegressions(unittest.TestCase):
+    """Test cases for the baseline comparison."""
+
+    def test_no_regression_within_threshold(self):
+        """Test that changes under the relative threshold pass."""
+        regressions = find_regressions([make_record(wall_ms=120.0)], [make_record()], 0.25, 5.0, 2048.0)
+        self.assertEqual(regressions, [])
+
+    def test_wall_time_regression(self):
+        """Test that a wall time regression over threshold and floor is reported."""
+        regressions = find_regressions([make_record(wall_ms=150.0)], [make_record()], 0.25, 5.0, 2048.0)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("opensearch.protobufs.schemas@upb wall_ms_median", regressions[0])
+        self.assertIn("+50%", regressions[0])
+
+    def test_small_absolute_change_is_noise(self):
+        """Test that the absolute floor suppresses regressions on tiny imports."""
+        regressions = find_regressions([make_record(wall_ms=2.0)], [make_record(wall_ms=1.0)], 0.25, 5.0, 2048.0)
+        self.assertEqual(regressions, [])
+
+    def test_rss_regression(self):
+        """Test that RSS growth is gated independently of wall time."""
+        regressions = find_regressions([make_record(rss_kb=40000.0)], [make_record()], 0.25, 5.0, 2048.0)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("rss_kb_median", regressions[0])
+
+    def test_backends_are_compared_separately(self):
+        """Test that records only match the baseline for the same backend."""
+        results = [make_record(backend="python", wall_ms=150.0)]
+        regressions = find_regressions(results, [make_record(backend="upb")], 0.25, 5.0, 2048.0)
+        self.assertEqual(regressions, [])
+        self.assertEqual(result_key(results[0]), "opensearch.protobufs.schemas@python")
+
+
+class TestMeasure(unittest.TestCase):
+    """Test cases for the subprocess measurement."""
+
+    def test_measure_stdlib_module(self):
+        """Test measuring a module in a fresh interpreter."""
+        try:
+            import google.protobuf  # noqa: F401
+        except ImportError:
+            self.skipTest("protobuf is not installed")
+
+        record = measure("json", "python", repeat=2)
+
+        self.assertEqual(record["target"], "json")
+        self.assertEqual(record["backend"], "python")
+        self.assertEqual(record["repeat"], 2)
+        self.assertGreater(record["rss_kb_median"], 0)
+        self.assertLessEqual(record["wall_ms_min"], record["wall_ms_median"])
+
+    def test_measure_failure_raises(self):
+        """Test that a failing import surfaces the child's stderr."""
+        with self.assertRaises(RuntimeError):
+            measure("module_that_does_not_exist", "python", repeat=1)
+
+
+class TestMain(unittest.TestCase):
+    """Test cases for the command line entry point."""
+
+    def setUp(self):
+        """Set up a scratch directory for result files."""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up the scratch directory."""
+        for path in Path(self.test_dir).iterdir():
+            path.unlink()
+        os.rmdir(self.test_dir)
+
+    @patch('import_benchmark.measure')
+    def test_main_fails_on_regression(self, mock_measure):
+        """Test that main returns 1 when the baseline gate trips."""
+        mock_measure.return_value = make_record(wall_ms=500.0)
+        baseline = Path(self.test_dir) / "baseline.json"
+        baseline.write_text(json.dumps({"results": [make_record()]}))
+        output = Path(self.test_dir) / "results.json"
+
+        status = main(["--targets", "opensearch.protobufs.schemas", "--backends", "upb",
+                       "--output", str(output), "--baseline", str(baseline)])
+
+        self.assertEqual(status, 1)
+        self.assertEqual(json.loads(output.read_text())["results"][0]["wall_ms_median"], 500.0)
+
+    @patch('import_benchmark.measure')
+    def test_main_missing_baseline_fails(self, mock_measure):
+        """Test that a missing baseline fails the gate instead of silently passing."""
+        mock_measure.return_value = make_record()
+        output = Path(self.test_dir) / "results.json"
+
+        status = main(["--targets", "opensearch.protobufs.schemas", "--backends", "upb",
+                       "--output", str(output), "--baseline", str(Path(self.test_dir) / "missing.json")])
+
+        self.assertEqual(status, 1)
+        mock_measure.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/ingest.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import BulkResponse
+    from helpers.ingest import AsyncBulkIngester
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+class FakeRpcError(grpc.RpcError):
+    """RpcError carrying a status code, like grpc.aio.AioRpcError."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+class FakeDocumentStub:
+    """Async Bulk stub whose per-document outcome is scripted by document id."""
+
+    def __init__(self, outcomes=None, rpc_errors=()):
+        # id -> list of statuses returned on successive attempts; default 201
+        self.outcomes = {key: list(value) for key, value in (outcomes or {}).items()}
+        self.rpc_errors = list(rpc_errors)
+        self.requests = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def Bulk(self, request, timeout=None, metadata=None):
+        self.requests.append(request)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if self.rpc_errors:
+                raise FakeRpcError(self.rpc_errors.pop(0))
+            response = BulkResponse()
+            for body in request.bulk_request_body:
+                doc_id = body.operation_container.index.x_id
+                statuses = self.outcomes.get(doc_id)
+                status = statuses.pop(0) if statuses else 201
+                item = response.items.add()
+                item.index.status = status
+                item.index.x_id = doc_id
+                if status >= 300:
+                    response.errors = True
+                    item.index.error.type = "rejected"
+            return response
+        finally:
+            self.in_flight -= 1
+
+
+def documents(count):
+    """Build count documents with ids 0..count-1."""
+    return [{"_id": str(i), "n": i} for i in range(count)]
+
+
+def make_ingester(stub, **kwargs):
+    """Build an ingester with fast, deterministic backoff."""
+    kwargs.setdefault("initial_backoff", 0.001)
+    kwargs.setdefault("max_backoff", 0.002)
+    return AsyncBulkIngester(stub, rng=random.Random(0), **kwargs)
+
+
+class TestAsyncBulkIngester(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncBulkIngester."""
+
+    async def test_fast_path(self):
+        """Test that all documents succeed and concurrency is bounded."""
+        stub = FakeDocumentStub()
+
+        summary = await make_ingester(stub, max_actions=10, concurrency=3).ingest(documents(95))
+
+        self.assertEqual(summary.succeeded, 95)
+        self.assertEqual(summary.requests, 10)
+        self.assertEqual((summary.retried, summary.failed), (0, 0))
+        self.assertLessEqual(stub.peak_in_flight, 3)
+        self.assertGreater(stub.peak_in_flight, 1)
+
+    async def test_only_retryable_items_are_resent(self):
+        """Test that 429/503 items are resent alone and permanent failures dead-lettered."""
+        stub = FakeDocumentStub(outcomes={"3": [429, 201], "5": [503, 503, 200], "7": [400]})
+
+        summary = await make_ingester(stub, max_actions=10).ingest(documents(10))
+
+        self.assertEqual(summary.succeeded, 9)
+        self.assertEqual(summary.failed, 1)
+        self.assertEqual(summary.retried, 3)
+        failed = summary.dead_letters[0]
+        self.assertEqual((failed.body.operation_container.index.x_id, failed.status), ("7", 400))
+        self.assertEqual(failed.error.type, "rejected")
+        resent = [[body.operation_container.index.x_id for body in request.bulk_request_body]
+                  for request in stub.requests[1:]]
+        self.assertEqual(sorted(resent), [["3", "5"], ["5"]])
+
+    async def test_retries_exhausted(self):
+        """Test that an item failing every attempt is dead-lettered with its attempt count."""
+        stub = FakeDocumentStub(outcomes={"0": [429] * 10})
+        sink = []
+
+        summary = await make_ingester(stub, max_retries=2, dead_letter=sink.append).ingest(documents(1))
+
+        self.assertEqual(summary.failed, 1)
+        self.assertEqual(summary.dead_letters, [])
+        self.assertEqual((sink[0].status, sink[0].attempts), (429, 3))
+
+    async def test_async_dead_letter_sink(self):
+        """Test that coroutine sinks are awaited."""
+        stub = FakeDocumentStub(outcomes={"1": [404]})
+        sink = []
+
+        async def record(failed):
+            await asyncio.sleep(0)
+            sink.append(failed.status)
+
+        await make_ingester(stub, dead_letter=record).ingest(documents(2))
+
+        self.assertEqual(sink, [404])
+
+    async def test_rpc_error_retry(self):
+        """Test that UNAVAILABLE resends the whole request."""
+        stub = FakeDocumentStub(rpc_errors=[grpc.StatusCode.UNAVAILABLE])
+
+        summary = await make_ingester(stub).ingest(documents(4))
+
+        self.assertEqual(summary.succeeded, 4)
+        self.assertEqual(summary.retried, 4)
+        self.assertEqual(len(stub.requests), 2)
+
+    async def test_rpc_error_permanent(self):
+        """Test that non-retryable RPC errors dead-letter every body."""
+        stub = FakeDocumentStub(rpc_errors=[grpc.StatusCode.INVALID_ARGUMENT])
+
+        summary = await make_ingester(stub).ingest(documents(3))
+
+        self.assertEqual(summary.failed, 3)
+        self.assertIsNone(summary.dead_letters[0].status)
+        self.assertEqual(summary.dead_letters[0].rpc_error.code(), grpc.StatusCode.INVALID_ARGUMENT)
+
+    def test_backoff_is_bounded(self):
+        """Test full-jitter backoff stays within the exponential ceiling."""
+        ingester = AsyncBulkIngester(None, initial_backoff=1.0, max_backoff=8.0, rng=random.Random(1))
+        for attempt in range(1, 10):
+            self.assertLessEqual(ingester.backoff(attempt), min(8.0, 2 ** (attempt - 1)))
+
+    def test_invalid_concurrency(self):
+        """Test argument validation."""
+        with self.assertRaises(ValueError):
+            AsyncBulkIngester(None, concurrency=0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
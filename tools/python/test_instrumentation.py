@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/instrumentation.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import BulkRequest, MlPredictModelStreamRequest, SearchRequest
+    from opensearch.protobufs.services import DocumentServiceStub, MLServiceStub, SearchServiceStub
+    from helpers.fake_server import FakeOpenSearch
+    from helpers.instrumentation import (
+        CALLS,
+        DESERIALIZE_SECONDS,
+        ERRORS,
+        FIRST_MESSAGE_SECONDS,
+        LATENCY_SECONDS,
+        MESSAGE_GAP_SECONDS,
+        REQUEST_BYTES,
+        RESPONSE_BYTES,
+        SERIALIZE_SECONDS,
+        STREAM_MESSAGES,
+        ClientMetrics,
+        Histogram,
+        aio_metrics_interceptors,
+        instrument_channel,
+        instrument_serializers,
+        method_name,
+    )
+    from helpers.raw_bulk import bulk_raw_method, encode_bulk_request
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+SEARCH = "SearchService/Search"
+STREAM_SEARCH = "SearchService/ServerStreamSearch"
+
+
+def search_request(size=3):
+    """Build a SearchRequest asking for size hits."""
+    request = SearchRequest(index=["bench"])
+    request.search_request_body.size = size
+    return request
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for the log-linear histogram."""
+
+    def test_percentiles_within_precision(self):
+        """Test that percentiles are within the relative error across magnitudes."""
+        histogram = Histogram(significant_bits=5)
+        values = [(number + 1) * 1e-6 for number in range(10000)]
+        for value in values:
+            histogram.record(value)
+
+        for fraction in (0.5, 0.9, 0.99, 0.999):
+            exact = values[int(fraction * len(values)) - 1]
+            self.assertAlmostEqual(histogram.percentile(fraction) / exact, 1.0, delta=1 / 32)
+        self.assertEqual(histogram.percentile(1.0), values[-1])
+        self.assertEqual(histogram.snapshot().count, 10000)
+        self.assertAlmostEqual(histogram.snapshot().mean, sum(values) / len(values))
+
+    def test_zeros_merge_and_buckets(self):
+        """Test zero values, merging and bucket counts."""
+        first, second = Histogram(), Histogram()
+        first.record(0)
+        first.record(1024, count=3)
+        second.record(3)
+        first.merge(second)
+
+        self.assertEqual(first.count, 5)
+        self.assertEqual(first.min, 0)
+        self.assertEqual(first.percentile(0.2), 0.0)
+        self.assertEqual(sum(count for _, count in first.buckets()), 5)
+        self.assertEqual(first.percentile(0.99), 1024)
+        with self.assertRaises(ValueError):
+            first.record(-1)
+        with self.assertRaises(ValueError):
+            first.merge(Histogram(significant_bits=3))
+
+    def test_method_name(self):
+        """Test short method names from full paths."""
+        self.assertEqual(method_name("/org.opensearch.protobufs.services.SearchService/Search"), SEARCH)
+        self.assertEqual(method_name(b"/pkg.MLService/PredictModelStream"), "MLService/PredictModelStream")
+
+
+class InstrumentedTestCase(unittest.TestCase):
+    """Starts a FakeOpenSearch and an instrumented channel to it."""
+
+    server_config = {"hits_per_page": 3, "source_size": 100, "stream_pages": 4, "stream_chunks": 5}
+
+    def setUp(self):
+        self.fake = FakeOpenSearch(seed=0, **self.server_config)
+        self.target = self.fake.start()
+        self.metrics = ClientMetrics()
+        self.channel = instrument_channel(grpc.insecure_channel(self.target), self.metrics)
+
+    def tearDown(self):
+        self.channel.close()
+        self.fake.stop()
+
+
+class TestSyncInstrumentation(InstrumentedTestCase):
+    """Test cases for sync channels."""
+
+    def test_unary(self):
+        """Test latency, sizes and serialization timings of unary calls."""
+        request = search_request()
+        stub = SearchServiceStub(self.channel)
+        stub.Search(request, timeout=5)
+        stub.Search.future(request, timeout=5).result()
+        metrics = self.metrics.snapshot()[SEARCH]
+
+        self.assertEqual(metrics[CALLS], 2)
+        self.assertNotIn(ERRORS, metrics)
+        self.assertEqual(metrics[LATENCY_SECONDS].count, 2)
+        self.assertEqual(metrics[SERIALIZE_SECONDS].count, 2)
+        self.assertEqual(metrics[DESERIALIZE_SECONDS].count, 2)
+        self.assertEqual(metrics[REQUEST_BYTES].max, request.ByteSize())
+        self.assertEqual(metrics[RESPONSE_BYTES].max, self.fake.page(3).ByteSize())
+        self.assertEqual(metrics["in_flight"], 0)
+        self.assertGreaterEqual(metrics["in_flight_peak"], 1)
+
+    def test_response_stream(self):
+        """Test per-message timings and counts of a server stream."""
+        pages = list(SearchServiceStub(self.channel).ServerStreamSearch(search_request(), timeout=5))
+        metrics = self.metrics.snapshot()[STREAM_SEARCH]
+
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(metrics[FIRST_MESSAGE_SECONDS].count, 1)
+        self.assertEqual(metrics[MESSAGE_GAP_SECONDS].count, 3)
+        self.assertEqual(metrics[RESPONSE_BYTES].count, 4)
+        self.assertEqual(metrics[DESERIALIZE_SECONDS].count, 4)
+        self.assertEqual(metrics[STREAM_MESSAGES].max, 4)
+        self.assertEqual(metrics[LATENCY_SECONDS].count, 1)
+
+    def test_stream_call_methods_are_delegated(self):
+        """Test that the wrapped stream still behaves as a grpc call."""
+        call = MLServiceStub(self.channel).PredictModelStream(MlPredictModelStreamRequest(model_id="m"), timeout=5)
+        frames = list(call)
+
+        self.assertEqual(len(frames), 5)
+        self.assertEqual(call.code(), grpc.StatusCode.OK)
+        self.assertEqual(self.metrics.snapshot()["MLService/PredictModelStream"][STREAM_MESSAGES].max, 5)
+
+    def test_pre_serialized_requests(self):
+        """Test that raw bytes requests are sized without a serialize timing."""
+        data = encode_bulk_request([b'{"a": 1}'] * 3, index="bench")
+        bulk_raw_method(self.channel)(data, timeout=5)
+        metrics = self.metrics.snapshot()["DocumentService/Bulk"]
+
+        self.assertEqual(metrics[REQUEST_BYTES].max, len(data))
+        self.assertNotIn(SERIALIZE_SECONDS, metrics)
+        self.assertEqual(metrics[DESERIALIZE_SECONDS].count, 1)
+
+    def test_disabled_sink_records_nothing(self):
+        """Test that a disabled sink is bypassed and None leaves the channel alone."""
+        self.metrics.enabled = False
+        SearchServiceStub(self.channel).Search(search_request(), timeout=5)
+        list(SearchServiceStub(self.channel).ServerStreamSearch(search_request(), timeout=5))
+
+        self.assertEqual(self.metrics.snapshot(), {})
+        raw = grpc.insecure_channel(self.target)
+        self.assertIs(instrument_channel(raw, None), raw)
+        raw.close()
+
+
+class TestSyncErrors(InstrumentedTestCase):
+    """Test cases for failing calls."""
+
+    server_config = {"rpc_error_rate": 1.0}
+
+    def test_errors_are_counted(self):
+        """Test that failed calls count as errors and leave in-flight at zero."""
+        with self.assertRaises(grpc.RpcError):
+            DocumentServiceStub(self.channel).Bulk(BulkRequest(), timeout=5)
+        metrics = self.metrics.snapshot()["DocumentService/Bulk"]
+
+        self.assertEqual(metrics[ERRORS], 1)
+        self.assertEqual(metrics[LATENCY_SECONDS].count, 1)
+        self.assertEqual(metrics["in_flight"], 0)
+
+
+class TestAioInstrumentation(InstrumentedTestCase):
+    """Test cases for grpc.aio channels."""
+
+    def test_unary_and_stream(self):
+        """Test that aio interceptors and serializer timing record the same metrics."""
+        async def run():
+            metrics = ClientMetrics()
+            channel = instrument_serializers(
+                grpc.aio.insecure_channel(self.target, interceptors=aio_metrics_interceptors(metrics)), metrics)
+            async with channel:
+                stub = SearchServiceStub(channel)
+                await stub.Search(search_request(), timeout=5)
+                pages = [page async for page in stub.ServerStreamSearch(search_request(), timeout=5)]
+                call = stub.ServerStreamSearch(search_request(), timeout=5)
+                first = await call.read()
+                call.cancel()
+                await asyncio.sleep(0.05)
+            return metrics.snapshot(), pages, first
+
+        snapshot, pages, first = asyncio.run(run())
+
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(len(first.hits.hits), 3)
+        self.assertEqual(snapshot[SEARCH][LATENCY_SECONDS].count, 1)
+        self.assertEqual(snapshot[SEARCH][SERIALIZE_SECONDS].count, 1)
+        stream = snapshot[STREAM_SEARCH]
+        self.assertEqual(stream[CALLS], 2)
+        self.assertEqual(stream[FIRST_MESSAGE_SECONDS].count, 2)
+        self.assertEqual(stream[MESSAGE_GAP_SECONDS].count, 3)
+        self.assertEqual((stream[STREAM_MESSAGES].min, stream[STREAM_MESSAGES].max), (1, 4))
+        self.assertEqual(stream[ERRORS], 1)
+        self.assertEqual(stream["in_flight"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
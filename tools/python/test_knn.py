@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/knn.py
+
+Requires the generated opensearch.protobufs package, grpcio and NumPy on
+PYTHONPATH (e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    import numpy
+    from opensearch.protobufs.schemas import QueryContainer, SearchRequest
+    from helpers.fake_server import FakeOpenSearch
+    from helpers.knn import encode_knn_searches, knn_search_batch
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs, grpc or numpy is not importable: {e}")
+
+
+def term_filter():
+    """Build a small filter query."""
+    query = QueryContainer()
+    query.term.field = "color"
+    query.term.x_name = "red only"
+    return query
+
+
+class TestEncodeKnnSearches(unittest.TestCase):
+    """Test cases for request construction."""
+
+    def test_matches_messages_built_field_by_field(self):
+        """Test that each encoded request parses to the message built the usual way."""
+        vectors = numpy.random.default_rng(0).random((4, 33))
+        template = SearchRequest(index=["products"], routing=["r"])
+        template.search_request_body.query.match_all.SetInParent()
+        encoded = encode_knn_searches(vectors, "embedding", 7, filter=term_filter(),
+                                      method_parameters={"ef_search": 100}, template=template)
+
+        self.assertEqual(len(encoded), 4)
+        for row, data in zip(vectors.astype(numpy.float32), encoded):
+            expected = SearchRequest(index=["products"], routing=["r"])
+            body = expected.search_request_body
+            body.size = 7
+            body.x_source.fetch = False
+            knn = body.query.knn
+            knn.field = "embedding"
+            knn.k = 7
+            knn.vector.extend(row.tolist())
+            knn.filter.CopyFrom(term_filter())
+            knn.method_parameters.fields["ef_search"].int32 = 100
+            self.assertEqual(SearchRequest.FromString(data), expected)
+
+    def test_template_size_and_source_win(self):
+        """Test that the template's size and _source settings are kept."""
+        template = SearchRequest()
+        template.search_request_body.size = 3
+        template.search_request_body.x_source.fetch = True
+        request = SearchRequest.FromString(encode_knn_searches([[1.0, 2.0]], "v", 10, template=template)[0])
+
+        self.assertEqual(request.search_request_body.size, 3)
+        self.assertTrue(request.search_request_body.x_source.fetch)
+        self.assertEqual(list(request.search_request_body.query.knn.vector), [1.0, 2.0])
+
+    def test_rejects_bad_input(self):
+        """Test the shape and k checks."""
+        with self.assertRaises(ValueError):
+            encode_knn_searches([1.0, 2.0], "v", 1)
+        with self.assertRaises(ValueError):
+            encode_knn_searches([[1.0]], "v", 0)
+
+    def test_no_rows(self):
+        """Test that a matrix with no rows encodes no requests."""
+        self.assertEqual(encode_knn_searches(numpy.zeros((0, 768)), "v", 5), [])
+
+
+class TestKnnSearchBatch(unittest.TestCase):
+    """Test cases against the fake server."""
+
+    def run_batch(self, fake, vectors, k, **kwargs):
+        target = fake.start()
+        try:
+            with grpc.insecure_channel(target) as channel:
+                return knn_search_batch(channel, vectors, "v", k, concurrency=4, timeout=5, **kwargs)
+        finally:
+            fake.stop()
+
+    def test_results(self):
+        """Test the (n_queries, k) id and score arrays, padded where hits run out."""
+        template = SearchRequest()
+        template.search_request_body.size = 3
+        fake = FakeOpenSearch(seed=0)
+        result = self.run_batch(fake, numpy.ones((10, 8)), 5, template=template)
+
+        self.assertEqual(result.ids.shape, (10, 5))
+        self.assertEqual(result.scores.dtype, numpy.float32)
+        self.assertEqual(list(result.ids[9]), ["0", "1", "2", None, None])
+        self.assertEqual(result.scores[0, 0], 1.0)
+        self.assertTrue(numpy.isnan(result.scores[:, 3:]).all())
+        self.assertEqual(result.errors, {})
+        self.assertEqual(fake.calls["Search"], 10)
+
+    def test_no_rows(self):
+        """Test that a matrix with no rows returns (0, k) arrays without calling the server."""
+        fake = FakeOpenSearch(seed=0)
+        result = self.run_batch(fake, numpy.zeros((0, 8)), 5)
+
+        self.assertEqual(result.ids.shape, (0, 5))
+        self.assertEqual(result.scores.shape, (0, 5))
+        self.assertEqual(result.errors, {})
+        self.assertEqual(fake.calls["Search"], 0)
+
+    def test_errors(self):
+        """Test that failures raise, or are reported per row with return_exceptions."""
+        with self.assertRaises(grpc.RpcError):
+            self.run_batch(FakeOpenSearch(seed=0, rpc_error_rate=1.0), numpy.ones((3, 2)), 2)
+        result = self.run_batch(FakeOpenSearch(seed=0, rpc_error_rate=1.0), numpy.ones((3, 2)), 2,
+                                return_exceptions=True)
+        self.assertEqual(sorted(result.errors), [0, 1, 2])
+        self.assertTrue((result.ids == None).all())  # noqa: E711
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/message_pool.py and message_pool_benchmark.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from opensearch.protobufs.schemas import BulkRequest, BulkRequestBody, IndexOperation, Refresh
+    from helpers.bulk import chunk_bulk_requests
+    from helpers.message_pool import BulkRequestPool, MessagePool, default_max_reuses
+    from message_pool_benchmark import SCENARIOS, fresh_batches, pooled_batches, run_scenario, sample_actions
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+
+class TestMessagePool(unittest.TestCase):
+    """Test cases for the generic pool."""
+
+    def test_reuses_cleared_instances(self):
+        """Test that a released message comes back cleared."""
+        pool = MessagePool(IndexOperation, max_reuses=None)
+        with pool.lease() as operation:
+            operation.x_id = "1"
+        again = pool.acquire()
+
+        self.assertIs(again, operation)
+        self.assertEqual(again, IndexOperation())
+        stats = pool.stats()
+        self.assertEqual((stats.created, stats.reused, stats.idle, stats.in_use), (1, 1, 0, 1))
+
+    def test_retires_and_discards(self):
+        """Test max_reuses retirement and the max_idle bound."""
+        pool = MessagePool(BulkRequestBody, max_idle=1, max_reuses=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        pool.release(first)
+        self.assertIsNot(pool.acquire(), first)
+
+        second, third = pool.acquire(), pool.acquire()
+        pool.release(second)
+        pool.release(third)
+        stats = pool.stats()
+        self.assertEqual((stats.retired, stats.discarded, stats.idle), (1, 1, 1))
+
+    def test_rejects_foreign_messages(self):
+        """Test that releasing a message not acquired from the pool fails."""
+        with self.assertRaises(ValueError):
+            MessagePool(IndexOperation).release(IndexOperation())
+        with self.assertRaises(ValueError):
+            MessagePool(IndexOperation, max_reuses=0)
+
+    def test_rejects_double_release(self):
+        """Test that releasing a message twice fails instead of handing it to two users."""
+        pool = MessagePool(IndexOperation, max_reuses=None)
+        operation = pool.acquire()
+        pool.release(operation)
+        with self.assertRaises(ValueError):
+            pool.release(operation)
+
+        self.assertIsNot(pool.acquire(), pool.acquire())
+        self.assertEqual(pool.stats().in_use, 2)
+
+    def test_threads(self):
+        """Test that concurrent acquire/release keeps the counters consistent."""
+        pool = MessagePool(IndexOperation, max_idle=4, max_reuses=None)
+
+        def work():
+            for _ in range(500):
+                with pool.lease() as operation:
+                    operation.x_id = "x"
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = pool.stats()
+        self.assertEqual(stats.created + stats.reused, 4000)
+        self.assertEqual(stats.in_use, 0)
+        self.assertLessEqual(stats.created, 8 + stats.discarded)
+
+
+class TestBulkRequestPool(unittest.TestCase):
+    """Test cases for in-place BulkRequest construction."""
+
+    def expected(self, actions, **fields):
+        return next(chunk_bulk_requests(actions, max_actions=len(actions), **fields))
+
+    def test_matches_chunk_bulk_requests(self):
+        """Test that pooled requests equal freshly built ones across growing and shrinking batches."""
+        pool = BulkRequestPool(index="logs", refresh=Refresh.REFRESH_TRUE, max_reuses=None)
+        batches = [
+            [{"_id": str(number), "n": number} for number in range(5)],
+            [b'{"a": 1}', b'{"a": 2}'],
+            [{"_id": "9", "_routing": "r"}] * 8,
+        ]
+        for actions in batches:
+            request = pool.build(actions)
+            self.assertEqual(request, self.expected(actions, index="logs", refresh=Refresh.REFRESH_TRUE))
+            request.timeout = "1m"
+            pool.release(request)
+        self.assertEqual(pool.stats().created, 1)
+        self.assertFalse(pool.acquire().HasField("timeout"))
+
+    def test_template(self):
+        """Test that the template's body is ignored and its fields kept."""
+        template = BulkRequest(index="a", pipeline="p")
+        template.bulk_request_body.add().object = b"{}"
+        request = BulkRequestPool(template).build([b'{"x": 1}'])
+
+        self.assertEqual(request, self.expected([b'{"x": 1}'], index="a", pipeline="p"))
+        with self.assertRaises(ValueError):
+            BulkRequestPool(template, index="b")
+
+    def test_failed_build_releases(self):
+        """Test that a request whose actions fail to encode goes back to the pool."""
+        pool = BulkRequestPool(max_reuses=None)
+        with self.assertRaises(TypeError):
+            pool.build([b'{"a": 1}', 42])
+
+        stats = pool.stats()
+        self.assertEqual((stats.in_use, stats.idle), (0, 1))
+        self.assertEqual(pool.build([b'{"b": 2}']), self.expected([b'{"b": 2}']))
+
+    def test_default_max_reuses(self):
+        """Test that instances are retired on arena backends by default."""
+        pool = BulkRequestPool()
+        self.assertEqual(pool.max_reuses, default_max_reuses())
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases running the benchmark scenarios briefly."""
+
+    def test_scenarios(self):
+        """Test that each scenario produces a complete record."""
+        actions = sample_actions(20, as_bytes=False)
+        builders = {"fresh": fresh_batches(actions), "pooled": pooled_batches(actions, None)}
+        for scenario in SCENARIOS:
+            record = run_scenario(builders[scenario], batches=20, docs_per_batch=20)
+            self.assertGreater(record["docs_per_s"], 0)
+            self.assertGreater(record["heap_peak_bytes_per_doc"], 0)
+            self.assertGreaterEqual(record["gc_pause_ms_max"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/ml_streaming.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import asyncio
+import contextlib
+import os
+import sys
+import time
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import (
+        MlExecuteAgentStreamRequest,
+        MlPredictModelStreamRequest,
+        PredictResponse,
+        SearchRequest,
+        Status,
+    )
+    from helpers.fake_server import FakeOpenSearch
+    from helpers.instrumentation import FIRST_MESSAGE_SECONDS, MESSAGE_GAP_SECONDS, ClientMetrics
+    from helpers.ml_streaming import MLStream, chunk_text, fan_out, open_ml_stream
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+def frame(content=None, result=None, is_last=None, status=None):
+    """Build one PredictResponse frame."""
+    response = PredictResponse()
+    output = response.inference_results.add().output.add(name="response")
+    if content is not None:
+        output.data_as_map.content = content
+    if is_last is not None:
+        output.data_as_map.is_last = is_last
+    if result is not None:
+        output.result = result
+    if status is not None:
+        response.status = status
+    return response
+
+
+class FakeCall:
+    """Async iterable of (response, size) pairs that records cancellation."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.cancelled = False
+
+    async def __aiter__(self):
+        for response in self.frames:
+            await asyncio.sleep(0)
+            yield response, response.ByteSize()
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class CountingChannel:
+    """grpc.aio channel stand-in whose streams count the frames pulled from them."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.pulled = 0
+        self.cancelled = 0
+
+    def unary_stream(self, path, request_serializer=None, response_deserializer=None):
+        def invoke(request, timeout=None, metadata=None):
+            channel = self
+
+            class Call(FakeCall):
+                async def __aiter__(self):
+                    for number in range(channel.frames):
+                        channel.pulled += 1
+                        await asyncio.sleep(0)
+                        yield frame(content=str(number)), 1
+
+                def cancel(self):
+                    channel.cancelled += 1
+
+            return Call([])
+        return invoke
+
+
+class TestMLStream(unittest.TestCase):
+    """Test cases for decoding and assembling one stream."""
+
+    def test_chunk_text(self):
+        """Test that data_as_map content is preferred over result."""
+        self.assertEqual(chunk_text(frame(content="Hel")), "Hel")
+        self.assertEqual(chunk_text(frame(result="lo")), "lo")
+        self.assertEqual(chunk_text(frame(content="a", result="b")), "a")
+        self.assertEqual(chunk_text(PredictResponse()), "")
+
+    def test_assembles_incremental_chunks(self):
+        """Test chunk order, last-chunk detection, status and metrics."""
+        frames = [frame(content="Hel"), frame(content="lo, "), frame(content="world", is_last=True),
+                  frame(status=Status.STATUS_COMPLETED)]
+        stream = MLStream(FakeCall(frames), "MLService/ExecuteAgentStream")
+
+        async def run():
+            seen = []
+            async for chunk in stream:
+                seen.append((chunk.index, chunk.text, chunk.is_last, stream.text()))
+            return seen
+
+        seen = asyncio.run(run())
+        self.assertEqual(seen, [(0, "Hel", False, "Hel"), (1, "lo, ", False, "Hello, "),
+                                (2, "world", True, "Hello, world"), (3, "", True, "Hello, world")])
+        self.assertEqual(stream.status, Status.STATUS_COMPLETED)
+        self.assertEqual(stream.metrics.chunks, 4)
+        self.assertEqual(stream.metrics.bytes, sum(response.ByteSize() for response in frames))
+        self.assertIsNotNone(stream.metrics.time_to_first_chunk)
+
+    def test_timings_count_from_the_call(self):
+        """Test that time spent before iterating counts towards the first chunk."""
+        stream = MLStream(FakeCall([frame(content="a"), frame(content="b")]), "MLService/PredictModelStream",
+                          started=time.monotonic() - 5.0)
+
+        async def run():
+            return [chunk async for chunk in stream]
+
+        chunks = asyncio.run(run())
+        self.assertGreaterEqual(stream.metrics.time_to_first_chunk, 5.0)
+        self.assertGreaterEqual(chunks[0].elapsed, 5.0)
+        self.assertLess(chunks[1].gap, 5.0)
+        self.assertGreaterEqual(stream.metrics.elapsed, 5.0)
+
+    def test_early_exit_cancels_the_call(self):
+        """Test that abandoning the iteration cancels the call."""
+        call = FakeCall([frame(content=str(number)) for number in range(10)])
+        stream = MLStream(call, "MLService/PredictModelStream")
+
+        async def run():
+            async with contextlib.aclosing(stream.__aiter__()) as chunks:
+                async for chunk in chunks:
+                    if chunk.index == 2:
+                        break
+
+        asyncio.run(run())
+        self.assertTrue(call.cancelled)
+        self.assertEqual(stream.text(), "012")
+
+    def test_rejects_other_requests(self):
+        """Test that only ML stream requests are accepted."""
+        with self.assertRaises(TypeError):
+            open_ml_stream(None, SearchRequest())
+
+
+class FakeServerTestCase(unittest.TestCase):
+    """Runs against FakeOpenSearch over a grpc.aio channel."""
+
+    server_config = {"stream_chunks": 5, "chunk_size": 3, "frame_interval": 0.005}
+
+    def setUp(self):
+        self.fake = FakeOpenSearch(seed=0, **self.server_config)
+        self.target = self.fake.start()
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def run_with_channel(self, body):
+        async def run():
+            async with grpc.aio.insecure_channel(self.target) as channel:
+                return await body(channel)
+        return asyncio.run(run())
+
+
+class TestOpenMLStream(FakeServerTestCase):
+    """Test cases for single streams."""
+
+    def test_collect(self):
+        """Test that collect() assembles every chunk and reports to the sink."""
+        metrics = ClientMetrics()
+
+        async def body(channel):
+            stream = open_ml_stream(channel, MlPredictModelStreamRequest(model_id="m"), timeout=5, sink=metrics)
+            return await stream.collect(keep_chunks=True)
+
+        result = self.run_with_channel(body)
+        self.assertEqual(result.text, "yyy" * 5)
+        self.assertEqual(result.status, Status.STATUS_COMPLETED)
+        self.assertEqual(len(result.chunks), 5)
+        self.assertTrue(result.chunks[-1].is_last)
+        self.assertGreater(result.metrics.max_gap, 0.0)
+        self.assertGreaterEqual(result.metrics.elapsed, result.metrics.time_to_first_chunk)
+        snapshot = metrics.snapshot()["MLService/PredictModelStream"]
+        self.assertEqual(snapshot[FIRST_MESSAGE_SECONDS].count, 1)
+        self.assertEqual(snapshot[MESSAGE_GAP_SECONDS].count, 4)
+
+
+class TestFanOut(FakeServerTestCase):
+    """Test cases for concurrent streams."""
+
+    def test_interleaves_all_streams(self):
+        """Test that every chunk of every stream arrives, tagged by position."""
+        requests = [MlExecuteAgentStreamRequest(agent_id=str(number)) for number in range(6)]
+        requests.append(MlPredictModelStreamRequest(model_id="m"))
+
+        async def body(channel):
+            return [item async for item in fan_out(channel, requests, concurrency=3, max_buffered=2, timeout=5)]
+
+        items = self.run_with_channel(body)
+        counts = {}
+        for position, chunk in items:
+            counts[position] = counts.get(position, 0) + 1
+        self.assertEqual(counts, {position: 5 for position in range(7)})
+        self.assertEqual(self.fake.calls["ExecuteAgentStream"], 6)
+
+    def test_bounded_buffering(self):
+        """Test that a slow consumer holds back the readers."""
+        channel = CountingChannel(frames=50)
+
+        async def run():
+            requests = [MlPredictModelStreamRequest(model_id="m")] * 4
+            generator = fan_out(channel, requests, concurrency=4, max_buffered=1)
+            async with contextlib.aclosing(generator):
+                await generator.__anext__()
+                await asyncio.sleep(0.05)
+                pulled = channel.pulled
+            return pulled, channel.cancelled
+
+        pulled, cancelled = asyncio.run(run())
+        # One chunk consumed, one queued, and each of the four readers holds at most one more.
+        self.assertLessEqual(pulled, 6)
+        self.assertEqual(cancelled, 4)
+
+
+class TestFanOutErrors(FakeServerTestCase):
+    """Test cases for failing streams."""
+
+    server_config = {"rpc_error_rate": 1.0}
+
+    def test_errors(self):
+        """Test that errors are raised, or yielded with return_exceptions."""
+        requests = [MlPredictModelStreamRequest(model_id="m")] * 3
+
+        async def raising(channel):
+            return [item async for item in fan_out(channel, requests, timeout=5)]
+
+        async def returning(channel):
+            return [item async for item in fan_out(channel, requests, timeout=5, return_exceptions=True)]
+
+        with self.assertRaises(grpc.RpcError):
+            self.run_with_channel(raising)
+        items = self.run_with_channel(returning)
+        self.assertEqual(sorted(position for position, _ in items), [0, 1, 2])
+        self.assertTrue(all(isinstance(error, grpc.RpcError) for _, error in items))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/ndjson_bulk.py and ndjson_bulk_benchmark.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from opensearch.protobufs.schemas import (
+        BulkRequest,
+        BulkRequestBody,
+        OP_TYPE_CREATE,
+        REFRESH_WAIT_FOR,
+        VERSION_TYPE_EXTERNAL_GTE,
+    )
+    from helpers.ndjson_bulk import NdjsonBulkError, ndjson_bulk_bodies, ndjson_bulk_requests, transcode_ndjson_bulk
+    from helpers.object_map import dict_to_object_map
+    from ndjson_bulk_benchmark import SCENARIOS, scenario_functions, write_ndjson
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+NDJSON = (
+    b'{"index":{"_index":"logs","_id":"1","routing":"r","if_seq_no":-1,"op_type":"create",'
+    b'"version":3,"version_type":"external_gte","pipeline":"p","require_alias":false}}\n'
+    b'{"message":"caf\xc3\xa9",  "n": 1.50}\n'
+    b'{"create":{"_id":2}}\r\n'
+    b' {"a":[1,2]}\r\n'
+    b'\n'
+    b'{"delete":{"_index":"logs","_id":"3","version":7}}\n'
+    b'{"update":{"_id":"4","retry_on_conflict":3}}\n'
+    b'{"doc" : {"tag":"\xc3\xa9" , "x":1.0}, "doc_as_upsert":true, "_source":{"includes":"a"},'
+    b' "script":{"source":"ctx._source.x++","lang":"painless","params":{"by":2}}, "upsert":{}}\n'
+    b'{"update":{"_id":"5"}}\n'
+    b'{"script":{"id":"stored","params":{"s":"v"}},"detect_noop":false}'
+)
+
+
+def expected_bodies():
+    """Build the bodies of NDJSON field by field."""
+    index = BulkRequestBody(object='{"message":"café",  "n": 1.50}'.encode("utf-8"))
+    operation = index.operation_container.index
+    operation.x_index, operation.x_id, operation.routing, operation.pipeline = "logs", "1", "r", "p"
+    operation.if_seq_no, operation.version = -1, 3
+    operation.op_type, operation.version_type = OP_TYPE_CREATE, VERSION_TYPE_EXTERNAL_GTE
+    operation.require_alias = False
+
+    create = BulkRequestBody(object=b' {"a":[1,2]}')
+    create.operation_container.create.x_id = "2"
+
+    delete = BulkRequestBody()
+    delete.operation_container.delete.x_index = "logs"
+    delete.operation_container.delete.x_id = "3"
+    delete.operation_container.delete.version = 7
+
+    update = BulkRequestBody()
+    update.operation_container.update.x_id = "4"
+    update.operation_container.update.retry_on_conflict = 3
+    action = update.update_action
+    action.doc = '{"tag":"é" , "x":1.0}'.encode("utf-8")
+    action.doc_as_upsert = True
+    action.upsert = b"{}"
+    action.x_source.filter.includes.append("a")
+    action.script.inline.source = "ctx._source.x++"
+    action.script.inline.lang.builtin = 4  # BUILTIN_SCRIPT_LANGUAGE_PAINLESS
+    dict_to_object_map({"by": 2}, action.script.inline.params)
+
+    stored = BulkRequestBody()
+    stored.operation_container.update.x_id = "5"
+    stored.update_action.detect_noop = False
+    stored.update_action.script.stored.id = "stored"
+    dict_to_object_map({"s": "v"}, stored.update_action.script.stored.params)
+    return [index, create, delete, update, stored]
+
+
+class TestTranscoding(unittest.TestCase):
+    """Test cases for the mapping of actions onto BulkRequestBody."""
+
+    def test_bodies(self):
+        """Test every action type, with documents and doc values kept byte for byte."""
+        self.assertEqual(list(ndjson_bulk_bodies(NDJSON)), expected_bodies())
+
+    def test_raw_matches_messages(self):
+        """Test that the raw bytes parse to, and serialize like, the message requests."""
+        raw = list(transcode_ndjson_bulk(NDJSON, index="logs", refresh=REFRESH_WAIT_FOR))
+        messages = list(ndjson_bulk_requests(NDJSON, index="logs", refresh=REFRESH_WAIT_FOR))
+
+        self.assertEqual(len(raw), 1)
+        self.assertEqual(BulkRequest.FromString(raw[0]), messages[0])
+        self.assertEqual(list(messages[0].bulk_request_body), expected_bodies())
+        self.assertEqual(messages[0].refresh, REFRESH_WAIT_FOR)
+
+    def test_sources(self):
+        """Test that a path, a file object and bytes give the same result."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "bulk.ndjson")
+        with open(path, "wb") as file:
+            file.write(NDJSON)
+        empty = os.path.join(directory, "empty.ndjson")
+        open(empty, "wb").close()
+
+        expected = list(transcode_ndjson_bulk(NDJSON))
+        self.assertEqual(list(transcode_ndjson_bulk(path)), expected)
+        self.assertEqual(list(transcode_ndjson_bulk(io.BytesIO(NDJSON))), expected)
+        self.assertEqual(list(transcode_ndjson_bulk(memoryview(NDJSON))), expected)
+        self.assertEqual(list(transcode_ndjson_bulk(empty)), [])
+
+    def test_limits(self):
+        """Test that requests respect max_actions and max_bytes."""
+        document = b'{"x":"' + b"y" * 100 + b'"}'
+        data = b"".join(b'{"index":{"_id":"%d"}}\n%s\n' % (number, document) for number in range(50))
+        by_count = list(transcode_ndjson_bulk(data, max_actions=20))
+        by_size = list(transcode_ndjson_bulk(data, max_bytes=1000))
+
+        self.assertEqual([len(BulkRequest.FromString(chunk).bulk_request_body) for chunk in by_count], [20, 20, 10])
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in by_size))
+        self.assertEqual(sum(len(BulkRequest.FromString(chunk).bulk_request_body) for chunk in by_size), 50)
+        with self.assertRaises(ValueError):
+            list(transcode_ndjson_bulk(data, max_bytes=100))
+
+
+class TestErrors(unittest.TestCase):
+    """Test cases for malformed input."""
+
+    BAD = (
+        b'{"index":{"_id":"1","bogus":1}}\n'
+        b'{"a":1}\n'
+        b'not json\n'
+        b'{"delete":{"_id":"2"}}\n'
+        b'{"index":{}}\n'
+        b'[1]\n'
+        b'{"update":{"_id":"3"}}\n'
+        b'{"doc":1}\n'
+        b'{"delete":{"version_type":"sometimes"}}\n'
+        b'{"create":{}}'
+    )
+
+    def test_raises_with_position(self):
+        """Test that the first bad line raises NdjsonBulkError with its offset."""
+        with self.assertRaises(NdjsonBulkError) as raised:
+            list(ndjson_bulk_bodies(b'{"delete":{"_id":"0"}}\n' + self.BAD))
+        self.assertEqual((raised.exception.line, raised.exception.offset), (2, 23))
+        self.assertIn("bogus", raised.exception.reason)
+
+    def test_on_error_continues(self):
+        """Test that on_error receives every bad line and the good actions survive."""
+        errors = []
+        bodies = list(ndjson_bulk_bodies(self.BAD, on_error=errors.append))
+
+        self.assertEqual([body.operation_container.delete.x_id for body in bodies], ["2"])
+        self.assertEqual([error.line for error in errors], [1, 3, 6, 8, 9, 10])
+        self.assertEqual(errors[2].offset, self.BAD.index(b"[1]"))
+        self.assertIn("no document line", errors[-1].reason)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases running the benchmark scenarios briefly."""
+
+    def test_scenarios_agree(self):
+        """Test that every scenario produces the same requests."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "bulk.ndjson")
+        write_ndjson(path, 30, 128)
+        functions = scenario_functions(path, max_actions=7)
+        outputs = [[BulkRequest.FromString(data) for data in functions[scenario]()] for scenario in SCENARIOS]
+
+        self.assertEqual(len(outputs[0]), 5)
+        self.assertEqual(outputs[1], outputs[2])
+        self.assertEqual([[body.operation_container for body in request.bulk_request_body] for request in outputs[0]],
+                         [[body.operation_container for body in request.bulk_request_body] for request in outputs[2]])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
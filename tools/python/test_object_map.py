@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/object_map.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import json
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from opensearch.protobufs.schemas import HitsMetadataHitsInner, NULL_VALUE_NULL, ObjectMap, UnmappedTermsAggregate
+    from helpers.object_map import (
+        dict_to_object_map,
+        dicts_to_object_maps,
+        hits_object_maps_to_dicts,
+        json_to_object_map,
+        object_map_to_dict,
+        object_map_to_json,
+        object_maps_to_dicts,
+        python_to_value,
+        value_to_python,
+    )
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+
+SAMPLE = {
+    "title": "hello",
+    "count": 3,
+    "big": 2 ** 40,
+    "ratio": 0.1,
+    "ok": True,
+    "missing": None,
+    "tags": ["a", 1, [2.5, {"x": False}]],
+    "nested": {"inner": {"deep": [], "empty": {}}},
+}
+
+
+class TestEncode(unittest.TestCase):
+    """Test cases for Python -> ObjectMap."""
+
+    def test_integer_selection(self):
+        """Test the int32/int64 boundaries."""
+        self.assertEqual(python_to_value(2 ** 31 - 1).WhichOneof("value"), "int32")
+        self.assertEqual(python_to_value(-(2 ** 31)).WhichOneof("value"), "int32")
+        self.assertEqual(python_to_value(2 ** 31).WhichOneof("value"), "int64")
+        self.assertEqual(python_to_value(-(2 ** 63)).WhichOneof("value"), "int64")
+        with self.assertRaises(ValueError):
+            python_to_value(2 ** 63)
+
+    def test_bool_is_not_int(self):
+        """Test that bools are stored as bool, not int32."""
+        self.assertEqual(python_to_value(True).WhichOneof("value"), "bool")
+
+    def test_float_selection(self):
+        """Test that floats are doubles unless compact and exact in float32."""
+        self.assertEqual(python_to_value(0.5).WhichOneof("value"), "double")
+        self.assertEqual(python_to_value(0.5, compact_floats=True).WhichOneof("value"), "float")
+        self.assertEqual(python_to_value(0.1, compact_floats=True).WhichOneof("value"), "double")
+        self.assertEqual(python_to_value(1e300, compact_floats=True).WhichOneof("value"), "double")
+
+    def test_null_and_containers(self):
+        """Test None, empty mappings and empty lists."""
+        message = dict_to_object_map({"n": None, "m": {}, "l": []})
+        self.assertEqual(message.fields["n"].null_value, NULL_VALUE_NULL)
+        self.assertEqual(message.fields["m"].WhichOneof("value"), "object_map")
+        self.assertEqual(message.fields["l"].WhichOneof("value"), "list_value")
+
+    def test_invalid_input(self):
+        """Test that unsupported keys and values raise TypeError."""
+        with self.assertRaises(TypeError):
+            dict_to_object_map({1: "a"})
+        with self.assertRaises(TypeError):
+            dict_to_object_map({"a": b"bytes"})
+
+    def test_fill_in_place(self):
+        """Test that an existing message is cleared and reused."""
+        message = dict_to_object_map({"old": 1})
+        result = dict_to_object_map({"new": 2}, message)
+        self.assertIs(result, message)
+        self.assertEqual(list(message.fields), ["new"])
+
+    def test_deep_nesting_does_not_recurse(self):
+        """Test nesting far beyond the recursion limit."""
+        data = current = {}
+        for _ in range(sys.getrecursionlimit() * 2):
+            current["child"] = {}
+            current = current["child"]
+        current["leaf"] = 1
+
+        message = dict_to_object_map(data)
+        decoded = object_map_to_dict(message)
+
+        for _ in range(sys.getrecursionlimit() * 2):
+            decoded = decoded["child"]
+        self.assertEqual(decoded, {"leaf": 1})
+
+
+class TestDecode(unittest.TestCase):
+    """Test cases for ObjectMap -> Python."""
+
+    def test_round_trip(self):
+        """Test that encode then decode returns the original data."""
+        self.assertEqual(object_map_to_dict(dict_to_object_map(SAMPLE)), SAMPLE)
+
+    def test_round_trip_through_wire_format(self):
+        """Test decoding a message parsed from bytes."""
+        wire = dict_to_object_map(SAMPLE).SerializeToString()
+        self.assertEqual(object_map_to_dict(ObjectMap.FromString(wire)), SAMPLE)
+
+    def test_key_and_list_order(self):
+        """Test that list order is preserved."""
+        decoded = object_map_to_dict(dict_to_object_map({"l": list(range(50))}))
+        self.assertEqual(decoded["l"], list(range(50)))
+
+    def test_float32_shortest_repr(self):
+        """Test that float32 values decode to their shortest decimal."""
+        value = ObjectMap.Value(float=0.1)
+        self.assertEqual(value_to_python(value), 0.1)
+
+    def test_unset_value_is_none(self):
+        """Test that an empty Value decodes to None."""
+        self.assertIsNone(value_to_python(ObjectMap.Value()))
+
+    def test_batch(self):
+        """Test batch decoding of a repeated list and of hits."""
+        items = [{"a": 1}, {"b": [2]}, {}]
+        maps = [ObjectMap() for _ in items]
+        for message, data in zip(maps, items):
+            dict_to_object_map(data, message)
+        self.assertEqual(object_maps_to_dicts(maps), items)
+
+        hits = [HitsMetadataHitsInner(x_id=str(i)) for i in range(3)]
+        dict_to_object_map({"f": [1]}, hits[0].fields)
+        dict_to_object_map({"g": "x"}, hits[2].fields)
+        self.assertEqual(hits_object_maps_to_dicts(hits), [{"f": [1]}, None, {"g": "x"}])
+
+    def test_dicts_to_repeated(self):
+        """Test appending ObjectMaps to a repeated field."""
+        aggregate = UnmappedTermsAggregate()
+
+        dicts_to_object_maps([{"a": 1}, {"b": 2}], aggregate.buckets)
+
+        self.assertEqual(object_maps_to_dicts(aggregate.buckets), [{"a": 1}, {"b": 2}])
+
+
+class TestJson(unittest.TestCase):
+    """Test cases for the JSON entry points."""
+
+    def test_json_round_trip(self):
+        """Test ObjectMap -> JSON bytes -> ObjectMap."""
+        encoded = object_map_to_json(dict_to_object_map(SAMPLE))
+        self.assertEqual(json.loads(encoded), SAMPLE)
+        self.assertEqual(object_map_to_dict(json_to_object_map(encoded)), SAMPLE)
+
+    def test_json_requires_object(self):
+        """Test that a top-level JSON array is rejected."""
+        with self.assertRaises(ValueError):
+            json_to_object_map(b"[1, 2]")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/parallel_bulk.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import BulkRequest, Refresh
+    from helpers.bulk import chunk_bulk_requests
+    from helpers.fake_server import FakeOpenSearch
+    from helpers.parallel_bulk import ParallelBulkEncoder, parallel_bulk
+    from helpers.raw_bulk import RawAction
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+def batches(count, size):
+    """Return count batches of size mapping documents with distinct ids."""
+    return [[{"_id": f"{batch}-{number}", "n": number, "text": "x" * (number * 37 % 200)}
+             for number in range(size)] for batch in range(count)]
+
+
+class TestParallelBulkEncoder(unittest.TestCase):
+    """Test cases for worker-side encoding."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.encoder = ParallelBulkEncoder(processes=2, slot_bytes=4096, slots=3, index="logs",
+                                          refresh=Refresh.REFRESH_TRUE)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.encoder.close()
+
+    def expected(self, documents):
+        return next(chunk_bulk_requests(documents, max_actions=len(documents), index="logs",
+                                        refresh=Refresh.REFRESH_TRUE)).SerializeToString()
+
+    def test_ordered_and_identical(self):
+        """Test that batches come back in order and match chunk_bulk_requests byte for byte."""
+        inputs = batches(12, 7)
+        encoded = list(self.encoder.encode(inputs))
+
+        self.assertEqual([batch.position for batch in encoded], list(range(12)))
+        for batch, documents in zip(encoded, inputs):
+            self.assertEqual(batch.documents, 7)
+            self.assertEqual(batch.data, self.expected(documents))
+
+    def test_document_kinds_and_oversized_batches(self):
+        """Test bytes and RawAction documents, and a batch larger than a slot."""
+        big = [b'{"blob": "' + b"y" * 3000 + b'"}'] * 3
+        encoded = list(self.encoder.encode([[b'{"a": 1}', RawAction(b'{"b": 2}', id="7", routing="r")], big]))
+
+        request = BulkRequest.FromString(encoded[0].data)
+        self.assertEqual(request.bulk_request_body[1].operation_container.index.x_id, "7")
+        self.assertEqual(request.bulk_request_body[1].operation_container.index.routing, "r")
+        self.assertGreater(len(encoded[1].data), 4096)
+        self.assertEqual(encoded[1].data, self.expected(big))
+
+    def test_worker_errors(self):
+        """Test that an encoding error in a worker is raised to the caller."""
+        with self.assertRaises(TypeError):
+            list(self.encoder.encode([[b"{}"], [object()]]))
+        self.assertEqual(len(list(self.encoder.encode(batches(2, 1)))), 2)
+
+
+class TestParallelBulk(unittest.TestCase):
+    """Test cases sending through the fake server."""
+
+    def test_send(self):
+        """Test that each result is correlated with its batch."""
+        fake = FakeOpenSearch(seed=0)
+        target = fake.start()
+        try:
+            with ParallelBulkEncoder(processes=2, index="logs") as encoder, grpc.insecure_channel(target) as channel:
+                results = list(parallel_bulk(channel, batches(6, 5), encoder, max_in_flight=2, timeout=5))
+        finally:
+            fake.stop()
+
+        self.assertEqual([result.position for result in results], list(range(6)))
+        self.assertTrue(all(result.error is None and len(result.response.items) == 5 for result in results))
+        self.assertEqual(fake.calls["Bulk"], 6)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/profiling.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from opensearch.protobufs.schemas import SearchResponse
+    from helpers.profiling import ProfileAnalyzer
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+
+def make_response(shard_times=((0, 1000),), index="logs", aggregation=True):
+    """Build a profiled SearchResponse with one BooleanQuery tree per (shard, nanos)."""
+    response = SearchResponse(took=1)
+    for shard, nanos in shard_times:
+        profile = response.profile.shards.add(id=f"[node-{shard}][{index}][{shard}]")
+        search = profile.searches.add(rewrite_time=10)
+        query = search.query.add(type="BooleanQuery", description="+a +b", time_in_nanos=nanos)
+        query.breakdown.score = nanos // 10
+        query.breakdown.score_count = 3
+        query.children.add(type="TermQuery", description="a", time_in_nanos=nanos // 2)
+        query.children.add(type="TermQuery", description="b", time_in_nanos=nanos // 4)
+        collector = search.collector.add(name="QueryPhaseCollector", reason="search_query", time_in_nanos=500)
+        collector.children.add(name="SimpleTopScoreDocCollector", reason="search_top_hits", time_in_nanos=200)
+        if aggregation:
+            terms = profile.aggregations.add(type="GlobalOrdinalsStringTermsAggregator", description="hosts",
+                                             time_in_nanos=300)
+            terms.breakdown.collect = 250
+            terms.debug.collection_strategy = "dense"
+            terms.debug.total_buckets = 7
+            terms.children.add(type="MaxAggregator", description="max_cpu", time_in_nanos=100)
+    return response
+
+
+class TestHotspots(unittest.TestCase):
+    """Test cases for hotspot ranking."""
+
+    def test_self_time_excludes_children(self):
+        """Test that a parent's self time is its total minus its children."""
+        analyzer = ProfileAnalyzer().add(make_response())
+        spots = {spot.name: spot for spot in analyzer.hotspots("query")}
+
+        self.assertEqual(spots["BooleanQuery"].total_ns, 1000)
+        self.assertEqual(spots["BooleanQuery"].self_ns, 250)
+        self.assertEqual(spots["TermQuery"].count, 2)
+        self.assertEqual(spots["TermQuery"].self_ns, 750)
+        self.assertEqual(spots["TermQuery"].max_ns, 500)
+        self.assertEqual([spot.name for spot in analyzer.hotspots("query")], ["TermQuery", "BooleanQuery"])
+
+    def test_accumulates_across_responses_and_shards(self):
+        """Test that totals, breakdowns and debug fields sum over every shard."""
+        responses = [make_response(((0, 1000), (1, 2000))), make_response(((0, 1000),)), SearchResponse()]
+        analyzer = ProfileAnalyzer().add(responses)
+
+        boolean = analyzer.hotspots("query", top=2, by="total_ns")[0]
+        self.assertEqual(boolean.name, "BooleanQuery")
+        self.assertEqual(boolean.total_ns, 4000)
+        self.assertEqual(boolean.breakdown, {"score": 400, "score_count": 9})
+        terms = analyzer.hotspots("aggregation", by="total_ns")[0]
+        self.assertEqual(terms.self_ns, 3 * 200)
+        self.assertEqual(terms.breakdown["collect"], 750)
+        self.assertEqual(terms.debug, {"collection_strategy": {"dense": 3}, "total_buckets": 21})
+        self.assertEqual(analyzer.responses, 3)
+
+    def test_categories(self):
+        """Test collectors, rewrites and category validation."""
+        analyzer = ProfileAnalyzer().add(make_response().profile)
+        collectors = {spot.name: spot.self_ns for spot in analyzer.hotspots("collector")}
+
+        self.assertEqual(collectors, {"QueryPhaseCollector": 300, "SimpleTopScoreDocCollector": 200})
+        self.assertEqual(analyzer.hotspots("rewrite")[0].total_ns, 10)
+        with self.assertRaises(ValueError):
+            analyzer.hotspots("segments")
+        with self.assertRaises(ValueError):
+            analyzer.hotspots(by="name")
+
+
+class TestShardSkew(unittest.TestCase):
+    """Test cases for shard times and skew."""
+
+    def test_skew_per_index(self):
+        """Test shard totals and the max/mean skew of each index."""
+        analyzer = ProfileAnalyzer()
+        analyzer.add(make_response(((0, 1000), (1, 1000), (2, 4000)), aggregation=False))
+        analyzer.add(make_response(((0, 1000), (1, 1000)), index="metrics", aggregation=False))
+
+        self.assertEqual(analyzer.shard_times()["[logs][2]"], 4010)
+        logs, metrics = analyzer.shard_skew()
+        self.assertEqual(logs.index, "logs")
+        self.assertEqual(logs.shards, 3)
+        self.assertEqual(logs.slowest_shard, "[logs][2]")
+        self.assertAlmostEqual(logs.skew, 4010 / 2010)
+        self.assertEqual(metrics.skew, 1.0)
+
+    def test_replicas_share_a_shard(self):
+        """Test that the same shard profiled on different nodes is one shard."""
+        first, second = make_response(aggregation=False), make_response(aggregation=False)
+        second.profile.shards[0].id = "[other-node][logs][0]"
+        analyzer = ProfileAnalyzer().add([first, second])
+
+        self.assertEqual(analyzer.shard_times(), {"[logs][0]": 2020})
+
+
+class TestFoldedStacks(unittest.TestCase):
+    """Test cases for flamegraph output."""
+
+    def test_self_times_per_stack(self):
+        """Test that each stack carries its self time and sums to the tree total."""
+        stacks = dict(line.rsplit(" ", 1) for line in ProfileAnalyzer().add(make_response()).folded_stacks())
+
+        self.assertEqual(stacks["query;BooleanQuery"], "250")
+        self.assertEqual(stacks["query;BooleanQuery;TermQuery"], "750")
+        self.assertEqual(stacks["aggregation;hosts (GlobalOrdinalsStringTermsAggregator)"], "200")
+        self.assertEqual(stacks["aggregation;hosts (GlobalOrdinalsStringTermsAggregator);max_cpu (MaxAggregator)"],
+                         "100")
+        self.assertEqual(sum(int(nanos) for stack, nanos in stacks.items() if stack.startswith("query")), 1000)
+
+    def test_separator_in_names_is_escaped(self):
+        """Test that a ';' inside a frame does not split the stack."""
+        response = make_response(aggregation=False)
+        response.profile.shards[0].searches[0].query[0].type = "a;b"
+
+        self.assertIn("query;a,b 250", ProfileAnalyzer().add(response).folded_stacks())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/query_template.py and query_template_benchmark.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise. The NumPy vector case is
+skipped when NumPy is not installed.
+"""
+
+import array
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from google.protobuf import json_format
+    from opensearch.protobufs.schemas import QueryContainer, SearchRequestBody
+    from helpers.query_template import Param, TemplateCache, compile_template
+    from query_template_benchmark import SCENARIOS, sample_values, scenario_functions
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def query(color="{{color}}", low="{{low}}", relation="{{relation}}", brands="{{brands}}", sort="{{sort}}",
+          extra="{{extra}}", vector="{{vector}}"):
+    """Return a template (by default) or, given values, the query it should bind to."""
+    return {
+        "size": 10,
+        "sort": sort,
+        "query": {"bool": {
+            "filter": [
+                {"term": {"field": "color", "value": {"string": color}}},
+                {"range": {"number_range_query": {"field": "price", "gte": low, "relation": relation}}},
+                {"terms": {"terms": {"tags": {"value": {"field_value_array": [{"string": "a"}]}}, "brand": brands}}},
+                {"exists": {"field": "in_stock"}},
+            ],
+            "must": [{"knn": {"field": "embedding", "k": 3, "vector": vector}}],
+            "should": [extra],
+        }},
+    }
+
+
+VALUES = {
+    "color": "red",
+    "low": 10.5,
+    "relation": "RANGE_RELATION_WITHIN",
+    "brands": {"value": {"field_value_array": [{"string": "acme"}, {"string": "globex"}]}},
+    "sort": [{"field": "price"}],
+    "extra": {"exists": {"field": "on_sale"}},
+    "vector": [0.25, 0.5, 0.75],
+}
+
+
+class TestQueryTemplate(unittest.TestCase):
+    """Test cases for compiling and binding."""
+
+    def setUp(self):
+        self.template = compile_template(query())
+        self.expected = json_format.ParseDict(query(**VALUES), SearchRequestBody())
+
+    def test_bind(self):
+        """Test that binding equals parsing the query with the values filled in."""
+        self.assertEqual(self.template.params, frozenset(VALUES))
+        self.assertEqual(self.template.bind(**VALUES), self.expected)
+
+    def test_bind_bytes(self):
+        """Test that the spliced bytes parse to the same message and serialize identically."""
+        data = self.template.bind_bytes(**VALUES)
+        self.assertEqual(SearchRequestBody.FromString(data), self.expected)
+        self.assertEqual(data, self.expected.SerializeToString())
+
+    def test_bindings_are_independent(self):
+        """Test that binding leaves the prototype and earlier results untouched."""
+        first = self.template.bind(**VALUES)
+        other = dict(VALUES, color="blue", vector=array.array("f", [1.0, 2.0, 3.0]))
+        second = self.template.bind(**other)
+
+        self.assertEqual(first, self.expected)
+        self.assertEqual(second.query.bool.filter[0].term.value.string, "blue")
+        self.assertEqual(list(second.query.bool.must[0].knn.vector), [1.0, 2.0, 3.0])
+        self.assertEqual(SearchRequestBody.FromString(self.template.bind_bytes(**other)), second)
+        self.assertFalse(self.template.prototype.query.bool.filter[0].term.value.HasField("string"))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy_vectors(self):
+        """Test float64 and float32 NumPy vectors."""
+        for dtype in ("float32", "float64"):
+            values = dict(VALUES, vector=numpy.array(VALUES["vector"], dtype=dtype))
+            self.assertEqual(self.template.bind(**values), self.expected)
+            self.assertEqual(SearchRequestBody.FromString(self.template.bind_bytes(**values)), self.expected)
+
+    def test_message_values_and_param(self):
+        """Test Param placeholders bound to a message."""
+        template = compile_template({"query": Param("query"), "size": 5})
+        query_value = QueryContainer()
+        query_value.exists.field = "x"
+
+        body = template.bind(query=query_value)
+        self.assertEqual(body.query, query_value)
+        self.assertEqual(body.size, 5)
+
+    def test_errors(self):
+        """Test parameter mismatches and unsupported placeholder positions."""
+        with self.assertRaises(ValueError):
+            self.template.bind(color="red")
+        with self.assertRaises(ValueError):
+            self.template.bind_bytes(unknown=1, **VALUES)
+        with self.assertRaises(ValueError):
+            compile_template({"stored_fields": ["a", "{{b}}"]})
+        with self.assertRaises(ValueError):
+            compile_template({"no_such_field": "{{b}}"})
+
+
+class TestTemplateCache(unittest.TestCase):
+    """Test cases for the LRU of compiled templates."""
+
+    def test_lru(self):
+        """Test hits, misses, eviction order and key canonicalization."""
+        cache = TemplateCache(max_entries=2)
+        first = cache.get({"size": "{{n}}", "from": 0})
+        self.assertIs(cache.get({"from": 0, "size": "{{n}}"}), first)
+        self.assertIs(cache.get({"from": 0, "size": Param("n")}), first)
+        cache.get({"size": "{{m}}"})
+        cache.get({"from": "{{m}}"})
+
+        self.assertEqual(cache.stats(), (2, 3, 1, 2))
+        self.assertIsNot(cache.get({"size": "{{n}}", "from": 0}), first)
+        self.assertEqual(cache.bind({"size": "{{m}}"}, m=3), SearchRequestBody(size=3))
+        self.assertEqual(cache.bind_bytes({"size": "{{m}}"}, m=3), SearchRequestBody(size=3).SerializeToString())
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases running the benchmark scenarios briefly."""
+
+    def test_scenarios_agree(self):
+        """Test that every scenario serializes the same queries."""
+        functions = scenario_functions(sample_values(5, dimension=4), filters=2)
+        outputs = [[SearchRequestBody.FromString(data) for data in functions[scenario]()] for scenario in SCENARIOS]
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/raw_bulk.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import BulkRequest, REFRESH_WAIT_FOR
+    from helpers.fake_server import FakeOpenSearch
+    from helpers.raw_bulk import RawAction, bulk_raw_method, chunk_raw_bulk_requests, encode_bulk_request
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+def protobuf_encoding(actions, op_type="index", template=None):
+    """Serialize the same actions through the protobuf runtime."""
+    request = BulkRequest()
+    if template is not None:
+        request.CopyFrom(template)
+    for action in actions:
+        body = request.bulk_request_body.add()
+        operation = getattr(body.operation_container, op_type)
+        operation.SetInParent()
+        for attribute, field in (("id", "x_id"), ("index", "x_index"), ("routing", "routing"),
+                                 ("pipeline", "pipeline")):
+            value = getattr(action, attribute)
+            if value is not None:
+                setattr(operation, field, value)
+        body.object = bytes(action.source)
+    return request.SerializeToString()
+
+
+ACTIONS = [
+    RawAction(b'{"a":1}', id="1", index="logs", routing="r1"),
+    RawAction(b"", id=""),
+    RawAction(b'{"big":"' + b"x" * 20000 + b'"}', id="é" * 70, pipeline="p"),
+    RawAction(b'{"n":null}'),
+]
+
+
+class TestEncodeBulkRequest(unittest.TestCase):
+    """Test cases for byte-identical encoding."""
+
+    def test_matches_protobuf_index(self):
+        """Test index actions with every combination of metadata."""
+        self.assertEqual(encode_bulk_request(ACTIONS), protobuf_encoding(ACTIONS))
+
+    def test_matches_protobuf_create(self):
+        """Test create actions, whose WriteOperation numbers fields differently."""
+        self.assertEqual(encode_bulk_request(ACTIONS, op_type="create"), protobuf_encoding(ACTIONS, "create"))
+
+    def test_top_level_fields_around_bodies(self):
+        """Test that fields numbered below and above 12 bracket the bodies."""
+        template = BulkRequest(index="logs", refresh=REFRESH_WAIT_FOR, timeout="1m")
+        template.global_params.human = True
+        template.bulk_request_body.add().object = b"ignored"
+
+        encoded = encode_bulk_request(ACTIONS, template=template)
+        del template.bulk_request_body[:]
+
+        self.assertEqual(encoded, protobuf_encoding(ACTIONS, template=template))
+        self.assertEqual(encode_bulk_request(ACTIONS[:1], index="logs"),
+                         protobuf_encoding(ACTIONS[:1], template=BulkRequest(index="logs")))
+
+    def test_bare_sources_and_buffers(self):
+        """Test that bytes, bytearray and memoryview sources are accepted."""
+        encoded = encode_bulk_request([b'{"a":1}', RawAction(bytearray(b"{}")), RawAction(memoryview(b"[]"))])
+        request = BulkRequest.FromString(encoded)
+
+        self.assertEqual([body.object for body in request.bulk_request_body], [b'{"a":1}', b"{}", b"[]"])
+        self.assertTrue(request.bulk_request_body[0].operation_container.HasField("index"))
+
+    def test_empty(self):
+        """Test that no actions encode just the top-level fields."""
+        self.assertEqual(encode_bulk_request([], index="a"), BulkRequest(index="a").SerializeToString())
+
+    def test_invalid_arguments(self):
+        """Test that bad op types and conflicting templates are rejected."""
+        with self.assertRaises(ValueError):
+            encode_bulk_request(ACTIONS, op_type="delete")
+        with self.assertRaises(ValueError):
+            encode_bulk_request(ACTIONS, template=BulkRequest(), index="a")
+
+
+class TestChunkRawBulkRequests(unittest.TestCase):
+    """Test cases for size-bounded raw chunks."""
+
+    def test_chunks_respect_limits(self):
+        """Test that every chunk fits max_bytes and together they hold every action in order."""
+        actions = [RawAction(b'{"n":"' + b"y" * 90 + b'"}', id=str(i)) for i in range(100)]
+
+        chunks = list(chunk_raw_bulk_requests(actions, max_bytes=1000, max_actions=7, index="logs"))
+        ids = [body.operation_container.index.x_id
+               for chunk in chunks for body in BulkRequest.FromString(chunk).bulk_request_body]
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+        self.assertTrue(all(len(BulkRequest.FromString(chunk).bulk_request_body) <= 7 for chunk in chunks))
+        self.assertEqual(ids, [str(i) for i in range(100)])
+        first = len(BulkRequest.FromString(chunks[0]).bulk_request_body)
+        self.assertEqual(chunks[0], protobuf_encoding(actions[:first], template=BulkRequest(index="logs")))
+
+    def test_oversize_action(self):
+        """Test that an action too large for any chunk raises ValueError."""
+        with self.assertRaises(ValueError):
+            list(chunk_raw_bulk_requests([RawAction(b"x" * 2000)], max_bytes=1000))
+
+    def test_errors_raise_on_first_next(self):
+        """Test that argument errors are raised lazily, like every other chunking error."""
+        for kwargs in ({"op_type": "delete"}, {"template": BulkRequest(), "index": "a"}, {"max_actions": 0},
+                       {"max_bytes": 1}):
+            chunks = chunk_raw_bulk_requests(ACTIONS, **kwargs)
+            with self.assertRaises(ValueError):
+                next(chunks)
+
+
+class TestBulkRawMethod(unittest.TestCase):
+    """Test cases sending raw bytes over a real channel."""
+
+    def test_send_pre_serialized(self):
+        """Test that the fake server parses the raw request like a normal one."""
+        with FakeOpenSearch() as fake, grpc.insecure_channel(fake.target) as channel:
+            response = bulk_raw_method(channel)(encode_bulk_request(ACTIONS[:2], index="logs"), timeout=5)
+
+        self.assertEqual([item.index.x_id for item in response.items], ["1", ""])
+        self.assertEqual(response.items[0].index.x_index, "logs")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
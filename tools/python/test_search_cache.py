@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/search_cache.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from opensearch.protobufs.schemas import ObjectMap, SearchRequest, SearchResponse
+    from helpers.search_cache import SearchResponseCache, bypass_reason, fingerprint
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+
+def make_request(indices=("a", "b"), size=10, ext=None):
+    """Build a SearchRequest over indices."""
+    request = SearchRequest(index=list(indices))
+    request.search_request_body.size = size
+    for key, value in (ext or {}).items():
+        request.search_request_body.ext.fields[key].string = value
+    return request
+
+
+def make_response(took, hits=1):
+    """Build a SearchResponse with hits hits."""
+    response = SearchResponse(took=took)
+    for number in range(hits):
+        response.hits.hits.add(x_id=str(number), x_source=b"x" * 100)
+    return response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSearchStub:
+    """Counts Search calls and answers with took set to the call number."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def Search(self, request, **kwargs):
+        self.calls += 1
+        return make_response(self.calls)
+
+
+class AsyncFakeSearchStub(FakeSearchStub):
+    async def Search(self, request, **kwargs):
+        await asyncio.sleep(0)
+        return FakeSearchStub.Search(self, request, **kwargs)
+
+
+class TestFingerprint(unittest.TestCase):
+    """Test cases for request canonicalization."""
+
+    def test_unordered_fields_normalized(self):
+        """Test that index order and duplicates do not change the fingerprint."""
+        self.assertEqual(fingerprint(make_request(["a", "b"])), fingerprint(make_request(["b", "a", "b"])))
+
+    def test_map_order_normalized(self):
+        """Test that map insertion order does not change the fingerprint."""
+        first = make_request(ext={"x": "1", "y": "2", "z": "3"})
+        second = make_request(ext={"z": "3", "y": "2", "x": "1"})
+
+        self.assertEqual(fingerprint(first), fingerprint(second))
+
+    def test_differences_detected(self):
+        """Test that meaningful differences change the fingerprint."""
+        self.assertNotEqual(fingerprint(make_request(size=10)), fingerprint(make_request(size=11)))
+        self.assertNotEqual(fingerprint(make_request(["a"])), fingerprint(make_request(["a", "b"])))
+
+    def test_request_not_modified(self):
+        """Test that fingerprinting leaves the request untouched."""
+        request = make_request(["b", "a"])
+
+        fingerprint(request)
+
+        self.assertEqual(list(request.index), ["b", "a"])
+
+    def test_bypass_reasons(self):
+        """Test that pit, scroll and request_cache=false bypass the cache."""
+        pit = make_request()
+        pit.search_request_body.pit.id = "pit"
+        scroll = make_request()
+        scroll.scroll = "1m"
+        no_cache = make_request()
+        no_cache.request_cache = False
+        allowed = make_request()
+        allowed.request_cache = True
+
+        self.assertEqual(bypass_reason(pit), "pit")
+        self.assertEqual(bypass_reason(scroll), "scroll")
+        self.assertEqual(bypass_reason(no_cache), "request_cache")
+        self.assertIsNone(bypass_reason(allowed))
+
+
+class TestSearchResponseCache(unittest.TestCase):
+    """Test cases for the LRU/TTL cache."""
+
+    def test_hit_returns_independent_copy(self):
+        """Test that hits return equal but separate messages."""
+        cache = SearchResponseCache()
+        cache.put(make_request(), make_response(5))
+
+        first = cache.get(make_request(["b", "a"]))
+        first.took = 99
+
+        self.assertEqual(cache.get(make_request()).took, 5)
+        self.assertEqual(cache.stats().hits, 2)
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after ttl seconds."""
+        clock = FakeClock()
+        cache = SearchResponseCache(ttl=10.0, clock=clock)
+        cache.put(make_request(), make_response(1))
+
+        clock.now = 9.9
+        self.assertIsNotNone(cache.get(make_request()))
+        clock.now = 10.0
+        self.assertIsNone(cache.get(make_request()))
+
+        stats = cache.stats()
+        self.assertEqual((stats.expirations, stats.misses, stats.entries, stats.bytes), (1, 1, 0, 0))
+
+    def test_entry_bound_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = SearchResponseCache(max_entries=2)
+        cache.put(make_request(size=1), make_response(1))
+        cache.put(make_request(size=2), make_response(2))
+        cache.get(make_request(size=1))
+        cache.put(make_request(size=3), make_response(3))
+
+        self.assertIsNotNone(cache.get(make_request(size=1)))
+        self.assertIsNone(cache.get(make_request(size=2)))
+        self.assertEqual(cache.stats().evictions, 1)
+
+    def test_byte_bound(self):
+        """Test that total bytes stay within max_bytes and oversize responses are not stored."""
+        entry_size = make_response(1, hits=3).ByteSize()
+        cache = SearchResponseCache(max_bytes=entry_size * 2)
+        for size in range(1, 5):
+            cache.put(make_request(size=size), make_response(size, hits=3))
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.stats().bytes, entry_size * 2)
+        self.assertFalse(cache.put(make_request(size=9), make_response(9, hits=10)))
+
+    def test_bypassed_requests_not_cached(self):
+        """Test that bypassed requests are neither stored nor served."""
+        cache = SearchResponseCache()
+        stub = FakeSearchStub()
+        request = make_request()
+        request.scroll = "1m"
+
+        cache.search(stub, request)
+        cache.search(stub, request)
+
+        self.assertEqual(stub.calls, 2)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats().bypasses, 2)
+
+    def test_search_through_stub(self):
+        """Test that repeated searches reach the stub once."""
+        cache = SearchResponseCache()
+        stub = FakeSearchStub()
+
+        results = [cache.search(stub, make_request(), timeout=5).took for _ in range(3)]
+
+        self.assertEqual(results, [1, 1, 1])
+        self.assertEqual(stub.calls, 1)
+        self.assertEqual((cache.stats().hits, cache.stats().misses), (2, 1))
+
+    def test_search_async(self):
+        """Test the grpc.aio variant."""
+        cache = SearchResponseCache()
+        stub = AsyncFakeSearchStub()
+
+        async def run():
+            return [(await cache.search_async(stub, make_request())).took for _ in range(3)]
+
+        self.assertEqual(asyncio.run(run()), [1, 1, 1])
+        self.assertEqual(stub.calls, 1)
+
+    def test_invalidate(self):
+        """Test that invalidate() empties the cache."""
+        cache = SearchResponseCache()
+        cache.put(make_request(), make_response(1))
+
+        cache.invalidate()
+
+        self.assertIsNone(cache.get(make_request()))
+        self.assertEqual(cache.stats().bytes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/streaming.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import SearchRequest, SearchResponse
+    from opensearch.protobufs.services import SearchServiceServicer, add_SearchServiceServicer_to_server
+    from helpers.streaming import consume_search_stream, consume_stream, effective_timeout
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+def make_request(pages, pause=None):
+    """Build a SearchRequest understood by PagingServicer."""
+    request = SearchRequest()
+    request.search_request_body.size = pages
+    if pause is not None:
+        request.search_request_body.timeout = pause
+    return request
+
+
+class FakeCall:
+    """Async iterable of (message, size) pairs that records progress."""
+
+    def __init__(self, count, fail_at=None):
+        self.count = count
+        self.fail_at = fail_at
+        self.produced = 0
+        self.cancelled = False
+
+    def __aiter__(self):
+        return self._frames()
+
+    async def _frames(self):
+        for index in range(self.count):
+            if index == self.fail_at:
+                raise RuntimeError("stream broke")
+            self.produced += 1
+            yield SearchResponse(took=index), 10 + index
+            await asyncio.sleep(0)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class PagingServicer(SearchServiceServicer):
+    """Streams search_request_body.size pages, pausing timeout seconds between them."""
+
+    async def ServerStreamSearch(self, request, context):
+        body = request.search_request_body
+        for index in range(body.size):
+            response = SearchResponse(took=index)
+            response.hits.hits.add(x_id=str(index))
+            yield response
+            if body.timeout:
+                await asyncio.sleep(float(body.timeout))
+
+
+class TestConsumeStream(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the generic bounded consumer."""
+
+    async def test_all_frames_handled_with_stats(self):
+        """Test that every frame reaches the handler with its size."""
+        seen, stats = [], []
+
+        summary = await consume_stream(FakeCall(5), lambda message: seen.append(message.took),
+                                       on_frame=stats.append)
+
+        self.assertEqual(seen, [0, 1, 2, 3, 4])
+        self.assertEqual(summary.frames, 5)
+        self.assertEqual(summary.bytes, sum(range(10, 15)))
+        self.assertEqual([frame.size for frame in stats], [10, 11, 12, 13, 14])
+        self.assertIsNotNone(summary.time_to_first_frame)
+
+    async def test_buffer_is_bounded(self):
+        """Test that a slow handler limits how far the reader runs ahead."""
+        call = FakeCall(50)
+        handled = 0
+        max_ahead = 0
+
+        async def slow(message):
+            nonlocal handled, max_ahead
+            max_ahead = max(max_ahead, call.produced - handled)
+            await asyncio.sleep(0.001)
+            handled += 1
+
+        summary = await consume_stream(call, slow, max_buffered=3)
+
+        self.assertEqual(handled, 50)
+        self.assertLessEqual(summary.max_buffered, 3)
+        # Buffered frames, plus one held by the reader and one being handled.
+        self.assertLessEqual(max_ahead, 3 + 2)
+
+    async def test_concurrent_handlers(self):
+        """Test that handlers overlap when concurrency > 1."""
+        active = peak = 0
+
+        async def handler(message):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.005)
+            active -= 1
+
+        await consume_stream(FakeCall(12), handler, max_buffered=8, concurrency=4)
+
+        self.assertGreater(peak, 1)
+
+    async def test_handler_error_cancels_call(self):
+        """Test that a failing handler cancels the stream and propagates."""
+        call = FakeCall(100)
+
+        def handler(message):
+            if message.took == 3:
+                raise ValueError("bad page")
+
+        with self.assertRaises(ValueError):
+            await consume_stream(call, handler)
+        self.assertTrue(call.cancelled)
+        self.assertLess(call.produced, 100)
+
+    async def test_stream_error_propagates(self):
+        """Test that an error from the stream reaches the caller."""
+        with self.assertRaises(RuntimeError):
+            await consume_stream(FakeCall(10, fail_at=4), lambda message: None)
+
+    async def test_outer_cancellation(self):
+        """Test that cancelling the consumer cancels the call."""
+        call = FakeCall(10 ** 6)
+
+        async def slow(message):
+            await asyncio.sleep(1)
+
+        task = asyncio.ensure_future(consume_stream(call, slow))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertTrue(call.cancelled)
+
+    async def test_invalid_arguments(self):
+        """Test argument validation."""
+        with self.assertRaises(ValueError):
+            await consume_stream(FakeCall(1), print, max_buffered=0)
+        with self.assertRaises(ValueError):
+            await consume_stream(FakeCall(1), print, concurrency=0)
+
+
+class TestEffectiveTimeout(unittest.TestCase):
+    """Test cases for deadline propagation."""
+
+    def test_combinations(self):
+        """Test that the earlier of timeout and deadline wins."""
+        self.assertIsNone(effective_timeout(None, None))
+        self.assertEqual(effective_timeout(5.0, None), 5.0)
+        self.assertAlmostEqual(effective_timeout(None, time.monotonic() + 2.0), 2.0, places=1)
+        self.assertAlmostEqual(effective_timeout(1.0, time.monotonic() + 2.0), 1.0, places=1)
+        self.assertEqual(effective_timeout(None, time.monotonic() - 1.0), 0.0)
+
+
+class TestConsumeSearchStream(unittest.IsolatedAsyncioTestCase):
+    """Test cases against an in-process grpc.aio server."""
+
+    async def asyncSetUp(self):
+        self.server = grpc.aio.server()
+        add_SearchServiceServicer_to_server(PagingServicer(), self.server)
+        port = self.server.add_insecure_port("127.0.0.1:0")
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel(f"127.0.0.1:{port}")
+
+    async def asyncTearDown(self):
+        await self.channel.close()
+        await self.server.stop(None)
+
+    async def test_streams_pages(self):
+        """Test consuming a real ServerStreamSearch call."""
+        ids = []
+
+        summary = await consume_search_stream(self.channel, make_request(6),
+                                              lambda page: ids.append(page.hits.hits[0].x_id))
+
+        self.assertEqual(ids, [str(i) for i in range(6)])
+        self.assertEqual(summary.frames, 6)
+        self.assertGreater(summary.bytes, 0)
+
+    async def test_deadline_exceeded(self):
+        """Test that the deadline is applied to the call."""
+        with self.assertRaises(grpc.aio.AioRpcError) as raised:
+            await consume_search_stream(self.channel, make_request(100, "0.05"),
+                                        lambda page: None, deadline=time.monotonic() + 0.2)
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.DEADLINE_EXCEEDED)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
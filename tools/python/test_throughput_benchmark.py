@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Unit tests for throughput_benchmark.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the tools/python directory to the path so we can import the module
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from throughput_benchmark import SCENARIOS, main, percentile, summarize
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+
+class TestSummaries(unittest.TestCase):
+    """Test cases for the statistics helpers."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        samples = list(range(1, 101))
+
+        self.assertEqual(percentile(samples, 0.50), 50)
+        self.assertEqual(percentile(samples, 0.99), 99)
+        self.assertEqual(percentile(samples, 1.0), 100)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_summarize(self):
+        """Test that rates are derived from wall time."""
+        record = summarize("search", wall=2.0, cpu=1.0, latencies=[0.01] * 10, sent=1_000_000, received=3_000_000)
+
+        self.assertEqual(record["requests_per_s"], 5.0)
+        self.assertEqual(record["mb_per_s"], 2.0)
+        self.assertEqual(record["cpu_percent"], 50.0)
+        self.assertAlmostEqual(record["latency_ms_p99"], 10.0)
+        self.assertNotIn("frames", record)
+
+
+class TestRun(unittest.TestCase):
+    """Test cases running every scenario briefly against the in-process server."""
+
+    def test_all_scenarios(self):
+        """Test that each scenario produces a complete record."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "results.json"
+            status = main(["--in-process", "--requests", "5", "--warmup", "1", "--concurrency", "2",
+                           "--bulk-docs", "10", "--page-size", "5", "--output", str(output)])
+            payload = json.loads(output.read_text(encoding='utf-8'))
+
+        self.assertEqual(status, 0)
+        self.assertEqual([record["scenario"] for record in payload["results"]], SCENARIOS)
+        for record in payload["results"]:
+            self.assertEqual(record["requests"], 5)
+            self.assertGreater(record["bytes_received"], 0)
+            self.assertGreater(record["requests_per_s"], 0)
+        streams = {record["scenario"]: record for record in payload["results"]}
+        self.assertEqual(streams["stream_search"]["frames"], 5 * 10)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/traffic.py and traffic_replay.py
+
+Requires the generated opensearch.protobufs package and grpcio on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise.
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import grpc
+    from opensearch.protobufs.schemas import BulkRequest, SearchRequest, SearchResponse
+    from opensearch.protobufs.services.document_service_pb2_grpc import DocumentServiceStub
+    from opensearch.protobufs.services.search_service_pb2_grpc import SearchServiceStub
+    from helpers.fake_server import FakeOpenSearch
+    from helpers.traffic import (
+        KIND_METHOD,
+        KIND_REQUEST,
+        KIND_RESPONSE,
+        KIND_STATUS,
+        TrafficLog,
+        TrafficRecorder,
+        index_path,
+        record_channel,
+        replay,
+    )
+    from traffic_replay import main
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs or grpc is not importable: {e}")
+
+SEARCH = "/org.opensearch.protobufs.services.SearchService/Search"
+STREAM = "/org.opensearch.protobufs.services.SearchService/ServerStreamSearch"
+BULK = "/org.opensearch.protobufs.services.DocumentService/Bulk"
+
+
+def search_request(size):
+    """Build a SearchRequest asking for size hits."""
+    request = SearchRequest(index=["products"])
+    request.search_request_body.size = size
+    return request
+
+
+class TrafficTestCase(unittest.TestCase):
+    """Records a few calls against a fake server into a temporary log."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "traffic.log")
+        self.fake = FakeOpenSearch(seed=0, hits_per_page=2, stream_pages=3)
+        self.target = self.fake.start()
+        self.addCleanup(self.fake.stop)
+
+    def record(self, **kwargs):
+        with TrafficRecorder(self.path, **kwargs) as recorder, grpc.insecure_channel(self.target) as channel:
+            recorded = record_channel(channel, recorder)
+            search = SearchServiceStub(recorded)
+            for size in (1, 2, 3):
+                search.Search(search_request(size))
+            self.stream = list(search.ServerStreamSearch(search_request(2)))
+            DocumentServiceStub(recorded).Bulk(BulkRequest(index="products"))
+
+    def read(self):
+        log = TrafficLog(self.path)
+        self.addCleanup(log.close)
+        return log
+
+
+class TestRecording(TrafficTestCase):
+    """Test cases for writing and reading the log."""
+
+    def test_round_trip(self):
+        """Test that requests, responses and statuses read back in call order."""
+        self.record()
+        log = self.read()
+        self.assertEqual(sorted(log.methods.values()), sorted([SEARCH, STREAM, BULK]))
+
+        records = [(record.kind, record.method, record.call) for record in log.records()]
+        self.assertEqual(records[:4], [(KIND_METHOD, SEARCH, 0), (KIND_REQUEST, SEARCH, 1),
+                                       (KIND_RESPONSE, SEARCH, 1), (KIND_STATUS, SEARCH, 1)])
+        self.assertEqual([record.message().search_request_body.size for record in log.requests()
+                          if record.method == SEARCH], [1, 2, 3])
+        self.assertEqual(len(next(log.records((KIND_RESPONSE,))).message().hits.hits), 1)
+
+        stream = [record for record in log.records() if record.method == STREAM and record.kind != KIND_METHOD]
+        self.assertEqual([record.kind for record in stream], [KIND_REQUEST] + [KIND_RESPONSE] * 3 + [KIND_STATUS])
+        self.assertEqual([record.message() for record in stream[1:4]], self.stream)
+        self.assertEqual(bytes(stream[-1].payload), b"OK")
+
+        timestamps = [record.timestamp for record in log.records()]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_requests_only(self):
+        """Test that record_responses=False keeps requests and statuses."""
+        self.record(record_responses=False)
+        kinds = {record.kind for record in self.read().records()}
+        self.assertEqual(kinds, {KIND_METHOD, KIND_REQUEST, KIND_STATUS})
+
+    def test_failed_call_status(self):
+        """Test that a failed call records its status code name and no response."""
+        self.fake.rpc_error_rate = 1.0
+        with TrafficRecorder(self.path) as recorder, grpc.insecure_channel(self.target) as channel:
+            with self.assertRaises(grpc.RpcError):
+                SearchServiceStub(record_channel(channel, recorder)).Search(search_request(1))
+        records = list(self.read().records((KIND_RESPONSE, KIND_STATUS)))
+        self.assertEqual([bytes(record.payload) for record in records], [b"RESOURCE_EXHAUSTED"])
+
+    def test_cancelled_call_and_late_records(self):
+        """Test that a cancelled call records its status and records after close() are dropped."""
+        self.fake.latency = 0.5
+        with TrafficRecorder(self.path) as recorder, grpc.insecure_channel(self.target) as channel:
+            future = SearchServiceStub(record_channel(channel, recorder)).Search.future(search_request(1))
+            self.assertTrue(future.cancel())
+        recorder.record(KIND_REQUEST, SEARCH, recorder.new_call(), b"late")
+
+        records = list(self.read().records((KIND_REQUEST, KIND_RESPONSE, KIND_STATUS)))
+        self.assertEqual([(record.kind, record.call) for record in records], [(KIND_REQUEST, 1), (KIND_STATUS, 1)])
+        self.assertEqual(bytes(records[1].payload), b"CANCELLED")
+
+    def test_without_index_and_torn_tail(self):
+        """Test that a log without its index is scanned and a truncated last record ignored."""
+        self.record()
+        with TrafficLog(self.path) as log:
+            expected = [(record.kind, record.call, bytes(record.payload)) for record in log.records()]
+        os.remove(index_path(self.path))
+        with open(self.path, "ab") as file:
+            file.write(b"\x01\x00\x00\x00\x09")
+
+        self.assertEqual([(record.kind, record.call, bytes(record.payload)) for record in self.read().records()],
+                         expected)
+
+    def test_stale_index(self):
+        """Test that records past the end of the index are found by scanning."""
+        self.record()
+        with TrafficLog(self.path) as log:
+            expected = [(record.kind, record.call, bytes(record.payload)) for record in log.records()]
+        with open(index_path(self.path), "r+b") as file:
+            file.truncate(os.path.getsize(index_path(self.path)) - 28 * 3 - 5)
+
+        self.assertEqual([(record.kind, record.call, bytes(record.payload)) for record in self.read().records()],
+                         expected)
+
+    def test_rejects_other_files(self):
+        """Test that a file without the magic is refused."""
+        with open(self.path, "wb") as file:
+            file.write(SearchResponse().SerializeToString() + b"not a log")
+        with self.assertRaises(ValueError):
+            TrafficLog(self.path)
+
+
+class TestReplay(TrafficTestCase):
+    """Test cases for replaying a log."""
+
+    def test_replay(self):
+        """Test that every recorded call is replayed with its original request."""
+        self.record()
+        before = dict(self.fake.calls)
+        with grpc.insecure_channel(self.target) as channel:
+            report = replay(self.read(), channel, rate=None, concurrency=2)
+
+        self.assertEqual(report.calls, 5)
+        self.assertEqual(report.errors, {})
+        self.assertEqual(report.methods["SearchService/Search"].calls, 3)
+        self.assertGreater(report.methods["SearchService/ServerStreamSearch"].p50, 0)
+        self.assertEqual(self.fake.calls["Search"] - before["Search"], 3)
+        self.assertEqual(self.fake.calls["Bulk"] - before["Bulk"], 1)
+
+    def test_methods_and_errors(self):
+        """Test method filtering and per-code error counts."""
+        self.record()
+        self.fake.rpc_error_rate = 1.0
+        with grpc.insecure_channel(self.target) as channel:
+            report = replay(self.read(), channel, rate=None, methods=["SearchService/Search"])
+
+        self.assertEqual(list(report.methods), ["SearchService/Search"])
+        self.assertEqual(report.errors, {"RESOURCE_EXHAUSTED": 3})
+        self.assertEqual(report.methods["SearchService/Search"].errors, 3)
+
+    def test_skipped_and_unknown_calls(self):
+        """Test that client-streaming and unknown-method calls are counted once per call."""
+        upload = "/org.opensearch.protobufs.services.SearchService/Upload"
+        with TrafficRecorder(self.path, record_responses=False) as recorder:
+            call = recorder.new_call()
+            for _ in range(3):
+                recorder.record(KIND_REQUEST, upload, call, b"")
+            for _ in range(2):
+                recorder.record(KIND_REQUEST, "/unknown.Service/Method", recorder.new_call(), b"")
+        streaming = mock.Mock(client_streaming=True, server_streaming=False)
+        with mock.patch.dict("helpers.traffic._METHODS", {upload: streaming}):
+            report = replay(self.read(), None, rate=None)
+
+        self.assertEqual((report.calls, report.skipped, report.unknown), (0, 1, 2))
+
+    def test_rate(self):
+        """Test that replay follows the recorded gaps divided by rate."""
+        clock = iter([0, 0, 400_000_000])
+        with TrafficRecorder(self.path, record_responses=False, clock=lambda: next(clock)) as recorder:
+            recorder.record(KIND_REQUEST, SEARCH, recorder.new_call(), search_request(1).SerializeToString())
+            recorder.record(KIND_REQUEST, SEARCH, recorder.new_call(), search_request(1).SerializeToString())
+        with grpc.insecure_channel(self.target) as channel:
+            start = time.perf_counter()
+            report = replay(self.read(), channel, rate=2.0)
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(report.calls, 2)
+        self.assertGreaterEqual(elapsed, 0.2)
+        with self.assertRaises(ValueError):
+            replay(self.read(), None, rate=0)
+
+
+class TestCommandLine(TrafficTestCase):
+    """Test cases for traffic_replay.py."""
+
+    def test_fake_target(self):
+        """Test a replay against the in-process fake server."""
+        self.record()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main([self.path, "--fake", "--max-rate", "--concurrency", "2"])
+
+        self.assertEqual(status, 0)
+        payload = json.loads(output.getvalue())
+        self.assertEqual(payload["calls"], 5)
+        self.assertEqual(payload["methods"]["DocumentService/Bulk"]["calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers/vectors.py
+
+Requires the generated opensearch.protobufs package on PYTHONPATH
+(e.g. PYTHONPATH=bazel-bin); skipped otherwise. NumPy-specific cases are
+skipped when NumPy is not installed.
+"""
+
+import os
+import struct
+import sys
+import unittest
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+try:
+    from opensearch.protobufs.schemas import BulkRequestBody
+    from helpers.vectors import ENCODING_BINARY_LE, set_vector_field
+except ImportError as e:
+    raise unittest.SkipTest(f"opensearch.protobufs is not importable: {e}")
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def make_bodies(count):
+    """Build count empty index bodies."""
+    return [BulkRequestBody() for _ in range(count)]
+
+
+def matrix(format_char, rows):
+    """Build a 2-D memoryview over little-endian packed rows."""
+    raw = b"".join(struct.pack(f"<{len(row)}{format_char}", *row) for row in rows)
+    return memoryview(raw).cast(format_char, shape=[len(rows), len(rows[0])])
+
+
+class TestSetVectorFieldBuffer(unittest.TestCase):
+    """Test cases using plain buffer-protocol objects."""
+
+    def test_float_values(self):
+        """Test that float rows populate FloatList values."""
+        bodies = make_bodies(2)
+
+        set_vector_field(bodies, "embedding", matrix("f", [[1.0, 2.5], [-3.0, 0.25]]))
+
+        values = [list(body.extra_field_values["embedding"].float_array_value.values.values) for body in bodies]
+        self.assertEqual(values, [[1.0, 2.5], [-3.0, 0.25]])
+
+    def test_float_binary_le(self):
+        """Test that the raw mode writes rows straight through."""
+        bodies = make_bodies(2)
+        vectors = matrix("f", [[1.0, 2.5], [-3.0, 0.25]])
+
+        set_vector_field(bodies, "embedding", vectors, encoding=ENCODING_BINARY_LE)
+
+        binary = bodies[1].extra_field_values["embedding"].float_array_value.binary_le
+        self.assertEqual(binary.bytes_le, struct.pack("<2f", -3.0, 0.25))
+        self.assertEqual(binary.dimension, 2)
+
+    def test_double_values(self):
+        """Test that float64 rows populate DoubleList values."""
+        bodies = make_bodies(1)
+        set_vector_field(bodies, "v", matrix("d", [[0.1, 0.2, 0.3]]))
+        self.assertEqual(list(bodies[0].extra_field_values["v"].double_array_value.values.values), [0.1, 0.2, 0.3])
+
+    def test_int_and_long_values(self):
+        """Test that integer rows populate the varint-encoded lists."""
+        bodies = make_bodies(1)
+        set_vector_field(bodies, "i", matrix("i", [[1, -2, 300000]]))
+        set_vector_field(bodies, "q", matrix("q", [[1, -2, 2 ** 40]]))
+
+        self.assertEqual(list(bodies[0].extra_field_values["i"].int_array_value.values.values), [1, -2, 300000])
+        self.assertEqual(list(bodies[0].extra_field_values["q"].long_array_value.values.values), [1, -2, 2 ** 40])
+
+    def test_bytes_value(self):
+        """Test that 8-bit rows are stored as BytesValue."""
+        bodies = make_bodies(2)
+        set_vector_field(bodies, "b", memoryview(b"abcdef").cast("B", shape=[2, 3]))
+        self.assertEqual([body.extra_field_values["b"].bytes_value.bytes for body in bodies], [b"abc", b"def"])
+
+    def test_existing_value_is_replaced(self):
+        """Test that a second call replaces rather than appends."""
+        bodies = make_bodies(1)
+        set_vector_field(bodies, "v", matrix("f", [[1.0]]))
+        set_vector_field(bodies, "v", matrix("f", [[2.0]]))
+        self.assertEqual(list(bodies[0].extra_field_values["v"].float_array_value.values.values), [2.0])
+
+    def test_matches_element_wise_construction(self):
+        """Test that the serialized result equals a body built element by element."""
+        rows = [[0.5, 1.5, -2.0, 8.0]]
+        bodies = make_bodies(1)
+        set_vector_field(bodies, "v", matrix("f", rows))
+
+        expected = BulkRequestBody()
+        expected.extra_field_values["v"].float_array_value.values.values.extend(rows[0])
+        self.assertEqual(bodies[0].SerializeToString(), expected.SerializeToString())
+
+    def test_row_count_mismatch(self):
+        """Test that rows and bodies must line up."""
+        with self.assertRaises(ValueError):
+            set_vector_field(make_bodies(3), "v", matrix("f", [[1.0]]))
+
+    def test_not_two_dimensional(self):
+        """Test that 1-D input is rejected."""
+        with self.assertRaises(ValueError):
+            set_vector_field(make_bodies(1), "v", memoryview(struct.pack("<2f", 1.0, 2.0)).cast("f"))
+
+    def test_unknown_encoding(self):
+        """Test that unknown encodings are rejected."""
+        with self.assertRaises(ValueError):
+            set_vector_field(make_bodies(1), "v", matrix("f", [[1.0]]), encoding="json")
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestSetVectorFieldNumpy(unittest.TestCase):
+    """Test cases using NumPy arrays."""
+
+    def test_float32_matrix(self):
+        """Test a float32 embedding batch."""
+        vectors = numpy.arange(12, dtype=numpy.float32).reshape(3, 4)
+        bodies = make_bodies(3)
+
+        set_vector_field(bodies, "embedding", vectors, encoding=ENCODING_BINARY_LE)
+
+        binary = bodies[2].extra_field_values["embedding"].float_array_value.binary_le
+        self.assertEqual(binary.bytes_le, vectors[2].astype("<f4").tobytes())
+
+    def test_big_endian_and_non_contiguous(self):
+        """Test that byte order and strides are normalized."""
+        vectors = numpy.arange(12, dtype=">f8").reshape(4, 3)[::2]
+        bodies = make_bodies(2)
+
+        set_vector_field(bodies, "v", vectors)
+
+        self.assertEqual(list(bodies[1].extra_field_values["v"].double_array_value.values.values), [6.0, 7.0, 8.0])
+
+    def test_int64_matrix(self):
+        """Test an int64 batch populates long_array_value."""
+        vectors = numpy.array([[1, 2], [3, 4]], dtype=numpy.int64)
+        bodies = make_bodies(2)
+
+        set_vector_field(bodies, "v", vectors)
+
+        self.assertEqual(list(bodies[1].extra_field_values["v"].long_array_value.values.values), [3, 4])
+
+    def test_unsupported_dtype(self):
+        """Test that float16 is rejected."""
+        with self.assertRaises(TypeError):
+            set_vector_field(make_bodies(1), "v", numpy.zeros((1, 2), dtype=numpy.float16))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark for the generated Python gRPC clients.
+
+Runs Bulk, Search, ServerStreamSearch and PredictModelStream against
+helpers.fake_server.FakeOpenSearch and reports, per scenario, requests/s,
+MB/s (serialized request plus response bytes), p50/p99 latency and client
+CPU utilisation. For streams the latency is per stream and time to first
+frame is reported too.
+
+The fake server runs in a child process by default so the CPU figure is the
+client's alone (serialization, deserialization and grpc's client threads).
+Pass --in-process to share one interpreter instead.
+
+Usage:
+    export PYTHONPATH=bazel-bin
+    python3 tools/python/throughput_benchmark.py --output throughput.json
+    python3 tools/python/throughput_benchmark.py --scenarios bulk search --requests 5000 --concurrency 16
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+import grpc
+from google.protobuf.internal import api_implementation
+
+from opensearch.protobufs.schemas import (
+    BulkRequest,
+    BulkResponse,
+    MlPredictModelStreamRequest,
+    PredictResponse,
+    SearchRequest,
+    SearchResponse,
+)
+from opensearch.protobufs.services import document_service_pb2, ml_service_pb2, search_service_pb2
+from helpers._grpc import method_path, sized_deserializer
+from helpers.bulk import to_bulk_request_body
+from helpers.fake_server import FakeOpenSearch
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+SCENARIOS = ["bulk", "search", "stream_search", "predict_stream"]
+
+UNARY = "unary"
+STREAM = "stream"
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of samples (fraction in [0, 1])."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(scenario: str, wall: float, cpu: float, latencies: List[float], sent: int, received: int,
+              frames: int = 0, first_frame: Sequence[float] = ()) -> Dict[str, Any]:
+    """Build the result record for one scenario."""
+    record = {
+        "scenario": scenario,
+        "requests": len(latencies),
+        "seconds": wall,
+        "requests_per_s": len(latencies) / wall if wall else 0.0,
+        "mb_per_s": (sent + received) / 1e6 / wall if wall else 0.0,
+        "bytes_sent": sent,
+        "bytes_received": received,
+        "latency_ms_p50": percentile(latencies, 0.50) * 1000.0,
+        "latency_ms_p99": percentile(latencies, 0.99) * 1000.0,
+        "cpu_percent": cpu / wall * 100.0 if wall else 0.0,
+    }
+    if frames:
+        record["frames"] = frames
+        record["frames_per_s"] = frames / wall if wall else 0.0
+        record["first_frame_ms_p50"] = percentile(first_frame, 0.50) * 1000.0
+        record["first_frame_ms_p99"] = percentile(first_frame, 0.99) * 1000.0
+    return record
+
+
+def bulk_request(docs: int, doc_bytes: int) -> BulkRequest:
+    """Build one BulkRequest of docs index actions with doc_bytes sources."""
+    padding = "x" * max(0, doc_bytes - 32)
+    request = BulkRequest(index="bench")
+    request.bulk_request_body.extend(
+        to_bulk_request_body({"_id": str(number), "n": number, "body": padding}) for number in range(docs)
+    )
+    return request
+
+
+def search_request(size: int) -> SearchRequest:
+    """Build a SearchRequest asking for size hits."""
+    request = SearchRequest(index=["bench"])
+    request.search_request_body.size = size
+    return request
+
+
+def build_scenarios(args: argparse.Namespace) -> Dict[str, Tuple[str, str, Any, Any]]:
+    """Map scenario name to (kind, method path, request, response class)."""
+    return {
+        "bulk": (UNARY, method_path(document_service_pb2, "DocumentService", "Bulk"),
+                 bulk_request(args.bulk_docs, args.doc_bytes), BulkResponse),
+        "search": (UNARY, method_path(search_service_pb2, "SearchService", "Search"),
+                   search_request(args.page_size), SearchResponse),
+        "stream_search": (STREAM, method_path(search_service_pb2, "SearchService", "ServerStreamSearch"),
+                          search_request(args.page_size), SearchResponse),
+        "predict_stream": (STREAM, method_path(ml_service_pb2, "MLService", "PredictModelStream"),
+                           MlPredictModelStreamRequest(model_id="bench"), PredictResponse),
+    }
+
+
+def run_workers(count: int, concurrency: int, call_once: Callable[[], Tuple[float, int, int, float]]) -> Dict:
+    """Run call_once count times on concurrency threads and collect the samples.
+
+    call_once returns (latency seconds, response bytes, frames, first frame seconds).
+    """
+    latencies, received, frames, first_frame = [], [0], [0], []
+    lock = threading.Lock()
+    remaining = [count]
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            latency, size, frame_count, first = call_once()
+            with lock:
+                latencies.append(latency)
+                received[0] += size
+                frames[0] += frame_count
+                if frame_count:
+                    first_frame.append(first)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"latencies": latencies, "received": received[0], "frames": frames[0], "first_frame": first_frame}
+
+
+def run_scenario(channel: grpc.Channel, scenario: str, kind: str, path: str, request: Any, response_class: Any,
+                 requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    """Benchmark one scenario on channel and return its record."""
+    factory = channel.unary_unary if kind == UNARY else channel.unary_stream
+    call = factory(path, request_serializer=type(request).SerializeToString,
+                   response_deserializer=sized_deserializer(response_class.FromString))
+    request_size = request.ByteSize()
+
+    def unary_once():
+        start = time.perf_counter()
+        _, size = call(request)
+        return time.perf_counter() - start, size, 0, 0.0
+
+    def stream_once():
+        start = time.perf_counter()
+        first, size, frames = 0.0, 0, 0
+        for _, frame_size in call(request):
+            if not frames:
+                first = time.perf_counter() - start
+            frames += 1
+            size += frame_size
+        return time.perf_counter() - start, size, frames, first
+
+    call_once = unary_once if kind == UNARY else stream_once
+    run_workers(warmup, concurrency, call_once)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    samples = run_workers(requests, concurrency, call_once)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    return summarize(scenario, wall, cpu, samples["latencies"], request_size * requests, samples["received"],
+                     samples["frames"], samples["first_frame"])
+
+
+def _serve(config: Dict[str, Any], connection) -> None:
+    """Child process entry point: run the fake server until told to stop."""
+    with FakeOpenSearch(**config) as fake:
+        connection.send(fake.target)
+        connection.recv()
+
+
+class ServerProcess:
+    """FakeOpenSearch in a child process, so its CPU is not charged to the client."""
+
+    def __init__(self, config: Dict[str, Any]):
+        context = multiprocessing.get_context("spawn")
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=_serve, args=(config, child), daemon=True)
+
+    def __enter__(self) -> str:
+        self._process.start()
+        if not self._connection.poll(60):
+            self._process.kill()
+            raise RuntimeError("Fake server did not start within 60s")
+        return self._connection.recv()
+
+    def __exit__(self, *exc_info) -> None:
+        self._connection.send("stop")
+        self._process.join(10)
+
+
+class InProcessServer:
+    """FakeOpenSearch in this process."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self._fake = FakeOpenSearch(**config)
+
+    def __enter__(self) -> str:
+        return self._fake.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self._fake.stop()
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the fake server, run the selected scenarios and return the payload."""
+    config = {
+        "latency": args.latency,
+        "hits_per_page": args.page_size,
+        "source_size": args.doc_bytes,
+        "stream_pages": args.stream_pages,
+        "stream_chunks": args.stream_chunks,
+        "max_workers": max(16, args.concurrency * 2),
+    }
+    scenarios = build_scenarios(args)
+    server = InProcessServer(config) if args.in_process else ServerProcess(config)
+    results = []
+    with server as target:
+        with grpc.insecure_channel(target, options=[("grpc.max_receive_message_length", -1),
+                                                    ("grpc.max_send_message_length", -1)]) as channel:
+            grpc.channel_ready_future(channel).result(timeout=30)
+            for scenario in args.scenarios:
+                kind, path, request, response_class = scenarios[scenario]
+                record = run_scenario(channel, scenario, kind, path, request, response_class,
+                                      args.requests, args.concurrency, args.warmup)
+                logger.info(f"{scenario}: {record['requests_per_s']:.0f} req/s, {record['mb_per_s']:.1f} MB/s, "
+                            f"p50 {record['latency_ms_p50']:.2f}ms, p99 {record['latency_ms_p99']:.2f}ms, "
+                            f"cpu {record['cpu_percent']:.0f}%")
+                results.append(record)
+
+    return {
+        "python": sys.version.split()[0],
+        "protobuf_backend": api_implementation.Type(),
+        "grpc": grpc.__version__,
+        "server": "in-process" if args.in_process else "subprocess",
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and return the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=1000, help="Calls (or streams) per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads issuing calls")
+    parser.add_argument("--bulk-docs", type=int, default=500, help="Actions per BulkRequest")
+    parser.add_argument("--doc-bytes", type=int, default=512, help="Approximate bytes per document source")
+    parser.add_argument("--page-size", type=int, default=100, help="Hits per SearchResponse")
+    parser.add_argument("--stream-pages", type=int, default=10, help="Frames per ServerStreamSearch")
+    parser.add_argument("--stream-chunks", type=int, default=50, help="Frames per PredictModelStream")
+    parser.add_argument("--latency", type=float, default=0.0, help="Server-side delay per call in seconds")
+    parser.add_argument("--in-process", action="store_true", help="Run the fake server in this process")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    payload = run(args)
+    text = json.dumps(payload, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding='utf-8')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
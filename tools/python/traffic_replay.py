@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Replay a traffic log written by helpers.traffic.TrafficRecorder.
+
+Sends the recorded requests to --target, or to an in-process
+helpers.fake_server.FakeOpenSearch with --fake, at the recorded pace scaled
+by --rate, or as fast as --concurrency allows with --max-rate, and prints
+per-method call counts, errors and latency percentiles as JSON.
+
+Usage:
+    export PYTHONPATH=bazel-bin
+    python3 tools/python/traffic_replay.py traffic.log --target localhost:9400 --rate 2
+    python3 tools/python/traffic_replay.py traffic.log --fake --max-rate --concurrency 32
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Add the tools/python directory to the path so we can import the helpers
+sys.path.insert(0, os.path.dirname(__file__))
+import grpc
+
+from helpers.fake_server import FakeOpenSearch
+from helpers.traffic import DEFAULT_REPLAY_CONCURRENCY, TrafficLog, replay
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Replay the log and return the process exit status (1 if any call failed)."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("log", help="Traffic log to replay")
+    server = parser.add_mutually_exclusive_group(required=True)
+    server.add_argument("--target", help="host:port of the gRPC endpoint")
+    server.add_argument("--fake", action="store_true", help="Replay against an in-process fake server")
+    pace = parser.add_mutually_exclusive_group()
+    pace.add_argument("--rate", type=float, default=1.0, help="Speed-up over the recorded pace")
+    pace.add_argument("--max-rate", action="store_true", help="Ignore the recorded pace")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_REPLAY_CONCURRENCY, help="Calls in flight")
+    parser.add_argument("--methods", nargs="+", help="Only replay these Service/Method names")
+    parser.add_argument("--timeout", type=float, help="Per-call deadline in seconds")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    fake = FakeOpenSearch() if args.fake else None
+    target = fake.start() if fake else args.target
+    try:
+        with TrafficLog(args.log) as log, grpc.insecure_channel(target) as channel:
+            report = replay(log, channel, rate=None if args.max_rate else args.rate,
+                            concurrency=args.concurrency, methods=args.methods, timeout=args.timeout)
+    finally:
+        if fake:
+            fake.stop()
+
+    payload = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "calls": report.calls,
+        "calls_per_s": report.calls / report.elapsed if report.elapsed else 0.0,
+        "elapsed_s": report.elapsed,
+        "errors": report.errors,
+        "max_lag_s": report.max_lag,
+        "skipped": report.skipped,
+        "unknown": report.unknown,
+        "methods": {name: stats._asdict() for name, stats in report.methods.items()},
+    }
+    text = json.dumps(payload, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding='utf-8')
+    else:
+        print(text)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -384,6 +384,166 @@ def add_SearchServiceServicer_to_server():
         self.assertLess(alpha_pos, zebra_pos, "Files should be sorted alphabetically")
 
 
+class TestLazyInitGeneration(unittest.TestCase):
+    """Test cases for the PEP 562 lazy __init__.py generation."""
+
+    def setUp(self):
+        """Set up a fake importable package with schemas and services."""
+        self.test_dir = tempfile.mkdtemp()
+        self.package_dir = Path(self.test_dir) / "lazypkg"
+        self.schemas_dir = self.package_dir / "schemas"
+        self.services_dir = self.package_dir / "services"
+        self.schemas_dir.mkdir(parents=True)
+        self.services_dir.mkdir(parents=True)
+        (self.package_dir / "__init__.py").write_text("")
+
+        (self.schemas_dir / "common_pb2.py").write_text("""
+import builtins
+builtins.LAZY_LOADED = getattr(builtins, "LAZY_LOADED", []) + [__name__]
+DESCRIPTOR = object()
+class BulkRequest:
+    pass
+class SearchRequest:
+    pass
+""")
+        (self.schemas_dir / "common_pb2.pyi").write_text("""
+from google.protobuf import descriptor as _descriptor
+DESCRIPTOR: _descriptor.FileDescriptor
+OP_TYPE_INDEX: OpType
+class BulkRequest:
+    pass
+class SearchRequest:
+    pass
+""")
+        (self.services_dir / "document_service_pb2.py").write_text("DESCRIPTOR = 'document'\n")
+        (self.services_dir / "search_service_pb2.py").write_text("DESCRIPTOR = 'search'\n")
+        (self.services_dir / "document_service_pb2_grpc.py").write_text("""
+import builtins
+builtins.LAZY_LOADED = getattr(builtins, "LAZY_LOADED", []) + [__name__]
+GRPC_VERSION = "1"
+_private = 1
+class DocumentServiceStub:
+    pass
+def add_DocumentServiceServicer_to_server():
+    pass
+""")
+        (self.services_dir / "search_service_pb2_grpc.py").write_text("""
+import builtins
+builtins.LAZY_LOADED = getattr(builtins, "LAZY_LOADED", []) + [__name__]
+class SearchServiceStub:
+    pass
+""")
+
+    def tearDown(self):
+        """Clean up the fake package and anything imported from it."""
+        import builtins
+        for name in list(sys.modules):
+            if name == "lazypkg" or name.startswith("lazypkg."):
+                del sys.modules[name]
+        if self.test_dir in sys.path:
+            sys.path.remove(self.test_dir)
+        if hasattr(builtins, "LAZY_LOADED"):
+            del builtins.LAZY_LOADED
+        shutil.rmtree(self.test_dir)
+
+    def test_lazy_schemas_init_content(self):
+        """Test that lazy mode emits __getattr__, __dir__, __all__ and a stub."""
+        output_file = self.schemas_dir / "__init__.py"
+
+        result = generate_schemas_init(str(self.schemas_dir), str(output_file), lazy=True)
+
+        self.assertEqual(result, ["BulkRequest", "DESCRIPTOR", "OP_TYPE_INDEX", "SearchRequest"])
+        content = output_file.read_text()
+        self.assertIn("# OpenSearch Protobuf Schemas", content)
+        self.assertIn("def __getattr__(name):", content)
+        self.assertIn("def __dir__():", content)
+        self.assertIn("'BulkRequest': 'common_pb2',", content)
+        self.assertNotIn("import *", content)
+
+        stub = (self.schemas_dir / "__init__.pyi").read_text()
+        self.assertIn("from . import common_pb2 as common_pb2", stub)
+        self.assertIn("    BulkRequest as BulkRequest,", stub)
+        self.assertIn("    OP_TYPE_INDEX as OP_TYPE_INDEX,", stub)
+        self.assertIn("__all__ = ['BulkRequest', 'DESCRIPTOR', 'OP_TYPE_INDEX', 'SearchRequest']", stub)
+
+    def test_lazy_services_index_skips_private_names(self):
+        """Test that private names are not exported and later modules win."""
+        output_file = self.services_dir / "__init__.py"
+
+        result = generate_services_init(str(self.services_dir), str(output_file), lazy=True)
+
+        self.assertTrue(result)
+        content = output_file.read_text()
+        self.assertNotIn("_private", content.split("__all__")[1])
+        # search_service_pb2 sorts after document_service_pb2, as with star imports
+        self.assertIn("'DESCRIPTOR': 'search_service_pb2',", content)
+        self.assertIn("'DocumentServiceStub': 'document_service_pb2_grpc',", content)
+        self.assertTrue((self.services_dir / "__init__.pyi").exists())
+
+    def test_lazy_package_imports_on_first_access(self):
+        """Test that the generated package only imports the module it needs."""
+        import builtins
+        generate_schemas_init(str(self.schemas_dir), str(self.schemas_dir / "__init__.py"), lazy=True)
+        generate_services_init(str(self.services_dir), str(self.services_dir / "__init__.py"), lazy=True)
+        sys.path.insert(0, self.test_dir)
+
+        import importlib
+        services = importlib.import_module("lazypkg.services")
+        self.assertEqual(getattr(builtins, "LAZY_LOADED", []), [])
+        self.assertIn("SearchServiceStub", dir(services))
+
+        stub = services.DocumentServiceStub
+        self.assertEqual(stub.__name__, "DocumentServiceStub")
+        self.assertEqual(builtins.LAZY_LOADED, ["lazypkg.services.document_service_pb2_grpc"])
+
+        from lazypkg.schemas import BulkRequest, common_pb2
+        self.assertIs(BulkRequest, common_pb2.BulkRequest)
+        self.assertNotIn("lazypkg.services.search_service_pb2_grpc", builtins.LAZY_LOADED)
+
+        with self.assertRaises(AttributeError):
+            services.DoesNotExist
+
+    def test_lazy_falls_back_to_source_without_stub(self):
+        """Test that names are read from the .py file when no .pyi exists."""
+        (self.schemas_dir / "common_pb2.pyi").unlink()
+
+        result = generate_schemas_init(str(self.schemas_dir), str(self.schemas_dir / "__init__.py"), lazy=True)
+
+        self.assertEqual(result, ["BulkRequest", "DESCRIPTOR", "SearchRequest"])
+
+    def test_lazy_unparsable_module_is_skipped(self):
+        """Test that a module that cannot be parsed contributes no names."""
+        (self.schemas_dir / "broken_pb2.py").write_text("class (:\n")
+
+        result = generate_schemas_init(str(self.schemas_dir), str(self.schemas_dir / "__init__.py"), lazy=True)
+
+        self.assertNotIn("broken_pb2", (self.schemas_dir / "__init__.py").read_text().split("_EXPORTS")[1])
+        self.assertIn("BulkRequest", result)
+
+    def test_lazy_file_write_error(self):
+        """Test lazy generation with file write permission error."""
+        output_file = self.schemas_dir / "__init__.py"
+
+        with patch('builtins.open', side_effect=PermissionError("Permission denied")):
+            self.assertEqual(generate_schemas_init(str(self.schemas_dir), str(output_file), lazy=True), [])
+            self.assertFalse(generate_services_init(str(self.services_dir), str(output_file), lazy=True))
+
+    @patch('sys.argv', ['generate_init_files.py', '--lazy', 'schemas_dir', 'services_dir'])
+    @patch('generate_init_files.generate_schemas_init')
+    @patch('generate_init_files.generate_services_init')
+    def test_main_function_lazy_flag(self, mock_services, mock_schemas):
+        """Test that --lazy is forwarded to both generators."""
+        mock_schemas.return_value = ["*"]
+        mock_services.return_value = True
+
+        with patch('sys.exit') as mock_exit:
+            main()
+            mock_exit.assert_called_with(0)
+
+        mock_schemas.assert_called_once_with('schemas_dir', os.path.join('schemas_dir', '__init__.py'), lazy=True)
+        mock_services.assert_called_once_with('services_dir', os.path.join('services_dir', '__init__.py'), lazy=True)
+
+
 class TestEdgeCases(unittest.TestCase):
     """Test edge cases and error conditions."""
 